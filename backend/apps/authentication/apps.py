@@ -5,3 +5,6 @@ class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authentication'
     verbose_name = '認証'
+
+    def ready(self):
+        import apps.authentication.signals  # noqa: F401
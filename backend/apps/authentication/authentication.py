@@ -0,0 +1,31 @@
+"""
+Authentication Classes
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .services.identity_cache import UserIdentityCache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT認証（ユーザー取得を UserIdentityCache 経由で行う）
+
+    リクエストごとの users テーブル問い合わせを省略する。
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        user = UserIdentityCache.get_user(user_id, validated_token.get('auth_ver'))
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        return user
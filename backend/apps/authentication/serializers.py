@@ -3,12 +3,24 @@ Authentication Serializers
 """
 from django.db import models
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.utils import timezone
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenObtainSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from apps.core.utils import normalize_phone
+from apps.tenants.services.feature_permissions import FeaturePermissionCompiler
 from apps.users.models import User
 
+from .services.identity_cache import UserIdentityCache
+from .services.profile_cache import UserProfileCache, guardian_of, me_payload
+
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
-    """カスタムJWTトークン取得シリアライザー"""
+    """カスタムJWTトークン取得シリアライザー
+
+    認証（PhoneOrEmailBackend）でユーザー・保護者・最寄り校舎を1クエリで読み込み、
+    その値からトークンのクレームとプロフィール（/me と同じ内容）を作成する。
+    ログイン成功時の更新（失敗回数のリセット・最終ログイン日時）は1回の UPDATE で行う。
+    """
 
     @classmethod
     def get_token(cls, user):
@@ -19,9 +31,16 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['user_type'] = user.user_type
         token['role'] = user.role
         token['full_name'] = user.full_name
+        # 認証バージョン（パスワード変更で旧トークンを無効化）
+        token['auth_ver'] = UserIdentityCache.auth_version(user)
+
+        guardian = guardian_of(user)
+        token['guardian_id'] = str(guardian.id) if guardian else None
 
         if user.tenant_id:
             token['tenant_id'] = str(user.tenant_id)
+            # 機能権限のバージョン（変わっていればクライアントは /me を取り直す）
+            token['perm_ver'] = FeaturePermissionCompiler.get_version(user.tenant_id)
         if user.primary_school_id:
             token['primary_school_id'] = str(user.primary_school_id)
         if user.primary_brand_id:
@@ -30,29 +49,44 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return token
 
     def validate(self, attrs):
-        data = super().validate(attrs)
+        # 認証のみ（TokenObtainPairSerializer.validate は最終ログイン日時を別に保存するため使わない）
+        data = TokenObtainSerializer.validate(self, attrs)
+        user = self.user
 
         # アカウントロックチェック
-        if self.user.is_locked():
+        if user.is_locked():
             raise serializers.ValidationError(
                 'アカウントがロックされています。しばらくしてから再度お試しください。'
             )
 
-        # ログイン成功時にリセット
-        self.user.reset_failed_login()
+        refresh = self.get_token(user)
+        data['refresh'] = str(refresh)
+        data['access'] = str(refresh.access_token)
+
+        # ログイン成功時にリセット（最終ログイン日時とまとめて更新）
+        now = timezone.now()
+        updates = {'failed_login_count': 0, 'locked_until': None, 'last_login_at': now}
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            updates['last_login'] = now
+        User.objects.filter(pk=user.pk).update(**updates)
+        UserIdentityCache.invalidate(user.pk)
+        for name, value in updates.items():
+            setattr(user, name, value)
 
         # ユーザー情報を追加
         data['user'] = {
-            'id': str(self.user.id),
-            'email': self.user.email,
-            'phone': self.user.phone,
-            'full_name': self.user.full_name,
-            'user_type': self.user.user_type,
-            'role': self.user.role,
-            'tenant_id': str(self.user.tenant_id) if self.user.tenant_id else None,
-            'primary_school_id': str(self.user.primary_school_id) if self.user.primary_school_id else None,
-            'must_change_password': self.user.must_change_password,
+            'id': str(user.id),
+            'email': user.email,
+            'phone': user.phone,
+            'full_name': user.full_name,
+            'user_type': user.user_type,
+            'role': user.role,
+            'tenant_id': str(user.tenant_id) if user.tenant_id else None,
+            'primary_school_id': str(user.primary_school_id) if user.primary_school_id else None,
+            'must_change_password': user.must_change_password,
         }
+        # /me と同じプロフィール（アプリ起動時の /me を省略できる。キャッシュも温める）
+        data['profile'] = me_payload(UserProfileCache.prime(user), FeaturePermissionCompiler.for_user(user))
 
         return data
 
@@ -105,7 +139,7 @@ class RegisterSerializer(serializers.Serializer):
     )
 
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        if User.objects.with_email(value).exists():
             raise serializers.ValidationError('このメールアドレスは既に登録されています')
         return value
 
@@ -116,13 +150,15 @@ class RegisterSerializer(serializers.Serializer):
 
         from apps.students.models import Guardian
 
-        # 電話番号を正規化（ハイフン除去）
-        normalized_phone = value.replace('-', '').replace(' ', '')
+        # 電話番号を正規化（数字のみ）
+        normalized_phone = normalize_phone(value)
+        if not normalized_phone:
+            return value
 
-        # 同じ電話番号の保護者を検索
+        # 同じ電話番号の保護者を検索（正規化列のインデックスで一致検索）
         existing_guardian = Guardian.objects.filter(
-            models.Q(phone_mobile__icontains=normalized_phone) |
-            models.Q(phone__icontains=normalized_phone)
+            models.Q(phone_mobile_normalized=normalized_phone) |
+            models.Q(phone_normalized=normalized_phone)
         ).exclude(email='').first()
 
         if existing_guardian:
@@ -359,7 +395,7 @@ class EmployeeRegisterSerializer(serializers.Serializer):
     def validate_email(self, value):
         # 既にSTAFFとして登録されている場合のみエラー
         # GUARDIANとして登録されている場合は、社員情報を追加できるようにする
-        existing_user = User.objects.filter(email=value).first()
+        existing_user = User.objects.with_email(value).first()
         if existing_user:
             if existing_user.user_type == User.UserType.STAFF:
                 raise serializers.ValidationError('このメールアドレスは既に社員として登録されています')
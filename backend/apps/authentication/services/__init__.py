@@ -4,8 +4,12 @@ Authentication Services
 """
 from .password_service import PasswordResetService
 from .email_service import EmailService
+from .identity_cache import UserIdentityCache
+from .profile_cache import UserProfileCache
 
 __all__ = [
     'PasswordResetService',
     'EmailService',
+    'UserIdentityCache',
+    'UserProfileCache',
 ]
@@ -0,0 +1,166 @@
+"""
+Identity Cache Service - 認証ユーザーのキャッシュ
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+import logging
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class UserIdentityCache:
+    """認証ユーザーのキャッシュ（プロセス内LRU + Redis）
+
+    JWT認証（REST / WebSocket）のたびに発生していた users テーブルへの
+    問い合わせを省略するため、ユーザーの行を短いTTLでキャッシュする。
+
+    - キーはユーザーID。値には認証バージョン（パスワード変更で変わる値）を含め、
+      トークンの auth_ver クレームと一致しない場合は無効なトークンとして扱う
+    - User の保存・削除、Guardian の紐付け変更時に invalidate() で破棄する。
+      queryset.update() で User を更新する箇所では invalidate_many() を呼ぶ
+    - パスワードハッシュ以外の全フィールドを保持する（シリアライザーが読むフィールドで
+      問い合わせが発生しないように）。パスワードは参照時のみ遅延ロードする
+    """
+
+    CACHE_PREFIX = 'auth_identity:v2:'
+    CACHE_TIMEOUT = 300  # Redis: 5分
+    LOCAL_TIMEOUT = 10  # プロセス内: 10秒（他プロセスでの更新を拾うため短め）
+    LOCAL_MAX_SIZE = 2048
+
+    # キャッシュに置かないフィールド（attname）
+    EXCLUDED_FIELDS = ('password',)
+
+    _local = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def fields(cls):
+        """キャッシュするフィールド（attname。モデルのフィールド定義順）"""
+        return [f.attname for f in User._meta.concrete_fields if f.attname not in cls.EXCLUDED_FIELDS]
+
+    @staticmethod
+    def auth_version(user) -> str:
+        """認証バージョン（パスワードハッシュ由来。パスワード変更で変わる）"""
+        return user.get_session_auth_hash()[:16]
+
+    @classmethod
+    def _cache_key(cls, user_id) -> str:
+        return f'{cls.CACHE_PREFIX}{user_id}'
+
+    @classmethod
+    def get_user(cls, user_id, auth_version=None):
+        """ユーザーをキャッシュ経由で取得
+
+        Args:
+            user_id: ユーザーID
+            auth_version: トークンの auth_ver クレーム（古いトークンでは None）
+
+        Returns:
+            User オブジェクト。存在しない・認証バージョン不一致の場合は None
+        """
+        identity = cls._get_identity(str(user_id))
+        if identity is None:
+            return None
+        if auth_version and auth_version != identity['auth_version']:
+            return None
+        return cls._build_user(identity)
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """キャッシュを破棄（即時とコミット後の2回。UserProfileCache.invalidate と同じ）"""
+        cls.invalidate_many([user_id])
+
+    @classmethod
+    def invalidate_many(cls, user_ids):
+        """複数ユーザーのキャッシュを破棄（queryset.update() でシグナルが発火しない更新の後にも呼ぶ）"""
+        keys = [cls._cache_key(user_id) for user_id in user_ids]
+        if not keys:
+            return
+        cls._delete(keys)
+        transaction.on_commit(lambda: cls._delete(keys))
+
+    @classmethod
+    def _delete(cls, keys):
+        with cls._lock:
+            for key in keys:
+                cls._local.pop(key, None)
+        try:
+            cache.delete_many(keys)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate identity cache: {e}")
+
+    @classmethod
+    def _get_identity(cls, user_id):
+        key = cls._cache_key(user_id)
+        now = time.monotonic()
+
+        with cls._lock:
+            entry = cls._local.get(key)
+            if entry is not None:
+                expires_at, identity = entry
+                if expires_at > now:
+                    cls._local.move_to_end(key)
+                    return identity
+                del cls._local[key]
+
+        try:
+            identity = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Identity cache unavailable: {e}")
+            identity = None
+
+        if identity is None:
+            identity = cls._load_identity(user_id)
+            if identity is None:
+                return None
+            try:
+                cache.set(key, identity, timeout=cls.CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to store identity cache for user {user_id}: {e}")
+
+        with cls._lock:
+            cls._local[key] = (now + cls.LOCAL_TIMEOUT, identity)
+            cls._local.move_to_end(key)
+            while len(cls._local) > cls.LOCAL_MAX_SIZE:
+                cls._local.popitem(last=False)
+
+        return identity
+
+    @classmethod
+    def _load_identity(cls, user_id):
+        """ユーザーの行と保護者プロフィールIDを1クエリで取得"""
+        user = User.objects.filter(id=user_id).annotate(
+            identity_guardian_id=F('guardian_profile__id'),
+        ).first()
+        if user is None:
+            return None
+        return cls.identity_of(user, user.identity_guardian_id)
+
+    @classmethod
+    def identity_of(cls, user, guardian_id):
+        """キャッシュする値（フィールド名 → 値）"""
+        return {
+            'values': {name: getattr(user, name) for name in cls.fields()},
+            'auth_version': cls.auth_version(user),
+            'guardian_id': guardian_id,
+        }
+
+    @classmethod
+    def _build_user(cls, identity):
+        # from_db は一部のフィールドのみの場合、値をモデルのフィールド定義順で受け取る
+        values = identity['values']
+        names = [name for name in cls.fields() if name in values]
+        user = User.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+        if identity['guardian_id'] is None:
+            # 保護者でないことが分かっているので guardian_profile の問い合わせを省略
+            User.guardian_profile.related.set_cached_value(user, None)
+        user.cached_guardian_id = identity['guardian_id']
+        return user
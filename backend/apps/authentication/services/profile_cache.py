@@ -0,0 +1,205 @@
+"""
+Profile Cache Service - ログイン応答・/me のプロフィールのキャッシュ
+"""
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+def guardian_of(user):
+    """ユーザーの保護者プロフィール（select_related 済みなら問い合わせなし。保護者でない場合は None）"""
+    try:
+        return user.guardian_profile
+    except ObjectDoesNotExist:
+        return None
+
+
+class UserProfileCache:
+    """ユーザー + 保護者 + 最寄り校舎のプロフィール（/me・ログイン応答）のキャッシュ
+
+    /me はアプリ起動のたびに呼ばれ、ユーザー・保護者プロフィール・最寄り校舎を
+    それぞれ遅延ロードしていた。ここでは select_related の1クエリで読み込んで組み立てた
+    プロフィールを Redis に保持し、ログイン時には認証で読み込んだユーザーから作成して
+    キャッシュを温める。
+
+    - User / Guardian の保存・削除時に invalidate() で該当ユーザーの値を破棄する
+    - 校舎名の変更は全ユーザーに影響するため、校舎の保存時にバージョンを上げる
+      （キーにバージョンを含めるため、旧バージョンの値は参照されなくなる）
+    - 役職の機能権限は FeaturePermissionCompiler のキャッシュから都度付け加える
+    """
+
+    CACHE_PREFIX = 'me_profile'
+    CACHE_TIMEOUT = 600  # 10分（queryset.update() による変更を拾うため）
+
+    # プロフィールの読み込みで同時に取得する関連
+    RELATED = ('guardian_profile', 'guardian_profile__nearest_school')
+
+    @classmethod
+    def _version_key(cls) -> str:
+        return f'{cls.CACHE_PREFIX}:version'
+
+    @classmethod
+    def get_version(cls) -> int:
+        try:
+            return cache.get(cls._version_key()) or 0
+        except Exception as e:
+            logger.warning(f"Profile cache unavailable: {e}")
+            return 0
+
+    @classmethod
+    def bump_version(cls):
+        """全ユーザーのプロフィールを無効化（校舎名の変更時。トランザクション内ではコミット後）"""
+        transaction.on_commit(cls._bump)
+
+    @classmethod
+    def _bump(cls):
+        key = cls._version_key()
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, timeout=None)
+        except Exception as e:
+            logger.warning(f"Failed to bump profile cache version: {e}")
+
+    @classmethod
+    def _cache_key(cls, user_id, version=None) -> str:
+        if version is None:
+            version = cls.get_version()
+        return f'{cls.CACHE_PREFIX}:{user_id}:v{version}'
+
+    @classmethod
+    def load_user(cls, user_id):
+        """ユーザー・保護者プロフィール・最寄り校舎を1クエリで取得"""
+        return User.objects.select_related(*cls.RELATED).filter(id=user_id).first()
+
+    @classmethod
+    def get(cls, user_id):
+        """
+        プロフィールを取得（キャッシュになければ1クエリで組み立てて保存）
+
+        Returns:
+            プロフィールの dict。ユーザーが存在しない場合は None
+        """
+        key = cls._cache_key(user_id)
+        try:
+            profile = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Profile cache unavailable: {e}")
+            profile = None
+        if profile is not None:
+            return profile
+
+        user = cls.load_user(user_id)
+        if user is None:
+            return None
+        return cls._store(key, cls.build(user))
+
+    @classmethod
+    def prime(cls, user):
+        """読み込み済みのユーザー（RELATED を select_related 済み）からプロフィールを作成して保存"""
+        return cls._store(cls._cache_key(user.id), cls.build(user))
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """
+        キャッシュを破棄
+
+        即時（同じトランザクション内の読み込み用）とコミット後（コミット前に他の
+        リクエストが古い内容を保存した場合用）の2回破棄する
+        """
+        cls._delete(user_id)
+        transaction.on_commit(lambda: cls._delete(user_id))
+
+    @classmethod
+    def _delete(cls, user_id):
+        try:
+            cache.delete(cls._cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate profile cache for user {user_id}: {e}")
+
+    @classmethod
+    def _store(cls, key, profile):
+        try:
+            cache.set(key, profile, timeout=cls.CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to store profile cache: {e}")
+        return profile
+
+    @staticmethod
+    def build(user) -> dict:
+        """プロフィールを組み立て（/me の応答から機能権限を除いたもの）"""
+        data = {
+            'id': str(user.id),
+            'email': user.email,
+            'full_name': user.full_name,
+            'user_type': user.user_type,
+            'role': user.role,
+            'tenant_id': str(user.tenant_id) if user.tenant_id else None,
+            'primary_school_id': str(user.primary_school_id) if user.primary_school_id else None,
+            'primary_brand_id': str(user.primary_brand_id) if user.primary_brand_id else None,
+            'permissions': user.permissions,
+            'is_email_verified': user.is_email_verified,
+        }
+
+        # Guardian情報（保護者ユーザーの場合）
+        guardian = guardian_of(user)
+        if guardian:
+            data.update({
+                'guardian_id': str(guardian.id),
+                'lastName': guardian.last_name,
+                'firstName': guardian.first_name,
+                'lastNameKana': guardian.last_name_kana or '',
+                'firstNameKana': guardian.first_name_kana or '',
+                'phoneNumber': guardian.phone_mobile or guardian.phone or '',
+                'postalCode': guardian.postal_code or '',
+                'prefecture': guardian.prefecture or '',
+                'city': guardian.city or '',
+                'address1': guardian.address1 or '',
+                'address2': guardian.address2 or '',
+                'nearestSchoolId': str(guardian.nearest_school_id) if guardian.nearest_school_id else None,
+                'nearestSchoolName': guardian.nearest_school.school_name if guardian.nearest_school else None,
+                'interestedBrands': guardian.interested_brands or [],
+                'referralSource': guardian.referral_source or '',
+                'expectations': guardian.expectations or '',
+            })
+        else:
+            # Userモデルから名前を分割
+            full_name = user.full_name or ''
+            parts = full_name.split(' ', 1)
+            data.update({
+                'guardian_id': None,
+                'lastName': parts[0] if parts else '',
+                'firstName': parts[1] if len(parts) > 1 else '',
+                'lastNameKana': '',
+                'firstNameKana': '',
+                'phoneNumber': '',
+                'postalCode': '',
+                'prefecture': '',
+                'city': '',
+                'address1': '',
+                'address2': '',
+                'nearestSchoolId': None,
+                'nearestSchoolName': None,
+                'interestedBrands': [],
+                'referralSource': '',
+                'expectations': '',
+            })
+        return data
+
+
+def me_payload(profile: dict, feature_permissions) -> dict:
+    """/me の応答（プロフィール + 役職の機能権限）"""
+    return {
+        **profile,
+        'position_id': feature_permissions.position_id,
+        'feature_codes': feature_permissions.feature_codes,
+        'is_feature_admin': feature_permissions.is_admin,
+    }
@@ -0,0 +1,32 @@
+"""
+Authentication Signals
+ユーザー情報の変更時に認証キャッシュ・プロフィールキャッシュを破棄
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .services.identity_cache import UserIdentityCache
+from .services.profile_cache import UserProfileCache
+
+
+@receiver(post_save, sender='users.User')
+@receiver(post_delete, sender='users.User')
+def invalidate_identity_on_user_change(sender, instance, **kwargs):
+    """ユーザーの保存（パスワード変更を含む）・削除時にキャッシュを破棄"""
+    UserIdentityCache.invalidate(instance.id)
+    UserProfileCache.invalidate(instance.id)
+
+
+@receiver(post_save, sender='students.Guardian')
+@receiver(post_delete, sender='students.Guardian')
+def invalidate_identity_on_guardian_change(sender, instance, **kwargs):
+    """保護者とユーザーの紐付けが変わった場合に備えてキャッシュを破棄"""
+    if instance.user_id:
+        UserIdentityCache.invalidate(instance.user_id)
+        UserProfileCache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender='schools.School')
+def invalidate_profiles_on_school_change(sender, instance, **kwargs):
+    """校舎名の変更に備えてプロフィール（最寄り校舎名）を無効化"""
+    UserProfileCache.bump_version()
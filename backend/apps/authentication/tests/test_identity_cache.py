@@ -0,0 +1,140 @@
+"""
+Identity Cache Tests - 認証ユーザーのキャッシュのテスト
+"""
+import os
+import pickle
+import uuid
+from datetime import date, datetime, timezone as dt_timezone
+
+import pytest
+from django.core.cache import cache
+
+from apps.authentication.services.identity_cache import UserIdentityCache
+from apps.users.models import User
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'identity-tests'}}
+
+
+def _user():
+    """全フィールドに既定値と異なる値を設定したユーザー（DBには保存しない）"""
+    moment = datetime(2026, 4, 1, 9, 30, tzinfo=dt_timezone.utc)
+    return User(
+        id=uuid.uuid4(),
+        password='pbkdf2_sha256$1$salt$hash',
+        last_login=moment,
+        is_superuser=True,
+        tenant_id=uuid.uuid4(),
+        qr_code=uuid.uuid4(),
+        email='cached@example.com',
+        is_email_verified=True,
+        user_type=User.UserType.ADMIN,
+        user_no='U0001',
+        last_name='山田',
+        first_name='花子',
+        last_name_kana='ヤマダ',
+        first_name_kana='ハナコ',
+        display_name='やまだ',
+        phone='090-1234-5678',
+        line_id='line-id',
+        email_normalized='cached@example.com',
+        phone_normalized='09012345678',
+        profile_image_url='https://example.com/a.png',
+        birth_date=date(1990, 1, 2),
+        gender='female',
+        parent_user_id=uuid.uuid4(),
+        student_id=uuid.uuid4(),
+        staff_id=uuid.uuid4(),
+        primary_school_id=uuid.uuid4(),
+        primary_brand_id=uuid.uuid4(),
+        nearest_school_id=uuid.uuid4(),
+        interested_brands=['brand-a'],
+        referral_source='web',
+        expectations='期待',
+        role='ADMIN',
+        permissions={'billing': True},
+        is_active=False,
+        is_staff=True,
+        last_login_at=moment,
+        failed_login_count=3,
+        locked_until=moment,
+        password_changed_at=moment,
+        must_change_password=True,
+        created_at=moment,
+        updated_at=moment,
+        deleted_at=moment,
+    )
+
+
+def _assert_same_fields(cached, original):
+    for name in UserIdentityCache.fields():
+        assert getattr(cached, name) == getattr(original, name), name
+
+
+@pytest.mark.unit
+class TestIdentityRoundTrip:
+    """キャッシュから復元したユーザーが元の行と一致するか"""
+
+    def test_every_field_matches(self):
+        original = _user()
+        identity = pickle.loads(pickle.dumps(UserIdentityCache.identity_of(original, None)))
+
+        cached = UserIdentityCache._build_user(identity)
+
+        _assert_same_fields(cached, original)
+        # キャッシュしないのはパスワードのみ（他のフィールドの参照で問い合わせが発生しない）
+        assert cached.get_deferred_fields() == {'password'}
+        assert cached.cached_guardian_id is None
+
+    def test_every_field_is_cached(self):
+        names = set(UserIdentityCache.fields())
+        expected = {f.attname for f in User._meta.concrete_fields} - {'password'}
+        assert names == expected
+
+    def test_guardian_id_is_kept(self):
+        guardian_id = uuid.uuid4()
+        cached = UserIdentityCache._build_user(UserIdentityCache.identity_of(_user(), guardian_id))
+        assert cached.cached_guardian_id == guardian_id
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+class TestIdentityCacheDatabase:
+    """DBの行とキャッシュ経由のユーザーの比較"""
+
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        settings.CACHES = LOCMEM
+        cache.clear()
+        UserIdentityCache._local.clear()
+
+    def test_cached_user_matches_row(self, django_assert_num_queries):
+        row = User.objects.create_user(
+            email='identity@example.com', password='pass', last_name='佐藤', first_name='一郎',
+            tenant_id=uuid.uuid4(), role='ADMIN', phone='080-0000-0000',
+        )
+        row = User.objects.get(id=row.id)
+
+        first = UserIdentityCache.get_user(row.id)
+        _assert_same_fields(first, row)
+
+        UserIdentityCache._local.clear()
+        with django_assert_num_queries(0):
+            cached = UserIdentityCache.get_user(row.id, UserIdentityCache.auth_version(row))
+            _assert_same_fields(cached, row)
+
+    def test_update_invalidates(self):
+        row = User.objects.create_user(email='inactive@example.com', password='pass', last_name='鈴木', first_name='次郎')
+        assert UserIdentityCache.get_user(row.id).is_active
+
+        User.objects.filter(id=row.id).update(is_active=False)
+        UserIdentityCache.invalidate_many([row.id])
+
+        assert not UserIdentityCache.get_user(row.id).is_active
+
+    def test_wrong_auth_version(self):
+        row = User.objects.create_user(email='version@example.com', password='pass', last_name='田中', first_name='三郎')
+        assert UserIdentityCache.get_user(row.id, 'stale-version') is None
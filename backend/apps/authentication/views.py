@@ -8,9 +8,11 @@ from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from django.utils import timezone
 
 from apps.core.exceptions import UnauthorizedError, ErrorCode
+from apps.core.permissions import get_feature_permissions
+from apps.core.throttling import LOOKUP_THROTTLES
+from apps.core.utils import normalize_phone
 
 from .serializers import (
     CustomTokenObtainPairSerializer,
@@ -22,6 +24,7 @@ from .serializers import (
     PasswordChangeSerializer,
 )
 from .services import PasswordResetService, EmailService
+from .services.profile_cache import UserProfileCache, me_payload
 
 User = get_user_model()
 
@@ -39,42 +42,29 @@ class LoginView(TokenObtainPairView):
 
         # 電話番号が指定されている場合、対応するメールアドレスを検索
         if phone and not email:
+            from django.db.models import Case, Q, When
             from apps.students.models import Guardian
-            # 電話番号の正規化（ハイフン除去）
-            normalized_phone = phone.replace('-', '').replace(' ', '').replace('　', '')
+            # 電話番号の正規化（数字のみ）
+            normalized_phone = normalize_phone(phone)
 
-            # Guardianから電話番号でユーザーを検索
+            # Guardianから電話番号でユーザーを検索（正規化列のインデックスで1回。携帯電話の一致を優先）
             guardian = Guardian.objects.filter(
-                phone_mobile=normalized_phone
-            ).first()
-
-            if not guardian:
-                guardian = Guardian.objects.filter(
-                    phone_mobile=phone
-                ).first()
-
-            if not guardian:
-                guardian = Guardian.objects.filter(
-                    phone=normalized_phone
-                ).first()
-
-            if not guardian:
-                guardian = Guardian.objects.filter(
-                    phone=phone
-                ).first()
+                Q(phone_mobile_normalized=normalized_phone) | Q(phone_normalized=normalized_phone)
+            ).select_related('user').order_by(
+                Case(When(phone_mobile_normalized=normalized_phone, then=0), default=1)
+            ).first() if normalized_phone else None
 
             if guardian and guardian.user_id:
-                try:
+                if guardian.user is not None:
                     data['email'] = guardian.user.email
-                except User.DoesNotExist:
+                elif guardian.email:
                     # user_idは存在するがUserが見つからない場合
-                    if guardian.email:
-                        data['email'] = guardian.email
-                    else:
-                        raise UnauthorizedError(
-                            'ユーザーアカウントが見つかりません',
-                            code=ErrorCode.INVALID_CREDENTIALS
-                        )
+                    data['email'] = guardian.email
+                else:
+                    raise UnauthorizedError(
+                        'ユーザーアカウントが見つかりません',
+                        code=ErrorCode.INVALID_CREDENTIALS
+                    )
             elif guardian and guardian.email:
                 # Guardian に紐づくユーザーがいなくても、emailがあればそれを使う
                 data['email'] = guardian.email
@@ -96,21 +86,12 @@ class LoginView(TokenObtainPairView):
             # ログイン失敗時の処理
             identifier = data.get('email') or phone
             if identifier:
-                try:
-                    user = User.objects.get(email=identifier)
+                user = User.objects.with_email(identifier).first()
+                if user is not None:
                     user.increment_failed_login()
-                except User.DoesNotExist:
-                    pass
             raise
 
-        # 最終ログイン日時を更新
-        user = serializer.user
-        try:
-            # 直接クエリで更新（update_fieldsの問題を回避）
-            User.objects.filter(pk=user.pk).update(last_login_at=timezone.now())
-        except Exception:
-            pass  # 更新失敗しても続行
-
+        # 最終ログイン日時はシリアライザーで失敗回数のリセットと合わせて更新済み
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
@@ -227,8 +208,8 @@ class PasswordChangeView(GenericAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        # 新しいトークンを発行
-        refresh = RefreshToken.for_user(user)
+        # 新しいトークンを発行（新しい認証バージョンを含める）
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
 
         return Response({
             'message': 'パスワードが正常に変更されました',
@@ -249,6 +230,7 @@ class PasswordChangeView(GenericAPIView):
 class CheckEmailView(GenericAPIView):
     """メールアドレス重複チェックビュー"""
     permission_classes = [AllowAny]
+    throttle_classes = LOOKUP_THROTTLES
 
     def post(self, request):
         email = request.data.get('email', '').strip().lower()
@@ -259,7 +241,7 @@ class CheckEmailView(GenericAPIView):
                 'message': 'メールアドレスを入力してください'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        exists = User.objects.filter(email=email).exists()
+        exists = User.objects.with_email(email).exists()
 
         if exists:
             return Response({
@@ -276,6 +258,7 @@ class CheckEmailView(GenericAPIView):
 class CheckPhoneView(GenericAPIView):
     """電話番号重複チェックビュー"""
     permission_classes = [AllowAny]
+    throttle_classes = LOOKUP_THROTTLES
 
     def post(self, request):
         phone = request.data.get('phone', '').strip()
@@ -286,13 +269,8 @@ class CheckPhoneView(GenericAPIView):
                 'message': '電話番号を入力してください'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # 電話番号の正規化（ハイフンや空白を削除）
-        normalized_phone = phone.replace('-', '').replace(' ', '').replace('　', '')
-
-        # 正規化した電話番号と元の電話番号の両方でチェック
-        exists = User.objects.filter(phone=phone).exists()
-        if not exists and normalized_phone != phone:
-            exists = User.objects.filter(phone=normalized_phone).exists()
+        # 正規化した電話番号（数字のみ）でチェック
+        exists = User.objects.with_phone(phone).exists()
 
         if exists:
             return Response({
@@ -311,63 +289,13 @@ class MeView(GenericAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        data = {
-            'id': str(user.id),
-            'email': user.email,
-            'full_name': user.full_name,
-            'user_type': user.user_type,
-            'role': user.role,
-            'tenant_id': str(user.tenant_id) if user.tenant_id else None,
-            'primary_school_id': str(user.primary_school_id) if user.primary_school_id else None,
-            'primary_brand_id': str(user.primary_brand_id) if user.primary_brand_id else None,
-            'permissions': user.permissions,
-            'is_email_verified': user.is_email_verified,
-        }
-
-        # Guardian情報を取得（保護者ユーザーの場合）
-        if hasattr(user, 'guardian_profile') and user.guardian_profile:
-            guardian = user.guardian_profile
-            data.update({
-                'lastName': guardian.last_name,
-                'firstName': guardian.first_name,
-                'lastNameKana': guardian.last_name_kana or '',
-                'firstNameKana': guardian.first_name_kana or '',
-                'phoneNumber': guardian.phone_mobile or guardian.phone or '',
-                'postalCode': guardian.postal_code or '',
-                'prefecture': guardian.prefecture or '',
-                'city': guardian.city or '',
-                'address1': guardian.address1 or '',
-                'address2': guardian.address2 or '',
-                'nearestSchoolId': str(guardian.nearest_school_id) if guardian.nearest_school_id else None,
-                'nearestSchoolName': guardian.nearest_school.school_name if guardian.nearest_school else None,
-                'interestedBrands': guardian.interested_brands or [],
-                'referralSource': guardian.referral_source or '',
-                'expectations': guardian.expectations or '',
-            })
-        else:
-            # Userモデルから名前を分割
-            full_name = user.full_name or ''
-            parts = full_name.split(' ', 1)
-            data.update({
-                'lastName': parts[0] if parts else '',
-                'firstName': parts[1] if len(parts) > 1 else '',
-                'lastNameKana': '',
-                'firstNameKana': '',
-                'phoneNumber': '',
-                'postalCode': '',
-                'prefecture': '',
-                'city': '',
-                'address1': '',
-                'address2': '',
-                'nearestSchoolId': None,
-                'nearestSchoolName': None,
-                'interestedBrands': [],
-                'referralSource': '',
-                'expectations': '',
-            })
+        # ユーザー・保護者・最寄り校舎のプロフィール（キャッシュ。なければ1クエリで作成）
+        profile = UserProfileCache.get(request.user.id)
+        if profile is None:
+            profile = UserProfileCache.build(request.user)
 
-        return Response(data)
+        # 役職の機能権限（コンパイル済みビットセットから。問い合わせなし）
+        return Response(me_payload(profile, get_feature_permissions(request)))
 
     def patch(self, request):
         """プロフィール更新"""
@@ -501,6 +429,7 @@ class ValidationCheckView(GenericAPIView):
     }
     """
     permission_classes = [AllowAny]
+    throttle_classes = LOOKUP_THROTTLES
 
     def post(self, request):
         from apps.students.models import Guardian
@@ -518,7 +447,7 @@ class ValidationCheckView(GenericAPIView):
                     'message': 'メールアドレスを入力してください'
                 }
             else:
-                exists = User.objects.filter(email=email).exists()
+                exists = User.objects.with_email(email).exists()
                 if exists:
                     results['email'] = {
                         'available': False,
@@ -539,19 +468,17 @@ class ValidationCheckView(GenericAPIView):
                     'message': '電話番号を入力してください'
                 }
             else:
-                # 電話番号の正規化（ハイフンや空白を削除）
-                normalized_phone = phone.replace('-', '').replace(' ', '').replace('　', '')
+                # 電話番号の正規化（数字のみ）
+                normalized_phone = normalize_phone(phone)
 
                 # User テーブルでチェック
-                exists_in_user = User.objects.filter(
-                    models.Q(phone=phone) | models.Q(phone=normalized_phone)
-                ).exists()
+                exists_in_user = User.objects.with_phone(phone).exists()
 
-                # Guardian テーブルでもチェック（より厳密な重複チェック）
+                # Guardian テーブルでもチェック（より厳密な重複チェック。正規化列のインデックスで一致検索）
                 existing_guardian = Guardian.objects.filter(
-                    models.Q(phone_mobile__icontains=normalized_phone) |
-                    models.Q(phone__icontains=normalized_phone)
-                ).exclude(email='').first()
+                    models.Q(phone_mobile_normalized=normalized_phone) |
+                    models.Q(phone_normalized=normalized_phone)
+                ).exclude(email='').only('email').first() if normalized_phone else None
 
                 if exists_in_user or existing_guardian:
                     # 既存のメールアドレスをマスク表示
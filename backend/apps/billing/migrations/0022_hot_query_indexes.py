@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:24
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（トランザクション外で実行）
+    atomic = False
+
+    dependencies = [
+        (
+            "billing",
+            "0021_rename_billing_bt_date_idx_billing_ban_transfe_6aa1ad_idx_and_more",
+        ),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="banktransfer",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["tenant_id", "import_batch_id", "status"],
+                name="bt_tenant_batch_status_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="confirmedbilling",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["tenant_id", "year", "month"],
+                name="cb_tenant_period_live_idx",
+            ),
+        ),
+    ]
@@ -85,6 +85,12 @@ class BankTransfer(TenantModel):
             models.Index(fields=['transfer_date']),
             models.Index(fields=['payer_name']),
             models.Index(fields=['status']),
+            # インポートバッチごとの照合状況
+            models.Index(
+                fields=['tenant_id', 'import_batch_id', 'status'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='bt_tenant_batch_status_idx',
+            ),
         ]
 
     def __str__(self):
@@ -186,14 +192,23 @@ class BankTransferImport(TenantModel):
 
     def update_counts(self):
         """照合状況を再集計"""
-        from django.db.models import Sum
-        transfers = BankTransfer.objects.filter(import_batch_id=str(self.id))
-        self.total_count = transfers.count()
-        self.matched_count = transfers.filter(status__in=[BankTransfer.Status.MATCHED, BankTransfer.Status.APPLIED]).count()
-        self.unmatched_count = transfers.filter(status=BankTransfer.Status.UNMATCHED).count() + transfers.filter(status=BankTransfer.Status.PENDING).count()
-        self.error_count = transfers.filter(status=BankTransfer.Status.CANCELLED).count()
-        total = transfers.aggregate(Sum('amount'))['amount__sum']
-        self.total_amount = total or 0
+        from django.db.models import Count, Q, Sum
+        Status = BankTransfer.Status
+        # 1クエリで集計（bt_tenant_batch_status_idx を使う）
+        counts = BankTransfer.objects.filter(
+            tenant_id=self.tenant_id, import_batch_id=str(self.id), deleted_at__isnull=True,
+        ).aggregate(
+            total=Count('id'),
+            matched=Count('id', filter=Q(status__in=[Status.MATCHED, Status.APPLIED])),
+            unmatched=Count('id', filter=Q(status__in=[Status.UNMATCHED, Status.PENDING])),
+            errors=Count('id', filter=Q(status=Status.CANCELLED)),
+            amount=Sum('amount'),
+        )
+        self.total_count = counts['total']
+        self.matched_count = counts['matched']
+        self.unmatched_count = counts['unmatched']
+        self.error_count = counts['errors']
+        self.total_amount = counts['amount'] or 0
 
         # ステータス更新
         if self.matched_count == self.total_count and self.total_count > 0:
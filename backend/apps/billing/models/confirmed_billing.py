@@ -156,6 +156,12 @@ class ConfirmedBilling(TenantModel):
             models.Index(fields=['guardian', 'year', 'month']),
             models.Index(fields=['status']),
             models.Index(fields=['-confirmed_at']),
+            # 一覧・エクスポート（テナント + 年月、論理削除済みを除く）
+            models.Index(
+                fields=['tenant_id', 'year', 'month'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='cb_tenant_period_live_idx',
+            ),
         ]
         constraints = [
             models.UniqueConstraint(
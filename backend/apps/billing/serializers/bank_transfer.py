@@ -132,7 +132,9 @@ class BankTransferImportSerializer(serializers.ModelSerializer):
     def get_transfers(self, obj):
         """関連する振込データを取得"""
         transfers = BankTransfer.objects.filter(
-            import_batch_id=str(obj.id)
+            tenant_id=obj.tenant_id,
+            import_batch_id=str(obj.id),
+            deleted_at__isnull=True,
         ).order_by('import_row_no')
         return BankTransferSerializer(transfers, many=True).data
 
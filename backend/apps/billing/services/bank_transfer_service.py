@@ -316,7 +316,8 @@ class BankTransferService:
         transfers = BankTransfer.objects.filter(
             tenant_id=tenant_id,
             import_batch_id=import_batch_id,
-            status=BankTransfer.Status.PENDING
+            status=BankTransfer.Status.PENDING,
+            deleted_at__isnull=True,
         )
 
         matched = 0
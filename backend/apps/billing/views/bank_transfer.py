@@ -32,7 +32,7 @@ class BankTransferViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         from apps.core.permissions import is_admin_user
 
-        queryset = BankTransfer.objects.select_related(
+        queryset = BankTransfer.objects.filter(deleted_at__isnull=True).select_related(
             'guardian', 'invoice', 'matched_by'
         )
 
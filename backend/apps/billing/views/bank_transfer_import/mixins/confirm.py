@@ -26,9 +26,11 @@ class BankTransferImportConfirmMixin:
             raise BusinessRuleViolationError('このバッチは既に確定済みです')
 
         matched_transfers = BankTransfer.objects.filter(
+            tenant_id=import_batch.tenant_id,
             import_batch_id=str(import_batch.id),
             status=BankTransfer.Status.MATCHED,
             guardian__isnull=False,
+            deleted_at__isnull=True,
         )
 
         applied_count = 0
@@ -10,6 +10,7 @@ from drf_spectacular.utils import extend_schema
 
 from apps.billing.models import Invoice, ConfirmedBilling
 from apps.core.exceptions import ValidationException
+from apps.tenants.services import TenantResolver
 
 
 class BankTransferImportSearchMixin:
@@ -34,13 +35,7 @@ class BankTransferImportSearchMixin:
         if not query and not guardian_no and not amount:
             raise ValidationException('検索条件を指定してください')
 
-        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
-
-        if not tenant_id:
-            from apps.tenants.models import Tenant
-            default_tenant = Tenant.objects.first()
-            if default_tenant:
-                tenant_id = default_tenant.id
+        tenant_id = TenantResolver.resolve_id(request, default_tenant_fallback=True)
 
         guardians = Guardian.objects.filter(deleted_at__isnull=True)
         if tenant_id:
@@ -16,6 +16,7 @@ from drf_spectacular.utils import extend_schema
 
 from apps.billing.models import Invoice, BankTransfer, BankTransferImport
 from apps.core.exceptions import ValidationException
+from apps.tenants.services import TenantResolver
 
 logger = logging.getLogger(__name__)
 
@@ -166,14 +167,8 @@ class BankTransferImportUploadMixin:
     def _import_bank_raw_data(self, request, transfers_data, file_name):
         """銀行生データをインポート"""
         from apps.students.models import Guardian
-        from apps.tenants.models import Tenant
 
-        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
-
-        if not tenant_id:
-            default_tenant = Tenant.objects.first()
-            if default_tenant:
-                tenant_id = default_tenant.id
+        tenant_id = TenantResolver.resolve_id(request, default_tenant_fallback=True)
 
         import_batch = BankTransferImport.objects.create(
             tenant_id=tenant_id,
@@ -303,7 +298,7 @@ class BankTransferImportUploadMixin:
             if len(df) == 0:
                 raise ValidationException('ファイルにデータがありません')
 
-            tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
+            tenant_id = TenantResolver.resolve_id(request)
 
             import_batch = BankTransferImport.objects.create(
                 tenant_id=tenant_id,
@@ -16,17 +16,7 @@ from apps.billing.serializers import ConfirmedBillingSerializer, ConfirmedBillin
 from apps.billing.services.receipt_service import generate_receipt_response
 from .mixins import BillingCreationMixin, BillingExportMixin
 from apps.core.exceptions import ValidationException
-
-
-def _get_tenant_id(request):
-    """リクエストからテナントIDを取得"""
-    tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
-    if not tenant_id:
-        from apps.tenants.models import Tenant
-        default_tenant = Tenant.objects.first()
-        if default_tenant:
-            tenant_id = default_tenant.id
-    return tenant_id
+from apps.tenants.mixins import TenantScopedViewSetMixin
 
 
 @extend_schema_view(
@@ -34,6 +24,7 @@ def _get_tenant_id(request):
     retrieve=extend_schema(summary='請求確定詳細'),
 )
 class ConfirmedBillingViewSet(
+    TenantScopedViewSetMixin,
     BillingCreationMixin,
     BillingExportMixin,
     viewsets.ModelViewSet
@@ -43,23 +34,21 @@ class ConfirmedBillingViewSet(
     締日確定時に生徒ごとの請求データをスナップショットとして保存。
     """
     permission_classes = [IsAuthenticated]
+    # テナントが特定できない管理者は既定テナント
+    default_tenant_fallback = True
 
-    def get_queryset(self):
+    def get_tenant_id(self):
         from apps.core.permissions import is_admin_user
 
-        queryset = ConfirmedBilling.objects.filter(
-            deleted_at__isnull=True
-        ).select_related(
-            'student', 'guardian', 'billing_deadline', 'confirmed_by'
-        )
-
-        # 管理者以外はテナントでフィルタ
+        # 管理者以外は自分のテナントのみ
         if not is_admin_user(self.request.user):
-            queryset = queryset.filter(tenant_id=self.request.user.tenant_id)
-        else:
-            tenant_id = _get_tenant_id(self.request)
-            if tenant_id:
-                queryset = queryset.filter(tenant_id=tenant_id)
+            return self.request.user.tenant_id
+        return super().get_tenant_id()
+
+    def get_queryset(self):
+        queryset = self.scope_queryset(ConfirmedBilling.objects.select_related(
+            'student', 'guardian', 'billing_deadline', 'confirmed_by'
+        ))
 
         # フィルター適用
         queryset = self._apply_filters(queryset)
@@ -158,7 +147,7 @@ class ConfirmedBillingViewSet(
         if not year or not month:
             raise ValidationException('year と month を指定してください')
 
-        tenant_id = _get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
 
         confirmed_billings = ConfirmedBilling.objects.filter(
             tenant_id=tenant_id,
@@ -269,7 +258,7 @@ class ConfirmedBillingViewSet(
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        tenant_id = _get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
 
         # 該当月の請求確定データを取得
         confirmed_billings = ConfirmedBilling.objects.filter(
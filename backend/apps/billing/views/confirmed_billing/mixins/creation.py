@@ -14,17 +14,6 @@ from apps.billing.models import ConfirmedBilling, MonthlyBillingDeadline, Guardi
 from apps.billing.serializers import ConfirmedBillingCreateSerializer, BillingConfirmBatchSerializer
 
 
-def _get_tenant_id(request):
-    """リクエストからテナントIDを取得"""
-    tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
-    if not tenant_id:
-        from apps.tenants.models import Tenant
-        default_tenant = Tenant.objects.first()
-        if default_tenant:
-            tenant_id = default_tenant.id
-    return tenant_id
-
-
 class BillingCreationMixin:
     """請求確定データ生成関連アクション"""
 
@@ -42,7 +31,7 @@ class BillingCreationMixin:
         year = data['year']
         month = data['month']
 
-        tenant_id = _get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
         user_id = str(request.user.id) if request.user and request.user.is_authenticated else None
 
         from apps.billing.tasks import generate_confirmed_billing_task
@@ -259,7 +248,7 @@ class BillingCreationMixin:
         month = data['month']
         close_deadline = data.get('close_deadline', True)
 
-        tenant_id = _get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
 
         deadline, _ = MonthlyBillingDeadline.get_or_create_for_month(
             tenant_id=tenant_id,
@@ -300,7 +289,7 @@ class BillingCreationMixin:
         year = data['year']
         month = data['month']
 
-        tenant_id = _get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
         user_id = str(request.user.id) if request.user and request.user.is_authenticated else None
 
         from apps.billing.tasks import generate_confirmed_billing_task
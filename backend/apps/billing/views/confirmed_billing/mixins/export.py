@@ -14,17 +14,6 @@ from apps.billing.models import ConfirmedBilling, PaymentProvider, GuardianBalan
 from apps.core.exceptions import ValidationException
 
 
-def _get_tenant_id(request):
-    """リクエストからテナントIDを取得"""
-    tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
-    if not tenant_id:
-        from apps.tenants.models import Tenant
-        default_tenant = Tenant.objects.first()
-        if default_tenant:
-            tenant_id = default_tenant.id
-    return tenant_id
-
-
 class BillingExportMixin:
     """CSVエクスポート関連アクション"""
 
@@ -38,7 +27,7 @@ class BillingExportMixin:
         if not year or not month:
             raise ValidationException('year と month を指定してください')
 
-        tenant_id = _get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
 
         confirmed_billings = ConfirmedBilling.objects.filter(
             tenant_id=tenant_id,
@@ -155,7 +144,7 @@ class BillingExportMixin:
         end_date = request.query_params.get('end_date')
         provider = request.query_params.get('provider', 'jaccs')
 
-        tenant_id = _get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
 
         # クエリセット構築
         queryset = self._build_debit_queryset(
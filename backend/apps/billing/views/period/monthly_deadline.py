@@ -13,32 +13,22 @@ from drf_spectacular.utils import extend_schema
 from apps.billing.models import MonthlyBillingDeadline, PaymentProvider
 from apps.billing.services import ConfirmedBillingService
 from apps.core.exceptions import ValidationException, BusinessRuleViolationError, OZAException
+from apps.tenants.mixins import TenantScopedViewSetMixin
 
 logger = logging.getLogger(__name__)
 
 
-class MonthlyBillingDeadlineViewSet(viewsets.ModelViewSet):
+class MonthlyBillingDeadlineViewSet(TenantScopedViewSetMixin, viewsets.ModelViewSet):
     """月次請求締切管理API
 
     内部的な締日管理。締日を過ぎると、その月の請求データは編集不可になる。
     """
     permission_classes = [IsAuthenticated]
+    # テナントIDが取得できない場合はデフォルトテナントを使用
+    default_tenant_fallback = True
 
     def get_queryset(self):
-        tenant_id = getattr(self.request, 'tenant_id', None)
-        if not tenant_id and hasattr(self.request, 'user') and hasattr(self.request.user, 'tenant_id'):
-            tenant_id = self.request.user.tenant_id
-        # テナントIDが取得できない場合はデフォルトテナントを使用
-        if not tenant_id:
-            from apps.tenants.models import Tenant
-            default_tenant = Tenant.objects.first()
-            if default_tenant:
-                tenant_id = default_tenant.id
-        if not tenant_id:
-            return MonthlyBillingDeadline.objects.none()
-        return MonthlyBillingDeadline.objects.filter(
-            tenant_id=tenant_id
-        ).order_by('-year', '-month')
+        return self.scope_queryset(MonthlyBillingDeadline.objects.all()).order_by('-year', '-month')
 
     def get_serializer_class(self):
         class MonthlyBillingDeadlineSerializer(serializers.ModelSerializer):
@@ -97,24 +87,12 @@ class MonthlyBillingDeadlineViewSet(viewsets.ModelViewSet):
 
         return MonthlyBillingDeadlineSerializer
 
-    def _get_tenant_id(self, request):
-        """テナントIDを取得（ヘルパーメソッド）"""
-        tenant_id = getattr(request, 'tenant_id', None)
-        if not tenant_id and hasattr(request, 'user') and hasattr(request.user, 'tenant_id'):
-            tenant_id = request.user.tenant_id
-        if not tenant_id:
-            from apps.tenants.models import Tenant
-            default_tenant = Tenant.objects.first()
-            if default_tenant:
-                tenant_id = default_tenant.id
-        return tenant_id
-
     @extend_schema(summary='締切状態一覧を取得')
     @action(detail=False, methods=['get'])
     def status_list(self, request):
         """現在月を中心とした締切状態一覧を取得"""
         today = date.today()
-        tenant_id = self._get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
 
         # デフォルト締日を取得（PaymentProviderから）
         default_closing_day = 25
@@ -209,7 +187,7 @@ class MonthlyBillingDeadlineViewSet(viewsets.ModelViewSet):
         except ValueError:
             raise ValidationException('year と month は整数で指定してください')
 
-        tenant_id = self._get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
         is_editable = MonthlyBillingDeadline.is_month_editable(tenant_id, year, month)
 
         return Response({
@@ -334,7 +312,7 @@ class MonthlyBillingDeadlineViewSet(viewsets.ModelViewSet):
         if not (1 <= closing_day <= 31):
             raise ValidationException('締日は1〜31の間で設定してください')
 
-        tenant_id = self._get_tenant_id(request)
+        tenant_id = self.get_tenant_id()
 
         # PaymentProviderのデフォルト締日を更新
         provider = PaymentProvider.objects.filter(
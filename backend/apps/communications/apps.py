@@ -5,3 +5,6 @@ class CommunicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.communications'
     verbose_name = 'コミュニケーション'
+
+    def ready(self):
+        import apps.communications.signals  # noqa: F401
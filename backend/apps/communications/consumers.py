@@ -6,10 +6,9 @@ import json
 import logging
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.utils import timezone
-from asgiref.sync import sync_to_async
 
-from .models import Channel, ChannelMember, Message, MessageRead
+from .models import ChannelMember
+from .services.chat_buffer import get_chat_write_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -35,9 +34,9 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
             await self.close(code=4001)
             return
 
-        # チャンネルメンバーシップ確認
-        is_member = await self.check_channel_membership()
-        if not is_member:
+        # チャンネルメンバーシップ確認（メッセージ保存用に会社IDも保持）
+        self.channel_tenant_id = await self.get_member_channel_tenant_id()
+        if not self.channel_tenant_id:
             logger.warning(f"User {self.user.id} is not a member of channel {self.channel_id}")
             await self.close(code=4003)
             return
@@ -82,6 +81,9 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
                 self.channel_name
             )
 
+        # 未書き込みのメッセージ・既読を反映（切断・ワーカー停止時に失わないように）
+        await get_chat_write_buffer().flush()
+
         logger.info(f"User disconnected from channel {getattr(self, 'channel_id', 'unknown')}")
 
     async def receive_json(self, content):
@@ -107,8 +109,8 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         if not message_content:
             return
 
-        # メッセージをDBに保存
-        message = await self.save_message(message_content, reply_to_id)
+        # メッセージを書き込みバッファに積む（DB保存を待たずにブロードキャスト）
+        message = self.save_message(message_content, reply_to_id)
 
         if message:
             # グループ全体にブロードキャスト
@@ -146,7 +148,7 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
         """既読処理"""
         message_id = content.get('message_id')
         if message_id:
-            await self.mark_message_as_read(message_id)
+            self.mark_message_as_read(message_id)
 
     # ========================================
     # Group message handlers
@@ -253,51 +255,44 @@ class ChatConsumer(AsyncJsonWebsocketConsumer):
     # ========================================
 
     @database_sync_to_async
-    def check_channel_membership(self):
-        """チャンネルメンバーシップを確認"""
+    def get_member_channel_tenant_id(self):
+        """チャンネルメンバーであればチャンネルの会社IDを返す"""
         try:
             return ChannelMember.objects.filter(
                 channel_id=self.channel_id,
                 user=self.user
-            ).exists()
+            ).values_list('channel__tenant_id', flat=True).first()
         except Exception as e:
             logger.error(f"Error checking channel membership: {e}")
-            return False
+            return None
 
-    @database_sync_to_async
     def save_message(self, content, reply_to_id=None):
-        """メッセージをDBに保存"""
+        """メッセージを書き込みバッファ経由でDBに保存"""
         try:
-            channel = Channel.objects.get(id=self.channel_id)
-            message = Message.objects.create(
-                tenant_id=channel.tenant_id,
-                channel=channel,
+            return get_chat_write_buffer().enqueue_message(
+                tenant_id=self.channel_tenant_id,
+                channel_id=self.channel_id,
                 sender=self.user,
                 content=content,
                 reply_to_id=reply_to_id,
-                message_type=Message.MessageType.TEXT,
             )
-            # チャンネルの更新日時を更新
-            channel.updated_at = timezone.now()
-            channel.save(update_fields=['updated_at'])
-            return message
         except Exception as e:
             logger.error(f"Error saving message: {e}")
             return None
 
-    @database_sync_to_async
     def mark_message_as_read(self, message_id):
-        """メッセージを既読にする"""
+        """
+        メッセージを既読にする
+
+        メッセージ単位の MessageRead は作らず、メンバーの既読位置
+        （last_read_message / last_read_at）をバッファ経由でまとめて更新する
+        """
         try:
-            MessageRead.objects.get_or_create(
+            get_chat_write_buffer().enqueue_read(
+                channel_id=self.channel_id,
+                user_id=self.user.id,
                 message_id=message_id,
-                user=self.user
             )
-            # ChannelMemberの最終既読日時も更新
-            ChannelMember.objects.filter(
-                channel_id=self.channel_id,
-                user=self.user
-            ).update(last_read_at=timezone.now())
         except Exception as e:
             logger.error(f"Error marking message as read: {e}")
 
@@ -0,0 +1,125 @@
+"""
+ボットFAQマッチャーのベンチマーク
+
+update_bot_faq の FAQ_DATA とラベル付きの問い合わせ例を使い、
+旧実装（キーワード + question.split() の二重ループ）と
+コンパイル済みマッチャー（Aho-Corasick + 文字バイグラムTF-IDF）の
+正解率・応答時間を比較する。DBは使用しない。
+"""
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from apps.communications.management.commands.update_bot_faq import FAQ_DATA
+from apps.communications.services.faq_matcher import FAQMatcher
+
+# (問い合わせ文, 期待するFAQの question。None はマッチしないのが正解)
+SAMPLES = [
+    ('体験授業を申し込みたいです', '体験授業を申し込みたい'),
+    ('無料体験はありますか？', '体験授業を申し込みたい'),
+    ('来週の授業を欠席します', '振替・欠席連絡について'),
+    ('振替はできますか', '振替・欠席連絡について'),
+    ('月謝はいくらですか', '料金・月謝について'),
+    ('料金・月謝について教えて', '料金・月謝について'),
+    ('授業のスケジュールを知りたい', '授業スケジュール・時間割について'),
+    ('何時から始まりますか', '授業スケジュール・時間割について'),
+    ('教室の場所はどこですか', '教室の場所を探している'),
+    ('英検の対策はしていますか', '検定・資格試験について'),
+    ('そろばんを習わせたい', 'アンそろばんクラブについて'),
+    ('プログラミングの教室はありますか', 'アンプログラミングクラブについて'),
+    ('将棋を習いたい', 'アン将棋クラブについて'),
+    ('中学生向けの塾はありますか', '中学生向けの学習塾や英会話'),
+    ('高校生向けの大学受験対策について', '高校生向けの大学受験対策'),
+    ('スタッフと直接話したいです', 'スタッフと直接話したい'),
+    ('入会の流れを教えてください', '入会の流れについて'),
+    ('支払い方法は何がありますか', '支払い方法について'),
+    ('夏期講習の日程は？', '夏期講習・季節講習について'),
+    ('駐車場はありますか', '駐車場について'),
+    ('駐車場について', '駐車場について'),
+    ('こんにちは', None),
+    ('ありがとうございました', None),
+]
+
+
+def legacy_match(faqs, message):
+    """旧実装の採点（BotService._match_faq 相当）"""
+    message_lower = message.lower()
+    best_match = None
+    best_score = 0
+    for faq in faqs:
+        score = 0
+        for keyword in faq.keywords:
+            if keyword.lower() in message_lower:
+                score += 10
+        for word in faq.question.lower().split():
+            if len(word) > 2 and word in message_lower:
+                score += 5
+        if score > best_score:
+            best_score = score
+            best_match = faq
+    return best_match if best_score >= 10 else None
+
+
+class Command(BaseCommand):
+    help = 'ボットFAQマッチャーの正解率・応答時間を旧実装と比較'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='計測の繰り返し回数（デフォルト: 200）'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        faqs = [
+            SimpleNamespace(
+                id=str(i),
+                question=data['question'],
+                keywords=data['keywords'],
+                sort_order=data['sort_order'],
+            )
+            for i, data in enumerate(sorted(FAQ_DATA, key=lambda d: d['sort_order']))
+        ]
+        question_by_id = {faq.id: faq.question for faq in faqs}
+
+        start = time.perf_counter()
+        matcher = FAQMatcher(faqs)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def compiled_match(message):
+            match = matcher.match(message)
+            return SimpleNamespace(question=question_by_id[match.faq_id]) if match else None
+
+        self.stdout.write(f'FAQ: {len(faqs)}件 / 問い合わせ例: {len(SAMPLES)}件')
+        self.stdout.write(f'マッチャー構築: {build_ms:.2f}ms')
+        self.stdout.write('')
+
+        for label, match_func in (
+            ('旧実装', lambda m: legacy_match(faqs, m)),
+            ('コンパイル済み', compiled_match),
+        ):
+            correct = 0
+            misses = []
+            for message, expected in SAMPLES:
+                result = match_func(message)
+                actual = result.question if result else None
+                if actual == expected:
+                    correct += 1
+                else:
+                    misses.append((message, expected, actual))
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for message, _expected in SAMPLES:
+                    match_func(message)
+            elapsed_us = (time.perf_counter() - start) * 1_000_000 / (iterations * len(SAMPLES))
+
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}: 正解率 {correct}/{len(SAMPLES)} ({correct / len(SAMPLES):.0%}) '
+                f'平均 {elapsed_us:.1f}µs/件'
+            ))
+            for message, expected, actual in misses:
+                self.stdout.write(f'  ✗ {message} → {actual}（期待: {expected}）')
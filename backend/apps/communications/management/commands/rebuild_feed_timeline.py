@@ -0,0 +1,32 @@
+"""
+フィードタイムライン（FeedTimelineEntry）を再構築
+
+導入時の初回投入や、シグナルを経由しない投稿の取り込み・更新の後に実行する。
+"""
+from django.core.management.base import BaseCommand
+
+from apps.communications.services.feed_timeline import FeedTimelineService
+
+
+class Command(BaseCommand):
+    help = 'フィードタイムライン（FeedTimelineEntry）を再構築'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant-id',
+            type=str,
+            help='対象のテナントID'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='1回の作成件数（デフォルト: 500）'
+        )
+
+    def handle(self, *args, **options):
+        count = FeedTimelineService.rebuild(
+            tenant_id=options.get('tenant_id'),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'{count}件の投稿をタイムラインに展開しました'))
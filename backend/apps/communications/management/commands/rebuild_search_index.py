@@ -0,0 +1,76 @@
+"""
+全文検索インデックス（search_vector）を再構築
+
+既存データの初回投入や、bulk_create 等シグナルを経由しない取り込みの後に実行する。
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.communications.models import ChatLog, ContactLog, FeedPost, Message
+from apps.communications.services.search import (
+    SEARCH_FIELDS, build_search_vector, is_search_enabled,
+)
+
+MODELS = {
+    'message': Message,
+    'feed_post': FeedPost,
+    'contact_log': ContactLog,
+    'chat_log': ChatLog,
+}
+
+
+class Command(BaseCommand):
+    help = '全文検索インデックス（search_vector）を再構築'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type',
+            choices=list(MODELS.keys()),
+            action='append',
+            help='対象の種別（複数指定可。デフォルト: 全種別）'
+        )
+        parser.add_argument(
+            '--tenant-id',
+            type=str,
+            help='対象のテナントID'
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='search_vector が未設定のレコードのみ処理'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='1回の更新件数（デフォルト: 1000）'
+        )
+
+    def handle(self, *args, **options):
+        if not is_search_enabled():
+            raise CommandError('全文検索はPostgreSQLのみ対応しています')
+
+        batch_size = options['batch_size']
+        for type_name in options['type'] or MODELS.keys():
+            model = MODELS[type_name]
+            text_fields = [name for name, _ in SEARCH_FIELDS[model]]
+
+            queryset = model.objects.all()
+            if options.get('tenant_id'):
+                queryset = queryset.filter(tenant_id=options['tenant_id'])
+            if options['missing_only']:
+                queryset = queryset.filter(search_vector__isnull=True)
+
+            updated = 0
+            batch = []
+            for obj in queryset.only('pk', *text_fields).iterator(chunk_size=batch_size):
+                obj.search_vector = build_search_vector(obj)
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, ['search_vector'])
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, ['search_vector'])
+                updated += len(batch)
+
+            self.stdout.write(self.style.SUCCESS(f'{type_name}: {updated}件を更新しました'))
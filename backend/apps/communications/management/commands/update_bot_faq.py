@@ -3,6 +3,7 @@
 """
 from django.core.management.base import BaseCommand
 from apps.communications.models import BotConfig, BotFAQ
+from apps.communications.services.faq_matcher import invalidate_faq_matcher
 
 FAQ_DATA = [
     # 体験・基本
@@ -726,4 +727,6 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write(self.style.WARNING(f'[DRY RUN] {created_count}件のFAQが作成されます'))
         else:
+            # FAQマッチャーを再構築させる
+            invalidate_faq_matcher(bot_config.id)
             self.stdout.write(self.style.SUCCESS(f'{created_count}件のFAQを作成しました'))
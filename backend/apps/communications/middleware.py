@@ -19,7 +19,7 @@ def get_user_from_token(token_string):
     """
     JWTトークンからユーザーを取得
     """
-    from apps.users.models import User
+    from apps.authentication.services import UserIdentityCache
 
     try:
         # トークンを検証
@@ -27,14 +27,15 @@ def get_user_from_token(token_string):
         user_id = access_token.get('user_id')
 
         if user_id:
-            user = User.objects.get(id=user_id)
-            return user
+            # ユーザー情報はキャッシュ経由で取得
+            user = UserIdentityCache.get_user(user_id, access_token.get('auth_ver'))
+            if user is not None and user.is_active:
+                return user
+            logger.warning(f"User not found for token")
     except TokenError as e:
         logger.warning(f"Token error: {e}")
     except InvalidToken as e:
         logger.warning(f"Invalid token: {e}")
-    except User.DoesNotExist:
-        logger.warning(f"User not found for token")
     except Exception as e:
         logger.error(f"Error getting user from token: {e}")
 
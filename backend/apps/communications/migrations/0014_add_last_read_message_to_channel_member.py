@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communications", "0013_add_approval_fields_to_feedpost"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="channelmember",
+            name="last_read_message",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="communications.message",
+                verbose_name="最終既読メッセージ",
+            ),
+        ),
+    ]
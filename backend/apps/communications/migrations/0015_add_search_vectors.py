@@ -0,0 +1,67 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:57
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communications", "0014_add_last_read_message_to_channel_member"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatlog",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="contactlog",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="feedpost",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="message",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chatlog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="comm_chatlog_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contactlog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="comm_contact_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="feedpost",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="comm_feed_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="comm_msg_search_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communications", "0015_add_search_vectors"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedTimelineEntry",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("tenant_id", models.UUIDField(verbose_name="会社ID")),
+                (
+                    "bucket_type",
+                    models.CharField(
+                        choices=[
+                            ("all", "すべて（管理者・スタッフ用）"),
+                            ("public", "全体公開"),
+                            ("school", "校舎"),
+                            ("grade", "学年"),
+                        ],
+                        max_length=10,
+                        verbose_name="バケット種別",
+                    ),
+                ),
+                (
+                    "bucket_key",
+                    models.UUIDField(
+                        blank=True, null=True, verbose_name="バケットキー"
+                    ),
+                ),
+                (
+                    "is_pinned",
+                    models.BooleanField(default=False, verbose_name="固定表示"),
+                ),
+                ("sort_at", models.DateTimeField(verbose_name="並び順日時")),
+                (
+                    "publish_start_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="公開開始日時"
+                    ),
+                ),
+                (
+                    "publish_end_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="公開終了日時"
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="timeline_entries",
+                        to="communications.feedpost",
+                        verbose_name="投稿",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "フィードタイムライン",
+                "verbose_name_plural": "フィードタイムライン",
+                "db_table": "communication_feed_timeline_entries",
+                "indexes": [
+                    models.Index(
+                        fields=[
+                            "tenant_id",
+                            "bucket_type",
+                            "bucket_key",
+                            "-is_pinned",
+                            "-sort_at",
+                            "-post",
+                        ],
+                        name="comm_feed_timeline_idx",
+                    )
+                ],
+                "unique_together": {("bucket_type", "bucket_key", "post")},
+            },
+        ),
+    ]
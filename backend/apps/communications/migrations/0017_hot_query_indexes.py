@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:24
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（トランザクション外で実行）
+    atomic = False
+
+    dependencies = [
+        ("communications", "0016_add_feed_timeline_entry"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["channel", "created_at"],
+                name="comm_msg_channel_live_idx",
+            ),
+        ),
+    ]
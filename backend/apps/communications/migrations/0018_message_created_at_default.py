@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communications", "0017_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="message",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+                verbose_name="作成日時",
+            ),
+        ),
+    ]
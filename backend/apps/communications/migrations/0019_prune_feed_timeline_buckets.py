@@ -0,0 +1,25 @@
+"""
+公開範囲と合わないタイムラインのバケットを削除
+
+以前の展開では学年限定・全体公開の投稿も校舎のバケットに、全体公開・校舎限定の投稿も
+学年のバケットに載せていたため、所属外の閲覧者に学年限定の投稿が表示されていた。
+校舎のバケットは校舎限定、学年のバケットは学年限定の投稿のみ残す。
+"""
+from django.db import migrations
+
+
+def prune_buckets(apps, schema_editor):
+    FeedTimelineEntry = apps.get_model('communications', 'FeedTimelineEntry')
+    FeedTimelineEntry.objects.filter(bucket_type='school').exclude(post__visibility='SCHOOL').delete()
+    FeedTimelineEntry.objects.filter(bucket_type='grade').exclude(post__visibility='GRADE').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communications", "0018_message_created_at_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(prune_buckets, migrations.RunPython.noop),
+    ]
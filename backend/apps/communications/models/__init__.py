@@ -43,6 +43,7 @@ from .feed import (
     FeedComment,
     FeedCommentLike,
     FeedBookmark,
+    FeedTimelineEntry,
 )
 
 # Chat Log
@@ -81,6 +82,7 @@ __all__ = [
     'FeedComment',
     'FeedCommentLike',
     'FeedBookmark',
+    'FeedTimelineEntry',
     # Chat Log
     'ChatLog',
     # Memo
@@ -3,8 +3,11 @@ Chat Models - チャット関連
 Channel, ChannelMember, Message, MessageRead
 """
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Channel(models.Model):
@@ -126,6 +129,15 @@ class ChannelMember(models.Model):
         blank=True,
         verbose_name='最終既読日時'
     )
+    # 既読位置（このメッセージまで既読）
+    last_read_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='最終既読メッセージ'
+    )
     is_muted = models.BooleanField(
         default=False,
         verbose_name='ミュート'
@@ -233,13 +245,25 @@ class Message(models.Model):
         default=False,
         verbose_name='削除済み'
     )
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name='作成日時')
+    # 書き込みバッファで採番時の日時を保存するため auto_now_add ではなく default
+    created_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name='作成日時')
+    # 全文検索用（バイグラム化した本文のtsvector。services/search.py参照）
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'communication_messages'
         verbose_name = 'メッセージ'
         verbose_name_plural = 'メッセージ'
         ordering = ['created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='comm_msg_search_gin'),
+            # チャンネルのメッセージ一覧（削除済みを除き作成日時順）
+            models.Index(
+                fields=['channel', 'created_at'],
+                condition=models.Q(is_deleted=False),
+                name='comm_msg_channel_live_idx',
+            ),
+        ]
 
     def __str__(self):
         sender_name = 'Bot' if self.is_bot_message else (
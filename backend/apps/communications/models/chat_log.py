@@ -2,6 +2,8 @@
 Chat Log Model - チャットログ
 """
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from .chat import Message
@@ -82,6 +84,8 @@ class ChatLog(models.Model):
     )
     # タイムスタンプ
     timestamp = models.DateTimeField(auto_now_add=True, verbose_name='タイムスタンプ')
+    # 全文検索用（バイグラム化した本文のtsvector。services/search.py参照）
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'communication_chat_logs'
@@ -93,6 +97,7 @@ class ChatLog(models.Model):
             models.Index(fields=['school', '-timestamp']),
             models.Index(fields=['guardian', '-timestamp']),
             models.Index(fields=['brand', '-timestamp']),
+            GinIndex(fields=['search_vector'], name='comm_chatlog_search_gin'),
         ]
 
     def __str__(self):
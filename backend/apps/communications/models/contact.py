@@ -3,6 +3,8 @@ Contact Log Models - 対応履歴/CRM
 ContactLog, ContactLogComment
 """
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
 
@@ -138,12 +140,17 @@ class ContactLog(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='作成日時')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新日時')
+    # 全文検索用（バイグラム化した本文のtsvector。services/search.py参照）
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'communication_contact_logs'
         verbose_name = '対応履歴'
         verbose_name_plural = '対応履歴'
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='comm_contact_search_gin'),
+        ]
 
     def __str__(self):
         target = self.student.full_name if self.student else (
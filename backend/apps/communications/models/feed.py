@@ -1,8 +1,11 @@
 """
 Feed Models - フィード投稿関連（Instagram風）
-FeedPost, FeedMedia, FeedLike, FeedComment, FeedCommentLike, FeedBookmark
+FeedPost, FeedMedia, FeedLike, FeedComment, FeedCommentLike, FeedBookmark,
+FeedTimelineEntry
 """
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
 
@@ -187,12 +190,17 @@ class FeedPost(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='作成日時')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新日時')
+    # 全文検索用（バイグラム化した本文のtsvector。services/search.py参照）
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'communication_feed_posts'
         verbose_name = 'フィード投稿'
         verbose_name_plural = 'フィード投稿'
         ordering = ['-is_pinned', '-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='comm_feed_search_gin'),
+        ]
 
     def __str__(self):
         return f"{self.author.email if self.author else 'Unknown'}: {self.content[:50]}..."
@@ -464,3 +472,59 @@ class FeedBookmark(models.Model):
         verbose_name = 'フィードブックマーク'
         verbose_name_plural = 'フィードブックマーク'
         unique_together = [['post', 'user'], ['post', 'guardian']]
+
+
+class FeedTimelineEntry(models.Model):
+    """
+    フィードタイムライン（公開範囲ごとのバケットに展開した投稿ID）
+
+    承認・公開された投稿を 全体/校舎/学年 のバケットへ展開しておき、
+    タイムラインの取得はバケットのキーセット範囲読み出しのみで行う。
+    services/feed_timeline.py 参照
+    """
+
+    class BucketType(models.TextChoices):
+        ALL = 'all', 'すべて（管理者・スタッフ用）'
+        PUBLIC = 'public', '全体公開'
+        SCHOOL = 'school', '校舎'
+        GRADE = 'grade', '学年'
+
+    id = models.BigAutoField(primary_key=True)
+    tenant_id = models.UUIDField(verbose_name='会社ID')
+    bucket_type = models.CharField(
+        max_length=10,
+        choices=BucketType.choices,
+        verbose_name='バケット種別'
+    )
+    # 校舎ID・学年ID（ALL/PUBLIC はNULL）
+    bucket_key = models.UUIDField(
+        null=True,
+        blank=True,
+        verbose_name='バケットキー'
+    )
+    post = models.ForeignKey(
+        FeedPost,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='投稿'
+    )
+    # 並び順（投稿から複製）
+    is_pinned = models.BooleanField(default=False, verbose_name='固定表示')
+    sort_at = models.DateTimeField(verbose_name='並び順日時')
+    publish_start_at = models.DateTimeField(null=True, blank=True, verbose_name='公開開始日時')
+    publish_end_at = models.DateTimeField(null=True, blank=True, verbose_name='公開終了日時')
+
+    class Meta:
+        db_table = 'communication_feed_timeline_entries'
+        verbose_name = 'フィードタイムライン'
+        verbose_name_plural = 'フィードタイムライン'
+        unique_together = [['bucket_type', 'bucket_key', 'post']]
+        indexes = [
+            models.Index(
+                fields=['tenant_id', 'bucket_type', 'bucket_key', '-is_pinned', '-sort_at', '-post'],
+                name='comm_feed_timeline_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket_type}:{self.bucket_key or '-'} {self.post_id}"
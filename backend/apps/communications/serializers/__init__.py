@@ -8,6 +8,7 @@ Communications Serializers
 - announcement.py: Announcement serializers
 - feed.py: Feed serializers
 - chatlog.py: ChatLog serializers
+- search.py: Search query parameters
 """
 # Channel & Message
 from .channel import (
@@ -70,6 +71,9 @@ from .memo import (
     TelMemoCreateSerializer,
 )
 
+# Search
+from .search import SearchParamsSerializer
+
 __all__ = [
     # Channel & Message
     'ChannelMemberSerializer',
@@ -111,4 +115,6 @@ __all__ = [
     'MessageMemoCreateSerializer',
     'TelMemoSerializer',
     'TelMemoCreateSerializer',
+    # Search
+    'SearchParamsSerializer',
 ]
@@ -1,11 +1,18 @@
 """
 Channel & Message Serializers - チャンネル・メッセージシリアライザー
 """
+import uuid
+
+from django.db.models import Count, IntegerField, OuterRef, Subquery, UUIDField, Value
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 from apps.communications.models import (
     Channel, ChannelMember, Message, MessageRead
 )
 
+# 送信者・メンバーのユーザーが未設定（ボット・保護者のみのメンバー）の比較用
+NO_USER = Value(uuid.UUID(int=0), output_field=UUIDField())
+
 
 class ChannelMemberSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.full_name', read_only=True)
@@ -15,7 +22,7 @@ class ChannelMemberSerializer(serializers.ModelSerializer):
         model = ChannelMember
         fields = [
             'id', 'channel', 'user', 'user_name', 'guardian', 'guardian_name',
-            'role', 'last_read_at', 'is_muted', 'is_pinned', 'joined_at'
+            'role', 'last_read_at', 'last_read_message', 'is_muted', 'is_pinned', 'joined_at'
         ]
         read_only_fields = ['id', 'joined_at']
 
@@ -217,9 +224,26 @@ class MessageSerializer(serializers.ModelSerializer):
             return obj.reply_to.sender_name
         return None
 
+    @staticmethod
+    def with_read_counts(queryset):
+        """既読人数（read_count）をサブクエリで付与（一覧でメッセージごとにCOUNTしない）"""
+        readers = ChannelMember.objects.filter(
+            channel_id=OuterRef('channel_id'),
+            last_read_at__gte=OuterRef('created_at'),
+        ).annotate(
+            member_user=Coalesce('user_id', NO_USER),
+        ).exclude(
+            member_user=Coalesce(OuterRef('sender_id'), NO_USER),
+        ).order_by().values('channel_id').annotate(count=Count('id')).values('count')
+        return queryset.annotate(read_count=Coalesce(Subquery(readers, output_field=IntegerField()), 0))
+
     def get_read_count(self, obj):
-        """既読人数を取得"""
-        return obj.reads.count()
+        """既読人数を取得（既読位置がこのメッセージ以降の送信者以外のメンバー数）"""
+        if hasattr(obj, 'read_count'):
+            return obj.read_count
+        return obj.channel.members.filter(
+            last_read_at__gte=obj.created_at
+        ).exclude(user_id=obj.sender_id).count()
 
     def get_reply_count(self, obj):
         """スレッド返信数を取得"""
@@ -93,12 +93,19 @@ class FeedPostListSerializer(serializers.ModelSerializer):
         return [{'id': str(s.id), 'name': s.school_name} for s in obj.target_schools.all()]
 
     def get_is_liked(self, obj):
+        # タイムラインではページ単位で取得済みの集合を使う
+        liked_post_ids = self.context.get('liked_post_ids')
+        if liked_post_ids is not None:
+            return obj.id in liked_post_ids
         request = self.context.get('request')
         if request and request.user and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
         return False
 
     def get_is_bookmarked(self, obj):
+        bookmarked_post_ids = self.context.get('bookmarked_post_ids')
+        if bookmarked_post_ids is not None:
+            return obj.id in bookmarked_post_ids
         request = self.context.get('request')
         if request and request.user and request.user.is_authenticated:
             return obj.bookmarks.filter(user=request.user).exists()
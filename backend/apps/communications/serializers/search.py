@@ -0,0 +1,37 @@
+"""
+Search Serializers - 横断検索のクエリパラメータ
+"""
+from rest_framework import serializers
+
+from ..services.search import SearchService
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    """横断検索のクエリパラメータ（不正な日付・ID・種別は400）"""
+    q = serializers.CharField(
+        error_messages={
+            'required': '検索キーワードを入力してください',
+            'blank': '検索キーワードを入力してください',
+        }
+    )
+    types = serializers.CharField(required=False, allow_blank=True)
+    channel_id = serializers.UUIDField(required=False)
+    school_id = serializers.UUIDField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    limit = serializers.IntegerField(
+        required=False, min_value=1, max_value=SearchService.MAX_LIMIT, default=SearchService.DEFAULT_LIMIT
+    )
+
+    def validate_types(self, value):
+        types = [t.strip() for t in value.split(',') if t.strip()]
+        unknown = [t for t in types if t not in SearchService.TYPES]
+        if unknown:
+            raise serializers.ValidationError(f'不明な種別です: {", ".join(unknown)}')
+        return types or None
+
+    def validate(self, attrs):
+        date_from, date_to = attrs.get('date_from'), attrs.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError({'date_to': 'date_to は date_from 以降の日付を指定してください'})
+        return attrs
@@ -5,6 +5,7 @@ from django.utils import timezone
 from ..models import (
     Channel, ChannelMember, Message, BotConfig, BotFAQ, BotConversation
 )
+from .faq_matcher import get_faq_matcher
 
 
 class BotService:
@@ -117,41 +118,12 @@ class BotService:
         return channel
 
     def _match_faq(self, message: str):
-        """FAQマッチング"""
-        message_lower = message.lower()
+        """FAQマッチング（コンパイル済みマッチャーを使用）"""
+        match = get_faq_matcher(self.bot_config).match(message)
+        if not match:
+            return None
 
-        faqs = BotFAQ.objects.filter(
-            tenant_id=self.tenant_id,
-            bot_config=self.bot_config,
-            is_active=True
-        ).order_by('sort_order')
-
-        best_match = None
-        best_score = 0
-
-        for faq in faqs:
-            score = 0
-
-            # キーワードマッチング
-            for keyword in faq.keywords:
-                if keyword.lower() in message_lower:
-                    score += 10
-
-            # 質問文との類似度（簡易版）
-            question_words = faq.question.lower().split()
-            for word in question_words:
-                if len(word) > 2 and word in message_lower:
-                    score += 5
-
-            if score > best_score:
-                best_score = score
-                best_match = faq
-
-        # 閾値以上のスコアがあればマッチ
-        if best_score >= 10:
-            return best_match
-
-        return None
+        return BotFAQ.objects.filter(id=match.faq_id, is_active=True).first()
 
     def _get_ai_response(self, message: str):
         """AI応答を生成（将来的にOpenAI等と連携）"""
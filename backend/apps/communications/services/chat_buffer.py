@@ -0,0 +1,185 @@
+"""
+Chat Write Buffer
+WebSocket Consumer用の非同期書き込みバッファ
+
+ChatConsumer から受け取ったメッセージ保存・既読更新をプロセス単位で溜め込み、
+一定間隔（デフォルト300ms）でまとめてDBへ書き込む。
+
+- メッセージ: IDを先に採番し、ブロードキャストはDB書き込みを待たずに行う。
+  書き込みは bulk_create で一括INSERT
+- 既読: 1メッセージ1行の MessageRead ではなく、メンバーごとに
+  「どのメッセージまで読んだか」（ChannelMember.last_read_message）へ集約し、
+  bulk_update で一括更新
+"""
+import asyncio
+import logging
+import uuid
+import weakref
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.communications.models import Channel, ChannelMember, Message
+
+from .search import update_search_vector
+
+logger = logging.getLogger(__name__)
+
+# フラッシュ間隔（秒）
+FLUSH_INTERVAL = getattr(settings, 'CHAT_WRITE_BUFFER_FLUSH_INTERVAL', 0.3)
+
+
+class ChatWriteBuffer:
+    """
+    チャット書き込みバッファ（イベントループ単位で1インスタンス）
+
+    enqueue_* はイベントループ上で同期的に呼ばれ、awaitを挟まないため
+    ロックは不要。溜まった内容は flush() でスワップしてから書き込む。
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._messages = []
+        # (channel_id, user_id) -> message_id  最後に既読指定されたメッセージ
+        self._reads = {}
+        self._flush_task = None
+
+    def enqueue_message(self, *, tenant_id, channel_id, sender, content, reply_to_id=None):
+        """
+        メッセージを保存キューに積む
+
+        IDと作成日時はこの時点で確定させるため、戻り値の Message インスタンスを
+        そのままブロードキャストに使用できる。
+        """
+        message = Message(
+            id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            channel_id=channel_id,
+            sender=sender,
+            content=content,
+            reply_to_id=reply_to_id or None,
+            message_type=Message.MessageType.TEXT,
+            created_at=timezone.now(),
+        )
+        self._messages.append(message)
+        self._schedule_flush()
+        return message
+
+    def enqueue_read(self, *, channel_id, user_id, message_id):
+        """
+        既読をキューに積む（同一メンバーの既読は最後の1件に集約）
+
+        クライアントから受け取った message_id が UUID でない場合は積まない
+        （1件の不正なIDでフラッシュ時の問い合わせが失敗し、他の既読まで失われるため）
+        """
+        try:
+            message_id = uuid.UUID(str(message_id))
+        except (ValueError, TypeError, AttributeError):
+            logger.warning(f"Ignoring read with invalid message id: {message_id!r}")
+            return
+        self._reads[(str(channel_id), str(user_id))] = str(message_id)
+        self._schedule_flush()
+
+    @property
+    def pending_count(self):
+        return len(self._messages) + len(self._reads)
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+        # 書き込み中に積まれた分は次のサイクルで処理
+        if self.pending_count:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def flush(self):
+        """溜まっている書き込みを一括でDBへ反映"""
+        messages, self._messages = self._messages, []
+        reads, self._reads = self._reads, {}
+        if not messages and not reads:
+            return
+        try:
+            await database_sync_to_async(self._write)(messages, reads)
+        except Exception as e:
+            logger.error(f"Error flushing chat write buffer: {e}")
+
+    def _write(self, messages, reads):
+        # メッセージを先に書き込む（同じバッチ内の既読が参照できるように）
+        if messages:
+            self._write_messages(messages)
+        if reads:
+            self._write_reads(reads)
+
+    def _write_messages(self, messages):
+        try:
+            with transaction.atomic():
+                self._insert_messages(messages)
+        except Exception as e:
+            # 不正な reply_to 等が混ざっている場合は1件ずつ保存して巻き添えを防ぐ
+            logger.warning(f"Bulk message insert failed, retrying one by one: {e}")
+            for message in messages:
+                try:
+                    with transaction.atomic():
+                        self._insert_messages([message])
+                except Exception as row_error:
+                    logger.error(f"Error saving message {message.id}: {row_error}")
+
+    def _insert_messages(self, messages):
+        # 作成日時は enqueue_message で採番時の値を設定済み（ブロードキャストと同じ値で保存）
+        # bulk_create ではシグナルが発火しないため検索用ベクトルもここで設定
+        for message in messages:
+            update_search_vector(message)
+        Message.objects.bulk_create(messages)
+
+        # チャンネルの更新日時を更新
+        Channel.objects.filter(
+            id__in={message.channel_id for message in messages}
+        ).update(updated_at=timezone.now())
+
+    def _write_reads(self, reads):
+        # メッセージID -> (チャンネルID, 作成日時)
+        message_info = {
+            str(message_id): (str(channel_id), created_at)
+            for message_id, channel_id, created_at in Message.objects.filter(
+                id__in=set(reads.values())
+            ).values_list('id', 'channel_id', 'created_at')
+        }
+
+        member_filter = Q()
+        for channel_id, user_id in reads:
+            member_filter |= Q(channel_id=channel_id, user_id=user_id)
+
+        members = []
+        for member in ChannelMember.objects.filter(member_filter):
+            message_id = reads.get((str(member.channel_id), str(member.user_id)))
+            channel_id, read_time = message_info.get(message_id, (None, None))
+            # 存在しない・他のチャンネルのメッセージは反映しない
+            if read_time is None or channel_id != str(member.channel_id):
+                continue
+            # 既読位置は前進のみ
+            if member.last_read_at and member.last_read_at >= read_time:
+                continue
+            member.last_read_message_id = message_id
+            member.last_read_at = read_time
+            members.append(member)
+
+        if members:
+            ChannelMember.objects.bulk_update(members, ['last_read_message', 'last_read_at'])
+
+
+_buffers = weakref.WeakKeyDictionary()
+
+
+def get_chat_write_buffer():
+    """実行中のイベントループに紐づくバッファを取得"""
+    loop = asyncio.get_running_loop()
+    buffer = _buffers.get(loop)
+    if buffer is None:
+        buffer = _buffers[loop] = ChatWriteBuffer()
+    return buffer
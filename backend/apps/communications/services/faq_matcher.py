@@ -0,0 +1,250 @@
+"""
+FAQ Matcher
+ボットFAQのコンパイル済みマッチャー
+
+BotService._match_faq はメッセージごとにテナントの全FAQを読み込み、
+キーワードと question.split() の二重ループで採点していた。
+split() は空白のない日本語では機能しないため、以下に置き換える。
+
+- キーワード: 全FAQのキーワードから Aho-Corasick オートマトンを構築し、
+  メッセージを1回走査するだけで一致したキーワードを列挙
+- 質問文: 文字バイグラムの TF-IDF 転置インデックスを構築し、
+  メッセージとのコサイン類似度を算出
+
+マッチャーはボット設定ごとに1度だけ構築してプロセス内にキャッシュし、
+BotFAQ の変更時（signals / update_bot_faq コマンド）に再構築する。
+"""
+import logging
+import math
+import threading
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+
+from .search import normalize
+
+logger = logging.getLogger(__name__)
+
+# 採点（既存の閾値10を踏襲: キーワード1件一致で成立）
+KEYWORD_SCORE = 10
+QUESTION_SCORE = 15
+MATCH_THRESHOLD = 10
+
+
+def char_ngrams(text: str, n: int = 2) -> List[str]:
+    """空白を除いた正規化テキストの文字n-gram"""
+    text = ''.join(normalize(text).split())
+    if len(text) < n:
+        return [text] if text else []
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+class AhoCorasick:
+    """Aho-Corasick オートマトン（複数キーワードの一括検索）"""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+    def add(self, keyword: str, value):
+        """キーワードを追加（build() 前に呼ぶ）"""
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(value)
+
+    def build(self):
+        """失敗遷移を構築"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str):
+        """一致した値を出現順に返す"""
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            yield from self._output[state]
+
+
+@dataclass
+class FAQEntry:
+    """マッチャー内部のFAQ情報"""
+    faq_id: str
+    sort_order: int
+    question_norm: float = 0.0
+
+
+@dataclass
+class FAQMatch:
+    """マッチ結果"""
+    faq_id: str
+    score: float
+    matched_keywords: List[str] = field(default_factory=list)
+    question_similarity: float = 0.0
+
+
+class FAQMatcher:
+    """ボット設定単位のコンパイル済みFAQマッチャー"""
+
+    def __init__(self, faqs):
+        """
+        Args:
+            faqs: BotFAQ（または id, keywords, question, sort_order を持つオブジェクト）の
+                  sort_order 順のイテラブル
+        """
+        self.entries: List[FAQEntry] = []
+        self._automaton = AhoCorasick()
+        self._postings: Dict[str, List[tuple]] = defaultdict(list)
+        self._idf: Dict[str, float] = {}
+
+        question_tfs = []
+        for index, faq in enumerate(faqs):
+            self.entries.append(FAQEntry(faq_id=str(faq.id), sort_order=faq.sort_order))
+            for keyword in {normalize(k) for k in (faq.keywords or []) if k}:
+                self._automaton.add(keyword, (index, keyword))
+            question_tfs.append(Counter(char_ngrams(faq.question)))
+        self._automaton.build()
+
+        # TF-IDF（平滑化IDF）
+        doc_count = len(question_tfs)
+        df = Counter(gram for tf in question_tfs for gram in tf)
+        self._idf = {gram: math.log((1 + doc_count) / (1 + n)) + 1 for gram, n in df.items()}
+        for index, tf in enumerate(question_tfs):
+            norm = 0.0
+            for gram, count in tf.items():
+                weight = count * self._idf[gram]
+                self._postings[gram].append((index, weight))
+                norm += weight * weight
+            self.entries[index].question_norm = math.sqrt(norm)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def match(self, message: str) -> Optional[FAQMatch]:
+        """最もスコアの高いFAQを返す（閾値未満なら None）"""
+        scores = self.score(message)
+        if not scores:
+            return None
+        # スコア降順、同点は sort_order 順（= 既存実装の先勝ち）
+        best_index = min(scores, key=lambda i: (-scores[i].score, i))
+        best = scores[best_index]
+        return best if best.score >= MATCH_THRESHOLD else None
+
+    def score(self, message: str) -> Dict[int, FAQMatch]:
+        """FAQごとのスコアを算出（メッセージ長に比例する計算量）"""
+        results: Dict[int, FAQMatch] = {}
+
+        # キーワード一致
+        seen = set()
+        for index, keyword in self._automaton.iter_matches(normalize(message)):
+            if (index, keyword) in seen:
+                continue
+            seen.add((index, keyword))
+            result = results.setdefault(index, FAQMatch(faq_id=self.entries[index].faq_id, score=0))
+            result.matched_keywords.append(keyword)
+            result.score += KEYWORD_SCORE
+
+        # 質問文との類似度
+        message_tf = Counter(char_ngrams(message))
+        dots = defaultdict(float)
+        message_norm = 0.0
+        for gram, count in message_tf.items():
+            idf = self._idf.get(gram)
+            if idf is None:
+                continue
+            weight = count * idf
+            message_norm += weight * weight
+            for index, doc_weight in self._postings[gram]:
+                dots[index] += weight * doc_weight
+        message_norm = math.sqrt(message_norm)
+
+        for index, dot in dots.items():
+            entry = self.entries[index]
+            if not message_norm or not entry.question_norm:
+                continue
+            similarity = dot / (message_norm * entry.question_norm)
+            result = results.setdefault(index, FAQMatch(faq_id=entry.faq_id, score=0))
+            result.question_similarity = similarity
+            result.score += QUESTION_SCORE * similarity
+
+        return results
+
+
+# ========================================
+# キャッシュ
+# ========================================
+
+VERSION_CACHE_PREFIX = 'bot_faq_matcher_version:'
+
+_matchers: Dict[str, tuple] = {}
+_lock = threading.Lock()
+
+
+def _get_version(bot_config_id) -> Optional[int]:
+    try:
+        return cache.get(f'{VERSION_CACHE_PREFIX}{bot_config_id}')
+    except Exception as e:
+        logger.warning(f"FAQ matcher version unavailable: {e}")
+        return None
+
+
+def get_faq_matcher(bot_config) -> FAQMatcher:
+    """ボット設定のマッチャーを取得（未構築・更新済みの場合は構築）"""
+    from ..models import BotFAQ
+
+    key = str(bot_config.id)
+    version = _get_version(key)
+
+    with _lock:
+        cached = _matchers.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    faqs = BotFAQ.objects.filter(
+        tenant_id=bot_config.tenant_id,
+        bot_config=bot_config,
+        is_active=True
+    ).only('id', 'keywords', 'question', 'sort_order').order_by('sort_order')
+    matcher = FAQMatcher(faqs)
+
+    with _lock:
+        _matchers[key] = (version, matcher)
+    logger.debug(f"FAQ matcher built for bot_config {key}: {len(matcher)} FAQs")
+    return matcher
+
+
+def invalidate_faq_matcher(bot_config_id):
+    """マッチャーを破棄（他プロセスにはバージョン更新で通知）"""
+    key = str(bot_config_id)
+    with _lock:
+        _matchers.pop(key, None)
+    version_key = f'{VERSION_CACHE_PREFIX}{key}'
+    try:
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            cache.set(version_key, 1, timeout=None)
+    except Exception as e:
+        logger.warning(f"Failed to bump FAQ matcher version for {key}: {e}")
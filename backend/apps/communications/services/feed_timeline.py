@@ -0,0 +1,276 @@
+"""
+Feed Timeline Service
+フィードタイムライン（投稿IDのバケット展開とキーセット読み出し）
+
+FeedPostViewSet.get_queryset は公開範囲を読み出し時に判定しており
+（school_id / target_schools / visibility の OR + distinct）、
+投稿数の増加に比例して保護者アプリのホームが遅くなる。
+
+承認・公開された投稿は FeedTimelineEntry として以下のバケットに展開する。
+- ALL: すべての投稿（管理者・スタッフ用）
+- PUBLIC: 全体公開の投稿
+- SCHOOL: 校舎限定の投稿を投稿校舎・対象校舎ごと
+- GRADE: 学年限定の投稿を対象学年ごと（校舎のバケットには載せない）
+
+読み出しは閲覧者のバケット集合に対するキーセット（固定表示, 日時, 投稿ID）の
+範囲読み出しとし、ページ内のいいね・ブックマーク状態は1回ずつの集合取得で求める。
+"""
+import base64
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.communications.models import FeedBookmark, FeedLike, FeedPost, FeedTimelineEntry
+
+logger = logging.getLogger(__name__)
+
+# タイムラインに影響するフィールド（これ以外の update_fields 保存では再展開しない）
+TIMELINE_FIELDS = {
+    'approval_status', 'is_published', 'is_deleted', 'visibility', 'school',
+    'is_pinned', 'publish_start_at', 'publish_end_at',
+}
+
+
+def is_timeline_visible(post: FeedPost) -> bool:
+    """タイムラインに載せる投稿か（承認済・公開・未削除）"""
+    return (
+        not post.is_deleted
+        and post.is_published
+        and post.approval_status == FeedPost.ApprovalStatus.APPROVED
+    )
+
+
+def build_entries(post: FeedPost) -> List[FeedTimelineEntry]:
+    """投稿のバケット展開（未保存のエントリ一覧）"""
+    BucketType = FeedTimelineEntry.BucketType
+    buckets = [(BucketType.ALL, None)]
+
+    if post.visibility == FeedPost.Visibility.PUBLIC:
+        buckets.append((BucketType.PUBLIC, None))
+    elif post.visibility == FeedPost.Visibility.SCHOOL:
+        school_ids = {post.school_id} if post.school_id else set()
+        school_ids.update(school.id for school in post.target_schools.all())
+        buckets.extend((BucketType.SCHOOL, school_id) for school_id in school_ids)
+    elif post.visibility == FeedPost.Visibility.GRADE:
+        grade_ids = {grade.id for grade in post.target_grades.all()}
+        buckets.extend((BucketType.GRADE, grade_id) for grade_id in grade_ids)
+
+    return [
+        FeedTimelineEntry(
+            tenant_id=post.tenant_id,
+            bucket_type=bucket_type,
+            bucket_key=bucket_key,
+            post=post,
+            is_pinned=post.is_pinned,
+            sort_at=post.created_at,
+            publish_start_at=post.publish_start_at,
+            publish_end_at=post.publish_end_at,
+        )
+        for bucket_type, bucket_key in buckets
+    ]
+
+
+def sync_post(post_id) -> int:
+    """
+    投稿のタイムラインエントリを作り直す
+
+    Returns:
+        作成したエントリ数（非公開・削除済みの場合は0）
+    """
+    post = FeedPost.objects.filter(pk=post_id).first()
+    with transaction.atomic():
+        FeedTimelineEntry.objects.filter(post_id=post_id).delete()
+        if post is None or not is_timeline_visible(post):
+            return 0
+        entries = build_entries(post)
+        FeedTimelineEntry.objects.bulk_create(entries)
+    return len(entries)
+
+
+def schedule_sync(post_id):
+    """コミット後にタイムラインを更新（M2M の設定が終わってから展開するため）"""
+    transaction.on_commit(lambda: sync_post(post_id))
+
+
+# ========================================
+# 読み出し
+# ========================================
+
+@dataclass
+class TimelineAudience:
+    """閲覧者が参照するバケット"""
+    tenant_id: str
+    school_ids: Set = field(default_factory=set)
+    grade_ids: Set = field(default_factory=set)
+    include_all: bool = False
+
+    def bucket_filter(self) -> Q:
+        BucketType = FeedTimelineEntry.BucketType
+        if self.include_all:
+            return Q(bucket_type=BucketType.ALL)
+        condition = Q(bucket_type=BucketType.PUBLIC)
+        if self.school_ids:
+            condition |= Q(bucket_type=BucketType.SCHOOL, bucket_key__in=self.school_ids)
+        if self.grade_ids:
+            condition |= Q(bucket_type=BucketType.GRADE, bucket_key__in=self.grade_ids)
+        return condition
+
+
+def resolve_audience(user, tenant_id, school_ids=None, grade_ids=None) -> TimelineAudience:
+    """
+    閲覧者のバケットを決定
+
+    スタッフ・管理者は ALL（校舎・学年の指定があればその校舎・学年の閲覧者と同じ表示）、
+    保護者は子どもの所属校舎・学年、生徒は本人の所属校舎・学年とする。
+    保護者・生徒の校舎・学年の指定は無視する（所属外の投稿を読めないように）
+    """
+    from apps.core.permissions import is_admin_user
+    from apps.students.models import Student
+
+    if is_admin_user(user) or getattr(user, 'user_type', None) in ('TEACHER', 'STAFF', 'ADMIN'):
+        if school_ids or grade_ids:
+            return TimelineAudience(
+                tenant_id=tenant_id,
+                school_ids=set(school_ids or []),
+                grade_ids=set(grade_ids or []),
+            )
+        return TimelineAudience(tenant_id=tenant_id, include_all=True)
+
+    guardian_id = getattr(user, 'cached_guardian_id', None)
+    if guardian_id is None and getattr(user, 'user_type', None) == 'GUARDIAN':
+        guardian = getattr(user, 'guardian_profile', None)
+        guardian_id = guardian.id if guardian else None
+
+    students = Student.objects.filter(tenant_id=tenant_id, deleted_at__isnull=True)
+    if guardian_id:
+        students = students.filter(guardian_id=guardian_id)
+    else:
+        students = students.filter(user_id=user.id)
+
+    audience = TimelineAudience(tenant_id=tenant_id)
+    for school_id, grade_id in students.values_list('primary_school_id', 'grade_id'):
+        if school_id:
+            audience.school_ids.add(school_id)
+        if grade_id:
+            audience.grade_ids.add(grade_id)
+    return audience
+
+
+def encode_cursor(is_pinned: bool, sort_at: datetime, post_id) -> str:
+    raw = f"{int(is_pinned)}|{sort_at.isoformat()}|{post_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """カーソルを (is_pinned, sort_at, post_id) に戻す（不正な場合は ValueError）"""
+    try:
+        pinned, sort_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return pinned == '1', datetime.fromisoformat(sort_at), post_id
+    except Exception as e:
+        raise ValueError('不正なカーソルです') from e
+
+
+@dataclass
+class TimelinePage:
+    """タイムラインの1ページ"""
+    posts: List[FeedPost]
+    next_cursor: Optional[str]
+    liked_post_ids: Set = field(default_factory=set)
+    bookmarked_post_ids: Set = field(default_factory=set)
+
+
+class FeedTimelineService:
+    """フィードタイムラインの読み出し"""
+
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 50
+
+    @classmethod
+    def get_page(cls, audience: TimelineAudience, user=None, cursor: Optional[str] = None,
+                 limit: int = DEFAULT_LIMIT) -> TimelinePage:
+        limit = max(1, min(limit, cls.MAX_LIMIT))
+        now = timezone.now()
+        if not audience.tenant_id:
+            # テナント未確定のまま全テナントを読み出さない
+            return TimelinePage(posts=[], next_cursor=None)
+
+        entries = FeedTimelineEntry.objects.filter(
+            audience.bucket_filter(), tenant_id=audience.tenant_id,
+        ).filter(
+            Q(publish_start_at__isnull=True) | Q(publish_start_at__lte=now),
+            Q(publish_end_at__isnull=True) | Q(publish_end_at__gte=now),
+        )
+        if cursor:
+            is_pinned, sort_at, post_id = decode_cursor(cursor)
+            after = Q(is_pinned=is_pinned, sort_at=sort_at, post_id__lt=post_id) | Q(
+                is_pinned=is_pinned, sort_at__lt=sort_at
+            )
+            if is_pinned:
+                after |= Q(is_pinned=False)
+            entries = entries.filter(after)
+
+        # 複数バケットに載っている投稿は1件にまとめる
+        rows = list(
+            entries.values_list('is_pinned', 'sort_at', 'post_id')
+            .order_by('-is_pinned', '-sort_at', '-post_id')
+            .distinct()[:limit + 1]
+        )
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        post_ids = [post_id for _, _, post_id in rows]
+
+        posts_by_id: Dict = FeedPost.objects.filter(id__in=post_ids).select_related(
+            'author', 'school', 'approved_by'
+        ).prefetch_related('media', 'target_brands', 'target_schools').in_bulk()
+        posts = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+
+        page = TimelinePage(
+            posts=posts,
+            next_cursor=encode_cursor(*rows[-1]) if has_next else None,
+        )
+        if user is not None and user.is_authenticated and post_ids:
+            page.liked_post_ids = set(
+                FeedLike.objects.filter(user=user, post_id__in=post_ids).values_list('post_id', flat=True)
+            )
+            page.bookmarked_post_ids = set(
+                FeedBookmark.objects.filter(user=user, post_id__in=post_ids).values_list('post_id', flat=True)
+            )
+        return page
+
+    @staticmethod
+    def rebuild(tenant_id=None, batch_size: int = 500) -> int:
+        """
+        タイムラインを投稿から再構築
+
+        Returns:
+            対象にした投稿数
+        """
+        posts = FeedPost.objects.all()
+        entries = FeedTimelineEntry.objects.all()
+        if tenant_id:
+            posts = posts.filter(tenant_id=tenant_id)
+            entries = entries.filter(tenant_id=tenant_id)
+
+        count = 0
+        with transaction.atomic():
+            entries.delete()
+            visible = posts.filter(
+                is_deleted=False,
+                is_published=True,
+                approval_status=FeedPost.ApprovalStatus.APPROVED,
+            ).prefetch_related('target_schools', 'target_grades')
+            batch = []
+            for post in visible.iterator(chunk_size=batch_size):
+                batch.extend(build_entries(post))
+                count += 1
+                if len(batch) >= batch_size:
+                    FeedTimelineEntry.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                FeedTimelineEntry.objects.bulk_create(batch)
+        return count
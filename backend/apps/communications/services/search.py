@@ -0,0 +1,326 @@
+"""
+Search Service
+メッセージ・フィード投稿・対応履歴・チャットログの全文検索
+
+PostgreSQL の全文検索は日本語の分かち書きに対応していないため、
+本文をバイグラム（2文字区切り）に分解したトークン列を 'simple' 設定で
+tsvector 化して search_vector に保存する。
+検索語も同じ方法で分解してフレーズ検索することで、部分一致と同等の結果を
+GINインデックス経由で取得する。
+1文字の検索語はバイグラムに含まれない位置（語中・語末）があるため icontains で絞り込む。
+"""
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+
+from apps.communications.models import ChatLog, ContactLog, FeedPost, Message
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'simple'
+
+# 英数字の連続はそのまま1トークン、それ以外（日本語等）はバイグラムに分解
+_WORD_PATTERN = re.compile(r'[0-9a-z_]+|[^\s0-9a-z_\W]+')
+_ASCII_WORD = re.compile(r'^[0-9a-z_]+$')
+
+# 検索対象フィールド（フィールド名, 重み）
+SEARCH_FIELDS = {
+    Message: (('content', 'A'),),
+    FeedPost: (('title', 'A'), ('content', 'B')),
+    ContactLog: (('subject', 'A'), ('content', 'B'), ('follow_up_notes', 'C')),
+    ChatLog: (('content', 'A'), ('guardian_name', 'B'), ('school_name', 'C')),
+}
+
+SNIPPET_LENGTH = 80
+
+
+def normalize(text: str) -> str:
+    """全角/半角・大文字/小文字を揃える"""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    検索用トークンに分解
+
+    例: "東京都 English" -> ["東京", "京都", "english"]
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall(normalize(text)):
+        if _ASCII_WORD.match(word) or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def is_search_enabled() -> bool:
+    """全文検索はPostgreSQLのみ対応"""
+    return connection.vendor == 'postgresql'
+
+
+def build_search_vector(instance):
+    """インスタンスの search_vector に代入する式を生成"""
+    vector = None
+    for field_name, weight in SEARCH_FIELDS[type(instance)]:
+        tokens = tokenize(getattr(instance, field_name, '') or '')
+        if not tokens:
+            continue
+        part = SearchVector(Value(' '.join(tokens)), config=SEARCH_CONFIG, weight=weight)
+        vector = part if vector is None else vector + part
+    if vector is None:
+        vector = SearchVector(Value(''), config=SEARCH_CONFIG)
+    return vector
+
+
+def update_search_vector(instance):
+    """保存前に search_vector を設定（PostgreSQL以外では何もしない）"""
+    if type(instance) in SEARCH_FIELDS and is_search_enabled():
+        instance.search_vector = build_search_vector(instance)
+
+
+def build_search_query(q: str) -> Optional[SearchQuery]:
+    """
+    検索語からクエリを生成
+
+    空白区切りの各語はバイグラムのフレーズ検索（＝部分一致）とし、語同士はAND。
+    1文字だけの語は語中・語末の文字がバイグラムに一致しないため、ここでは扱わず
+    single_char_terms() の部分一致で絞り込む
+    """
+    query = None
+    for term in normalize(q).split():
+        tokens = tokenize(term)
+        if not tokens or _is_single_char(tokens):
+            continue
+        part = SearchQuery(' '.join(tokens), config=SEARCH_CONFIG, search_type='phrase')
+        query = part if query is None else query & part
+    return query
+
+
+def single_char_terms(q: str) -> List[str]:
+    """1文字だけの検索語（icontains で絞り込む）"""
+    return [
+        tokens[0] for tokens in (tokenize(term) for term in normalize(q).split())
+        if _is_single_char(tokens)
+    ]
+
+
+def _is_single_char(tokens: List[str]) -> bool:
+    return len(tokens) == 1 and len(tokens[0]) == 1
+
+
+def contains_filter(model, term: str) -> Q:
+    """検索対象フィールドのいずれかに term を含む"""
+    condition = Q()
+    for field_name, _weight in SEARCH_FIELDS[model]:
+        condition |= Q(**{f'{field_name}__icontains': term})
+    return condition
+
+
+def build_snippet(text: str, q: str, length: int = SNIPPET_LENGTH) -> Tuple[str, List[List[int]]]:
+    """
+    ハイライト用のスニペットを生成
+
+    Returns:
+        (スニペット文字列, スニペット内のハイライト位置 [[start, end], ...])
+    """
+    text = text or ''
+    normalized_text = normalize(text)
+    terms = [t for t in normalize(q).split() if t]
+
+    # NFKCで文字数が変わる場合は位置がずれるため、位置計算は正規化後の長さが同じ場合のみ
+    if len(normalized_text) != len(text):
+        normalized_text = text.lower()
+
+    first = min(
+        (pos for pos in (normalized_text.find(t) for t in terms) if pos >= 0),
+        default=0,
+    )
+    start = max(0, first - length // 4)
+    end = min(len(text), start + length)
+    snippet = text[start:end]
+    window = normalized_text[start:end]
+
+    highlights = []
+    for term in terms:
+        pos = window.find(term)
+        while pos >= 0:
+            highlights.append([pos, pos + len(term)])
+            pos = window.find(term, pos + len(term))
+    highlights.sort()
+
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(text) else ''
+    if prefix:
+        highlights = [[s + 1, e + 1] for s, e in highlights]
+    return f'{prefix}{snippet}{suffix}', highlights
+
+
+@dataclass
+class SearchFilters:
+    """検索条件（テナントは必須）"""
+    tenant_id: str
+    channel_id: Optional[str] = None
+    school_id: Optional[str] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+
+
+class SearchService:
+    """横断検索サービス"""
+
+    TYPES = ('message', 'feed_post', 'contact_log', 'chat_log')
+    # 並び順・日付絞り込みに使う日時フィールド
+    DATE_FIELDS = {'chat_log': 'timestamp'}
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    @classmethod
+    def search(cls, q: str, filters: SearchFilters, types=None, limit: int = DEFAULT_LIMIT) -> Dict:
+        """
+        横断検索
+
+        Returns:
+            {'message': [...], 'feed_post': [...], ...}
+        """
+        query = build_search_query(q)
+        short_terms = single_char_terms(q)
+        types = [t for t in (types or cls.TYPES) if t in cls.TYPES]
+        limit = max(1, min(limit, cls.MAX_LIMIT))
+
+        results = {t: [] for t in types}
+        if (query is None and not short_terms) or not filters.tenant_id or not is_search_enabled():
+            return results
+
+        for search_type in types:
+            date_field = cls.DATE_FIELDS.get(search_type, 'created_at')
+            queryset = getattr(cls, f'_{search_type}_queryset')(filters)
+            queryset = cls._apply_common(queryset, filters, date_field)
+            for term in short_terms:
+                queryset = queryset.filter(contains_filter(queryset.model, term))
+            if query is not None:
+                queryset = queryset.filter(search_vector=query).annotate(
+                    rank=SearchRank(F('search_vector'), query)
+                )
+            else:
+                queryset = queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+            queryset = queryset.order_by('-rank', f'-{date_field}')
+            serialize = getattr(cls, f'_serialize_{search_type}')
+            results[search_type] = [serialize(obj, q) for obj in queryset[:limit]]
+        return results
+
+    # ----------------------------------------
+    # Querysets
+    # ----------------------------------------
+
+    @staticmethod
+    def _apply_common(queryset, filters: SearchFilters, date_field):
+        queryset = queryset.filter(tenant_id=filters.tenant_id)
+        if filters.date_from:
+            queryset = queryset.filter(**{f'{date_field}__date__gte': filters.date_from})
+        if filters.date_to:
+            queryset = queryset.filter(**{f'{date_field}__date__lte': filters.date_to})
+        return queryset
+
+    @staticmethod
+    def _message_queryset(filters):
+        queryset = Message.objects.filter(is_deleted=False).select_related(
+            'channel', 'sender', 'sender_guardian'
+        )
+        if filters.channel_id:
+            queryset = queryset.filter(channel_id=filters.channel_id)
+        if filters.school_id:
+            queryset = queryset.filter(channel__school_id=filters.school_id)
+        return queryset
+
+    @staticmethod
+    def _feed_post_queryset(filters):
+        queryset = FeedPost.objects.filter(is_deleted=False).select_related('author', 'school')
+        if filters.school_id:
+            queryset = queryset.filter(school_id=filters.school_id)
+        return queryset
+
+    @staticmethod
+    def _contact_log_queryset(filters):
+        queryset = ContactLog.objects.select_related('student', 'guardian', 'school')
+        if filters.channel_id:
+            queryset = queryset.filter(related_channel_id=filters.channel_id)
+        if filters.school_id:
+            queryset = queryset.filter(school_id=filters.school_id)
+        return queryset
+
+    @staticmethod
+    def _chat_log_queryset(filters):
+        queryset = ChatLog.objects.all()
+        if filters.channel_id:
+            queryset = queryset.filter(message__channel_id=filters.channel_id)
+        if filters.school_id:
+            queryset = queryset.filter(school_id=filters.school_id)
+        return queryset
+
+    # ----------------------------------------
+    # Serializers
+    # ----------------------------------------
+
+    @staticmethod
+    def _serialize_message(obj, q):
+        snippet, highlights = build_snippet(obj.content, q)
+        return {
+            'id': str(obj.id),
+            'channel_id': str(obj.channel_id),
+            'channel_name': obj.channel.name,
+            'sender_name': obj.sender_name,
+            'snippet': snippet,
+            'highlights': highlights,
+            'rank': obj.rank,
+            'created_at': obj.created_at.isoformat(),
+        }
+
+    @staticmethod
+    def _serialize_feed_post(obj, q):
+        snippet, highlights = build_snippet(obj.content, q)
+        return {
+            'id': str(obj.id),
+            'title': obj.title,
+            'school_name': obj.school.school_name if obj.school else None,
+            'author_name': obj.author.full_name if obj.author else None,
+            'snippet': snippet,
+            'highlights': highlights,
+            'rank': obj.rank,
+            'created_at': obj.created_at.isoformat(),
+        }
+
+    @staticmethod
+    def _serialize_contact_log(obj, q):
+        snippet, highlights = build_snippet(obj.content, q)
+        return {
+            'id': str(obj.id),
+            'subject': obj.subject,
+            'student_name': obj.student.full_name if obj.student else None,
+            'guardian_name': obj.guardian.full_name if obj.guardian else None,
+            'snippet': snippet,
+            'highlights': highlights,
+            'rank': obj.rank,
+            'created_at': obj.created_at.isoformat(),
+        }
+
+    @staticmethod
+    def _serialize_chat_log(obj, q):
+        snippet, highlights = build_snippet(obj.content, q)
+        return {
+            'id': str(obj.id),
+            'message_id': str(obj.message_id) if obj.message_id else None,
+            'guardian_name': obj.guardian_name,
+            'school_name': obj.school_name,
+            'brand_name': obj.brand_name,
+            'snippet': snippet,
+            'highlights': highlights,
+            'rank': obj.rank,
+            'created_at': obj.timestamp.isoformat(),
+        }
@@ -0,0 +1,60 @@
+"""
+Communications Signals
+全文検索用 search_vector の更新、ボットFAQマッチャーの再構築、
+フィードタイムラインの展開
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import BotFAQ, ChatLog, ContactLog, FeedPost, Message
+from .services.faq_matcher import invalidate_faq_matcher
+from .services.feed_timeline import TIMELINE_FIELDS, schedule_sync
+from .services.search import (
+    SEARCH_FIELDS, build_search_vector, is_search_enabled, update_search_vector,
+)
+
+
+@receiver(pre_save, sender=Message)
+@receiver(pre_save, sender=FeedPost)
+@receiver(pre_save, sender=ContactLog)
+@receiver(pre_save, sender=ChatLog)
+def set_search_vector(sender, instance, update_fields=None, **kwargs):
+    """通常の保存では同じINSERT/UPDATE文で search_vector を書き込む"""
+    if update_fields is None:
+        update_search_vector(instance)
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_save, sender=FeedPost)
+@receiver(post_save, sender=ContactLog)
+@receiver(post_save, sender=ChatLog)
+def refresh_search_vector(sender, instance, update_fields=None, **kwargs):
+    """update_fields 指定で本文が更新された場合は search_vector を追加で更新"""
+    if update_fields is None or not is_search_enabled():
+        return
+    text_fields = {name for name, _ in SEARCH_FIELDS[sender]}
+    if text_fields & set(update_fields):
+        sender.objects.filter(pk=instance.pk).update(search_vector=build_search_vector(instance))
+
+
+@receiver(post_save, sender=BotFAQ)
+@receiver(post_delete, sender=BotFAQ)
+def invalidate_bot_faq_matcher(sender, instance, **kwargs):
+    """FAQの変更時にマッチャーを破棄（次回応答時に再構築）"""
+    invalidate_faq_matcher(instance.bot_config_id)
+
+
+@receiver(post_save, sender=FeedPost)
+def sync_feed_timeline(sender, instance, update_fields=None, **kwargs):
+    """承認・公開状態や公開範囲の変更時にタイムラインを再展開"""
+    if update_fields is not None and not (TIMELINE_FIELDS & set(update_fields)):
+        return
+    schedule_sync(instance.pk)
+
+
+@receiver(m2m_changed, sender=FeedPost.target_schools.through)
+@receiver(m2m_changed, sender=FeedPost.target_grades.through)
+def sync_feed_timeline_targets(sender, instance, action, **kwargs):
+    """対象校舎・学年の変更時にタイムラインを再展開"""
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, FeedPost):
+        schedule_sync(instance.pk)
@@ -0,0 +1,195 @@
+"""
+Chat Write Buffer Tests - チャット書き込みバッファ・既読人数のテスト
+"""
+import asyncio
+import os
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+
+from apps.communications.services.chat_buffer import ChatWriteBuffer
+
+requires_postgres = pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.mark.unit
+class TestChatWriteBuffer:
+    """バッファへの積み込み・フラッシュのテスト（DB書き込みはモック）"""
+
+    def test_enqueue_message_assigns_id_and_created_at(self):
+        async def enqueue():
+            buffer = ChatWriteBuffer(flush_interval=60)
+            message = buffer.enqueue_message(
+                tenant_id=uuid.uuid4(), channel_id=uuid.uuid4(), sender=None, content='こんにちは',
+            )
+            return buffer, message
+
+        buffer, message = _run(enqueue())
+        assert message.id is not None
+        assert message.created_at is not None
+        assert buffer.pending_count == 1
+
+    def test_reads_collapse_per_member(self):
+        async def enqueue():
+            buffer = ChatWriteBuffer(flush_interval=60)
+            channel_id, user_id = uuid.uuid4(), uuid.uuid4()
+            for _ in range(3):
+                buffer.enqueue_read(channel_id=channel_id, user_id=user_id, message_id=uuid.uuid4())
+            last = uuid.uuid4()
+            buffer.enqueue_read(channel_id=channel_id, user_id=user_id, message_id=last)
+            return buffer, channel_id, user_id, last
+
+        buffer, channel_id, user_id, last = _run(enqueue())
+        assert buffer.pending_count == 1
+        assert buffer._reads == {(str(channel_id), str(user_id)): str(last)}
+
+    @pytest.mark.parametrize('message_id', ['not-a-uuid', None, 123])
+    def test_invalid_read_is_ignored(self, message_id):
+        buffer = ChatWriteBuffer(flush_interval=60)
+        with mock.patch.object(buffer, '_schedule_flush') as schedule:
+            buffer.enqueue_read(channel_id=uuid.uuid4(), user_id=uuid.uuid4(), message_id=message_id)
+        assert buffer.pending_count == 0
+        schedule.assert_not_called()
+
+    def test_flush_writes_pending_and_clears(self):
+        async def enqueue_and_flush():
+            buffer = ChatWriteBuffer(flush_interval=60)
+            buffer.enqueue_message(tenant_id=uuid.uuid4(), channel_id=uuid.uuid4(), sender=None, content='a')
+            buffer.enqueue_read(channel_id=uuid.uuid4(), user_id=uuid.uuid4(), message_id=uuid.uuid4())
+            with mock.patch.object(buffer, '_write') as write:
+                await buffer.flush()
+            return buffer, write
+
+        buffer, write = _run(enqueue_and_flush())
+        write.assert_called_once()
+        messages, reads = write.call_args.args
+        assert len(messages) == 1 and len(reads) == 1
+        assert buffer.pending_count == 0
+
+    def test_flush_without_pending_is_noop(self):
+        buffer = ChatWriteBuffer(flush_interval=60)
+        with mock.patch.object(buffer, '_write') as write:
+            _run(buffer.flush())
+        write.assert_not_called()
+
+    def test_scheduled_flush_runs_after_interval(self):
+        async def enqueue_and_wait():
+            buffer = ChatWriteBuffer(flush_interval=0.01)
+            with mock.patch.object(buffer, '_write') as write:
+                buffer.enqueue_message(tenant_id=uuid.uuid4(), channel_id=uuid.uuid4(), sender=None, content='a')
+                await asyncio.sleep(0.1)
+            return buffer, write
+
+        buffer, write = _run(enqueue_and_wait())
+        write.assert_called_once()
+        assert buffer.pending_count == 0
+
+    def test_disconnect_flushes_buffer(self):
+        from apps.communications.consumers import ChatConsumer
+
+        buffer = mock.Mock()
+        buffer.flush = mock.AsyncMock()
+        with mock.patch('apps.communications.consumers.get_chat_write_buffer', return_value=buffer):
+            _run(ChatConsumer().disconnect(1000))
+        buffer.flush.assert_awaited_once()
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+@requires_postgres
+class TestChatWriteBufferDatabase:
+    """フラッシュ時のDB書き込み・既読人数のテスト"""
+
+    @pytest.fixture
+    def channel(self):
+        from apps.communications.models import Channel
+
+        return Channel.objects.create(tenant_id=uuid.uuid4(), name='テスト')
+
+    @pytest.fixture
+    def users(self):
+        from apps.users.models import User
+
+        return [
+            User.objects.create_user(email=f'chat{i}@example.com', password='pass', last_name='山田', first_name='太郎')
+            for i in range(3)
+        ]
+
+    def test_flush_saves_enqueued_created_at(self, channel, users):
+        from apps.communications.models import Message
+
+        buffer = ChatWriteBuffer(flush_interval=60)
+        created_at = timezone.now() - timedelta(seconds=5)
+        with mock.patch('apps.communications.services.chat_buffer.timezone.now', return_value=created_at), \
+                mock.patch.object(buffer, '_schedule_flush'):
+            message = buffer.enqueue_message(
+                tenant_id=channel.tenant_id, channel_id=channel.id, sender=users[0], content='保存',
+            )
+        buffer._write(buffer._messages, {})
+
+        saved = Message.objects.get(id=message.id)
+        assert saved.created_at == created_at
+        assert saved.content == '保存'
+
+    def test_read_watermark_only_advances(self, channel, users):
+        from apps.communications.models import ChannelMember, Message
+
+        member = ChannelMember.objects.create(channel=channel, user=users[1])
+        now = timezone.now()
+        older = Message.objects.create(
+            tenant_id=channel.tenant_id, channel=channel, sender=users[0], content='1', created_at=now - timedelta(minutes=1),
+        )
+        newer = Message.objects.create(tenant_id=channel.tenant_id, channel=channel, sender=users[0], content='2', created_at=now)
+
+        buffer = ChatWriteBuffer(flush_interval=60)
+        buffer._write([], {(str(channel.id), str(users[1].id)): str(newer.id)})
+        buffer._write([], {(str(channel.id), str(users[1].id)): str(older.id)})
+
+        member.refresh_from_db()
+        assert member.last_read_message_id == newer.id
+        assert member.last_read_at == newer.created_at
+
+    def test_read_from_other_channel_is_ignored(self, channel, users):
+        from apps.communications.models import Channel, ChannelMember, Message
+
+        other = Channel.objects.create(tenant_id=channel.tenant_id, name='別チャンネル')
+        member = ChannelMember.objects.create(channel=channel, user=users[1])
+        foreign = Message.objects.create(tenant_id=channel.tenant_id, channel=other, sender=users[0], content='別')
+
+        ChatWriteBuffer(flush_interval=60)._write([], {(str(channel.id), str(users[1].id)): str(foreign.id)})
+
+        member.refresh_from_db()
+        assert member.last_read_message_id is None
+        assert member.last_read_at is None
+
+    def test_read_counts_match_per_message_count(self, channel, users):
+        from apps.communications.models import ChannelMember, Message
+        from apps.communications.serializers import MessageSerializer
+
+        now = timezone.now()
+        messages = [
+            Message.objects.create(
+                tenant_id=channel.tenant_id, channel=channel, sender=sender, content=str(i),
+                created_at=now + timedelta(minutes=i),
+            )
+            for i, sender in enumerate([users[0], users[1], None])
+        ]
+        ChannelMember.objects.create(channel=channel, user=users[0], last_read_at=messages[2].created_at)
+        ChannelMember.objects.create(channel=channel, user=users[1], last_read_at=messages[0].created_at)
+        ChannelMember.objects.create(channel=channel, user=users[2])
+
+        annotated = MessageSerializer.with_read_counts(Message.objects.filter(channel=channel)).order_by('created_at')
+        serializer = MessageSerializer()
+        for message, plain in zip(annotated, Message.objects.filter(channel=channel).order_by('created_at')):
+            assert message.read_count == serializer.get_read_count(plain)
+        assert [m.read_count for m in annotated] == [1, 1, 1]
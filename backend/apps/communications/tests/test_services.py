@@ -0,0 +1,291 @@
+"""
+Communications Services Tests - コミュニケーションサービスのユニットテスト
+"""
+import pytest
+
+
+class TestSearchTokenizer:
+    """全文検索トークナイザーのテスト"""
+
+    def test_japanese_bigrams(self):
+        """日本語はバイグラムに分解される"""
+        from apps.communications.services.search import tokenize
+
+        assert tokenize('振替授業') == ['振替', '替授', '授業']
+
+    def test_ascii_words_kept(self):
+        """英数字は単語単位・小文字で保持される"""
+        from apps.communications.services.search import tokenize
+
+        assert tokenize('ABC教室 Python3') == ['abc', '教室', 'python3']
+
+    def test_fullwidth_normalized(self):
+        """全角英数字は半角に正規化される"""
+        from apps.communications.services.search import tokenize
+
+        assert tokenize('ＰＹＴＨＯＮ') == ['python']
+
+    def test_single_character(self):
+        """1文字の語はそのまま1トークン"""
+        from apps.communications.services.search import tokenize
+
+        assert tokenize('塾') == ['塾']
+
+
+class TestSearchQuery:
+    """検索クエリ・1文字の語の扱いのテスト"""
+
+    def test_single_char_terms_use_contains(self):
+        """1文字の語はフレーズ検索に含めず icontains で絞り込む"""
+        from apps.communications.services.search import build_search_query, single_char_terms
+
+        assert build_search_query('塾') is None
+        assert single_char_terms('塾 振替 Ａ') == ['塾', 'a']
+
+    def test_contains_filter_covers_search_fields(self):
+        """検索対象フィールドのいずれかに一致"""
+        from apps.communications.models import ContactLog
+        from apps.communications.services.search import contains_filter
+
+        condition = contains_filter(ContactLog, '塾')
+        assert condition.connector == 'OR'
+        assert sorted(child[0] for child in condition.children) == [
+            'content__icontains', 'follow_up_notes__icontains', 'subject__icontains',
+        ]
+
+    def test_tenant_required(self):
+        """テナント未指定では検索しない"""
+        from unittest import mock
+        from apps.communications.services.search import SearchFilters, SearchService
+
+        with mock.patch.object(SearchService, '_message_queryset') as queryset:
+            results = SearchService.search('振替', SearchFilters(tenant_id=None), types=['message'])
+        assert results == {'message': []}
+        queryset.assert_not_called()
+
+
+class TestSearchParams:
+    """検索パラメータのバリデーションのテスト"""
+
+    def _validate(self, **params):
+        from apps.communications.serializers import SearchParamsSerializer
+
+        serializer = SearchParamsSerializer(data={'q': '振替', **params})
+        return serializer.is_valid(), serializer
+
+    def test_valid(self):
+        valid, serializer = self._validate(
+            types='message, contact_log', channel_id='11111111-1111-1111-1111-111111111111',
+            date_from='2025-01-01', date_to='2025-03-31', limit='10',
+        )
+        assert valid
+        assert serializer.validated_data['types'] == ['message', 'contact_log']
+        assert serializer.validated_data['limit'] == 10
+
+    @pytest.mark.parametrize('params, field', [
+        ({'date_from': '2025-13-01'}, 'date_from'),
+        ({'channel_id': 'not-a-uuid'}, 'channel_id'),
+        ({'school_id': '123'}, 'school_id'),
+        ({'types': 'message,unknown'}, 'types'),
+        ({'limit': 'abc'}, 'limit'),
+        ({'date_from': '2025-04-01', 'date_to': '2025-03-01'}, 'date_to'),
+    ])
+    def test_invalid(self, params, field):
+        """不正な日付・ID・種別はエラー（ビューは400を返す）"""
+        valid, serializer = self._validate(**params)
+        assert not valid
+        assert field in serializer.errors
+
+    def test_query_required(self):
+        from apps.communications.serializers import SearchParamsSerializer
+
+        serializer = SearchParamsSerializer(data={'q': '  '})
+        assert not serializer.is_valid()
+        assert 'q' in serializer.errors
+
+
+class TestSearchSnippet:
+    """検索スニペットのテスト"""
+
+    def test_highlight_positions(self):
+        """ハイライト位置がスニペット内の位置で返る"""
+        from apps.communications.services.search import build_snippet
+
+        snippet, highlights = build_snippet('明日の振替授業について', '振替')
+        assert snippet == '明日の振替授業について'
+        assert highlights == [[3, 5]]
+
+    def test_long_text_is_trimmed(self):
+        """長文は一致箇所の周辺のみ切り出される"""
+        from apps.communications.services.search import build_snippet
+
+        text = 'あ' * 200 + '振替' + 'い' * 200
+        snippet, highlights = build_snippet(text, '振替', length=40)
+        assert snippet.startswith('…')
+        assert snippet.endswith('…')
+        start, end = highlights[0]
+        assert snippet[start:end] == '振替'
+
+
+class TestAhoCorasick:
+    """Aho-Corasick オートマトンのテスト"""
+
+    def test_overlapping_keywords(self):
+        """重なり合うキーワードもすべて検出される"""
+        from apps.communications.services.faq_matcher import AhoCorasick
+
+        automaton = AhoCorasick()
+        for keyword in ['受験', '大学受験', '学受']:
+            automaton.add(keyword, keyword)
+        automaton.build()
+
+        assert sorted(automaton.iter_matches('大学受験対策')) == ['受験', '大学受験', '学受']
+
+    def test_no_match(self):
+        """一致しない場合は何も返さない"""
+        from apps.communications.services.faq_matcher import AhoCorasick
+
+        automaton = AhoCorasick()
+        automaton.add('振替', 'x')
+        automaton.build()
+
+        assert list(automaton.iter_matches('こんにちは')) == []
+
+
+class TestFAQMatcher:
+    """FAQマッチャーのテスト"""
+
+    @pytest.fixture
+    def matcher(self):
+        from types import SimpleNamespace
+        from apps.communications.services.faq_matcher import FAQMatcher
+
+        faqs = [
+            SimpleNamespace(id='trial', question='体験授業を申し込みたい', keywords=['体験', '見学'], sort_order=1),
+            SimpleNamespace(id='fee', question='料金・月謝について', keywords=['料金', '月謝'], sort_order=2),
+            SimpleNamespace(id='parking', question='駐車場について', keywords=[], sort_order=3),
+        ]
+        return FAQMatcher(faqs)
+
+    def test_keyword_match(self, matcher):
+        """キーワード一致でマッチする"""
+        match = matcher.match('月謝はいくらですか')
+        assert match.faq_id == 'fee'
+        assert match.matched_keywords == ['月謝']
+
+    def test_question_similarity_without_spaces(self, matcher):
+        """空白のない日本語でも質問文との類似度でマッチする"""
+        match = matcher.match('駐車場について教えてください')
+        assert match.faq_id == 'parking'
+        assert match.question_similarity > 0.5
+
+    def test_below_threshold(self, matcher):
+        """関係のないメッセージはマッチしない"""
+        assert matcher.match('こんにちは') is None
+
+    def test_fullwidth_keyword(self, matcher):
+        """全角・半角の違いを吸収する"""
+        from types import SimpleNamespace
+        from apps.communications.services.faq_matcher import FAQMatcher
+
+        matcher = FAQMatcher([
+            SimpleNamespace(id='it', question='IT講座', keywords=['Python'], sort_order=1),
+        ])
+        assert matcher.match('ＰＹＴＨＯＮを習いたい').faq_id == 'it'
+
+
+class TestFeedTimelineCursor:
+    """フィードタイムラインのカーソルのテスト"""
+
+    def test_roundtrip(self):
+        """カーソルは (固定表示, 日時, 投稿ID) に復元される"""
+        import uuid
+        from datetime import datetime, timezone
+        from apps.communications.services.feed_timeline import decode_cursor, encode_cursor
+
+        post_id = uuid.uuid4()
+        sort_at = datetime(2025, 4, 1, 9, 30, tzinfo=timezone.utc)
+        assert decode_cursor(encode_cursor(True, sort_at, post_id)) == (True, sort_at, str(post_id))
+
+    def test_invalid_cursor(self):
+        """不正なカーソルは ValueError"""
+        from apps.communications.services.feed_timeline import decode_cursor
+
+        with pytest.raises(ValueError):
+            decode_cursor('invalid')
+
+
+class TestFeedTimelineBuckets:
+    """フィードタイムラインのバケット展開・閲覧者のバケットのテスト"""
+
+    SCHOOL_ID = '11111111-1111-1111-1111-111111111111'
+    GRADE_ID = '22222222-2222-2222-2222-222222222222'
+
+    def _buckets(self, visibility):
+        import uuid
+        from types import SimpleNamespace
+        from unittest import mock
+        from apps.communications.models import FeedPost
+        from apps.communications.services.feed_timeline import build_entries
+
+        post = FeedPost(
+            id=uuid.uuid4(), tenant_id=uuid.uuid4(), visibility=visibility, school_id=uuid.UUID(self.SCHOOL_ID),
+        )
+        related = {
+            'target_schools': SimpleNamespace(all=lambda: [SimpleNamespace(id=uuid.UUID(self.SCHOOL_ID))]),
+            'target_grades': SimpleNamespace(all=lambda: [SimpleNamespace(id=uuid.UUID(self.GRADE_ID))]),
+        }
+        with mock.patch.object(FeedPost, 'target_schools', related['target_schools']), \
+                mock.patch.object(FeedPost, 'target_grades', related['target_grades']):
+            entries = build_entries(post)
+        return sorted((e.bucket_type, str(e.bucket_key) if e.bucket_key else None) for e in entries)
+
+    def test_grade_post_only_in_grade_buckets(self):
+        """学年限定の投稿は校舎のバケットに載らない"""
+        assert self._buckets('GRADE') == [('all', None), ('grade', self.GRADE_ID)]
+
+    def test_school_post_only_in_school_buckets(self):
+        assert self._buckets('SCHOOL') == [('all', None), ('school', self.SCHOOL_ID)]
+
+    def test_public_and_staff_posts(self):
+        assert self._buckets('PUBLIC') == [('all', None), ('public', None)]
+        assert self._buckets('STAFF') == [('all', None)]
+
+    def test_guardian_cannot_override_audience(self):
+        """保護者の校舎・学年の指定は無視され、子どもの所属のみ参照する"""
+        from types import SimpleNamespace
+        from unittest import mock
+        from apps.communications.services.feed_timeline import resolve_audience
+
+        user = SimpleNamespace(
+            id=1, is_authenticated=True, user_type='GUARDIAN', role=None, cached_guardian_id='g-1',
+        )
+        with mock.patch('apps.students.models.Student.objects') as students:
+            students.filter.return_value.filter.return_value.values_list.return_value = [(self.SCHOOL_ID, None)]
+            audience = resolve_audience(user, 't-1', school_ids=['other-school'], grade_ids=['other-grade'])
+
+        assert audience.school_ids == {self.SCHOOL_ID}
+        assert audience.grade_ids == set()
+        assert not audience.include_all
+        students.filter.assert_called_once_with(tenant_id='t-1', deleted_at__isnull=True)
+
+    def test_staff_can_preview_school(self):
+        """スタッフは校舎・学年を指定してその閲覧者の表示を確認できる"""
+        from types import SimpleNamespace
+        from apps.communications.services.feed_timeline import resolve_audience
+
+        user = SimpleNamespace(id=1, is_authenticated=True, user_type='STAFF', role=None)
+        assert resolve_audience(user, 't-1').include_all
+        audience = resolve_audience(user, 't-1', school_ids=[self.SCHOOL_ID])
+        assert audience.school_ids == {self.SCHOOL_ID}
+        assert not audience.include_all
+
+    def test_tenant_required(self):
+        """テナント未確定では読み出さない"""
+        from unittest import mock
+        from apps.communications.services.feed_timeline import FeedTimelineService, TimelineAudience
+
+        with mock.patch('apps.communications.services.feed_timeline.FeedTimelineEntry.objects') as entries:
+            page = FeedTimelineService.get_page(TimelineAudience(tenant_id=None, include_all=True))
+        assert page.posts == [] and page.next_cursor is None
+        entries.filter.assert_not_called()
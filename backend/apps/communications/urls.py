@@ -10,6 +10,7 @@ from .views import (
     FeedPostViewSet, FeedCommentViewSet, FeedBookmarkViewSet,
     ChatLogViewSet,
     MessageMemoViewSet, TelMemoViewSet,
+    SearchView,
 )
 
 app_name = 'communications'
@@ -31,5 +32,6 @@ router.register(r'message-memos', MessageMemoViewSet, basename='message-memo')
 router.register(r'tel-memos', TelMemoViewSet, basename='tel-memo')
 
 urlpatterns = [
+    path('search/', SearchView.as_view(), name='search'),
     path('', include(router.urls)),
 ]
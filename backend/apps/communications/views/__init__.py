@@ -41,6 +41,9 @@ from .memo import (
     TelMemoViewSet,
 )
 
+# Search
+from .search import SearchView
+
 
 __all__ = [
     # Channel & Message
@@ -65,4 +68,6 @@ __all__ = [
     # Memo
     'MessageMemoViewSet',
     'TelMemoViewSet',
+    # Search
+    'SearchView',
 ]
@@ -8,6 +8,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from apps.core.permissions import IsTenantUser, IsTenantAdmin
+from apps.tenants.services import TenantResolver
 from ..models import Channel, BotConfig, BotFAQ, BotConversation
 from ..serializers import (
     BotConfigSerializer, BotFAQSerializer, BotChatSerializer,
@@ -91,10 +92,8 @@ class BotChatViewSet(viewsets.ViewSet):
         message = serializer.validated_data['message']
         channel_id = serializer.validated_data.get('channel_id')
 
-        # tenant_idを取得（request.tenant_idまたは保護者プロファイルから）
-        tenant_id = getattr(request, 'tenant_id', None)
-        if not tenant_id and hasattr(request.user, 'guardian_profile') and request.user.guardian_profile:
-            tenant_id = request.user.guardian_profile.tenant_id
+        # tenant_idを取得（request.tenant_id・ユーザー・保護者プロファイルの順）
+        tenant_id = TenantResolver.resolve_id(request)
 
         # ボットサービスで応答を生成
         bot_service = BotService(tenant_id=tenant_id)
@@ -10,6 +10,7 @@ from django.db.models import Q, Count
 from django.utils import timezone
 
 from apps.core.permissions import IsTenantUser
+from apps.tenants.services import TenantResolver
 from ..models import Channel, ChannelMember, Message
 from ..serializers import (
     ChannelListSerializer, ChannelDetailSerializer, ChannelCreateSerializer,
@@ -24,10 +25,8 @@ class ChannelViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         from apps.core.permissions import is_admin_user
 
-        # tenant_idを取得（request.tenant_idまたはユーザーの保護者プロファイルから）
-        tenant_id = getattr(self.request, 'tenant_id', None)
-        if not tenant_id and hasattr(self.request.user, 'guardian_profile') and self.request.user.guardian_profile:
-            tenant_id = self.request.user.guardian_profile.tenant_id
+        # tenant_idを取得（request.tenant_id・ユーザー・保護者プロファイルの順）
+        tenant_id = TenantResolver.resolve_id(self.request)
 
         # 管理者は全チャンネルを閲覧可能
         if is_admin_user(self.request.user):
@@ -73,10 +72,8 @@ class ChannelViewSet(viewsets.ModelViewSet):
         return ChannelDetailSerializer
 
     def perform_create(self, serializer):
-        # tenant_idを取得（request.tenant_idまたはユーザーの保護者プロファイルから）
-        tenant_id = getattr(self.request, 'tenant_id', None)
-        if not tenant_id and hasattr(self.request.user, 'guardian_profile') and self.request.user.guardian_profile:
-            tenant_id = self.request.user.guardian_profile.tenant_id
+        # tenant_idを取得（request.tenant_id・ユーザー・保護者プロファイルの順）
+        tenant_id = TenantResolver.resolve_id(self.request)
         serializer.save(tenant_id=tenant_id)
 
     def create(self, request, *args, **kwargs):
@@ -92,9 +89,9 @@ class ChannelViewSet(viewsets.ModelViewSet):
     def messages(self, request, pk=None):
         """チャンネルのメッセージ一覧"""
         channel = self.get_object()
-        messages = channel.messages.filter(is_deleted=False).select_related(
+        messages = MessageSerializer.with_read_counts(channel.messages.filter(is_deleted=False).select_related(
             'sender', 'sender_guardian', 'reply_to'
-        )
+        ))
 
         # ページネーション
         page = self.paginate_queryset(messages)
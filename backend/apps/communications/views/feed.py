@@ -2,6 +2,8 @@
 Feed Views - フィード（投稿・コメント・ブックマーク）管理Views
 FeedPostViewSet, FeedCommentViewSet, FeedBookmarkViewSet
 """
+import uuid
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -10,12 +12,14 @@ from django.db.models import Q
 from django.utils import timezone
 
 from apps.core.permissions import IsTenantUser, IsTenantAdmin
+from apps.tenants.services import TenantResolver
 from ..models import FeedPost, FeedComment, FeedLike, FeedCommentLike, FeedBookmark
 from ..serializers import (
     FeedPostListSerializer, FeedPostDetailSerializer, FeedPostCreateSerializer,
     FeedCommentSerializer, FeedCommentCreateSerializer,
     FeedLikeSerializer, FeedBookmarkSerializer,
 )
+from ..services.feed_timeline import FeedTimelineService, resolve_audience
 
 
 class FeedPostViewSet(viewsets.ModelViewSet):
@@ -137,6 +141,49 @@ class FeedPostViewSet(viewsets.ModelViewSet):
         instance.save(update_fields=['is_deleted', 'deleted_at'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['get'])
+    def timeline(self, request):
+        """
+        ホームタイムライン（バケット展開済みの投稿をカーソルで取得）
+
+        Query params:
+            school_id / grade_id: 表示対象（スタッフ・管理者のみ。複数指定可。
+                保護者・生徒は常に所属の校舎・学年）
+            cursor: 前ページの next_cursor
+            limit: 件数（最大50）
+        """
+        tenant_id = TenantResolver.resolve_id(request)
+        if not tenant_id:
+            return Response({'error': 'テナントを特定できません'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            school_ids = [uuid.UUID(v) for v in request.query_params.getlist('school_id')]
+            grade_ids = [uuid.UUID(v) for v in request.query_params.getlist('grade_id')]
+        except ValueError:
+            return Response({'error': '不正な校舎・学年IDです'}, status=status.HTTP_400_BAD_REQUEST)
+
+        audience = resolve_audience(request.user, tenant_id, school_ids=school_ids, grade_ids=grade_ids)
+        try:
+            limit = int(request.query_params.get('limit', FeedTimelineService.DEFAULT_LIMIT))
+            page = FeedTimelineService.get_page(
+                audience,
+                user=request.user,
+                cursor=request.query_params.get('cursor'),
+                limit=limit,
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = FeedPostListSerializer(page.posts, many=True, context={
+            'request': request,
+            'liked_post_ids': page.liked_post_ids,
+            'bookmarked_post_ids': page.bookmarked_post_ids,
+        })
+        return Response({
+            'results': serializer.data,
+            'next_cursor': page.next_cursor,
+        })
+
     @action(detail=True, methods=['post'])
     def like(self, request, pk=None):
         """いいね"""
@@ -16,6 +16,7 @@ from datetime import datetime
 import re
 
 from apps.core.permissions import IsTenantUser
+from apps.tenants.services import TenantResolver
 from ..models import Channel, Message, ChatLog, MessageReaction
 from ..serializers import MessageSerializer, MessageCreateSerializer
 from ..services import notify_new_message, notify_message_edited, notify_message_deleted, notify_thread_reply, notify_reaction_added, notify_reaction_removed
@@ -35,10 +36,8 @@ class MessageViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsTenantUser]
 
     def get_tenant_id(self):
-        """tenant_idを取得（request.tenant_idまたはユーザーの保護者プロファイルから）"""
-        tenant_id = getattr(self.request, 'tenant_id', None)
-        if not tenant_id and hasattr(self.request.user, 'guardian_profile') and self.request.user.guardian_profile:
-            tenant_id = self.request.user.guardian_profile.tenant_id
+        """tenant_idを取得（request.tenant_id・ユーザー・保護者プロファイルの順）"""
+        tenant_id = TenantResolver.resolve_id(self.request)
         return tenant_id
 
     def get_queryset(self):
@@ -65,7 +64,7 @@ class MessageViewSet(viewsets.ModelViewSet):
             )
 
         # 作成日時の昇順（古いメッセージが先）
-        return queryset.order_by('created_at')
+        return MessageSerializer.with_read_counts(queryset).order_by('created_at')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -193,12 +192,12 @@ class MessageViewSet(viewsets.ModelViewSet):
         parent_message = self.get_object()
 
         # 返信メッセージを取得
-        replies = Message.objects.filter(
+        replies = MessageSerializer.with_read_counts(Message.objects.filter(
             reply_to=parent_message,
             is_deleted=False
         ).select_related(
             'sender', 'sender_guardian'
-        ).order_by('created_at')
+        )).order_by('created_at')
 
         serializer = MessageSerializer(replies, many=True)
 
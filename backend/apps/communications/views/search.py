@@ -0,0 +1,53 @@
+"""
+Search Views - 横断検索Views
+SearchView
+"""
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.core.permissions import IsStaffOrAdmin
+from apps.tenants.services import TenantResolver
+from ..serializers.search import SearchParamsSerializer
+from ..services.search import SearchFilters, SearchService
+
+
+class SearchView(APIView):
+    """
+    メッセージ・フィード投稿・対応履歴・チャットログの横断検索（スタッフ向け）
+
+    GET /api/v1/communications/search/?q=振替&types=message,contact_log
+        &channel_id=&school_id=&date_from=2025-01-01&date_to=2025-03-31&limit=20
+    """
+    permission_classes = [IsAuthenticated, IsStaffOrAdmin]
+
+    def get(self, request):
+        # 空のパラメータ（channel_id= 等）は未指定として扱う
+        params = SearchParamsSerializer(data={k: v for k, v in request.query_params.items() if v.strip()})
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = params.validated_data
+
+        # テナント未確定のまま全テナントを検索しない
+        tenant_id = TenantResolver.resolve_id(request)
+        if not tenant_id:
+            return Response(
+                {'error': 'テナントを特定できません'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filters = SearchFilters(
+            tenant_id=tenant_id,
+            channel_id=data.get('channel_id'),
+            school_id=data.get('school_id'),
+            date_from=data.get('date_from'),
+            date_to=data.get('date_to'),
+        )
+
+        q = data['q']
+        results = SearchService.search(q, filters, types=data.get('types'), limit=data['limit'])
+        return Response({
+            'query': q,
+            'results': results,
+        })
@@ -10,6 +10,7 @@ from django.db import transaction
 from apps.contracts.models import StudentItem, Course, Pack, Product, Contract
 from apps.students.models import Student
 from apps.schools.models import Brand, School
+from apps.tasks.outbox import task_events
 from apps.tenants.models import Tenant
 
 
@@ -47,8 +48,18 @@ class Command(BaseCommand):
             action='store_true',
             help='インポート前に既存データを削除'
         )
+        parser.add_argument(
+            '--skip-tasks',
+            action='store_true',
+            help='入会申請などのタスクを自動作成しない'
+        )
 
     def handle(self, *args, **options):
+        # 取り込み中に発生するタスク作成イベントは終了時にまとめて送信（--skip-tasks なら作成しない）
+        with task_events(suppress=options['skip_tasks']):
+            self.run_import(*args, **options)
+
+    def run_import(self, *args, **options):
         user_csv = options.get('csv')
         contracts_csv = options.get('contracts_csv')
         billing_csv = options.get('billing_csv')
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:24
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（トランザクション外で実行）
+    atomic = False
+
+    dependencies = [
+        ("contracts", "0038_add_is_billed_to_studentitem"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="studentitem",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["student", "billing_month", "is_billed"],
+                name="si_student_month_billed_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="studentitem",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["tenant_id", "billing_month"],
+                name="si_tenant_month_live_idx",
+            ),
+        ),
+    ]
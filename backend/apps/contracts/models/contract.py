@@ -245,6 +245,20 @@ class StudentItem(TenantModel):
         verbose_name = 'T04_生徒商品'
         verbose_name_plural = 'T04_生徒商品'
         ordering = ['-billing_month', 'student']
+        indexes = [
+            # 生徒の請求月ごとの明細・未請求の明細
+            models.Index(
+                fields=['student', 'billing_month', 'is_billed'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='si_student_month_billed_idx',
+            ),
+            # テナントの請求月ごとの明細（請求確定・一覧）
+            models.Index(
+                fields=['tenant_id', 'billing_month'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='si_tenant_month_live_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.product} ({self.billing_month})"
@@ -10,6 +10,7 @@ from django.utils import timezone
 
 from apps.core.csv_utils import CSVMixin
 from apps.core.pagination import AdminResultsSetPagination
+from apps.tenants.services import TenantResolver
 from apps.contracts.models import Contract, StudentItem, Product
 from apps.contracts.serializers import (
     ContractListSerializer, ContractDetailSerializer, ContractCreateSerializer,
@@ -127,12 +128,7 @@ class ContractCSVMixin(CSVMixin):
         instance = serializer.instance
         if instance.start_date:
             from apps.billing.models import MonthlyBillingDeadline
-            tenant_id = getattr(self.request, 'tenant_id', None)
-            if not tenant_id:
-                from apps.tenants.models import Tenant
-                default_tenant = Tenant.objects.first()
-                if default_tenant:
-                    tenant_id = default_tenant.id
+            tenant_id = TenantResolver.resolve_id(self.request, default_tenant_fallback=True)
             if not MonthlyBillingDeadline.is_month_editable(
                 tenant_id,
                 instance.start_date.year,
@@ -11,6 +11,7 @@ from django.core.cache import cache
 
 from ..models import Course, Pack
 from apps.core.exceptions import NotFoundError
+from apps.core.throttling import PUBLIC_THROTTLES
 from ..serializers import PublicCourseSerializer, PublicPackSerializer, PublicBrandSerializer
 
 # キャッシュ有効期間（5分）
@@ -87,6 +88,7 @@ def _build_grade_filter(grade_name: str, name_field: str = 'course_name'):
 class PublicBrandListView(APIView):
     """公開ブランド一覧API（認証不要・顧客向け）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -107,6 +109,7 @@ class PublicBrandListView(APIView):
 class PublicCourseListView(APIView):
     """公開コース一覧API（認証不要・顧客向け）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -189,6 +192,7 @@ class PublicCourseListView(APIView):
 class PublicCourseDetailView(APIView):
     """公開コース詳細API（認証不要・顧客向け）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request, pk):
         """コース詳細を返す"""
@@ -213,6 +217,7 @@ class PublicCourseDetailView(APIView):
 class PublicPackListView(APIView):
     """公開パック一覧API（認証不要・顧客向け）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -293,6 +298,7 @@ class PublicPackListView(APIView):
 class PublicPackDetailView(APIView):
     """公開パック詳細API（認証不要・顧客向け）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request, pk):
         """パック詳細を返す"""
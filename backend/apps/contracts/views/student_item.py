@@ -14,6 +14,7 @@ from apps.core.permissions import IsTenantUser, IsTenantAdmin
 from apps.core.exceptions import ValidationException
 from apps.core.csv_utils import CSVMixin
 from apps.core.pagination import AdminResultsSetPagination
+from apps.tenants.services import TenantResolver
 from ..models import StudentItem, StudentDiscount
 from ..serializers import StudentItemSerializer, StudentDiscountSerializer
 
@@ -103,12 +104,7 @@ class StudentItemViewSet(CSVMixin, viewsets.ModelViewSet):
         if not file:
             raise ValidationException('ファイルが指定されていません')
 
-        tenant_id = getattr(request, 'tenant_id', None)
-        if not tenant_id:
-            from apps.tenants.models import Tenant
-            default_tenant = Tenant.objects.first()
-            if default_tenant:
-                tenant_id = default_tenant.id
+        tenant_id = TenantResolver.resolve_id(request, default_tenant_fallback=True)
 
         # ファイル読み込み
         try:
@@ -228,12 +224,7 @@ class StudentItemViewSet(CSVMixin, viewsets.ModelViewSet):
         from apps.billing.models import MonthlyBillingDeadline
         from datetime import date
 
-        tenant_id = getattr(self.request, 'tenant_id', None)
-        if not tenant_id:
-            from apps.tenants.models import Tenant
-            default_tenant = Tenant.objects.first()
-            if default_tenant:
-                tenant_id = default_tenant.id
+        tenant_id = TenantResolver.resolve_id(self.request, default_tenant_fallback=True)
 
         # 現在の請求期間を取得
         current_year, current_month = MonthlyBillingDeadline.get_current_billing_period(tenant_id)
@@ -30,6 +30,7 @@ class ErrorCode:
     TOKEN_EXPIRED = 'TOKEN_EXPIRED'
     INVALID_CREDENTIALS = 'INVALID_CREDENTIALS'
     ACCOUNT_LOCKED = 'ACCOUNT_LOCKED'
+    RATE_LIMITED = 'RATE_LIMITED'
 
     # バリデーション
     VALIDATION_ERROR = 'VALIDATION_ERROR'
@@ -54,6 +55,7 @@ class ErrorCode:
     ALREADY_BOOKED = 'ALREADY_BOOKED'
     BOOKING_FULL = 'BOOKING_FULL'
     CLOSED_DAY = 'CLOSED_DAY'
+    SCHEDULE_CONFLICT = 'SCHEDULE_CONFLICT'
 
     # サーバーエラー
     INTERNAL_ERROR = 'INTERNAL_ERROR'
@@ -183,6 +185,13 @@ class ClosedDayError(BusinessRuleViolationError):
     default_code = ErrorCode.CLOSED_DAY
 
 
+class ScheduleConflictError(BusinessRuleViolationError):
+    """スケジュールの時間帯が重複"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = '同じ時間帯に別の予定があります'
+    default_code = ErrorCode.SCHEDULE_CONFLICT
+
+
 # 後方互換性のためのエイリアス
 ResourceNotFoundError = NotFoundError
 
@@ -274,6 +283,7 @@ def _get_error_code_from_status(status_code):
         403: ErrorCode.FORBIDDEN,
         404: ErrorCode.NOT_FOUND,
         409: ErrorCode.ALREADY_EXISTS,
+        429: ErrorCode.RATE_LIMITED,
         500: ErrorCode.INTERNAL_ERROR,
     }
     return status_to_code.get(status_code, ErrorCode.INTERNAL_ERROR)
@@ -0,0 +1,257 @@
+"""
+pg_stat_statements から負荷の大きいクエリを取得
+
+ローカルの PostgreSQL（docker-compose の db は pg_stat_statements を読み込んで起動する）で
+画面操作やテストを流した後に実行し、実行時間の大きいクエリ・対象のモデル・
+テーブルごとのシーケンシャルスキャンとインデックススキャンの回数を表示する。
+複合インデックス・部分インデックスを追加する際の判断材料にする。
+
+    python manage.py capture_hot_queries --reset          # 統計をリセット
+    （画面操作・テストを実行）
+    python manage.py capture_hot_queries --app billing --explain --json hot_queries.json
+"""
+import json
+import re
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+# --order-by → pg_stat_statements の列（PostgreSQL 13 以降の列名）
+ORDER_COLUMNS = {
+    'total': 'total_exec_time',
+    'mean': 'mean_exec_time',
+    'calls': 'calls',
+}
+
+# 集計対象外（トランザクション制御・設定・統計自体の参照）
+IGNORED_QUERY = r'^\s*(BEGIN|COMMIT|ROLLBACK|SET|SHOW|SAVEPOINT|RELEASE|DEALLOCATE)\y'
+
+# pg_stat_statements で定数を置き換えたパラメータ（$1 等）
+PARAM_PATTERN = re.compile(r'\$(\d+)')
+
+# PostgreSQL 15 以前で汎用プランを取得する際のプリペアド文の名前
+PLAN_STATEMENT = 'capture_hot_queries_plan'
+
+TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+"?([A-Za-z0-9_]+)"?', re.IGNORECASE)
+
+
+def table_models(app_labels=None):
+    """db_table → モデルのラベル（app_labels 指定時はそのアプリのみ）"""
+    return {
+        model._meta.db_table: model._meta.label
+        for model in apps.get_models()
+        if not app_labels or model._meta.app_label in app_labels
+    }
+
+
+def tables_in(query, known_tables):
+    """クエリが参照するテーブル（モデルのテーブルのみ）"""
+    return sorted({table for table in TABLE_PATTERN.findall(query) if table in known_tables})
+
+
+class Command(BaseCommand):
+    help = 'pg_stat_statements から負荷の大きいクエリ・対象テーブルのスキャン回数を表示'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='表示件数（デフォルト: 20）'
+        )
+        parser.add_argument(
+            '--order-by',
+            choices=list(ORDER_COLUMNS.keys()),
+            default='total',
+            help='並び順（total: 合計実行時間 / mean: 平均実行時間 / calls: 実行回数。デフォルト: total）'
+        )
+        parser.add_argument(
+            '--min-calls',
+            type=int,
+            default=1,
+            help='集計対象の最小実行回数（デフォルト: 1）'
+        )
+        parser.add_argument(
+            '--app',
+            action='append',
+            help='対象アプリ（複数指定可。指定したアプリのテーブルを参照するクエリのみ）'
+        )
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='実行計画を表示（PostgreSQL 16 以降は EXPLAIN (GENERIC_PLAN)、15 以前はプリペアド文の汎用プラン）'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='クエリを省略せずに表示'
+        )
+        parser.add_argument(
+            '--json',
+            type=str,
+            help='結果をJSONファイルに出力（インデックス追加前後の比較用）'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='統計をリセットして終了'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('pg_stat_statements はPostgreSQLのみ対応しています')
+        if connection.pg_version < 130000:
+            raise CommandError('PostgreSQL 13 以降が必要です')
+
+        with connection.cursor() as cursor:
+            self._ensure_extension(cursor)
+
+            if options['reset']:
+                cursor.execute('SELECT pg_stat_statements_reset()')
+                self.stdout.write(self.style.SUCCESS('pg_stat_statements の統計をリセットしました'))
+                return
+
+            known_tables = table_models(options['app'])
+            statements = self._top_statements(cursor, options, known_tables)
+            scans = self._table_scans(cursor, {t for s in statements for t in s['tables']})
+
+            if options['explain']:
+                for statement in statements:
+                    statement['plan'] = self._generic_plan(cursor, statement['query'])
+
+        self._print(statements, scans, known_tables, options['full'])
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump({'statements': statements, 'tables': scans}, f, ensure_ascii=False, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f'{options["json"]} に出力しました'))
+
+    def _ensure_extension(self, cursor):
+        """拡張が未作成なら作成（shared_preload_libraries に未設定の場合は参照時にエラーになる）"""
+        try:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_stat_statements')
+            cursor.execute('SELECT 1 FROM pg_stat_statements LIMIT 1')
+        except Exception as e:
+            raise CommandError(
+                'pg_stat_statements を参照できません。'
+                'postgres -c shared_preload_libraries=pg_stat_statements で起動してください'
+                f'（{e}）'
+            )
+
+    def _top_statements(self, cursor, options, known_tables):
+        """実行時間の大きいクエリ"""
+        params = [options['min_calls']]
+        table_filter = ''
+        if options['app']:
+            if not known_tables:
+                raise CommandError(f'アプリが見つかりません: {", ".join(options["app"])}')
+            table_filter = 'AND query ILIKE ANY(%s)'
+            params.append([f'%"{table}"%' for table in known_tables])
+        params.append(options['limit'])
+
+        cursor.execute(f"""
+            SELECT
+                queryid, calls, total_exec_time, mean_exec_time, rows,
+                shared_blks_hit, shared_blks_read, query
+            FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+              AND calls >= %s
+              AND query !~* '{IGNORED_QUERY}'
+              AND query NOT ILIKE '%%pg_stat_statements%%'
+              {table_filter}
+            ORDER BY {ORDER_COLUMNS[options['order_by']]} DESC
+            LIMIT %s
+        """, params)
+
+        statements = []
+        for queryid, calls, total_ms, mean_ms, rows, blks_hit, blks_read, query in cursor.fetchall():
+            blocks = blks_hit + blks_read
+            statements.append({
+                'queryid': queryid,
+                'calls': calls,
+                'total_ms': round(total_ms, 2),
+                'mean_ms': round(mean_ms, 3),
+                'rows': rows,
+                'cache_hit_ratio': round(blks_hit / blocks, 4) if blocks else None,
+                'tables': tables_in(query, known_tables),
+                'query': query,
+            })
+        return statements
+
+    def _table_scans(self, cursor, tables):
+        """テーブルごとのシーケンシャルスキャン・インデックススキャンの回数"""
+        if not tables:
+            return []
+        cursor.execute("""
+            SELECT relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup
+            FROM pg_stat_user_tables
+            WHERE relname = ANY(%s)
+            ORDER BY seq_tup_read DESC
+        """, [sorted(tables)])
+        return [
+            {'table': table, 'seq_scan': seq_scan, 'seq_tup_read': seq_tup_read,
+             'idx_scan': idx_scan, 'live_rows': live_rows}
+            for table, seq_scan, seq_tup_read, idx_scan, live_rows in cursor.fetchall()
+        ]
+
+    def _generic_plan(self, cursor, query):
+        """パラメータ（$1 等）を含んだままの実行計画"""
+        try:
+            if connection.pg_version >= 160000:
+                cursor.execute(f'EXPLAIN (GENERIC_PLAN) {query}')
+                return [row[0] for row in cursor.fetchall()]
+            return self._prepared_generic_plan(cursor, query)
+        except Exception as e:
+            return [f'（実行計画を取得できません: {e}）']
+
+    def _prepared_generic_plan(self, cursor, query):
+        """
+        PostgreSQL 15 以前の汎用プラン
+
+        GENERIC_PLAN がないため、プリペアド文を汎用プラン固定で EXPLAIN EXECUTE する
+        （汎用プランはパラメータの値を使わないので NULL を渡す）。
+        プリペアド文はトランザクションのロールバックでは消えないため必ず DEALLOCATE する。
+        """
+        param_count = max((int(n) for n in PARAM_PATTERN.findall(query)), default=0)
+        args = f'({", ".join(["NULL"] * param_count)})' if param_count else ''
+        with transaction.atomic():
+            cursor.execute('SET LOCAL plan_cache_mode = force_generic_plan')
+            cursor.execute(f'PREPARE {PLAN_STATEMENT} AS {query}')
+            try:
+                with transaction.atomic():
+                    cursor.execute(f'EXPLAIN EXECUTE {PLAN_STATEMENT}{args}')
+                    return [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.execute(f'DEALLOCATE {PLAN_STATEMENT}')
+
+    def _print(self, statements, scans, known_tables, full):
+        if not statements:
+            self.stdout.write('対象のクエリがありません')
+            return
+
+        for rank, statement in enumerate(statements, start=1):
+            hit_ratio = statement['cache_hit_ratio']
+            self.stdout.write(self.style.SUCCESS(
+                f'#{rank} 合計 {statement["total_ms"]:.1f}ms / 平均 {statement["mean_ms"]:.2f}ms / '
+                f'{statement["calls"]}回 / {statement["rows"]}行'
+                + (f' / キャッシュヒット率 {hit_ratio:.1%}' if hit_ratio is not None else '')
+            ))
+            models = [known_tables[table] for table in statement['tables']]
+            if models:
+                self.stdout.write(f'  モデル: {", ".join(models)}')
+            query = ' '.join(statement['query'].split())
+            if not full and len(query) > 300:
+                query = query[:300] + '…'
+            self.stdout.write(f'  {query}')
+            for line in statement.get('plan', []):
+                self.stdout.write(f'    {line}')
+            self.stdout.write('')
+
+        if scans:
+            self.stdout.write(self.style.SUCCESS('テーブルのスキャン回数（シーケンシャルスキャンの読み込み行数順）'))
+            for scan in scans:
+                self.stdout.write(
+                    f'  {scan["table"]}: seq_scan {scan["seq_scan"]}回（{scan["seq_tup_read"]}行）/ '
+                    f'idx_scan {scan["idx_scan"]}回 / {scan["live_rows"]}行'
+                )
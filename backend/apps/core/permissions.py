@@ -124,3 +124,30 @@ class ReadOnlyOrAdmin(permissions.BasePermission):
             request.user.is_authenticated and
             request.user.role in ['ADMIN', 'SUPER_ADMIN']
         )
+
+
+def get_feature_permissions(request):
+    """リクエストの機能権限（FeaturePermissionMiddleware 未適用時はその場で判定）"""
+    feature_permissions = getattr(request, 'feature_permissions', None)
+    if feature_permissions is None:
+        from apps.tenants.services.feature_permissions import FeaturePermissionCompiler
+        feature_permissions = FeaturePermissionCompiler.for_user(request.user)
+    return feature_permissions
+
+
+class HasFeature(permissions.BasePermission):
+    """役職の機能権限を確認（ビューの required_features に機能コードを指定）
+
+    例:
+        permission_classes = [IsAuthenticated, HasFeature]
+        required_features = ['10010']
+    """
+    message = 'この機能の利用権限がありません'
+
+    def has_permission(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return False
+        required = getattr(view, 'required_features', None)
+        if not required:
+            return True
+        return get_feature_permissions(request).has_all(required)
@@ -0,0 +1,130 @@
+"""
+Throttling Tests - スライディングウィンドウ方式のレート制限・連絡先の正規化のユニットテスト
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+
+from apps.core.throttling import IPSlidingWindowThrottle, TenantSlidingWindowThrottle, parse_rate
+from apps.core.utils import normalize_email, normalize_phone
+
+pytestmark = pytest.mark.unit
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle-tests'}}
+
+
+class CheckView:
+    pass
+
+
+class OtherView:
+    pass
+
+
+class IPThrottle(IPSlidingWindowThrottle):
+    scope = 'test_ip'
+
+    def get_rate(self):
+        return '3/min'
+
+
+class TenantThrottle(TenantSlidingWindowThrottle):
+    scope = 'test_tenant'
+
+    def get_rate(self):
+        return '2/min'
+
+
+def _request(ip='203.0.113.1', tenant_id=None, user_tenant_id=None):
+    """tenant_id は X-Tenant-ID ヘッダー由来、user_tenant_id はログインユーザーのテナント"""
+    request = APIRequestFactory().post('/', REMOTE_ADDR=ip)
+    request.tenant_id = tenant_id
+    if user_tenant_id:
+        request.user = SimpleNamespace(is_authenticated=True, tenant_id=user_tenant_id)
+    else:
+        request.user = AnonymousUser()
+    return request
+
+
+class TestSlidingWindowThrottle:
+    """回数制限のテスト（時刻は固定）"""
+
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        settings.CACHES = LOCMEM
+        cache.clear()
+
+    def test_parse_rate(self):
+        assert parse_rate('20/min') == (20, 60)
+        assert parse_rate('5/s') == (5, 1)
+        assert parse_rate(None) == (None, None)
+
+    @mock.patch('apps.core.throttling.time.time', return_value=6000.0)
+    def test_limit_per_ip_and_view(self, _):
+        view = CheckView()
+        results = [IPThrottle().allow_request(_request(), view) for _ in range(4)]
+        assert results == [True, True, True, False]
+
+        # 別のIP・別のビューは別に数える
+        assert IPThrottle().allow_request(_request(ip='203.0.113.2'), view)
+        assert IPThrottle().allow_request(_request(), OtherView())
+
+    def test_previous_window_is_weighted(self):
+        view = CheckView()
+        with mock.patch('apps.core.throttling.time.time', return_value=6059.0):
+            for _ in range(3):
+                assert IPThrottle().allow_request(_request(), view)
+
+        # 次のウィンドウの先頭では直前の3回がほぼそのまま残る（3 × 59/60 + 今回分）
+        with mock.patch('apps.core.throttling.time.time', return_value=6061.0):
+            assert IPThrottle().allow_request(_request(), view)
+            throttle = IPThrottle()
+            assert not throttle.allow_request(_request(), view)
+            assert 0 < throttle.wait() <= 60
+
+        # ウィンドウの後半では直前の回数の重みが下がる
+        with mock.patch('apps.core.throttling.time.time', return_value=6110.0):
+            assert IPThrottle().allow_request(_request(), view)
+
+    @mock.patch('apps.core.throttling.time.time', return_value=6000.0)
+    def test_tenant_limit(self, _):
+        view = CheckView()
+        assert TenantThrottle().allow_request(_request(user_tenant_id='t1'), view)
+        assert TenantThrottle().allow_request(_request(ip='203.0.113.9', user_tenant_id='t1'), view)
+        assert not TenantThrottle().allow_request(_request(ip='203.0.113.10', user_tenant_id='t1'), view)
+        # テナントが分からない場合は制限しない
+        assert all(TenantThrottle().allow_request(_request(), view) for _ in range(5))
+
+    @mock.patch('apps.core.throttling.time.time', return_value=6000.0)
+    def test_tenant_header_is_ignored(self, _):
+        """X-Tenant-ID だけでは他テナントの枠を消費できない"""
+        view = CheckView()
+        assert all(TenantThrottle().allow_request(_request(tenant_id='t1'), view) for _ in range(5))
+        assert TenantThrottle().allow_request(_request(user_tenant_id='t1'), view)
+
+    @mock.patch('apps.core.throttling.time.time', return_value=6000.0)
+    def test_denied_request_is_not_counted_by_later_throttles(self, _):
+        """DRF は拒否後も残りの制限を評価するが、後の制限のカウンタは増やさない"""
+        view = CheckView()
+        for _ in range(3):
+            assert IPThrottle().allow_request(_request(), view)
+
+        for _ in range(3):
+            request = _request(user_tenant_id='t1')
+            assert not IPThrottle().allow_request(request, view)
+            assert TenantThrottle().allow_request(request, view)
+
+        # テナントの枠は消費されていない
+        assert TenantThrottle().allow_request(_request(ip='203.0.113.9', user_tenant_id='t1'), view)
+
+
+def test_normalize_contacts():
+    assert normalize_phone('090-1234-5678') == '09012345678'
+    assert normalize_phone('０９０ １２３４ ５６７８') == '09012345678'
+    assert normalize_phone(None) == ''
+    assert normalize_email('  Taro@Example.COM ') == 'taro@example.com'
+    assert normalize_email('') == ''
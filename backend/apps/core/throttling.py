@@ -0,0 +1,161 @@
+"""
+Throttling - スライディングウィンドウ方式のレート制限
+
+認証不要（AllowAny）の公開APIは、メールアドレス・電話番号の重複チェックや
+体験・コース一覧のように誰でも呼び出せるため、スクリプトで大量に呼ばれると
+DBへ直接負荷がかかる。ここではキャッシュ（本番は Redis）上のカウンタで
+呼び出し回数を制限する。
+
+- 1ウィンドウ（例: 1分）ごとのカウンタを持ち、直前のウィンドウの回数を経過時間で
+  按分して加えた値を「直近1ウィンドウの回数」とみなす（スライディングウィンドウカウンタ）。
+  固定ウィンドウと違い、境界をまたいだ集中を許さない
+- カウンタはビュークラスごと・IPアドレス（またはログインユーザーのテナント）ごとに分ける
+- DRF は先の制限で拒否した後も残りの制限を評価するため、拒否済みのリクエストは
+  後の制限のカウンタに数えない（拒否されたリクエストで別の枠を消費させない）
+- 制限値は REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] のスコープ名で設定する
+- キャッシュに接続できない場合は制限しない（公開APIを止めない）
+"""
+import logging
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+# 拒否済みのリクエストに付ける印（後の制限はカウンタを更新しない）
+DENIED_ATTR = '_sliding_window_denied'
+
+# 'num/period' の period（先頭1文字）→ 秒
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    '20/min' のような制限値を (回数, 秒) に変換
+
+    Returns:
+        (num_requests, duration)。rate が None の場合は (None, None)
+    """
+    if rate is None:
+        return None, None
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """スライディングウィンドウ方式のレート制限（基底クラス）
+
+    サブクラスで scope と get_ident_key() を定義する。
+    """
+
+    scope = None
+    cache_prefix = 'throttle'
+
+    def __init__(self):
+        self.num_requests, self.duration = parse_rate(self.get_rate())
+        self._wait = None
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_ident_key(self, request, view):
+        """カウンタを分ける識別子（None の場合は制限しない）"""
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return None
+        return f'{self.cache_prefix}:{self.scope}:{view.__class__.__name__}:{ident}'
+
+    def allow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+        if getattr(request, DENIED_ATTR, False):
+            # 先の制限で拒否済み（拒否の判定はそちらに任せ、このカウンタは消費しない）
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = time.time()
+        window = int(now // self.duration)
+        current_key = f'{key}:{window}'
+        previous_key = f'{key}:{window - 1}'
+        elapsed = (now % self.duration) / self.duration
+
+        try:
+            counts = cache.get_many([current_key, previous_key])
+        except Exception as e:
+            logger.warning(f"Throttle cache unavailable: {e}")
+            return True
+
+        estimated = counts.get(previous_key, 0) * (1 - elapsed) + counts.get(current_key, 0)
+        if estimated >= self.num_requests:
+            self._wait = self.duration * (1 - elapsed)
+            setattr(request, DENIED_ATTR, True)
+            return False
+
+        try:
+            # 2ウィンドウ分保持（次のウィンドウで「直前の回数」として参照するため）
+            cache.add(current_key, 0, timeout=self.duration * 2)
+            cache.incr(current_key)
+        except ValueError:
+            # キャッシュが値を保持しない（DummyCache 等）
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to update throttle counter: {e}")
+        return True
+
+    def wait(self):
+        return self._wait
+
+
+class IPSlidingWindowThrottle(SlidingWindowThrottle):
+    """IPアドレスごとの制限（X-Forwarded-For は NUM_PROXIES の設定に従う）"""
+
+    def get_ident_key(self, request, view):
+        return f'ip:{self.get_ident(request)}'
+
+
+class TenantSlidingWindowThrottle(SlidingWindowThrottle):
+    """
+    テナントごとの制限（ログインユーザーのテナント。未ログインの場合は制限しない）
+
+    X-Tenant-ID ヘッダーはクライアントが自由に指定できるため使わない
+    （他テナントの枠を消費させられる）。未ログインの呼び出しは IP 単位の制限で抑える。
+    """
+
+    def get_ident_key(self, request, view):
+        user = getattr(request, 'user', None)
+        if not getattr(user, 'is_authenticated', False):
+            return None
+        tenant_id = getattr(user, 'tenant_id', None)
+        return f'tenant:{tenant_id}' if tenant_id else None
+
+
+# =============================================================================
+# 公開APIの制限
+# =============================================================================
+class LookupIPThrottle(IPSlidingWindowThrottle):
+    """メールアドレス・電話番号の重複チェック（登録済みかどうかが分かるため厳しめ）"""
+    scope = 'lookup_ip'
+
+
+class LookupTenantThrottle(TenantSlidingWindowThrottle):
+    scope = 'lookup_tenant'
+
+
+class PublicIPThrottle(IPSlidingWindowThrottle):
+    """体験予約・コース一覧などの公開API"""
+    scope = 'public_ip'
+
+
+class PublicTenantThrottle(TenantSlidingWindowThrottle):
+    scope = 'public_tenant'
+
+
+LOOKUP_THROTTLES = [LookupIPThrottle, LookupTenantThrottle]
+PUBLIC_THROTTLES = [PublicIPThrottle, PublicTenantThrottle]
@@ -1,6 +1,7 @@
 """
 Utility Functions
 """
+import unicodedata
 import uuid
 from datetime import datetime, date
 from typing import Optional
@@ -85,6 +86,36 @@ def format_phone_number(phone: str) -> str:
     return phone.replace('-', '').replace('−', '').replace(' ', '')
 
 
+def normalize_phone(phone: Optional[str]) -> str:
+    """
+    電話番号を検索用に正規化（全角を半角にして数字のみ残す）
+
+    Args:
+        phone: 電話番号（ハイフン・空白・全角数字を含んでよい）
+
+    Returns:
+        数字のみの電話番号（数字がなければ空文字）
+    """
+    if not phone:
+        return ''
+    return ''.join(c for c in unicodedata.normalize('NFKC', phone) if c.isdigit())
+
+
+def normalize_email(email: Optional[str]) -> str:
+    """
+    メールアドレスを検索用に正規化（前後の空白を除き小文字化）
+
+    Args:
+        email: メールアドレス
+
+    Returns:
+        正規化済みメールアドレス（空の場合は空文字）
+    """
+    if not email:
+        return ''
+    return email.strip().lower()
+
+
 def mask_email(email: str) -> str:
     """
     メールアドレスをマスク
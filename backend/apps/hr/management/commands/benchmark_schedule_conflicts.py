@@ -0,0 +1,162 @@
+"""
+社員スケジュールの空き状況検索のベンチマーク
+
+1年分の勤務スケジュール・予約済みの枠を合成し、
+「校舎Xで毎週○曜日 HH:MM〜HH:MM に空いている社員」を全校舎・全曜日・全時間帯について求める。
+旧実装（日ごとに生の行を読み、社員ごとに行を走査）と ScheduleIndex（区間リスト + 二分探索）の
+結果が一致することを確認し、構築・検索の時間を比較する。DBは使用しない。
+"""
+import random
+import time as timer
+from collections import defaultdict
+from datetime import date, time
+
+from django.core.management.base import BaseCommand
+
+from apps.hr.services.schedule_conflicts import ScheduleIndex, dates_between, to_minutes
+
+# 勤務のパターン（開始, 終了）
+SHIFTS = [
+    [(time(10, 0), time(14, 0)), (time(15, 0), time(21, 0))],
+    [(time(13, 0), time(21, 0))],
+    [(time(9, 0), time(18, 0))],
+    [(time(16, 0), time(22, 0))],
+]
+
+
+def synthesize(staff_count, school_count, year, seed):
+    """1年分の勤務スケジュール（employee, date, start, end, school）と予約済みの枠（employee, date, start, end）"""
+    rng = random.Random(seed)
+    schools = [f'school-{i}' for i in range(school_count)]
+    duty, busy = [], []
+    for staff in range(staff_count):
+        employee_id = f'employee-{staff:04d}'
+        home = rng.choice(schools)
+        days_off = set(rng.sample(range(7), 2))
+        for day in dates_between(date(year, 1, 1), date(year, 12, 31)):
+            if day.weekday() in days_off:
+                continue
+            school = home if rng.random() < 0.8 else rng.choice(schools)
+            for start, end in rng.choice(SHIFTS):
+                duty.append((employee_id, day, start, end, school))
+                # 勤務時間内に 0〜3 件の予約（30分・60分）
+                for _ in range(rng.randint(0, 3)):
+                    minute = rng.randrange(to_minutes(start), to_minutes(end) - 30, 30)
+                    length = rng.choice([30, 60])
+                    busy.append((
+                        employee_id, day,
+                        time(minute // 60, minute % 60),
+                        time(min(minute + length, 23 * 60 + 59) // 60, min(minute + length, 23 * 60 + 59) % 60),
+                    ))
+    return schools, duty, busy
+
+
+class LegacyLookup:
+    """旧実装相当: 日ごとに行を読み（1日1クエリ相当）、社員ごとに行を走査"""
+
+    def __init__(self, duty, busy):
+        self.duty_by_date = defaultdict(list)
+        self.busy_by_date = defaultdict(list)
+        for row in duty:
+            self.duty_by_date[row[1]].append(row)
+        for row in busy:
+            self.busy_by_date[row[1]].append(row)
+        self.reads = 0
+
+    def free_staff(self, days, start, end, school_id):
+        start_minutes, end_minutes = to_minutes(start), to_minutes(end)
+        result = {}
+        for day in days:
+            self.reads += 2
+            duty_rows = [r for r in self.duty_by_date[day] if r[4] == school_id]
+            busy_rows = self.busy_by_date[day]
+            free = []
+            for employee_id in {r[0] for r in duty_rows}:
+                # 勤務時間がその時間帯を含むか（連続するシフトは結合）
+                spans = sorted(
+                    (to_minutes(r[2]), to_minutes(r[3])) for r in duty_rows if r[0] == employee_id
+                )
+                merged = []
+                for s, e in spans:
+                    if merged and s <= merged[-1][1]:
+                        merged[-1][1] = max(merged[-1][1], e)
+                    else:
+                        merged.append([s, e])
+                if not any(s <= start_minutes and e >= end_minutes for s, e in merged):
+                    continue
+                if any(
+                    r[0] == employee_id and to_minutes(r[2]) < end_minutes and start_minutes < to_minutes(r[3])
+                    for r in busy_rows
+                ):
+                    continue
+                free.append(employee_id)
+            result[day] = sorted(free)
+        return result
+
+
+class Command(BaseCommand):
+    help = '社員スケジュールの空き状況検索を旧実装と比較（1年分の合成データ）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--staff', type=int, default=80, help='社員数（デフォルト: 80）')
+        parser.add_argument('--schools', type=int, default=6, help='校舎数（デフォルト: 6）')
+        parser.add_argument('--year', type=int, default=date.today().year, help='対象年')
+        parser.add_argument('--seed', type=int, default=1, help='乱数シード')
+
+    def handle(self, *args, **options):
+        schools, duty, busy = synthesize(options['staff'], options['schools'], options['year'], options['seed'])
+        days_by_weekday = {
+            weekday: dates_between(date(options['year'], 1, 1), date(options['year'], 12, 31), [weekday])
+            for weekday in range(7)
+        }
+        slots = [(time(hour, 0), time(hour + 1, 0)) for hour in range(10, 21)]
+        queries = [
+            (school, weekday, start, end)
+            for school in schools for weekday in range(7) for start, end in slots
+        ]
+        self.stdout.write(
+            f'社員: {options["staff"]}人 / 校舎: {len(schools)} / 勤務: {len(duty)}件 / 予約: {len(busy)}件'
+        )
+        self.stdout.write(f'問い合わせ: {len(queries)}件（校舎 × 曜日 × 1時間枠、各約52日）')
+        self.stdout.write('')
+
+        started = timer.perf_counter()
+        legacy = LegacyLookup(duty, busy)
+        legacy_build_ms = (timer.perf_counter() - started) * 1000
+        started = timer.perf_counter()
+        legacy_results = [
+            legacy.free_staff(days_by_weekday[weekday], start, end, school)
+            for school, weekday, start, end in queries
+        ]
+        legacy_ms = (timer.perf_counter() - started) * 1000
+
+        started = timer.perf_counter()
+        index = ScheduleIndex()
+        for employee_id, day, start, end, school in duty:
+            index.add_duty(employee_id, day, start, end, school)
+        for employee_id, day, start, end in busy:
+            index.add_busy(employee_id, day, start, end)
+        index_build_ms = (timer.perf_counter() - started) * 1000
+        started = timer.perf_counter()
+        index_results = [
+            index.free_staff(days_by_weekday[weekday], start, end, school_id=school)
+            for school, weekday, start, end in queries
+        ]
+        index_ms = (timer.perf_counter() - started) * 1000
+
+        mismatches = sum(1 for a, b in zip(legacy_results, index_results) if a != b)
+        free_total = sum(len(ids) for result in index_results for ids in result.values())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'旧実装: 構築 {legacy_build_ms:.1f}ms / 検索 {legacy_ms:.1f}ms '
+            f'（{legacy_ms * 1000 / len(queries):.0f}µs/件、日ごとの読み込み {legacy.reads}回）'
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f'ScheduleIndex: 構築 {index_build_ms:.1f}ms / 検索 {index_ms:.1f}ms '
+            f'（{index_ms * 1000 / len(queries):.0f}µs/件、読み込み 2回）'
+        ))
+        self.stdout.write(f'空きの延べ人数: {free_total}')
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'結果の不一致: {mismatches}件'))
+        else:
+            self.stdout.write('結果は一致しました')
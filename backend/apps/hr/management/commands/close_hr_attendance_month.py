@@ -0,0 +1,51 @@
+"""
+勤怠の月を締める（月次集計 HRAttendanceMonthlySummary を作成）
+
+定期ジョブ（close_hr_attendance_month_task）は月初に前月を締める。
+締め後に打刻を修正した場合は --reopen で締めを解除してから締め直す。
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hr.services.attendance_rollup import close_month, previous_month, reopen_month
+
+
+class Command(BaseCommand):
+    help = '勤怠の月を締めて月次集計を作成する'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant-id',
+            type=str,
+            required=True,
+            help='対象のテナントID'
+        )
+        parser.add_argument(
+            '--month',
+            type=str,
+            help='対象月（YYYY-MM。省略時は前月）'
+        )
+        parser.add_argument(
+            '--reopen',
+            action='store_true',
+            help='締めを解除する'
+        )
+
+    def handle(self, *args, **options):
+        tenant_id = options['tenant_id']
+        if options.get('month'):
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--month は YYYY-MM 形式で指定してください')
+        else:
+            month = previous_month()
+
+        if options['reopen']:
+            count = reopen_month(tenant_id, month)
+            self.stdout.write(self.style.SUCCESS(f'{month:%Y-%m} の締めを解除しました（{count}件）'))
+            return
+
+        count = close_month(tenant_id, month)
+        self.stdout.write(self.style.SUCCESS(f'{month:%Y-%m} を締めました（{count}件）'))
@@ -0,0 +1,155 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenants", "0011_add_approval_status_to_employee"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("hr", "0005_hrattendance"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HRAttendanceMonthlySummary",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+                ("tenant_id", models.UUIDField(db_index=True, verbose_name="会社ID")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="削除日時"
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="月初日", verbose_name="月")),
+                (
+                    "work_days",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="勤務日数（退勤済）"
+                    ),
+                ),
+                (
+                    "working_days",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="勤務中（未退勤）"
+                    ),
+                ),
+                (
+                    "absent_days",
+                    models.PositiveIntegerField(default=0, verbose_name="欠勤日数"),
+                ),
+                (
+                    "leave_days",
+                    models.PositiveIntegerField(default=0, verbose_name="休暇日数"),
+                ),
+                (
+                    "holiday_days",
+                    models.PositiveIntegerField(default=0, verbose_name="休日日数"),
+                ),
+                (
+                    "approved_days",
+                    models.PositiveIntegerField(default=0, verbose_name="承認済み日数"),
+                ),
+                (
+                    "total_work_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="勤務時間合計（分）"
+                    ),
+                ),
+                (
+                    "total_overtime_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="残業時間合計（分）"
+                    ),
+                ),
+                (
+                    "total_break_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="休憩時間合計（分）"
+                    ),
+                ),
+                (
+                    "total_late_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="遅刻時間合計（分）"
+                    ),
+                ),
+                (
+                    "total_early_leave_minutes",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="早退時間合計（分）"
+                    ),
+                ),
+                (
+                    "is_closed",
+                    models.BooleanField(default=False, verbose_name="締め済み"),
+                ),
+                (
+                    "closed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="締め日時"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "勤怠月次集計",
+                "verbose_name_plural": "勤怠月次集計",
+                "db_table": "t_hr_attendance_monthly_summary",
+                "ordering": ["-month"],
+            },
+        ),
+        migrations.AddField(
+            model_name="hrattendancemonthlysummary",
+            name="tenant_ref",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="%(app_label)s_%(class)s_set",
+                to="tenants.tenant",
+                verbose_name="会社",
+            ),
+        ),
+        migrations.AddField(
+            model_name="hrattendancemonthlysummary",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="hr_attendance_monthly_summaries",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="ユーザー",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hrattendancemonthlysummary",
+            index=models.Index(
+                fields=["tenant_id", "month"], name="idx_hr_att_summary_month"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="hrattendancemonthlysummary",
+            unique_together={("user", "month")},
+        ),
+    ]
@@ -4,7 +4,7 @@ HR Models - 勤怠管理モデル
 このファイルは後方互換性のために残しています。
 新しいインポートは apps.hr.models パッケージから行ってください。
 """
-from apps.hr.models.attendance import HRAttendance
+from apps.hr.models.attendance import HRAttendance, HRAttendanceMonthlySummary
 from apps.hr.models.staff_schedule import (
     StaffAvailability,
     StaffAvailabilityBooking,
@@ -19,6 +19,7 @@ from apps.hr.models.staff_profile import (
 
 __all__ = [
     'HRAttendance',
+    'HRAttendanceMonthlySummary',
     'StaffAvailability',
     'StaffAvailabilityBooking',
     'StaffWorkSchedule',
@@ -1,7 +1,7 @@
 """
 HR Models - 人事関連モデル
 """
-from apps.hr.models.attendance import HRAttendance
+from apps.hr.models.attendance import HRAttendance, HRAttendanceMonthlySummary
 from apps.hr.models.staff_schedule import (
     StaffAvailability,
     StaffAvailabilityBooking,
@@ -16,6 +16,7 @@ from apps.hr.models.staff_profile import (
 
 __all__ = [
     'HRAttendance',
+    'HRAttendanceMonthlySummary',
     'StaffAvailability',
     'StaffAvailabilityBooking',
     'StaffWorkSchedule',
@@ -146,3 +146,50 @@ class HRAttendance(TenantModel):
             if self.status == self.AttendanceStatus.WORKING:
                 self.status = self.AttendanceStatus.COMPLETED
         super().save(*args, **kwargs)
+
+
+class HRAttendanceMonthlySummary(TenantModel):
+    """勤怠の月次集計（ユーザー × 月）
+
+    月末の締めで HRAttendance から集計して保持する（締め済みの月は再集計しない）。
+    未締めの月は HRAttendance をその都度集計する。
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+        verbose_name='ID'
+    )
+    user = models.ForeignKey(
+        'users.User',
+        on_delete=models.CASCADE,
+        related_name='hr_attendance_monthly_summaries',
+        verbose_name='ユーザー'
+    )
+    month = models.DateField('月', help_text='月初日')
+    work_days = models.PositiveIntegerField('勤務日数（退勤済）', default=0)
+    working_days = models.PositiveIntegerField('勤務中（未退勤）', default=0)
+    absent_days = models.PositiveIntegerField('欠勤日数', default=0)
+    leave_days = models.PositiveIntegerField('休暇日数', default=0)
+    holiday_days = models.PositiveIntegerField('休日日数', default=0)
+    approved_days = models.PositiveIntegerField('承認済み日数', default=0)
+    total_work_minutes = models.PositiveIntegerField('勤務時間合計（分）', default=0)
+    total_overtime_minutes = models.PositiveIntegerField('残業時間合計（分）', default=0)
+    total_break_minutes = models.PositiveIntegerField('休憩時間合計（分）', default=0)
+    total_late_minutes = models.PositiveIntegerField('遅刻時間合計（分）', default=0)
+    total_early_leave_minutes = models.PositiveIntegerField('早退時間合計（分）', default=0)
+    is_closed = models.BooleanField('締め済み', default=False)
+    closed_at = models.DateTimeField('締め日時', null=True, blank=True)
+
+    class Meta:
+        db_table = 't_hr_attendance_monthly_summary'
+        verbose_name = '勤怠月次集計'
+        verbose_name_plural = '勤怠月次集計'
+        ordering = ['-month']
+        unique_together = ['user', 'month']
+        indexes = [
+            models.Index(fields=['tenant_id', 'month'], name='idx_hr_att_summary_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.month:%Y-%m}"
@@ -0,0 +1,15 @@
+"""
+HR Services - 人事関連サービス
+"""
+from .attendance_rollup import (
+    aggregate_month, close_month, close_previous_month, iter_timesheet_csv, monthly_rows, reopen_month,
+)
+from .schedule_conflicts import (
+    ScheduleIndex, book_availability, check_availability, check_work_schedule, release_booking,
+)
+
+__all__ = [
+    'aggregate_month', 'close_month', 'close_previous_month', 'iter_timesheet_csv', 'monthly_rows',
+    'reopen_month',
+    'ScheduleIndex', 'book_availability', 'check_availability', 'check_work_schedule', 'release_booking',
+]
@@ -0,0 +1,319 @@
+"""
+Attendance Rollup Service
+勤怠の月次集計（ユーザー × 月）と給与計算用の勤務表CSV
+
+月別サマリーは1ユーザー・1か月ごとに集計 + ステータス別の件数を個別に数えていたため、
+全スタッフ分を出すと N × 4 回のクエリになっていた。ここでは
+- 集計: テナント・月の HRAttendance を user ごとに GROUP BY し、分数の合計とステータス別の日数を
+  条件付き集計（Count(filter=...)）で1回のクエリで求める
+- 締め: 月末の締め（close_month）で集計結果を HRAttendanceMonthlySummary に保持する。
+  締め済みのユーザーは保持した値を返し、以後の打刻修正では再集計しない（reopen_month で締めを解除）。
+  締め後に勤怠を登録したユーザーなど、締めた行のないユーザーはその場で集計して合わせて返す
+- 勤務表CSV: 日別の勤怠をイテレータで読み、1行ずつ書き出す（StreamingHttpResponse 用）
+"""
+import csv
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.hr.models import HRAttendance, HRAttendanceMonthlySummary
+
+Status = HRAttendance.AttendanceStatus
+
+# 集計項目（HRAttendanceMonthlySummary の項目名 → 集計式）
+ROLLUP_FIELDS = {
+    'work_days': Count('id', filter=Q(status=Status.COMPLETED)),
+    'working_days': Count('id', filter=Q(status=Status.WORKING)),
+    'absent_days': Count('id', filter=Q(status=Status.ABSENT)),
+    'leave_days': Count('id', filter=Q(status=Status.LEAVE)),
+    'holiday_days': Count('id', filter=Q(status=Status.HOLIDAY)),
+    'approved_days': Count('id', filter=Q(is_approved=True)),
+    'total_work_minutes': Coalesce(Sum('work_minutes'), 0),
+    'total_overtime_minutes': Coalesce(Sum('overtime_minutes'), 0),
+    'total_break_minutes': Coalesce(Sum('break_minutes'), 0),
+    'total_late_minutes': Coalesce(Sum('late_minutes'), 0),
+    'total_early_leave_minutes': Coalesce(Sum('early_leave_minutes'), 0),
+}
+
+USER_FIELDS = {
+    'user__email': 'email',
+    'user__last_name': 'last_name',
+    'user__first_name': 'first_name',
+}
+
+# 勤務表CSV（日別）
+TIMESHEET_COLUMNS = [
+    'メールアドレス', '氏名', '日付', 'ステータス', '出勤時刻', '退勤時刻',
+    '休憩（分）', '勤務（分）', '残業（分）', '遅刻（分）', '早退（分）', '校舎', '承認',
+]
+# 勤務表CSV（月次集計）
+SUMMARY_COLUMNS = [
+    'メールアドレス', '氏名', '勤務日数', '勤務中', '欠勤日数', '休暇日数', '休日日数', '承認済み日数',
+    '勤務（分）', '残業（分）', '休憩（分）', '遅刻（分）', '早退（分）', '締め',
+]
+
+
+def month_start(year: int, month: int) -> date:
+    return date(int(year), int(month), 1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def previous_month(today: Optional[date] = None) -> date:
+    """前月の月初日（締め対象）"""
+    today = today or timezone.localdate()
+    return (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def _attendances(tenant_id, month: date, user_ids: Optional[Iterable] = None):
+    queryset = HRAttendance.objects.filter(
+        tenant_id=tenant_id,
+        deleted_at__isnull=True,
+        date__gte=month,
+        date__lt=next_month(month),
+    )
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=list(user_ids))
+    return queryset
+
+
+def aggregate_month(tenant_id, month: date, user_ids: Optional[Iterable] = None,
+                    with_user: bool = False) -> List[Dict]:
+    """
+    テナント・月の勤怠をユーザーごとに集計（1クエリ）
+
+    Args:
+        month: 月初日
+        user_ids: 対象ユーザー（省略時はテナント全体）
+        with_user: True の場合はメールアドレス・氏名も返す（email / last_name / first_name）
+
+    Returns:
+        [{'user_id', 'work_days', ..., 'total_work_minutes', ...}, ...]
+    """
+    keys = ['user_id', *USER_FIELDS] if with_user else ['user_id']
+    order = ['user__last_name', 'user__first_name', 'user_id'] if with_user else ['user_id']
+    rows = []
+    for row in _attendances(tenant_id, month, user_ids).values(*keys).annotate(**ROLLUP_FIELDS).order_by(*order):
+        for source, name in USER_FIELDS.items():
+            if source in row:
+                row[name] = row.pop(source) or ''
+        row['is_closed'] = False
+        rows.append(row)
+    return rows
+
+
+def _closed_rows(tenant_id, month: date, user_ids: Optional[Iterable] = None):
+    queryset = HRAttendanceMonthlySummary.objects.filter(
+        tenant_id=tenant_id, month=month, is_closed=True, deleted_at__isnull=True,
+    )
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=list(user_ids))
+    return queryset
+
+
+def is_month_closed(tenant_id, month: date) -> bool:
+    return _closed_rows(tenant_id, month).exists()
+
+
+def monthly_rows(tenant_id, month: date, user_ids: Optional[Iterable] = None) -> List[Dict]:
+    """
+    月次集計（締め済みのユーザーは保持した値、それ以外のユーザーはその場で集計）
+
+    Returns:
+        aggregate_month(with_user=True) と同じ形式（氏名順）
+    """
+    closed = list(_closed_rows(tenant_id, month, user_ids).values(
+        'user_id', *USER_FIELDS, *ROLLUP_FIELDS, 'is_closed',
+    ))
+    live = aggregate_month(tenant_id, month, user_ids, with_user=True)
+    if not closed:
+        return live
+    for row in closed:
+        for source, name in USER_FIELDS.items():
+            row[name] = row.pop(source) or ''
+    closed_user_ids = {row['user_id'] for row in closed}
+    rows = closed + [row for row in live if row['user_id'] not in closed_user_ids]
+    rows.sort(key=lambda row: (row['last_name'], row['first_name'], str(row['user_id'])))
+    return rows
+
+
+def manager_school_ids(user) -> Set:
+    """校舎責任者の担当校舎（社員マスタの対応校舎と主校舎）"""
+    from apps.tenants.models import Employee
+
+    school_ids = set()
+    if getattr(user, 'staff_id', None):
+        school_ids.update(
+            school_id for school_id in Employee.objects.filter(id=user.staff_id).values_list('schools', flat=True)
+            if school_id
+        )
+    if getattr(user, 'primary_school_id', None):
+        school_ids.add(user.primary_school_id)
+    return school_ids
+
+
+def school_staff_user_ids(tenant_id, school_ids: Iterable) -> Set:
+    """校舎に所属するスタッフ（社員マスタの対応校舎・主校舎）のユーザーID"""
+    from apps.tenants.models import Employee
+    from apps.users.models import User
+
+    school_ids = list(school_ids)
+    if not school_ids:
+        return set()
+    staff_ids = Employee.objects.filter(tenant_id=tenant_id, schools__in=school_ids).values('id')
+    return set(User.objects.filter(
+        Q(staff_id__in=staff_ids) | Q(primary_school_id__in=school_ids),
+        tenant_id=tenant_id,
+    ).values_list('id', flat=True))
+
+
+def close_month(tenant_id, month: date) -> int:
+    """
+    月を締める（集計して HRAttendanceMonthlySummary に保持）
+
+    既に締め済みのユーザーの行は変更しない。
+
+    Returns:
+        締めた行数
+    """
+    now = timezone.now()
+    closed_user_ids = set(_closed_rows(tenant_id, month).values_list('user_id', flat=True))
+    summaries = [
+        HRAttendanceMonthlySummary(
+            tenant_id=tenant_id,
+            user_id=row['user_id'],
+            month=month,
+            is_closed=True,
+            closed_at=now,
+            **{field: row[field] for field in ROLLUP_FIELDS},
+        )
+        for row in aggregate_month(tenant_id, month)
+        if row['user_id'] not in closed_user_ids
+    ]
+    with transaction.atomic():
+        HRAttendanceMonthlySummary.objects.filter(
+            tenant_id=tenant_id, month=month, is_closed=False,
+        ).delete()
+        HRAttendanceMonthlySummary.objects.bulk_create(summaries, batch_size=1000)
+    return len(summaries)
+
+
+def reopen_month(tenant_id, month: date) -> int:
+    """
+    月の締めを解除する（以後は HRAttendance をその都度集計）
+
+    Returns:
+        削除した集計行数
+    """
+    deleted, _ = HRAttendanceMonthlySummary.objects.filter(tenant_id=tenant_id, month=month).delete()
+    return deleted
+
+
+def close_previous_month(tenant_id=None, today: Optional[date] = None) -> Dict[str, int]:
+    """前月を締める（tenant_id 省略時は全テナント。月初の定期ジョブ用）"""
+    from apps.tenants.models import Tenant
+
+    month = previous_month(today)
+    tenant_ids = [tenant_id] if tenant_id else list(Tenant.objects.values_list('id', flat=True))
+    total = {'month': month.isoformat(), 'tenants': 0, 'rows': 0}
+    for tid in tenant_ids:
+        total['rows'] += close_month(tid, month)
+        total['tenants'] += 1
+    return total
+
+
+# =============================================================================
+# 勤務表CSV
+# =============================================================================
+class _Echo:
+    """csv.writer の書き込み先（書き込んだ行をそのまま返す）"""
+
+    def write(self, value):
+        return value
+
+
+def _full_name(last_name, first_name) -> str:
+    return f"{last_name or ''} {first_name or ''}".strip()
+
+
+def _local_time(value) -> str:
+    return timezone.localtime(value).strftime('%H:%M') if value else ''
+
+
+def iter_timesheet_csv(tenant_id, month: date, kind: str = 'daily',
+                       user_ids: Optional[Iterable] = None) -> Iterator[str]:
+    """
+    勤務表CSVを1行ずつ返す（先頭に Excel 用の BOM）
+
+    Args:
+        kind: daily（日別の勤怠）/ summary（ユーザーごとの月次集計）
+        user_ids: 対象ユーザー（省略時はテナント全体）
+
+    Raises:
+        ValueError: kind が不正
+    """
+    if kind == 'daily':
+        return _daily_lines(tenant_id, month, user_ids)
+    if kind == 'summary':
+        return _summary_lines(tenant_id, month, user_ids)
+    raise ValueError('kind は daily, summary のいずれかを指定してください')
+
+
+def _summary_lines(tenant_id, month: date, user_ids: Optional[Iterable] = None) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield '\ufeff'
+    yield writer.writerow(SUMMARY_COLUMNS)
+    for row in monthly_rows(tenant_id, month, user_ids):
+        yield writer.writerow([
+            row['email'],
+            _full_name(row['last_name'], row['first_name']),
+            row['work_days'],
+            row['working_days'],
+            row['absent_days'],
+            row['leave_days'],
+            row['holiday_days'],
+            row['approved_days'],
+            row['total_work_minutes'],
+            row['total_overtime_minutes'],
+            row['total_break_minutes'],
+            row['total_late_minutes'],
+            row['total_early_leave_minutes'],
+            '済' if row['is_closed'] else '',
+        ])
+
+
+def _daily_lines(tenant_id, month: date, user_ids: Optional[Iterable] = None) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield '\ufeff'
+    yield writer.writerow(TIMESHEET_COLUMNS)
+    status_labels = dict(Status.choices)
+    rows = _attendances(tenant_id, month, user_ids).order_by(
+        'user__last_name', 'user__first_name', 'user_id', 'date'
+    ).values_list(
+        'user__email', 'user__last_name', 'user__first_name', 'date', 'status', 'clock_in', 'clock_out',
+        'break_minutes', 'work_minutes', 'overtime_minutes', 'late_minutes', 'early_leave_minutes',
+        'school__school_name', 'is_approved',
+    )
+    for (email, last_name, first_name, day, status, clock_in, clock_out, break_minutes, work_minutes,
+         overtime_minutes, late_minutes, early_leave_minutes, school_name, is_approved) in rows.iterator(chunk_size=2000):
+        yield writer.writerow([
+            email or '',
+            _full_name(last_name, first_name),
+            day.isoformat(),
+            status_labels.get(status, status),
+            _local_time(clock_in),
+            _local_time(clock_out),
+            break_minutes,
+            work_minutes,
+            overtime_minutes,
+            late_minutes,
+            early_leave_minutes,
+            school_name or '',
+            '済' if is_approved else '',
+        ])
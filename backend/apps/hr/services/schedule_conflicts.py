@@ -0,0 +1,296 @@
+"""
+Schedule Conflicts Service
+社員の勤務スケジュール・空き時間（予約枠）の重複チェックと空き状況の検索
+
+- 書き込み: 社員の行をロック（select_for_update）してから同じ日の重なる行を確認し、
+  重なりがなければ保存する。同じ社員への同時登録は直列化されるため、確認と保存の間に
+  重なる行が作られることはない。予約は空き時間の行をロックして定員と生徒の重複を確認する
+- 検索: ScheduleIndex に期間内の勤務スケジュール（勤務中の時間帯）と予約済み・ブロック中の枠
+  （埋まっている時間帯）を2回のクエリで読み込み、社員・日ごとに開始順に並べて重なりを結合した
+  区間リストにする。「校舎Xで毎週火曜17:00〜18:00に空いている社員」のような問い合わせを
+  多数の社員・日付に対して二分探索だけで答える
+
+時刻は0時からの分（int）で扱う。終了が開始以前の行（日付をまたぐ勤務）はその日の終わりまでとする。
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+
+from apps.core.exceptions import AlreadyBookedError, BookingFullError, ScheduleConflictError
+from apps.hr.models import StaffAvailability, StaffAvailabilityBooking, StaffWorkSchedule
+
+DAY_MINUTES = 24 * 60
+
+# 予約枠のうち埋まっている（勤務中でも空きではない）もの
+BUSY_SLOTS = Q(status__in=[StaffAvailability.SlotStatus.BOOKED, StaffAvailability.SlotStatus.BLOCKED]) | Q(
+    status=StaffAvailability.SlotStatus.AVAILABLE, current_bookings__gt=0,
+)
+# 有効な予約
+ACTIVE_BOOKINGS = [
+    StaffAvailabilityBooking.BookingStatus.PENDING,
+    StaffAvailabilityBooking.BookingStatus.CONFIRMED,
+]
+
+
+def to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def parse_time(value: str) -> time:
+    """'HH:MM' を time に変換
+
+    Raises:
+        ValueError: 形式が不正
+    """
+    return datetime.strptime(value, '%H:%M').time()
+
+
+def _span(start: time, end: time) -> Tuple[int, int]:
+    start_minutes, end_minutes = to_minutes(start), to_minutes(end)
+    if end_minutes <= start_minutes:
+        end_minutes = DAY_MINUTES
+    return start_minutes, end_minutes
+
+
+def dates_between(date_from: date, date_to: date, weekdays: Optional[Iterable[int]] = None) -> List[date]:
+    """期間内の日付（weekdays: 0=月曜〜6=日曜 で絞り込み）"""
+    weekdays = set(weekdays) if weekdays else None
+    days = []
+    day = date_from
+    while day <= date_to:
+        if weekdays is None or day.weekday() in weekdays:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+class IntervalList:
+    """1社員・1日分の時間帯（開始順に並べ、重なり・隣接を結合して保持）"""
+
+    __slots__ = ('_pending', '_starts', '_ends')
+
+    def __init__(self):
+        self._pending: List[Tuple[int, int]] = []
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def add(self, start: int, end: int):
+        self._pending.append((start, end))
+
+    def _build(self):
+        intervals = sorted(self._pending + list(zip(self._starts, self._ends)))
+        self._pending = []
+        starts, ends = [], []
+        for start, end in intervals:
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts, self._ends = starts, ends
+
+    def _ensure_built(self):
+        if self._pending:
+            self._build()
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """[start, end) と重なる時間帯があるか"""
+        self._ensure_built()
+        index = bisect_left(self._starts, end) - 1
+        return index >= 0 and self._ends[index] > start
+
+    def covers(self, start: int, end: int) -> bool:
+        """[start, end) 全体を含む時間帯があるか"""
+        self._ensure_built()
+        index = bisect_right(self._starts, start) - 1
+        return index >= 0 and self._ends[index] >= end
+
+    def __len__(self):
+        self._ensure_built()
+        return len(self._starts)
+
+
+def _id(value) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+class ScheduleIndex:
+    """社員の勤務中・予定ありの時間帯（社員 × 日）の索引（社員ID・校舎IDは文字列で保持）"""
+
+    def __init__(self):
+        # (employee_id, date, school_id) → 勤務中の時間帯（school_id=None は校舎を問わない）
+        self._duty: Dict[tuple, IntervalList] = defaultdict(IntervalList)
+        # (employee_id, date) → 予定ありの時間帯
+        self._busy: Dict[tuple, IntervalList] = defaultdict(IntervalList)
+        # (date, school_id) → 勤務予定のある社員
+        self._staff_on: Dict[tuple, set] = defaultdict(set)
+
+    def add_duty(self, employee_id, day: date, start: time, end: time, school_id=None):
+        span = _span(start, end)
+        employee_id = _id(employee_id)
+        for school in {None, _id(school_id)}:
+            self._duty[(employee_id, day, school)].add(*span)
+            self._staff_on[(day, school)].add(employee_id)
+
+    def add_busy(self, employee_id, day: date, start: time, end: time):
+        self._busy[(_id(employee_id), day)].add(*_span(start, end))
+
+    def is_busy(self, employee_id, day: date, start: time, end: time) -> bool:
+        busy = self._busy.get((_id(employee_id), day))
+        return bool(busy) and busy.overlaps(*_span(start, end))
+
+    def is_free(self, employee_id, day: date, start: time, end: time, school_id=None) -> bool:
+        """勤務中（school_id 指定時はその校舎で）かつ予定がない"""
+        duty = self._duty.get((_id(employee_id), day, _id(school_id)))
+        if not duty or not duty.covers(*_span(start, end)):
+            return False
+        return not self.is_busy(employee_id, day, start, end)
+
+    def free_staff(self, days: Iterable[date], start: time, end: time, school_id=None,
+                   employee_ids: Optional[Iterable] = None) -> Dict[date, list]:
+        """日ごとの空いている社員ID（勤務予定のある社員のみが対象）"""
+        candidates = {_id(e) for e in employee_ids} if employee_ids is not None else None
+        school_id = _id(school_id)
+        start_minutes, end_minutes = _span(start, end)
+        result = {}
+        for day in days:
+            staff = self._staff_on.get((day, school_id), ())
+            if candidates is not None:
+                staff = candidates.intersection(staff)
+            free = []
+            for employee_id in staff:
+                if not self._duty[(employee_id, day, school_id)].covers(start_minutes, end_minutes):
+                    continue
+                busy = self._busy.get((employee_id, day))
+                if busy is None or not busy.overlaps(start_minutes, end_minutes):
+                    free.append(employee_id)
+            free.sort()
+            result[day] = free
+        return result
+
+    @classmethod
+    def load(cls, tenant_id, date_from: date, date_to: date, school_id=None,
+             employee_ids: Optional[Iterable] = None) -> 'ScheduleIndex':
+        """期間内の勤務スケジュールと埋まっている予約枠を読み込む（2クエリ）"""
+        index = cls()
+        employees = {'employee_id__in': list(employee_ids)} if employee_ids is not None else {}
+
+        schedules = StaffWorkSchedule.objects.filter(
+            tenant_id=tenant_id, deleted_at__isnull=True, date__gte=date_from, date__lte=date_to, **employees,
+        )
+        if school_id:
+            schedules = schedules.filter(school_id=school_id)
+        for employee_id, day, start, end, schedule_school_id in schedules.values_list(
+            'employee_id', 'date', 'planned_start', 'planned_end', 'school_id',
+        ).iterator(chunk_size=5000):
+            index.add_duty(employee_id, day, start, end, schedule_school_id)
+
+        for employee_id, day, start, end in StaffAvailability.objects.filter(
+            BUSY_SLOTS, tenant_id=tenant_id, deleted_at__isnull=True,
+            date__gte=date_from, date__lte=date_to, **employees,
+        ).values_list('employee_id', 'date', 'start_time', 'end_time').iterator(chunk_size=5000):
+            index.add_busy(employee_id, day, start, end)
+        return index
+
+
+# =============================================================================
+# 書き込み時の重複チェック
+# =============================================================================
+def _lock_employee(employee_id):
+    """社員の行をロック（同じ社員への登録を直列化）"""
+    from apps.tenants.models import Employee
+
+    list(Employee.objects.select_for_update().filter(id=employee_id).values_list('id', flat=True))
+
+
+def _format(start: time, end: time) -> str:
+    return f"{start:%H:%M}〜{end:%H:%M}"
+
+
+def check_work_schedule(employee_id, day: date, start: time, end: time, exclude_id=None):
+    """
+    同じ社員・同じ日の勤務スケジュールと重ならないか確認（呼び出し側のトランザクション内で実行）
+
+    Raises:
+        ScheduleConflictError: 重なる勤務スケジュールがある
+    """
+    _lock_employee(employee_id)
+    start_minutes, end_minutes = _span(start, end)
+    for other_start, other_end in StaffWorkSchedule.objects.filter(
+        employee_id=employee_id, date=day, deleted_at__isnull=True,
+    ).exclude(id=exclude_id).values_list('planned_start', 'planned_end'):
+        other_start_minutes, other_end_minutes = _span(other_start, other_end)
+        if other_start_minutes < end_minutes and start_minutes < other_end_minutes:
+            raise ScheduleConflictError(f'{day} {_format(other_start, other_end)} の勤務スケジュールと重なっています')
+
+
+def check_availability(employee_id, day: date, start: time, end: time, exclude_id=None):
+    """
+    同じ社員・同じ日の空き時間（キャンセル以外）と重ならないか確認（呼び出し側のトランザクション内で実行）
+
+    Raises:
+        ScheduleConflictError: 重なる空き時間がある
+    """
+    _lock_employee(employee_id)
+    start_minutes, end_minutes = _span(start, end)
+    for other_start, other_end in StaffAvailability.objects.filter(
+        employee_id=employee_id, date=day, deleted_at__isnull=True,
+    ).exclude(status=StaffAvailability.SlotStatus.CANCELLED).exclude(id=exclude_id).values_list(
+        'start_time', 'end_time',
+    ):
+        other_start_minutes, other_end_minutes = _span(other_start, other_end)
+        if other_start_minutes < end_minutes and start_minutes < other_end_minutes:
+            raise ScheduleConflictError(f'{day} {_format(other_start, other_end)} の空き時間と重なっています')
+
+
+def book_availability(availability_id, tenant_id, student_id, student_item_id=None,
+                      request_message: str = '') -> StaffAvailabilityBooking:
+    """
+    空き時間を予約（枠の行をロックして定員・生徒の重複を確認）
+
+    Raises:
+        BookingFullError: 予約できない枠（満席・予約受付外）
+        AlreadyBookedError: 生徒が同じ時間帯に別の枠を予約済み
+    """
+    with transaction.atomic():
+        availability = StaffAvailability.objects.select_for_update().get(id=availability_id, tenant_id=tenant_id)
+        if not availability.is_bookable:
+            raise BookingFullError('この枠は予約できません')
+
+        if StaffAvailabilityBooking.objects.filter(
+            student_id=student_id,
+            status__in=ACTIVE_BOOKINGS,
+            availability__date=availability.date,
+            availability__start_time__lt=availability.end_time,
+            availability__end_time__gt=availability.start_time,
+        ).exists():
+            raise AlreadyBookedError('同じ時間帯に別の予約があります')
+
+        booking = StaffAvailabilityBooking.objects.create(
+            tenant_id=availability.tenant_id,
+            availability=availability,
+            student_id=student_id,
+            student_item_id=student_item_id,
+            request_message=request_message,
+            status=StaffAvailabilityBooking.BookingStatus.PENDING,
+        )
+
+        availability.current_bookings += 1
+        if availability.current_bookings >= availability.capacity:
+            availability.status = StaffAvailability.SlotStatus.BOOKED
+        availability.save(update_fields=['current_bookings', 'status', 'updated_at'])
+    return booking
+
+
+def release_booking(booking: StaffAvailabilityBooking):
+    """キャンセルした予約の枠を戻す（枠の行をロックして予約数を減らす）"""
+    with transaction.atomic():
+        availability = StaffAvailability.objects.select_for_update().get(id=booking.availability_id)
+        availability.current_bookings = max(0, availability.current_bookings - 1)
+        if availability.status == StaffAvailability.SlotStatus.BOOKED:
+            availability.status = StaffAvailability.SlotStatus.AVAILABLE
+        availability.save(update_fields=['current_bookings', 'status', 'updated_at'])
@@ -0,0 +1,24 @@
+"""
+HR Celery Tasks - 人事関連のバックグラウンドタスク
+"""
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(bind=True, soft_time_limit=600, time_limit=900)
+def close_hr_attendance_month_task(self, tenant_id=None):
+    """前月の勤怠を締めて月次集計を保持するCeleryタスク（月初）
+
+    Args:
+        tenant_id: テナントID（省略時は全テナント）
+
+    Returns:
+        dict: 処理結果
+    """
+    from apps.hr.services.attendance_rollup import close_previous_month
+
+    result = close_previous_month(tenant_id=tenant_id)
+    logger.info(f"Closed HR attendance month: {result}")
+    return result
@@ -0,0 +1,159 @@
+"""
+Attendance Rollup Tests - 勤怠の月次集計・締め・勤務表CSVのテスト
+"""
+import os
+from datetime import date
+
+import pytest
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+        reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+    ),
+]
+
+MONTH = date(2026, 9, 1)
+
+
+@pytest.fixture
+def tenant(db):
+    from apps.tenants.models import Tenant
+
+    return Tenant.objects.create(tenant_code='HR_TENANT', tenant_name='勤怠テナント', is_active=True)
+
+
+@pytest.fixture
+def staff(tenant):
+    from apps.users.models import User
+
+    def create(email, last_name):
+        return User.objects.create_user(
+            email=email, password='pass', tenant_id=tenant.id, last_name=last_name, first_name='花子',
+        )
+    return create('sato@example.com', '佐藤'), create('suzuki@example.com', '鈴木')
+
+
+def _attendance(tenant, user, day, status, work_minutes=0, overtime_minutes=0):
+    from apps.hr.models import HRAttendance
+
+    return HRAttendance.objects.create(
+        tenant_id=tenant.id, user=user, date=day, status=status,
+        work_minutes=work_minutes, overtime_minutes=overtime_minutes, break_minutes=60,
+    )
+
+
+@pytest.fixture
+def attendances(tenant, staff):
+    sato, suzuki = staff
+    _attendance(tenant, sato, date(2026, 9, 1), 'completed', 480, 30)
+    _attendance(tenant, sato, date(2026, 9, 2), 'completed', 420)
+    _attendance(tenant, sato, date(2026, 9, 3), 'absent')
+    _attendance(tenant, suzuki, date(2026, 9, 1), 'leave')
+    # 翌月の勤怠は集計しない
+    _attendance(tenant, suzuki, date(2026, 10, 1), 'completed', 480)
+
+
+def test_aggregate_month_groups_all_staff_in_one_query(tenant, staff, attendances, django_assert_num_queries):
+    """テナント全体のユーザー別集計を1回のクエリで求める"""
+    from apps.hr.services.attendance_rollup import aggregate_month
+
+    sato, suzuki = staff
+    with django_assert_num_queries(1):
+        rows = {row['user_id']: row for row in aggregate_month(tenant.id, MONTH, with_user=True)}
+
+    assert rows[sato.id]['work_days'] == 2
+    assert rows[sato.id]['absent_days'] == 1
+    assert rows[sato.id]['total_work_minutes'] == 900
+    assert rows[sato.id]['total_overtime_minutes'] == 30
+    assert rows[sato.id]['total_break_minutes'] == 180
+    assert rows[suzuki.id]['leave_days'] == 1
+    assert rows[suzuki.id]['total_work_minutes'] == 0
+    assert rows[suzuki.id]['last_name'] == '鈴木'
+
+
+def test_closed_month_keeps_materialized_totals(tenant, staff, attendances):
+    """締め済みの月は保持した集計を返し、締め後の修正は締めを解除するまで反映しない"""
+    from apps.hr.services.attendance_rollup import close_month, monthly_rows, reopen_month
+
+    sato, _ = staff
+    assert close_month(tenant.id, MONTH) == 2
+    # 締め済みのユーザーは締め直しても変更しない
+    assert close_month(tenant.id, MONTH) == 0
+
+    _attendance(tenant, sato, date(2026, 9, 4), 'completed', 480)
+    rows = {row['user_id']: row for row in monthly_rows(tenant.id, MONTH)}
+    assert rows[sato.id]['work_days'] == 2
+    assert rows[sato.id]['is_closed'] is True
+
+    reopen_month(tenant.id, MONTH)
+    rows = {row['user_id']: row for row in monthly_rows(tenant.id, MONTH)}
+    assert rows[sato.id]['work_days'] == 3
+    assert rows[sato.id]['is_closed'] is False
+
+
+def test_timesheet_csv_streams_daily_rows(tenant, staff, attendances):
+    """勤務表CSVは BOM・見出し・日別の行を順に返す"""
+    from apps.hr.services.attendance_rollup import iter_timesheet_csv
+
+    lines = list(iter_timesheet_csv(tenant.id, MONTH))
+    assert lines[0] == '\ufeff'
+    assert lines[1].startswith('メールアドレス,氏名,日付')
+    body = lines[2:]
+    assert len(body) == 4
+    assert body[0].startswith('sato@example.com,佐藤 花子,2026-09-01,退勤済')
+    assert body[-1].startswith('suzuki@example.com,鈴木 花子,2026-09-01,休暇')
+
+    with pytest.raises(ValueError):
+        iter_timesheet_csv(tenant.id, MONTH, kind='weekly')
+
+
+def test_closed_month_includes_staff_without_snapshot(tenant, staff, attendances):
+    """締め後に勤怠を登録したスタッフは、締めた行と合わせてその場の集計を返す"""
+    from apps.hr.services.attendance_rollup import close_month, monthly_rows
+    from apps.users.models import User
+
+    close_month(tenant.id, MONTH)
+    tanaka = User.objects.create_user(
+        email='tanaka@example.com', password='pass', tenant_id=tenant.id, last_name='田中', first_name='花子',
+    )
+    _attendance(tenant, tanaka, date(2026, 9, 10), 'completed', 300)
+
+    rows = {row['user_id']: row for row in monthly_rows(tenant.id, MONTH)}
+    assert set(rows) == {*(user.id for user in staff), tanaka.id}
+    assert rows[staff[0].id]['is_closed'] is True
+    assert rows[tanaka.id]['is_closed'] is False
+    assert rows[tanaka.id]['total_work_minutes'] == 300
+
+
+def test_school_manager_sees_only_own_schools(tenant, staff, attendances):
+    """校舎責任者は担当校舎のスタッフの勤怠のみ"""
+    from apps.hr.services.attendance_rollup import (
+        iter_timesheet_csv, manager_school_ids, monthly_rows, school_staff_user_ids,
+    )
+    from apps.schools.models import School
+    from apps.tenants.models import Employee
+    from apps.users.models import User
+
+    sato, suzuki = staff
+    own, other = (
+        School.objects.create(tenant_ref=tenant, school_code=code, school_name=code, is_active=True)
+        for code in ('HR_OWN', 'HR_OTHER')
+    )
+    employee = Employee.objects.create(tenant_ref=tenant, last_name='校舎', first_name='責任者')
+    employee.schools.set([own])
+    manager = User.objects.create_user(
+        email='manager@example.com', password='pass', tenant_id=tenant.id, last_name='校舎', first_name='責任者',
+        role='SCHOOL_MANAGER', staff_id=employee.id,
+    )
+    User.objects.filter(id=sato.id).update(primary_school_id=own.id)
+    User.objects.filter(id=suzuki.id).update(primary_school_id=other.id)
+
+    assert manager_school_ids(manager) == {own.id}
+    user_ids = school_staff_user_ids(tenant.id, manager_school_ids(manager))
+    # 担当校舎の社員（責任者本人を含む）と主校舎のスタッフ
+    assert user_ids == {sato.id, manager.id}
+    assert [row['user_id'] for row in monthly_rows(tenant.id, MONTH, user_ids)] == [sato.id]
+    body = list(iter_timesheet_csv(tenant.id, MONTH, user_ids=user_ids))[2:]
+    assert len(body) == 3 and all(line.startswith('sato@example.com') for line in body)
@@ -0,0 +1,51 @@
+"""
+Schedule Conflicts Tests - 社員スケジュールの空き状況索引のテスト
+"""
+from datetime import date, time
+
+import pytest
+
+from apps.hr.services.schedule_conflicts import IntervalList, ScheduleIndex, dates_between
+
+pytestmark = pytest.mark.unit
+
+TUESDAY = date(2026, 9, 1)
+
+
+def test_interval_list_merges_and_answers_overlap_and_cover():
+    """重なり・隣接する時間帯は結合し、重なり・包含を二分探索で判定する"""
+    intervals = IntervalList()
+    for start, end in [(900, 960), (600, 720), (720, 780), (1000, 1020)]:
+        intervals.add(start, end)
+
+    assert len(intervals) == 3
+    assert intervals.covers(600, 780)
+    assert not intervals.covers(760, 800)
+    assert intervals.overlaps(770, 800)
+    assert not intervals.overlaps(780, 900)
+    assert not intervals.overlaps(960, 1000)
+    assert intervals.overlaps(1010, 1100)
+
+
+def test_free_staff_requires_duty_at_school_and_no_busy_slot():
+    """校舎での勤務時間に含まれ、予約済みの枠と重ならない社員だけを返す"""
+    index = ScheduleIndex()
+    index.add_duty('a', TUESDAY, time(13, 0), time(21, 0), 'school-1')
+    index.add_duty('b', TUESDAY, time(15, 0), time(17, 30), 'school-1')
+    index.add_duty('b', TUESDAY, time(17, 30), time(20, 0), 'school-1')
+    index.add_duty('c', TUESDAY, time(13, 0), time(21, 0), 'school-2')
+    index.add_duty('d', TUESDAY, time(13, 0), time(21, 0), 'school-1')
+    index.add_busy('d', TUESDAY, time(17, 30), time(18, 30))
+
+    free = index.free_staff([TUESDAY], time(17, 0), time(18, 0), school_id='school-1')
+    assert free == {TUESDAY: ['a', 'b']}
+
+    anywhere = index.free_staff([TUESDAY], time(17, 0), time(18, 0))
+    assert anywhere == {TUESDAY: ['a', 'b', 'c']}
+    assert index.free_staff([TUESDAY], time(17, 0), time(18, 0), employee_ids=['c', 'd']) == {TUESDAY: ['c']}
+
+
+def test_dates_between_filters_weekdays():
+    """曜日（0=月曜）で期間内の日付を絞り込む"""
+    tuesdays = dates_between(date(2026, 9, 1), date(2026, 9, 30), [1])
+    assert tuesdays == [date(2026, 9, 1), date(2026, 9, 8), date(2026, 9, 15), date(2026, 9, 22), date(2026, 9, 29)]
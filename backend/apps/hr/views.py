@@ -6,11 +6,13 @@ from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Sum, Q
-from datetime import datetime, timedelta
+from django.db.models import Q
+from datetime import date, datetime, timedelta
 
-from apps.core.permissions import IsTenantUser
+from apps.core.permissions import IsTenantUser, is_admin_user
 from apps.core.exceptions import OZAException, ErrorCode
 from .models import (
     HRAttendance,
@@ -32,6 +34,7 @@ from .serializers import (
     StaffSkillSerializer,
     StaffReviewSerializer,
 )
+from .services import attendance_rollup, schedule_conflicts
 
 
 class HRAttendanceViewSet(viewsets.ModelViewSet):
@@ -188,53 +191,114 @@ class HRAttendanceViewSet(viewsets.ModelViewSet):
         """休憩終了"""
         return Response({'message': '休憩終了しました'})
 
+    def _target_month(self, request):
+        """クエリパラメータ year / month の月初日（不正な場合は None）"""
+        today = timezone.localdate()
+        try:
+            return attendance_rollup.month_start(
+                request.query_params.get('year', today.year),
+                request.query_params.get('month', today.month),
+            )
+        except (TypeError, ValueError):
+            return None
+
     @action(detail=False, methods=['get'])
     def summary(self, request):
         """月別勤怠サマリー"""
-        year = request.query_params.get('year', timezone.localdate().year)
-        month = request.query_params.get('month', timezone.localdate().month)
+        month = self._target_month(request)
+        if month is None:
+            return Response({'error': 'year / month が不正です'}, status=status.HTTP_400_BAD_REQUEST)
         tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
 
-        queryset = HRAttendance.objects.filter(
-            tenant_id=tenant_id,
-            user=request.user,
-            date__year=year,
-            date__month=month
-        )
-
-        aggregates = queryset.aggregate(
-            total_work_minutes=Sum('work_minutes'),
-            total_overtime_minutes=Sum('overtime_minutes'),
-            total_break_minutes=Sum('break_minutes')
-        )
-
-        work_days = queryset.filter(
-            status=HRAttendance.AttendanceStatus.COMPLETED
-        ).count()
-
-        absent_days = queryset.filter(
-            status=HRAttendance.AttendanceStatus.ABSENT
-        ).count()
-
-        leave_days = queryset.filter(
-            status=HRAttendance.AttendanceStatus.LEAVE
-        ).count()
-
-        total_work_minutes = aggregates['total_work_minutes'] or 0
+        rows = attendance_rollup.monthly_rows(tenant_id, month, user_ids=[request.user.id])
+        row = rows[0] if rows else {}
+        work_days = row.get('work_days', 0)
+        total_work_minutes = row.get('total_work_minutes', 0)
 
         return Response({
             'userId': str(request.user.id),
-            'year': int(year),
-            'month': int(month),
+            'year': month.year,
+            'month': month.month,
             'totalWorkDays': work_days,
             'totalWorkMinutes': total_work_minutes,
-            'totalOvertimeMinutes': aggregates['total_overtime_minutes'] or 0,
-            'totalBreakMinutes': aggregates['total_break_minutes'] or 0,
-            'absentDays': absent_days,
-            'leaveDays': leave_days,
-            'averageWorkMinutes': total_work_minutes // work_days if work_days > 0 else 0
+            'totalOvertimeMinutes': row.get('total_overtime_minutes', 0),
+            'totalBreakMinutes': row.get('total_break_minutes', 0),
+            'absentDays': row.get('absent_days', 0),
+            'leaveDays': row.get('leave_days', 0),
+            'averageWorkMinutes': total_work_minutes // work_days if work_days > 0 else 0,
+            'isClosed': row.get('is_closed', False),
         })
 
+    @action(detail=False, methods=['get'])
+    def team_summary(self, request):
+        """月別勤怠サマリー（テナントの全スタッフ）"""
+        if not _can_view_team(request.user):
+            return Response({'error': 'スタッフ全体の勤怠を参照する権限がありません'}, status=status.HTTP_403_FORBIDDEN)
+        month = self._target_month(request)
+        if month is None:
+            return Response({'error': 'year / month が不正です'}, status=status.HTTP_400_BAD_REQUEST)
+        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
+
+        rows = attendance_rollup.monthly_rows(tenant_id, month, _team_user_ids(request.user, tenant_id))
+        return Response({
+            'year': month.year,
+            'month': month.month,
+            'isClosed': any(row['is_closed'] for row in rows),
+            'staff': [
+                {
+                    'userId': str(row['user_id']),
+                    'email': row['email'],
+                    'name': f"{row['last_name']} {row['first_name']}".strip(),
+                    'totalWorkDays': row['work_days'],
+                    'workingDays': row['working_days'],
+                    'absentDays': row['absent_days'],
+                    'leaveDays': row['leave_days'],
+                    'holidayDays': row['holiday_days'],
+                    'approvedDays': row['approved_days'],
+                    'totalWorkMinutes': row['total_work_minutes'],
+                    'totalOvertimeMinutes': row['total_overtime_minutes'],
+                    'totalBreakMinutes': row['total_break_minutes'],
+                    'totalLateMinutes': row['total_late_minutes'],
+                    'totalEarlyLeaveMinutes': row['total_early_leave_minutes'],
+                }
+                for row in rows
+            ],
+        })
+
+    @action(detail=False, methods=['get'])
+    def timesheet(self, request):
+        """勤務表CSV（給与計算用。kind=daily: 日別 / summary: 月次集計）"""
+        if not _can_view_team(request.user):
+            return Response({'error': 'スタッフ全体の勤怠を参照する権限がありません'}, status=status.HTTP_403_FORBIDDEN)
+        month = self._target_month(request)
+        if month is None:
+            return Response({'error': 'year / month が不正です'}, status=status.HTTP_400_BAD_REQUEST)
+        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
+        kind = request.query_params.get('kind', 'daily')
+
+        try:
+            lines = attendance_rollup.iter_timesheet_csv(
+                tenant_id, month, kind, user_ids=_team_user_ids(request.user, tenant_id)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(lines, content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="timesheet_{kind}_{month:%Y%m}.csv"'
+        return response
+
+
+def _can_view_team(user):
+    """スタッフ全体の勤怠（給与計算用）を参照できるか"""
+    return is_admin_user(user) or getattr(user, 'role', None) == 'SCHOOL_MANAGER'
+
+
+def _team_user_ids(user, tenant_id):
+    """参照できるスタッフ（管理者はテナント全体 = None、校舎責任者は担当校舎のスタッフのみ）"""
+    if is_admin_user(user):
+        return None
+    return attendance_rollup.school_staff_user_ids(tenant_id, attendance_rollup.manager_school_ids(user))
+
 
 class StaffAvailabilityViewSet(viewsets.ModelViewSet):
     """社員空き時間ビューセット"""
@@ -295,7 +359,23 @@ class StaffAvailabilityViewSet(viewsets.ModelViewSet):
                     message='社員情報が見つかりません'
                 )
 
-        serializer.save(tenant_id=tenant_id, employee_id=employee_id)
+        data = serializer.validated_data
+        with transaction.atomic():
+            schedule_conflicts.check_availability(employee_id, data['date'], data['start_time'], data['end_time'])
+            serializer.save(tenant_id=tenant_id, employee_id=employee_id)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        data = serializer.validated_data
+        with transaction.atomic():
+            schedule_conflicts.check_availability(
+                instance.employee_id,
+                data.get('date', instance.date),
+                data.get('start_time', instance.start_time),
+                data.get('end_time', instance.end_time),
+                exclude_id=instance.id,
+            )
+            serializer.save()
 
     @action(detail=False, methods=['get'])
     def my_schedule(self, request):
@@ -333,31 +413,15 @@ class StaffAvailabilityViewSet(viewsets.ModelViewSet):
         """空き時間を予約"""
         availability = self.get_object()
 
-        if not availability.is_bookable:
-            raise OZAException(
-                error_code=ErrorCode.VALIDATION_ERROR,
-                message='この枠は予約できません'
-            )
-
-        student_id = request.data.get('student_id')
-        student_item_id = request.data.get('student_item_id')
-        request_message = request.data.get('request_message', '')
-
-        booking = StaffAvailabilityBooking.objects.create(
-            tenant_id=availability.tenant_id,
-            availability=availability,
-            student_id=student_id,
-            student_item_id=student_item_id,
-            request_message=request_message,
-            status=StaffAvailabilityBooking.BookingStatus.PENDING
+        # 枠の行をロックして定員・生徒の重複を確認してから予約
+        booking = schedule_conflicts.book_availability(
+            availability.id,
+            availability.tenant_id,
+            student_id=request.data.get('student_id'),
+            student_item_id=request.data.get('student_item_id'),
+            request_message=request.data.get('request_message', ''),
         )
 
-        # 予約数を更新
-        availability.current_bookings += 1
-        if availability.current_bookings >= availability.capacity:
-            availability.status = StaffAvailability.SlotStatus.BOOKED
-        availability.save()
-
         return Response({
             'id': str(booking.id),
             'status': booking.status,
@@ -414,11 +478,7 @@ class StaffAvailabilityBookingViewSet(viewsets.ModelViewSet):
         booking.save()
 
         # 空き時間の予約数を減らす
-        availability = booking.availability
-        availability.current_bookings = max(0, availability.current_bookings - 1)
-        if availability.status == StaffAvailability.SlotStatus.BOOKED:
-            availability.status = StaffAvailability.SlotStatus.AVAILABLE
-        availability.save()
+        schedule_conflicts.release_booking(booking)
 
         return Response({'message': 'キャンセルしました'})
 
@@ -470,7 +530,25 @@ class StaffWorkScheduleViewSet(viewsets.ModelViewSet):
                     message='社員情報が見つかりません'
                 )
 
-        serializer.save(tenant_id=tenant_id, employee_id=employee_id)
+        data = serializer.validated_data
+        with transaction.atomic():
+            schedule_conflicts.check_work_schedule(
+                employee_id, data['date'], data['planned_start'], data['planned_end']
+            )
+            serializer.save(tenant_id=tenant_id, employee_id=employee_id)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        data = serializer.validated_data
+        with transaction.atomic():
+            schedule_conflicts.check_work_schedule(
+                instance.employee_id,
+                data.get('date', instance.date),
+                data.get('planned_start', instance.planned_start),
+                data.get('planned_end', instance.planned_end),
+                exclude_id=instance.id,
+            )
+            serializer.save()
 
     @action(detail=False, methods=['get'])
     def my_schedule(self, request):
@@ -531,6 +609,60 @@ class StaffWorkScheduleViewSet(viewsets.ModelViewSet):
 
         return Response(result)
 
+    @action(detail=False, methods=['get'])
+    def free_staff(self, request):
+        """
+        指定の時間帯に空いている社員を日ごとに取得
+
+        勤務スケジュールがその時間帯を含み、予約済み・ブロック中の空き時間と重ならない社員。
+        クエリパラメータ: start_time, end_time（HH:MM、必須）, start_date, end_date（省略時は今月）,
+        weekdays（0=月曜〜6=日曜、カンマ区切り）, school_id, employee_id（カンマ区切り）
+        """
+        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
+        params = request.query_params
+        today = timezone.localdate()
+        try:
+            start_time = schedule_conflicts.parse_time(params['start_time'])
+            end_time = schedule_conflicts.parse_time(params['end_time'])
+            date_from = date.fromisoformat(params['start_date']) if params.get('start_date') else today.replace(day=1)
+            date_to = (
+                date.fromisoformat(params['end_date']) if params.get('end_date')
+                else (date_from.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            )
+            weekdays = [int(w) for w in params['weekdays'].split(',')] if params.get('weekdays') else None
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'start_time / end_time（HH:MM）と日付・曜日の指定を確認してください'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if date_to < date_from or (date_to - date_from).days > 366:
+            return Response({'error': '期間は1年以内で指定してください'}, status=status.HTTP_400_BAD_REQUEST)
+
+        school_id = params.get('school_id') or None
+        employee_ids = params['employee_id'].split(',') if params.get('employee_id') else None
+        index = schedule_conflicts.ScheduleIndex.load(
+            tenant_id, date_from, date_to, school_id=school_id, employee_ids=employee_ids
+        )
+        free = index.free_staff(
+            schedule_conflicts.dates_between(date_from, date_to, weekdays),
+            start_time, end_time, school_id=school_id, employee_ids=employee_ids,
+        )
+
+        from apps.tenants.models import Employee
+        names = {
+            str(e['id']): f"{e['last_name']} {e['first_name']}"
+            for e in Employee.objects.filter(
+                id__in={employee_id for ids in free.values() for employee_id in ids}
+            ).values('id', 'last_name', 'first_name')
+        }
+        return Response([
+            {
+                'date': day.isoformat(),
+                'employees': [{'id': employee_id, 'name': names.get(employee_id, '')} for employee_id in ids],
+            }
+            for day, ids in free.items()
+        ])
+
 
 class StaffProfileViewSet(viewsets.ModelViewSet):
     """講師プロフィールビューセット"""
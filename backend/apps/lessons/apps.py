@@ -5,3 +5,7 @@ class LessonsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.lessons'
     verbose_name = 'レッスン'
+
+    def ready(self):
+        # シグナルをインポートして登録
+        import apps.lessons.signals  # noqa: F401
@@ -0,0 +1,21 @@
+"""
+キオスク用の校舎スナップショット（当日の授業・QRコード対応）を事前構築
+"""
+from django.core.management.base import BaseCommand
+
+from apps.lessons.services.kiosk import KioskService
+
+
+class Command(BaseCommand):
+    help = 'キオスク用の校舎スナップショットを事前構築'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant-id',
+            type=str,
+            help='対象テナントID（省略時は全テナント）'
+        )
+
+    def handle(self, *args, **options):
+        count = KioskService.prewarm(tenant_id=options.get('tenant_id'))
+        self.stdout.write(self.style.SUCCESS(f'{count}校舎のスナップショットを構築しました'))
@@ -0,0 +1,53 @@
+"""
+出欠集計（日別 × 校舎・ブランド・クラス / 月別 × 生徒）を作り直す
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.lessons.services.attendance_stats import REBUILD_DAYS, AttendanceStatsService, rebuild_recent
+
+
+class Command(BaseCommand):
+    help = '出欠集計を作り直す'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant-id',
+            type=str,
+            help='対象テナントID（省略時は全テナント）'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=REBUILD_DAYS,
+            help=f'今日から遡る日数（既定: {REBUILD_DAYS}）'
+        )
+        parser.add_argument(
+            '--date-from',
+            type=str,
+            help='開始日 (YYYY-MM-DD)。指定時は --tenant-id と --date-to も必要'
+        )
+        parser.add_argument(
+            '--date-to',
+            type=str,
+            help='終了日 (YYYY-MM-DD)'
+        )
+
+    def handle(self, *args, **options):
+        tenant_id = options.get('tenant_id')
+        if options.get('date_from'):
+            if not tenant_id or not options.get('date_to'):
+                raise CommandError('--date-from を指定する場合は --tenant-id と --date-to も指定してください')
+            try:
+                date_from = date.fromisoformat(options['date_from'])
+                date_to = date.fromisoformat(options['date_to'])
+            except ValueError:
+                raise CommandError('日付は YYYY-MM-DD 形式で指定してください')
+            result = AttendanceStatsService.rebuild(tenant_id, date_from, date_to)
+        else:
+            result = rebuild_recent(tenant_id=tenant_id, days=options['days'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"出欠集計を作り直しました: 日別 {result['daily']}件, 生徒・月別 {result['monthly']}件"
+        ))
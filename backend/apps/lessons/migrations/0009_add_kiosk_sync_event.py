@@ -0,0 +1,126 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0025_add_lesson_occurrence"),
+        ("students", "0027_add_class_schedule_to_trial_booking"),
+        ("tenants", "0011_add_approval_status_to_employee"),
+        ("lessons", "0008_alter_absenceticket_tenant_id_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KioskSyncEvent",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+                ("tenant_id", models.UUIDField(db_index=True, verbose_name="会社ID")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="削除日時"
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(max_length=64, verbose_name="冪等キー"),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[("check_in", "入室"), ("check_out", "退室")],
+                        max_length=20,
+                        verbose_name="種別",
+                    ),
+                ),
+                (
+                    "occurred_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="打刻日時（端末）"
+                    ),
+                ),
+                (
+                    "result",
+                    models.CharField(
+                        choices=[
+                            ("applied", "反映済"),
+                            ("no_schedule", "該当授業なし"),
+                            ("no_check_in", "入室記録なし"),
+                            ("invalid", "不正"),
+                        ],
+                        max_length=20,
+                        verbose_name="反映結果",
+                    ),
+                ),
+                (
+                    "schedule",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="kiosk_sync_events",
+                        to="lessons.lessonschedule",
+                        verbose_name="スケジュール",
+                    ),
+                ),
+                (
+                    "school",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="kiosk_sync_events",
+                        to="schools.school",
+                        verbose_name="校舎",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="kiosk_sync_events",
+                        to="students.student",
+                        verbose_name="生徒",
+                    ),
+                ),
+                (
+                    "tenant_ref",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(app_label)s_%(class)s_set",
+                        to="tenants.tenant",
+                        verbose_name="会社",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "キオスク同期イベント",
+                "verbose_name_plural": "キオスク同期イベント",
+                "db_table": "t19b_kiosk_sync_events",
+                "unique_together": {("school", "idempotency_key")},
+            },
+        ),
+    ]
@@ -0,0 +1,195 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("students", "0027_add_class_schedule_to_trial_booking"),
+        ("schools", "0025_add_lesson_occurrence"),
+        ("tenants", "0011_add_approval_status_to_employee"),
+        ("lessons", "0009_add_kiosk_sync_event"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StudentAttendanceMonthlyStat",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+                ("tenant_id", models.UUIDField(db_index=True, verbose_name="会社ID")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="削除日時"
+                    ),
+                ),
+                (
+                    "present_count",
+                    models.IntegerField(default=0, verbose_name="出席数"),
+                ),
+                ("absent_count", models.IntegerField(default=0, verbose_name="欠席数")),
+                ("late_count", models.IntegerField(default=0, verbose_name="遅刻数")),
+                (
+                    "makeup_used_count",
+                    models.IntegerField(default=0, verbose_name="振替使用数"),
+                ),
+                (
+                    "tickets_outstanding",
+                    models.IntegerField(
+                        default=0, verbose_name="未使用の欠席チケット数"
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("month", models.DateField(help_text="月初日", verbose_name="月")),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_monthly_stats",
+                        to="students.student",
+                        verbose_name="生徒",
+                    ),
+                ),
+                (
+                    "tenant_ref",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(app_label)s_%(class)s_set",
+                        to="tenants.tenant",
+                        verbose_name="会社",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "出欠集計（生徒・月別）",
+                "verbose_name_plural": "出欠集計（生徒・月別）",
+                "db_table": "t19s_student_attendance_monthly_stats",
+                "ordering": ["month"],
+                "unique_together": {("student", "month")},
+            },
+        ),
+        migrations.CreateModel(
+            name="AttendanceDailyStat",
+            fields=[
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+                ("tenant_id", models.UUIDField(db_index=True, verbose_name="会社ID")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="削除日時"
+                    ),
+                ),
+                (
+                    "present_count",
+                    models.IntegerField(default=0, verbose_name="出席数"),
+                ),
+                ("absent_count", models.IntegerField(default=0, verbose_name="欠席数")),
+                ("late_count", models.IntegerField(default=0, verbose_name="遅刻数")),
+                (
+                    "makeup_used_count",
+                    models.IntegerField(default=0, verbose_name="振替使用数"),
+                ),
+                (
+                    "tickets_outstanding",
+                    models.IntegerField(
+                        default=0, verbose_name="未使用の欠席チケット数"
+                    ),
+                ),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="日付")),
+                (
+                    "brand",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_daily_stats",
+                        to="schools.brand",
+                        verbose_name="ブランド",
+                    ),
+                ),
+                (
+                    "class_schedule",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_daily_stats",
+                        to="schools.classschedule",
+                        verbose_name="クラス",
+                    ),
+                ),
+                (
+                    "school",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_daily_stats",
+                        to="schools.school",
+                        verbose_name="校舎",
+                    ),
+                ),
+                (
+                    "tenant_ref",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(app_label)s_%(class)s_set",
+                        to="tenants.tenant",
+                        verbose_name="会社",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "出欠集計（日別）",
+                "verbose_name_plural": "出欠集計（日別）",
+                "db_table": "t19r_attendance_daily_stats",
+                "ordering": ["date"],
+                "indexes": [
+                    models.Index(
+                        fields=["tenant_id", "date"], name="idx_att_daily_tenant_date"
+                    ),
+                    models.Index(
+                        fields=["school", "date"], name="idx_att_daily_school_date"
+                    ),
+                ],
+            },
+        ),
+    ]
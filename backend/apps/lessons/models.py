@@ -429,3 +429,139 @@ class AbsenceTicket(TenantModel):
 
     def __str__(self):
         return f"欠席チケット: {self.student} - {self.absence_date} ({self.get_status_display()})"
+
+
+class KioskSyncEvent(TenantModel):
+    """T19b: キオスク同期イベント
+
+    オフライン対応キオスクからまとめて送信された入退室打刻。
+    校舎 + 冪等キーで一意とし、再送されたイベントを二重に反映しない。
+    """
+
+    class EventType(models.TextChoices):
+        CHECK_IN = 'check_in', '入室'
+        CHECK_OUT = 'check_out', '退室'
+
+    class Result(models.TextChoices):
+        APPLIED = 'applied', '反映済'
+        NO_SCHEDULE = 'no_schedule', '該当授業なし'
+        NO_CHECK_IN = 'no_check_in', '入室記録なし'
+        INVALID = 'invalid', '不正'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        related_name='kiosk_sync_events',
+        verbose_name='校舎'
+    )
+    idempotency_key = models.CharField('冪等キー', max_length=64)
+    event_type = models.CharField('種別', max_length=20, choices=EventType.choices)
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='kiosk_sync_events',
+        verbose_name='生徒'
+    )
+    schedule = models.ForeignKey(
+        LessonSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='kiosk_sync_events',
+        verbose_name='スケジュール'
+    )
+    occurred_at = models.DateTimeField('打刻日時（端末）', null=True, blank=True)
+    result = models.CharField('反映結果', max_length=20, choices=Result.choices)
+
+    class Meta:
+        db_table = 't19b_kiosk_sync_events'
+        verbose_name = 'キオスク同期イベント'
+        verbose_name_plural = 'キオスク同期イベント'
+        unique_together = ['school', 'idempotency_key']
+
+    def __str__(self):
+        return f"{self.school_id} {self.idempotency_key} {self.get_event_type_display()} ({self.get_result_display()})"
+
+
+class AttendanceStatsCounts(models.Model):
+    """出欠集計の共通項目"""
+    present_count = models.IntegerField('出席数', default=0)
+    absent_count = models.IntegerField('欠席数', default=0)
+    late_count = models.IntegerField('遅刻数', default=0)
+    makeup_used_count = models.IntegerField('振替使用数', default=0)
+    tickets_outstanding = models.IntegerField('未使用の欠席チケット数', default=0)
+
+    class Meta:
+        abstract = True
+
+
+class AttendanceDailyStat(TenantModel, AttendanceStatsCounts):
+    """T19r: 出欠集計（日別 × 校舎・ブランド・クラス）
+
+    Attendance / AbsenceTicket の書き込み時に該当日を集計し直し、夜間に一括で作り直す。
+    LessonSchedule 側の出席記録はクラスを持たないため brand / class_schedule は空になる。
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    date = models.DateField('日付')
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_daily_stats',
+        verbose_name='校舎'
+    )
+    brand = models.ForeignKey(
+        'schools.Brand',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_daily_stats',
+        verbose_name='ブランド'
+    )
+    class_schedule = models.ForeignKey(
+        'schools.ClassSchedule',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_daily_stats',
+        verbose_name='クラス'
+    )
+
+    class Meta:
+        db_table = 't19r_attendance_daily_stats'
+        verbose_name = '出欠集計（日別）'
+        verbose_name_plural = '出欠集計（日別）'
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['tenant_id', 'date'], name='idx_att_daily_tenant_date'),
+            models.Index(fields=['school', 'date'], name='idx_att_daily_school_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.school_id} {self.class_schedule_id}"
+
+
+class StudentAttendanceMonthlyStat(TenantModel, AttendanceStatsCounts):
+    """T19s: 出欠集計（月別 × 生徒）"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    student = models.ForeignKey(
+        'students.Student',
+        on_delete=models.CASCADE,
+        related_name='attendance_monthly_stats',
+        verbose_name='生徒'
+    )
+    month = models.DateField('月', help_text='月初日')
+
+    class Meta:
+        db_table = 't19s_student_attendance_monthly_stats'
+        verbose_name = '出欠集計（生徒・月別）'
+        verbose_name_plural = '出欠集計（生徒・月別）'
+        ordering = ['month']
+        unique_together = ['student', 'month']
+
+    def __str__(self):
+        return f"{self.student_id} {self.month:%Y-%m}"
@@ -0,0 +1,8 @@
+from .kiosk import KioskService, invalidate_kiosk_snapshot
+from .kiosk_sync import KioskSyncService, build_roster
+from .makeup_search import MakeupSearchService
+
+__all__ = [
+    'KioskService', 'invalidate_kiosk_snapshot', 'KioskSyncService', 'build_roster',
+    'MakeupSearchService',
+]
@@ -0,0 +1,348 @@
+"""
+Attendance Stats Service
+出欠集計（日別 × 校舎・ブランド・クラス / 月別 × 生徒）の作成・参照
+
+ダッシュボードや生徒の成績表は Attendance / AbsenceTicket をその都度集計していた。
+ここでは集計結果を AttendanceDailyStat / StudentAttendanceMonthlyStat に保持し、
+- Attendance / AbsenceTicket の書き込み時: 該当する日・生徒の月だけを集計し直す（signals → タスク）
+- 夜間: 直近の期間をまとめて作り直す（有効期限切れによる未使用チケット数の変化を反映）
+参照側は集計済みの件数を合計するだけにする。
+
+集計の定義:
+- 出席数: Attendance の出席・遅刻・早退（遅刻数は出席数の内数）
+- 欠席数: Attendance の欠席・欠席（連絡あり） + 欠席チケット（キャンセル以外、欠席日で集計）
+- 振替使用数: 使用済みの欠席チケット（振替日・振替先クラスで集計）
+- 未使用の欠席チケット数: 発行済みで有効期限内の欠席チケット（欠席日で集計、集計時点の値）
+
+同じテナントの集計し直しが並行すると、削除 → 作成 の間に別の集計の行が入り重複するため、
+集計の前にテナントの行をロックしてテナント単位で直列に実行する。
+日別集計は校舎・ブランド・クラスが空の行を持つため一意キーでの upsert はできない。
+
+出席記録（LessonSchedule）は校舎しか持たず、ブランド・クラスを決められないため、
+Attendance 由来の行はブランド・クラスが空になる。ブランド・クラスで絞り込む・まとめる場合、
+出席数・遅刻数は集計できないので None を返し、欠席数はクラスのある欠席チケットの分だけになる。
+"""
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from apps.lessons.models import (
+    AbsenceTicket, Attendance, AttendanceDailyStat, StudentAttendanceMonthlyStat,
+)
+
+logger = logging.getLogger(__name__)
+
+# 夜間の作り直しの対象期間（欠席チケットの有効期限 90日 をカバー）
+REBUILD_DAYS = 120
+
+COUNT_FIELDS = ('present_count', 'absent_count', 'late_count', 'makeup_used_count', 'tickets_outstanding')
+# 参照時の合計（集計テーブルの項目名と重ならない名前で返す）
+TOTALS = {
+    'present': 'present_count',
+    'absent': 'absent_count',
+    'late': 'late_count',
+    'makeup_used': 'makeup_used_count',
+    'outstanding': 'tickets_outstanding',
+}
+# Attendance だけから集計する項目（ブランド・クラス単位では集計できない）
+ATTENDANCE_TOTALS = ('present', 'late')
+# 出席記録が持たない集計軸
+CLASS_DIMENSIONS = ('brand', 'class_schedule')
+GROUP_FIELDS = {
+    'date': 'date',
+    'month': 'month',
+    'school': 'school_id',
+    'brand': 'brand_id',
+    'class_schedule': 'class_schedule_id',
+}
+
+ATTENDED = Q(status__in=[
+    Attendance.Status.PRESENT, Attendance.Status.LATE, Attendance.Status.EARLY_LEAVE,
+])
+LATE = Q(status=Attendance.Status.LATE)
+ABSENT = Q(status__in=[Attendance.Status.ABSENT, Attendance.Status.ABSENT_NOTICE])
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def month_end(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def _range(field: str, dates: Optional[List[date]] = None, date_from: Optional[date] = None,
+           date_to: Optional[date] = None) -> Dict:
+    if dates is not None:
+        return {f'{field}__in': dates}
+    return {f'{field}__gte': date_from, f'{field}__lte': date_to}
+
+
+def _empty_counts() -> Dict[str, int]:
+    return dict.fromkeys(COUNT_FIELDS, 0)
+
+
+def schedule_refresh(tenant_id, dates: Iterable[Optional[date]], student_ids: Iterable = ()):
+    """
+    コミット後に該当日（と生徒の該当月）の集計を作り直す
+
+    キューが使えない場合はその場で集計する。
+    """
+    dates = sorted({d if isinstance(d, str) else d.isoformat() for d in dates if d})
+    student_ids = sorted({str(s) for s in student_ids if s})
+    if not tenant_id or not dates:
+        return
+
+    def enqueue():
+        from apps.lessons.tasks import refresh_attendance_stats_task
+
+        try:
+            refresh_attendance_stats_task.delay(str(tenant_id), dates, student_ids)
+        except Exception as e:
+            logger.warning(f"Attendance stats queue unavailable, refreshing synchronously: {e}")
+            AttendanceStatsService.refresh(tenant_id, [date.fromisoformat(d) for d in dates], student_ids)
+
+    transaction.on_commit(enqueue)
+
+
+def rebuild_recent(tenant_id=None, days: Optional[int] = None, today: Optional[date] = None) -> Dict[str, int]:
+    """直近 days 日（既定 REBUILD_DAYS）の集計を作り直す（tenant_id 省略時は全テナント）"""
+    from apps.tenants.models import Tenant
+
+    today = today or date.today()
+    date_from = today - timedelta(days=days or REBUILD_DAYS)
+    tenant_ids = [tenant_id] if tenant_id else list(Tenant.objects.values_list('id', flat=True))
+    total = {'tenants': 0, 'daily': 0, 'monthly': 0}
+    for tid in tenant_ids:
+        result = AttendanceStatsService.rebuild(tid, date_from, today)
+        total['tenants'] += 1
+        total['daily'] += result['daily']
+        total['monthly'] += result['monthly']
+    return total
+
+
+def _lock_tenant(tenant_id) -> None:
+    """テナントの集計し直しを直列にする（トランザクション内で呼ぶ）"""
+    from apps.tenants.models import Tenant
+
+    list(Tenant.objects.select_for_update().filter(id=tenant_id).values_list('id', flat=True))
+
+
+class AttendanceStatsService:
+    """出欠集計の作成・参照"""
+
+    # ----------------------------------------
+    # 作成
+    # ----------------------------------------
+
+    @classmethod
+    def refresh(cls, tenant_id, dates: Iterable[date], student_ids: Iterable = ()) -> None:
+        """書き込みのあった日と、生徒のその月の集計を作り直す"""
+        dates = sorted(set(dates))
+        if not dates:
+            return
+        cls.refresh_daily(tenant_id, dates=dates)
+        student_ids = [s for s in student_ids if s]
+        if student_ids:
+            cls.refresh_student_monthly(
+                tenant_id, month_start(dates[0]), month_end(dates[-1]), student_ids=student_ids
+            )
+
+    @classmethod
+    def rebuild(cls, tenant_id, date_from: date, date_to: date) -> Dict[str, int]:
+        """期間内の集計をすべて作り直す（夜間ジョブ用）"""
+        month_from, month_to = month_start(date_from), month_end(date_to)
+        return {
+            'daily': cls.refresh_daily(tenant_id, date_from=date_from, date_to=date_to),
+            'monthly': cls.refresh_student_monthly(tenant_id, month_from, month_to),
+        }
+
+    @classmethod
+    def refresh_daily(cls, tenant_id, dates: Optional[List[date]] = None,
+                      date_from: Optional[date] = None, date_to: Optional[date] = None) -> int:
+        """日別 × 校舎・ブランド・クラス の集計を作り直す（dates か date_from〜date_to を指定）"""
+        with transaction.atomic():
+            _lock_tenant(tenant_id)
+            stats = cls._daily_stats(tenant_id, dates, date_from, date_to)
+            AttendanceDailyStat.objects.filter(
+                tenant_id=tenant_id, **_range('date', dates, date_from, date_to)
+            ).delete()
+            AttendanceDailyStat.objects.bulk_create(stats, batch_size=1000)
+        return len(stats)
+
+    @staticmethod
+    def _daily_stats(tenant_id, dates, date_from, date_to) -> List[AttendanceDailyStat]:
+        today = date.today()
+        rows = defaultdict(_empty_counts)
+
+        for r in Attendance.objects.filter(
+            tenant_id=tenant_id, deleted_at__isnull=True,
+            **_range('schedule__date', dates, date_from, date_to),
+        ).values('schedule__date', 'schedule__school_id').annotate(
+            present=Count('id', filter=ATTENDED),
+            late=Count('id', filter=LATE),
+            absent=Count('id', filter=ABSENT),
+        ):
+            counts = rows[(r['schedule__date'], r['schedule__school_id'], None, None)]
+            counts['present_count'] += r['present']
+            counts['late_count'] += r['late']
+            counts['absent_count'] += r['absent']
+
+        tickets = AbsenceTicket.objects.filter(tenant_id=tenant_id, deleted_at__isnull=True)
+        for r in tickets.filter(**_range('absence_date', dates, date_from, date_to)).exclude(
+            status=AbsenceTicket.Status.CANCELLED
+        ).values(
+            'absence_date', 'class_schedule__school_id', 'class_schedule__brand_id', 'class_schedule_id'
+        ).annotate(
+            absent=Count('id'),
+            outstanding=Count('id', filter=Q(status=AbsenceTicket.Status.ISSUED, valid_until__gte=today)),
+        ):
+            counts = rows[(r['absence_date'], r['class_schedule__school_id'],
+                           r['class_schedule__brand_id'], r['class_schedule_id'])]
+            counts['absent_count'] += r['absent']
+            counts['tickets_outstanding'] += r['outstanding']
+
+        for r in tickets.filter(
+            status=AbsenceTicket.Status.USED, **_range('used_date', dates, date_from, date_to)
+        ).values(
+            'used_date', 'used_class_schedule__school_id', 'used_class_schedule__brand_id', 'used_class_schedule_id'
+        ).annotate(used=Count('id')):
+            counts = rows[(r['used_date'], r['used_class_schedule__school_id'],
+                           r['used_class_schedule__brand_id'], r['used_class_schedule_id'])]
+            counts['makeup_used_count'] += r['used']
+
+        return [
+            AttendanceDailyStat(
+                tenant_id=tenant_id,
+                date=stat_date,
+                school_id=school_id,
+                brand_id=brand_id,
+                class_schedule_id=class_schedule_id,
+                **counts,
+            )
+            for (stat_date, school_id, brand_id, class_schedule_id), counts in rows.items()
+        ]
+
+    @classmethod
+    def refresh_student_monthly(cls, tenant_id, month_from: date, month_to: date,
+                                student_ids: Optional[List] = None) -> int:
+        """月別 × 生徒 の集計を作り直す（student_ids 省略時はテナント全体）"""
+        month_from, month_to = month_start(month_from), month_end(month_to)
+        students = {'student_id__in': student_ids} if student_ids is not None else {}
+        with transaction.atomic():
+            _lock_tenant(tenant_id)
+            stats = cls._monthly_stats(tenant_id, month_from, month_to, students)
+            # (生徒, 月) の一意キーで upsert し、集計対象がなくなった行のみ削除する
+            keys = {(stat.student_id, stat.month) for stat in stats}
+            stale = [
+                pk for pk, student_id, month in StudentAttendanceMonthlyStat.objects.filter(
+                    tenant_id=tenant_id, month__gte=month_from, month__lte=month_to, **students
+                ).values_list('id', 'student_id', 'month')
+                if (student_id, month) not in keys
+            ]
+            StudentAttendanceMonthlyStat.objects.filter(id__in=stale).delete()
+            StudentAttendanceMonthlyStat.objects.bulk_create(
+                stats,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['student', 'month'],
+                update_fields=[*COUNT_FIELDS, 'updated_at'],
+            )
+        return len(stats)
+
+    @staticmethod
+    def _monthly_stats(tenant_id, month_from, month_to, students) -> List[StudentAttendanceMonthlyStat]:
+        today = date.today()
+        rows = defaultdict(_empty_counts)
+
+        for r in Attendance.objects.filter(
+            tenant_id=tenant_id, deleted_at__isnull=True,
+            schedule__date__gte=month_from, schedule__date__lte=month_to, **students,
+        ).annotate(month=TruncMonth('schedule__date')).values('student_id', 'month').annotate(
+            present=Count('id', filter=ATTENDED),
+            late=Count('id', filter=LATE),
+            absent=Count('id', filter=ABSENT),
+        ):
+            counts = rows[(r['student_id'], r['month'])]
+            counts['present_count'] += r['present']
+            counts['late_count'] += r['late']
+            counts['absent_count'] += r['absent']
+
+        tickets = AbsenceTicket.objects.filter(tenant_id=tenant_id, deleted_at__isnull=True, **students)
+        for r in tickets.filter(absence_date__gte=month_from, absence_date__lte=month_to).exclude(
+            status=AbsenceTicket.Status.CANCELLED
+        ).annotate(month=TruncMonth('absence_date')).values('student_id', 'month').annotate(
+            absent=Count('id'),
+            outstanding=Count('id', filter=Q(status=AbsenceTicket.Status.ISSUED, valid_until__gte=today)),
+        ):
+            counts = rows[(r['student_id'], r['month'])]
+            counts['absent_count'] += r['absent']
+            counts['tickets_outstanding'] += r['outstanding']
+
+        for r in tickets.filter(
+            status=AbsenceTicket.Status.USED, used_date__gte=month_from, used_date__lte=month_to,
+        ).annotate(month=TruncMonth('used_date')).values('student_id', 'month').annotate(used=Count('id')):
+            rows[(r['student_id'], r['month'])]['makeup_used_count'] += r['used']
+
+        return [
+            StudentAttendanceMonthlyStat(tenant_id=tenant_id, student_id=student_id, month=month, **counts)
+            for (student_id, month), counts in rows.items()
+        ]
+
+    # ----------------------------------------
+    # 参照
+    # ----------------------------------------
+
+    @staticmethod
+    def summarize(tenant_id, date_from: date, date_to: date, group_by: str = 'school',
+                  school_id=None, brand_id=None, class_schedule_id=None) -> List[Dict]:
+        """
+        期間内の集計を group_by（date / month / school / brand / class_schedule）ごとに合計
+
+        ブランド・クラスで絞り込む・まとめる場合、出席数・遅刻数は None、
+        欠席数はクラスのある欠席チケットの分のみ（出席記録はブランド・クラスを持たないため）
+
+        Raises:
+            ValueError: group_by が不正
+        """
+        if group_by not in GROUP_FIELDS:
+            raise ValueError(f'group_by は {", ".join(GROUP_FIELDS)} のいずれかを指定してください')
+        stats = AttendanceDailyStat.objects.filter(
+            tenant_id=tenant_id, date__gte=date_from, date__lte=date_to
+        )
+        if school_id:
+            stats = stats.filter(school_id=school_id)
+        if brand_id:
+            stats = stats.filter(brand_id=brand_id)
+        if class_schedule_id:
+            stats = stats.filter(class_schedule_id=class_schedule_id)
+        if group_by == 'month':
+            stats = stats.annotate(month=TruncMonth('date'))
+        by_class = group_by in CLASS_DIMENSIONS or bool(brand_id or class_schedule_id)
+        if by_class:
+            # クラスが空の行は出席記録（またはクラスのない欠席チケット）の分なので除く
+            stats = stats.filter(class_schedule__isnull=False)
+        key = GROUP_FIELDS[group_by]
+        totals = {
+            name: Sum(f) for name, f in TOTALS.items() if not (by_class and name in ATTENDANCE_TOTALS)
+        }
+        rows = list(stats.values(key).annotate(**totals).order_by(key))
+        if by_class:
+            for row in rows:
+                row.update(dict.fromkeys(ATTENDANCE_TOTALS))
+        return rows
+
+    @staticmethod
+    def student_months(tenant_id, student_id, month_from: date, month_to: date) -> List[StudentAttendanceMonthlyStat]:
+        """生徒の月別集計（テナント外の生徒は空）"""
+        return list(StudentAttendanceMonthlyStat.objects.filter(
+            tenant_id=tenant_id,
+            student_id=student_id,
+            month__gte=month_start(month_from),
+            month__lte=month_start(month_to),
+        ).order_by('month'))
@@ -0,0 +1,359 @@
+"""
+Kiosk Service
+キオスク打刻の高速経路（校舎の当日スナップショットと出席の書き込み）
+
+従来の入室打刻は 生徒 → ユーザー → 校舎 → 当日の授業（group_enrollments の OR + distinct）
+→ Attendance の get_or_create を1件ずつ順に発行しており、夕方に打刻が集中すると
+キオスクの応答が遅くなり、DBが一時的に詰まると打刻そのものが失敗していた。
+
+- 校舎ごとに当日の授業（開始・終了時刻と受講生徒ID）と QRコード → 生徒 の対応を
+  スナップショットとしてキャッシュ（Redis）とプロセス内メモリに保持する
+- スナップショットは朝の定期ジョブ（tasks.prewarm_kiosk_snapshots_task）で事前構築し、
+  授業・集団授業の受講者・生徒の変更時にバージョンを更新して作り直す（signals.py 参照）
+- 出席の書き込みはその場で行う（直後の退室打刻が入室の記録を参照するため）。
+  DBが一時的に応答しない場合のみ Celery タスク（tasks.record_kiosk_check_in_task）に渡して再試行する
+"""
+import hashlib
+import hmac
+import logging
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.lessons.models import Attendance, GroupLessonEnrollment, LessonSchedule
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'kiosk_snapshot:'
+CACHE_TIMEOUT = 60 * 60
+# 全校舎のバージョン
+GLOBAL_VERSION_KEY = f'{CACHE_PREFIX}version'
+SCHOOL_VERSION_PREFIX = f'{CACHE_PREFIX}school_version:'
+
+# プロセス内に保持する時間（秒）と件数
+LOCAL_TTL_SECONDS = 30
+LOCAL_MAX_ENTRIES = 64
+
+# 打刻可能範囲: 授業開始の15分前〜授業終了
+CHECK_IN_MARGIN = timedelta(minutes=15)
+ACTIVE_SCHEDULE_STATUSES = ('scheduled', 'confirmed', 'in_progress')
+
+_local_snapshots: Dict[str, tuple] = {}
+
+
+def _bump(key):
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+    except Exception as e:
+        logger.warning(f"Failed to bump kiosk snapshot version {key}: {e}")
+
+
+def invalidate_kiosk_snapshot(school_id=None):
+    """
+    スナップショットを無効化
+
+    Args:
+        school_id: 指定時はその校舎のみ、省略時は全校舎
+
+    トランザクション内ではコミット後に無効化する（コミット前に読んだ古い内容が
+    新しいバージョンでキャッシュされないように）
+    """
+    key = f'{SCHOOL_VERSION_PREFIX}{school_id}' if school_id else GLOBAL_VERSION_KEY
+    transaction.on_commit(lambda: _bump(key))
+
+
+def student_school_ids(student_id, primary_school_ids=()) -> set:
+    """
+    生徒が載るスナップショットの校舎ID
+
+    主校舎（変更前を含む）と、当日以降に受講する授業（個別・集団）の校舎
+    """
+    school_ids = {i for i in primary_school_ids if i}
+    school_ids.update(LessonSchedule.objects.filter(
+        Q(student_id=student_id) | Q(enrollments__student_id=student_id, enrollments__deleted_at__isnull=True),
+        date__gte=timezone.localdate(),
+        deleted_at__isnull=True,
+    ).order_by().values_list('school_id', flat=True).distinct())
+    return school_ids
+
+
+def _cache_key(school_id, target_date: date) -> Optional[str]:
+    school_version_key = f'{SCHOOL_VERSION_PREFIX}{school_id}'
+    try:
+        versions = cache.get_many([GLOBAL_VERSION_KEY, school_version_key])
+    except Exception as e:
+        logger.warning(f"Kiosk snapshot cache unavailable: {e}")
+        return None
+    return (
+        f'{CACHE_PREFIX}{school_id}:{target_date.isoformat()}:'
+        f'{versions.get(GLOBAL_VERSION_KEY, 0)}:{versions.get(school_version_key, 0)}'
+    )
+
+
+def kiosk_token_for(school_id) -> str:
+    """校舎のキオスクトークン"""
+    # 簡易的な検証（本番では環境変数等でシークレットを管理）
+    secret = getattr(settings, 'KIOSK_SECRET_KEY', 'oz-kiosk-secret-2024')
+    return hmac.new(
+        secret.encode(),
+        f"kiosk:{school_id}".encode(),
+        hashlib.sha256
+    ).hexdigest()[:32]
+
+
+def verify_kiosk_token(school_id, token: str) -> bool:
+    """キオスクトークンを検証"""
+    return hmac.compare_digest(token, kiosk_token_for(school_id))
+
+
+def normalize_qr_code(qr_code) -> Optional[str]:
+    """QRコードを正規化（UUIDとして不正な場合は None）"""
+    try:
+        return str(uuid.UUID(str(qr_code).strip()))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _student_entry(student_id, full_name, student_no) -> Dict:
+    return {'id': str(student_id), 'full_name': full_name, 'student_no': student_no}
+
+
+class KioskService:
+    """キオスク打刻の高速経路"""
+
+    # ----------------------------------------
+    # スナップショット
+    # ----------------------------------------
+
+    @staticmethod
+    def build_snapshot(school_id, target_date: date) -> Optional[Dict]:
+        """
+        校舎の当日スナップショットを構築（校舎が存在しなければ None）
+
+        Returns:
+            {
+                'school_id', 'tenant_id', 'date',
+                'schedules': [{id, tenant_id, start_time, end_time, class_name, student_ids}],
+                'students': {qr_code: {id, full_name, student_no}},
+            }
+        """
+        from apps.schools.models import School
+        from apps.students.models import Student
+
+        school = School.objects.filter(id=school_id, deleted_at__isnull=True).values('id', 'tenant_id').first()
+        if school is None:
+            return None
+
+        schedules = list(LessonSchedule.objects.filter(
+            school_id=school_id,
+            date=target_date,
+            status__in=ACTIVE_SCHEDULE_STATUSES,
+            deleted_at__isnull=True,
+        ).select_related('subject').order_by('start_time'))
+
+        roster = {s.id: {s.student_id} if s.student_id else set() for s in schedules}
+        for schedule_id, student_id in GroupLessonEnrollment.objects.filter(
+            schedule_id__in=roster.keys(),
+            deleted_at__isnull=True,
+        ).values_list('schedule_id', 'student_id'):
+            roster[schedule_id].add(student_id)
+
+        student_ids = set().union(*roster.values()) if roster else set()
+        students = {}
+        for student_id, qr_code, last_name, first_name, student_no in Student.objects.filter(
+            Q(id__in=student_ids) | Q(primary_school_id=school_id),
+            deleted_at__isnull=True,
+        ).values_list('id', 'qr_code', 'last_name', 'first_name', 'student_no'):
+            students[str(qr_code)] = _student_entry(student_id, f"{last_name} {first_name}", student_no)
+
+        return {
+            'school_id': str(school['id']),
+            'tenant_id': str(school['tenant_id']),
+            'date': target_date.isoformat(),
+            'schedules': [
+                {
+                    'id': str(s.id),
+                    'tenant_id': str(s.tenant_id),
+                    'start_time': s.start_time.strftime('%H:%M:%S'),
+                    'end_time': s.end_time.strftime('%H:%M:%S'),
+                    'class_name': s.class_name or (s.subject.subject_name if s.subject else ''),
+                    'student_ids': sorted(str(i) for i in roster[s.id]),
+                }
+                for s in schedules
+            ],
+            'students': students,
+        }
+
+    @classmethod
+    def get_snapshot(cls, school_id, target_date: Optional[date] = None) -> Optional[Dict]:
+        """校舎の当日スナップショット（プロセス内 → キャッシュ → 構築 の順に参照）"""
+        target_date = target_date or timezone.localdate()
+        key = _cache_key(school_id, target_date)
+
+        if key:
+            local = _local_snapshots.get(key)
+            if local and local[0] > time.monotonic():
+                return local[1]
+            try:
+                snapshot = cache.get(key)
+            except Exception:
+                snapshot = None
+            if snapshot is not None:
+                cls._remember(key, snapshot)
+                return snapshot
+
+        snapshot = cls.build_snapshot(school_id, target_date)
+        if snapshot is not None and key:
+            try:
+                cache.set(key, snapshot, CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to cache kiosk snapshot: {e}")
+            cls._remember(key, snapshot)
+        return snapshot
+
+    @staticmethod
+    def _remember(key, snapshot):
+        if len(_local_snapshots) >= LOCAL_MAX_ENTRIES:
+            now = time.monotonic()
+            for stale in [k for k, (expires, _) in _local_snapshots.items() if expires <= now]:
+                _local_snapshots.pop(stale, None)
+            if len(_local_snapshots) >= LOCAL_MAX_ENTRIES:
+                _local_snapshots.clear()
+        _local_snapshots[key] = (time.monotonic() + LOCAL_TTL_SECONDS, snapshot)
+
+    @classmethod
+    def prewarm(cls, tenant_id=None, target_date: Optional[date] = None) -> int:
+        """有効な全校舎のスナップショットを事前構築（定期ジョブ用）"""
+        from apps.schools.models import School
+
+        target_date = target_date or timezone.localdate()
+        schools = School.objects.filter(is_active=True, deleted_at__isnull=True)
+        if tenant_id:
+            schools = schools.filter(tenant_id=tenant_id)
+        count = 0
+        for school_id in schools.values_list('id', flat=True):
+            # 作り直すため即時に無効化（書き込みではないのでコミットを待たない）
+            _bump(f'{SCHOOL_VERSION_PREFIX}{school_id}')
+            if cls.get_snapshot(school_id, target_date) is not None:
+                count += 1
+        return count
+
+    # ----------------------------------------
+    # 参照
+    # ----------------------------------------
+
+    @staticmethod
+    def find_student(snapshot: Optional[Dict], qr_code) -> Optional[Dict]:
+        """
+        QRコードから生徒を特定（スナップショットになければDBを参照）
+
+        Returns:
+            {id, full_name, student_no}（見つからなければ None）
+        """
+        from apps.students.models import Student
+
+        normalized = normalize_qr_code(qr_code)
+        if normalized is None:
+            return None
+        if snapshot:
+            entry = snapshot['students'].get(normalized)
+            if entry:
+                return entry
+        row = Student.objects.filter(qr_code=normalized, deleted_at__isnull=True).values_list(
+            'id', 'last_name', 'first_name', 'student_no'
+        ).first()
+        if row is None:
+            return None
+        student_id, last_name, first_name, student_no = row
+        return _student_entry(student_id, f"{last_name} {first_name}", student_no)
+
+    @staticmethod
+    def find_guardian_user(qr_code):
+        """QRコードからユーザー（保護者）を特定"""
+        from apps.users.models import User
+
+        normalized = normalize_qr_code(qr_code)
+        if normalized is None:
+            return None
+        return User.objects.filter(qr_code=normalized, is_active=True).first()
+
+    @staticmethod
+    def match_schedule(snapshot: Optional[Dict], student_id, now: Optional[datetime] = None) -> Optional[Dict]:
+        """現在時刻に打刻可能な受講中の授業（授業開始15分前〜授業終了）"""
+        if not snapshot:
+            return None
+        now = timezone.localtime(now or timezone.now()).replace(tzinfo=None)
+        target_date = date.fromisoformat(snapshot['date'])
+        student_id = str(student_id)
+        for schedule in snapshot['schedules']:
+            if student_id not in schedule['student_ids']:
+                continue
+            start = datetime.combine(target_date, datetime.strptime(schedule['start_time'], '%H:%M:%S').time())
+            end = datetime.combine(target_date, datetime.strptime(schedule['end_time'], '%H:%M:%S').time())
+            if start - CHECK_IN_MARGIN <= now <= end:
+                return schedule
+        return None
+
+    # ----------------------------------------
+    # 書き込み
+    # ----------------------------------------
+
+    @staticmethod
+    def record_check_in(schedule_id, student_id, tenant_id, check_in_time: str):
+        """
+        入室を出席記録に書き込む（打刻時とキューでの再試行から呼ばれる。再実行しても同じ結果になる）
+
+        Args:
+            check_in_time: 'HH:MM:SS'
+        """
+        check_in = datetime.strptime(check_in_time, '%H:%M:%S').time()
+        try:
+            with transaction.atomic():
+                attendance, created = Attendance.objects.get_or_create(
+                    schedule_id=schedule_id,
+                    student_id=student_id,
+                    defaults={
+                        'tenant_id': tenant_id,
+                        'status': Attendance.Status.PRESENT,
+                        'check_in_time': check_in,
+                    }
+                )
+        except IntegrityError:
+            # 同じ打刻が並行して処理された場合
+            attendance, created = Attendance.objects.get(schedule_id=schedule_id, student_id=student_id), False
+
+        if not created and not attendance.check_in_time:
+            attendance.check_in_time = check_in
+            attendance.status = Attendance.Status.PRESENT
+            attendance.save(update_fields=['check_in_time', 'status'])
+
+        # 授業ステータスを更新（save() を通さずスナップショットの無効化を起こさない）
+        LessonSchedule.objects.filter(
+            pk=schedule_id, status=LessonSchedule.Status.SCHEDULED
+        ).update(status=LessonSchedule.Status.CONFIRMED)
+
+    @classmethod
+    def check_in(cls, schedule: Dict, student_id, check_in_time: str):
+        """
+        入室をその場で書き込む
+
+        DBが一時的に応答しない場合はキューに渡して再試行する（キューにも渡せなければ例外を送出）。
+        """
+        from apps.lessons.tasks import record_kiosk_check_in_task
+
+        args = (schedule['id'], str(student_id), schedule['tenant_id'], check_in_time)
+        try:
+            cls.record_check_in(*args)
+        except OperationalError as e:
+            logger.warning(f"Kiosk check-in write failed, retrying via queue: {e}")
+            record_kiosk_check_in_task.delay(*args)
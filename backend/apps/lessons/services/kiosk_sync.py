@@ -0,0 +1,431 @@
+"""
+Kiosk Sync Service
+オフライン対応キオスクの同期（当日名簿の配信と打刻イベントの一括反映）
+
+キオスクは朝（または通信回復時）に校舎の当日名簿をダウンロードし、
+QRコードの照合・授業の判定を端末内で行って打刻をローカルに貯める。
+貯めた打刻は冪等キー付きのイベントとしてまとめて送信され、サーバー側で
+Attendance に一括で反映する。
+
+名簿:
+- QRコードそのものは含めず、校舎・日付ごとのソルト付きハッシュのみを配信する
+- 校舎のキオスクトークンを鍵とした HMAC 署名を付け、端末側で改ざんを検出できるようにする
+
+イベントの反映:
+- 校舎 + 冪等キーで一意（KioskSyncEvent）。再送分は duplicate として結果のみ返す
+- 入室は最も早い時刻、退室は最も遅い時刻を採用する（端末の時刻順は保証されないため）
+- 論理削除された出席記録は作り直す代わりに復元する（授業・生徒で一意のため）。
+  同時にオンラインの打刻で作成された記録は、作成後に読み直して時刻を反映する
+"""
+import hashlib
+import hmac
+import json
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.lessons.models import Attendance, GroupLessonEnrollment, KioskSyncEvent, LessonSchedule
+from apps.students.models import Student
+
+from .attendance_stats import schedule_refresh
+from .kiosk import ACTIVE_SCHEDULE_STATUSES, CHECK_IN_MARGIN, KioskService, kiosk_token_for
+
+logger = logging.getLogger(__name__)
+
+ROSTER_VERSION = 1
+# ハッシュの長さ（16進文字数）
+QR_HASH_LENGTH = 24
+# 1回の送信で受け付けるイベント数
+MAX_EVENTS_PER_BATCH = 500
+# 冪等キーの最大長（KioskSyncEvent.idempotency_key）
+MAX_IDEMPOTENCY_KEY_LENGTH = 64
+# 反映済みのイベントが再送された場合の結果（KioskSyncEvent には保存しない）
+DUPLICATE = 'duplicate'
+
+
+# ========================================
+# 名簿
+# ========================================
+
+def roster_salt(school_id, target_date: date) -> str:
+    """校舎・日付ごとのハッシュ用ソルト"""
+    return hmac.new(
+        kiosk_token_for(school_id).encode(),
+        f"roster:{school_id}:{target_date.isoformat()}".encode(),
+        hashlib.sha256
+    ).hexdigest()[:16]
+
+
+def hash_qr_code(salt: str, qr_code: str) -> str:
+    """QRコードのハッシュ（端末側でも同じ計算で照合する）"""
+    return hashlib.sha256(f"{salt}:{qr_code}".encode()).hexdigest()[:QR_HASH_LENGTH]
+
+
+def sign_payload(school_id, payload: Dict) -> str:
+    """名簿の署名（キー順ソート・空白なしの JSON に対する HMAC-SHA256）"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hmac.new(kiosk_token_for(school_id).encode(), canonical.encode(), hashlib.sha256).hexdigest()
+
+
+def build_roster(school_id, target_date: Optional[date] = None) -> Optional[Dict]:
+    """
+    キオスク用の当日名簿（校舎が存在しなければ None）
+
+    Returns:
+        {
+            'version', 'school_id', 'date', 'expires_at', 'salt', 'check_in_margin_minutes',
+            'students': [[qr_hash, student_id, 氏名, 生徒番号], ...],
+            'schedules': [[schedule_id, 開始 'HH:MM', 終了 'HH:MM', 授業名, [students の添字]], ...],
+            'signature',
+        }
+    """
+    target_date = target_date or timezone.localdate()
+    snapshot = KioskService.get_snapshot(school_id, target_date)
+    if snapshot is None:
+        return None
+
+    salt = roster_salt(school_id, target_date)
+    students = sorted(snapshot['students'].items(), key=lambda item: item[1]['id'])
+    index_by_student_id = {entry['id']: i for i, (_, entry) in enumerate(students)}
+
+    expires_at = timezone.make_aware(datetime.combine(target_date + timedelta(days=1), time.min))
+    payload = {
+        'version': ROSTER_VERSION,
+        'school_id': snapshot['school_id'],
+        'date': snapshot['date'],
+        'expires_at': expires_at.isoformat(),
+        'salt': salt,
+        'check_in_margin_minutes': int(CHECK_IN_MARGIN.total_seconds() // 60),
+        'students': [
+            [hash_qr_code(salt, qr_code), entry['id'], entry['full_name'], entry['student_no']]
+            for qr_code, entry in students
+        ],
+        'schedules': [
+            [
+                schedule['id'],
+                schedule['start_time'][:5],
+                schedule['end_time'][:5],
+                schedule['class_name'],
+                sorted(
+                    index_by_student_id[student_id]
+                    for student_id in schedule['student_ids']
+                    if student_id in index_by_student_id
+                ),
+            ]
+            for schedule in snapshot['schedules']
+        ],
+    }
+    payload['signature'] = sign_payload(school_id, payload)
+    return payload
+
+
+# ========================================
+# イベントの反映
+# ========================================
+
+@dataclass
+class SyncEvent:
+    """検証済みの打刻イベント"""
+    idempotency_key: str
+    event_type: str
+    student_id: uuid.UUID
+    occurred_at: datetime
+    schedule_id: Optional[uuid.UUID] = None
+
+    @property
+    def local_datetime(self) -> datetime:
+        return timezone.localtime(self.occurred_at).replace(tzinfo=None)
+
+
+def _parse_uuid(value) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def parse_event(raw) -> Optional[SyncEvent]:
+    """送信されたイベントを検証（不正な場合は None）"""
+    if not isinstance(raw, dict):
+        return None
+    key = str(raw.get('idempotency_key') or '').strip()
+    event_type = raw.get('type')
+    student_id = _parse_uuid(raw.get('student_id'))
+    occurred_at = parse_datetime(str(raw.get('occurred_at') or ''))
+    if (
+        not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH
+        or event_type not in KioskSyncEvent.EventType.values
+        or student_id is None or occurred_at is None
+    ):
+        return None
+    if timezone.is_naive(occurred_at):
+        occurred_at = timezone.make_aware(occurred_at)
+    schedule_id = _parse_uuid(raw.get('schedule_id')) if raw.get('schedule_id') else None
+    return SyncEvent(key, event_type, student_id, occurred_at, schedule_id)
+
+
+class KioskSyncService:
+    """打刻イベントの一括反映"""
+
+    @classmethod
+    def apply_events(cls, school, raw_events: List) -> Dict:
+        """
+        打刻イベントを Attendance に一括反映
+
+        Args:
+            school: School
+            raw_events: 送信されたイベントのリスト
+                {idempotency_key, type: check_in|check_out, student_id, occurred_at, schedule_id?}
+
+        Returns:
+            {'results': [{idempotency_key, status}], 'applied': 件数}
+        """
+        Result = KioskSyncEvent.Result
+        results: Dict[str, str] = {}
+        order: List[str] = []
+        events: List[SyncEvent] = []
+
+        for raw in raw_events:
+            event = parse_event(raw)
+            if event is None:
+                key = str(raw.get('idempotency_key') or '') if isinstance(raw, dict) else ''
+                order.append(key)
+                results[key] = Result.INVALID
+                continue
+            if event.idempotency_key in results:
+                continue
+            order.append(event.idempotency_key)
+            results[event.idempotency_key] = ''
+            events.append(event)
+
+        with transaction.atomic():
+            # 反映済みのイベント（再送分）を除外
+            seen = set(KioskSyncEvent.objects.filter(
+                school=school,
+                idempotency_key__in=[e.idempotency_key for e in events],
+            ).values_list('idempotency_key', flat=True))
+            for key in seen:
+                results[key] = DUPLICATE
+            events = [e for e in events if e.idempotency_key not in seen]
+
+            # 存在しない生徒のイベントは反映しない
+            known_students = set(Student.objects.filter(
+                id__in={e.student_id for e in events},
+                deleted_at__isnull=True,
+            ).values_list('id', flat=True))
+            for e in events:
+                if e.student_id not in known_students:
+                    results[e.idempotency_key] = Result.INVALID
+            events = [e for e in events if e.student_id in known_students]
+
+            applied = cls._reconcile(school, events, results) if events else {}
+
+            KioskSyncEvent.objects.bulk_create([
+                KioskSyncEvent(
+                    tenant_id=school.tenant_id,
+                    school=school,
+                    idempotency_key=e.idempotency_key,
+                    event_type=e.event_type,
+                    student_id=e.student_id,
+                    schedule_id=applied.get(e.idempotency_key),
+                    occurred_at=e.occurred_at,
+                    result=results[e.idempotency_key],
+                )
+                for e in events
+            ], ignore_conflicts=True)
+
+        return {
+            'results': [{'idempotency_key': key, 'status': results[key]} for key in order],
+            'applied': sum(1 for status in results.values() if status == Result.APPLIED),
+        }
+
+    @staticmethod
+    def _load_schedules(school, dates):
+        """対象日の授業と受講生徒（日付ごと）"""
+        schedules = list(LessonSchedule.objects.filter(
+            school=school,
+            date__in=dates,
+            status__in=ACTIVE_SCHEDULE_STATUSES,
+            deleted_at__isnull=True,
+        ).order_by('date', 'start_time'))
+        roster = {s.id: {s.student_id} if s.student_id else set() for s in schedules}
+        for schedule_id, student_id in GroupLessonEnrollment.objects.filter(
+            schedule_id__in=roster.keys(),
+            deleted_at__isnull=True,
+        ).values_list('schedule_id', 'student_id'):
+            roster[schedule_id].add(student_id)
+
+        by_date = defaultdict(list)
+        for s in schedules:
+            by_date[s.date].append(s)
+        return by_date, roster
+
+    @staticmethod
+    def _match(event: SyncEvent, day_schedules, roster) -> Optional[LessonSchedule]:
+        """打刻時刻に該当する受講中の授業（端末が判定した授業を優先）"""
+        occurred = event.local_datetime
+        candidates = [s for s in day_schedules if event.student_id in roster[s.id]]
+        if event.schedule_id:
+            for s in candidates:
+                if s.id == event.schedule_id:
+                    return s
+        for s in candidates:
+            start = datetime.combine(s.date, s.start_time)
+            end = datetime.combine(s.date, s.end_time)
+            if start - CHECK_IN_MARGIN <= occurred <= end:
+                return s
+        return None
+
+    @classmethod
+    def _reconcile(cls, school, events: List[SyncEvent], results: Dict[str, str]) -> Dict:
+        """
+        イベントを出席記録に反映し、results を更新する
+
+        Returns:
+            {idempotency_key: 反映先の schedule_id}
+        """
+        Result = KioskSyncEvent.Result
+        dates = {e.local_datetime.date() for e in events}
+        schedules_by_date, roster = cls._load_schedules(school, dates)
+        student_ids = {e.student_id for e in events}
+
+        # 既存の出席記録（対象日・対象生徒分を1回で取得。論理削除分は復元するため含める）
+        existing = {
+            (a.schedule_id, a.student_id): a
+            for a in Attendance.objects.filter(
+                schedule__school=school,
+                schedule__date__in=dates,
+                student_id__in=student_ids,
+            ).select_for_update()
+        }
+
+        check_ins: Dict[tuple, time] = {}
+        check_outs: Dict[tuple, time] = {}
+        applied: Dict[str, uuid.UUID] = {}
+
+        # 入室 → 退室 の順に処理（同じ送信内の入室に対する退室を反映するため）
+        for event in sorted(events, key=lambda e: (e.event_type != 'check_in', e.occurred_at)):
+            occurred = event.local_datetime
+            day = occurred.date()
+
+            if event.event_type == KioskSyncEvent.EventType.CHECK_IN:
+                schedule = cls._match(event, schedules_by_date.get(day, []), roster)
+                if schedule is None:
+                    results[event.idempotency_key] = Result.NO_SCHEDULE
+                    continue
+                key = (schedule.id, event.student_id)
+                if key not in check_ins or occurred.time() < check_ins[key]:
+                    check_ins[key] = occurred.time()
+                results[event.idempotency_key] = Result.APPLIED
+                applied[event.idempotency_key] = schedule.id
+                continue
+
+            # 退室: 当日入室済みの授業のうち、退室時刻以前に入室した最後の授業
+            entered = []
+            for s in schedules_by_date.get(day, []):
+                key = (s.id, event.student_id)
+                current = existing.get(key)
+                live_check_in = current.check_in_time if current and current.deleted_at is None else None
+                check_in = check_ins.get(key) or live_check_in
+                if check_in and check_in <= occurred.time():
+                    entered.append((check_in, s))
+            if not entered:
+                results[event.idempotency_key] = Result.NO_CHECK_IN
+                continue
+            _, schedule = max(entered, key=lambda item: item[0])
+            key = (schedule.id, event.student_id)
+            if key not in check_outs or occurred.time() > check_outs[key]:
+                check_outs[key] = occurred.time()
+            results[event.idempotency_key] = Result.APPLIED
+            applied[event.idempotency_key] = schedule.id
+
+        cls._write_attendances(school, existing, check_ins, check_outs)
+        return applied
+
+    @staticmethod
+    def _merge(attendance, check_in, check_out) -> bool:
+        """既存の出席記録に入室（早い方）・退室（遅い方）を反映（変更があれば True）"""
+        changed = False
+        if check_in and (not attendance.check_in_time or check_in < attendance.check_in_time):
+            if not attendance.check_in_time:
+                attendance.status = Attendance.Status.PRESENT
+            attendance.check_in_time = check_in
+            changed = True
+        if check_out and (not attendance.check_out_time or check_out > attendance.check_out_time):
+            attendance.check_out_time = check_out
+            changed = True
+        return changed
+
+    @classmethod
+    def _write_attendances(cls, school, existing, check_ins, check_outs):
+        """出席記録を一括作成・更新"""
+        to_create = {}
+        to_update = {}
+        for key in check_ins.keys() | check_outs.keys():
+            attendance = existing.get(key)
+            if attendance is None:
+                # 既存の記録がなければ退室は反映されないため、入室が必ずある
+                schedule_id, student_id = key
+                to_create[key] = Attendance(
+                    tenant_id=school.tenant_id,
+                    schedule_id=schedule_id,
+                    student_id=student_id,
+                    status=Attendance.Status.PRESENT,
+                    check_in_time=check_ins[key],
+                    check_out_time=check_outs.get(key),
+                )
+            elif attendance.deleted_at is not None:
+                # 論理削除された記録を復元（削除前の時刻は引き継がない）
+                attendance.deleted_at = None
+                attendance.status = Attendance.Status.PRESENT
+                attendance.check_in_time = check_ins.get(key)
+                attendance.check_out_time = check_outs.get(key)
+                to_update[key] = attendance
+            elif cls._merge(attendance, check_ins.get(key), check_outs.get(key)):
+                to_update[key] = attendance
+
+        if to_create:
+            Attendance.objects.bulk_create(list(to_create.values()), ignore_conflicts=True)
+            # 同時に作成された記録と衝突した分は、その記録を読み直して反映する
+            for attendance in Attendance.objects.filter(
+                schedule_id__in={schedule_id for schedule_id, _ in to_create},
+                student_id__in={student_id for _, student_id in to_create},
+            ).select_for_update():
+                key = (attendance.schedule_id, attendance.student_id)
+                created = to_create.get(key)
+                if created is None or attendance.id == created.id:
+                    continue
+                del to_create[key]
+                if attendance.deleted_at is not None:
+                    attendance.deleted_at = None
+                    attendance.status = Attendance.Status.PRESENT
+                    attendance.check_in_time = attendance.check_out_time = None
+                cls._merge(attendance, created.check_in_time, created.check_out_time)
+                to_update[key] = attendance
+        if to_update:
+            Attendance.objects.bulk_update(
+                list(to_update.values()), ['check_in_time', 'check_out_time', 'status', 'deleted_at']
+            )
+
+        # bulk_create / bulk_update は signals を通らないため出欠集計の更新を明示的に依頼する
+        if to_create or to_update:
+            written = list(to_create.values()) + list(to_update.values())
+            schedule_refresh(
+                school.tenant_id,
+                LessonSchedule.objects.filter(id__in={a.schedule_id for a in written}).values_list('date', flat=True),
+                {a.student_id for a in written},
+            )
+
+        # 入室のあった授業を「確定」に（save() を通さずスナップショットの無効化を起こさない）
+        schedule_ids = {schedule_id for schedule_id, _ in check_ins}
+        if schedule_ids:
+            LessonSchedule.objects.filter(
+                id__in=schedule_ids, status=LessonSchedule.Status.SCHEDULED
+            ).update(status=LessonSchedule.Status.CONFIRMED)
@@ -0,0 +1,236 @@
+"""
+Makeup Search Service
+振替先の一括検索（複数の欠席チケット × 期間内の授業実施日）
+
+TransferAvailableClassesView はチケット1枚ごとに
+振替候補クラスの取得 → Ticket の消化記号照合 → クラスごとの学年判定（.exists()）を発行しており、
+兄弟分のチケットを表示するとその回数だけ繰り返していた。
+
+ここでは1回の呼び出しで
+- 消化記号 → チケットコード の対応（キャッシュ、Ticket の変更時に無効化）
+- テナント内の有効なクラスを チケットコード / 振替グループ ごとに索引化
+- 候補クラスの授業実施日（LessonOccurrence、休講日を除く）
+- 日別の座席占有数（ScheduleOccupancy）
+をそれぞれ1回ずつ取得し、全チケットの振替先を求める。
+
+振替候補の決め方:
+1. 消化記号に対応するチケットコードのクラス（従来と同じ）
+2. 1 がなければ、欠席した授業と同じ振替グループのクラス
+3. どちらもなければ、欠席した授業と同じ校舎・ブランドのクラス
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'makeup_symbol_codes:'
+CACHE_TIMEOUT = 60 * 60
+VERSION_PREFIX = f'{CACHE_PREFIX}version:'
+
+DEFAULT_WEEKS = 4
+MAX_WEEKS = 12
+# 当日振替の受付締切（授業開始の何分前まで）
+SAME_DAY_CUTOFF = timedelta(minutes=30)
+
+
+def _bump_symbol_version(tenant_id):
+    key = f'{VERSION_PREFIX}{tenant_id}'
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+    except Exception as e:
+        logger.warning(f"Failed to bump makeup symbol version for tenant {tenant_id}: {e}")
+
+
+def invalidate_symbol_codes(tenant_id):
+    """テナントの 消化記号 → チケットコード のキャッシュを無効化（トランザクション内ではコミット後）"""
+    if not tenant_id:
+        return
+    transaction.on_commit(lambda: _bump_symbol_version(tenant_id))
+
+
+def get_symbol_codes(tenant_id) -> Dict[str, Set[str]]:
+    """テナントの 消化記号 → チケットコード の対応（キャッシュ経由）"""
+    from apps.contracts.models import Ticket
+
+    key = None
+    try:
+        key = f'{CACHE_PREFIX}{tenant_id}:{cache.get(f"{VERSION_PREFIX}{tenant_id}", 0)}'
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    except Exception as e:
+        logger.warning(f"Makeup symbol cache unavailable: {e}")
+
+    symbol_codes = defaultdict(set)
+    for symbol, code in Ticket.objects.filter(
+        tenant_id=tenant_id,
+        deleted_at__isnull=True,
+    ).exclude(consumption_symbol='').values_list('consumption_symbol', 'ticket_code'):
+        symbol_codes[symbol].add(code)
+    symbol_codes = dict(symbol_codes)
+
+    if key:
+        try:
+            cache.set(key, symbol_codes, CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to cache makeup symbol codes: {e}")
+    return symbol_codes
+
+
+class TransferIndex:
+    """テナント内の有効なクラスの索引（チケットコード・振替グループ・校舎+ブランド）"""
+
+    def __init__(self, schedules: Iterable):
+        self.by_ticket_code = defaultdict(list)
+        self.by_transfer_group = defaultdict(list)
+        self.by_school_brand = defaultdict(list)
+        for cs in schedules:
+            if cs.ticket_id:
+                self.by_ticket_code[cs.ticket_id].append(cs)
+            if cs.transfer_group:
+                self.by_transfer_group[cs.transfer_group].append(cs)
+            self.by_school_brand[(cs.school_id, cs.brand_id)].append(cs)
+
+    @classmethod
+    def for_tenant(cls, tenant_id):
+        from apps.schools.models import ClassSchedule
+
+        return cls(ClassSchedule.objects.filter(
+            tenant_id=tenant_id,
+            is_active=True,
+            deleted_at__isnull=True,
+        ).select_related(
+            'school', 'brand', 'brand_category', 'room', 'grade'
+        ).prefetch_related('grade__school_years'))
+
+    def candidates(self, absence_ticket, symbol_codes: Dict[str, Set[str]]) -> List:
+        """欠席チケットの振替候補クラス"""
+        codes = symbol_codes.get(absence_ticket.consumption_symbol) if absence_ticket.consumption_symbol else None
+        if codes:
+            seen = set()
+            result = []
+            for code in sorted(codes):
+                for cs in self.by_ticket_code.get(code, ()):
+                    if cs.id not in seen:
+                        seen.add(cs.id)
+                        result.append(cs)
+            return result
+        original = absence_ticket.class_schedule
+        if original is None:
+            return []
+        if original.transfer_group:
+            return list(self.by_transfer_group.get(original.transfer_group, ()))
+        return list(self.by_school_brand.get((original.school_id, original.brand_id), ()))
+
+
+@dataclass
+class MakeupOption:
+    """振替先（クラス × 日付）"""
+    class_schedule: object
+    date: date
+    available_seats: int
+
+
+def search_window(weeks: Optional[int] = None, today: Optional[date] = None):
+    """検索期間（今日から weeks 週間）"""
+    today = today or date.today()
+    weeks = max(1, min(weeks or DEFAULT_WEEKS, MAX_WEEKS))
+    return today, today + timedelta(weeks=weeks) - timedelta(days=1)
+
+
+class MakeupSearchService:
+    """振替先の一括検索"""
+
+    @staticmethod
+    def _school_year_resolver():
+        from apps.schools.views.trial.utils import get_school_year_from_birth_date
+
+        resolved = {}
+
+        def resolve(student):
+            if not student or not student.birth_date:
+                return None
+            if student.birth_date not in resolved:
+                resolved[student.birth_date] = get_school_year_from_birth_date(student.birth_date)
+            return resolved[student.birth_date]
+        return resolve
+
+    @classmethod
+    def search(cls, absence_tickets: List, date_from: date, date_to: date,
+               now: Optional[datetime] = None) -> Dict:
+        """
+        欠席チケットごとの振替先
+
+        Args:
+            absence_tickets: AbsenceTicket のリスト（student / class_schedule を取得済みであること）
+            date_from, date_to: 検索期間（両端を含む。各チケットの有効期限でさらに絞る）
+
+        Returns:
+            {absence_ticket_id: [MakeupOption]}（日付・開始時刻順）
+        """
+        from apps.schools.services.lesson_occurrence import LessonOccurrenceService
+        from apps.schools.services.occupancy import EMPTY_OCCUPANCY, ScheduleOccupancyService
+        from apps.schools.services.trial_availability import matches_school_year
+
+        now = now or datetime.now()
+        results = {ticket.id: [] for ticket in absence_tickets}
+        tickets_by_tenant = defaultdict(list)
+        for ticket in absence_tickets:
+            tickets_by_tenant[ticket.tenant_id].append(ticket)
+
+        school_year_of = cls._school_year_resolver()
+
+        for tenant_id, tickets in tickets_by_tenant.items():
+            symbol_codes = get_symbol_codes(tenant_id)
+            index = TransferIndex.for_tenant(tenant_id)
+
+            candidates_by_ticket = {}
+            for ticket in tickets:
+                school_year = school_year_of(ticket.student)
+                candidates_by_ticket[ticket.id] = {
+                    cs.id for cs in index.candidates(ticket, symbol_codes)
+                    if matches_school_year(cs, school_year)
+                }
+            schedule_ids = set().union(*candidates_by_ticket.values())
+            if not schedule_ids:
+                continue
+
+            occurrences_by_schedule = defaultdict(list)
+            for occurrence in LessonOccurrenceService.get_occurrences(
+                date_from, date_to, tenant_id=tenant_id, schedule_ids=schedule_ids, open_only=True
+            ):
+                occurrences_by_schedule[occurrence.class_schedule_id].append(occurrence)
+            occupancy = ScheduleOccupancyService.get_date_occupancy(schedule_ids, date_from, date_to)
+
+            for ticket in tickets:
+                last_date = min(date_to, ticket.valid_until) if ticket.valid_until else date_to
+                options = []
+                for schedule_id in candidates_by_ticket[ticket.id]:
+                    for occurrence in occurrences_by_schedule.get(schedule_id, ()):
+                        if occurrence.date > last_date:
+                            continue
+                        # 欠席した授業そのものは除外
+                        if schedule_id == ticket.class_schedule_id and occurrence.date == ticket.absence_date:
+                            continue
+                        if datetime.combine(occurrence.date, occurrence.start_time) - SAME_DAY_CUTOFF < now:
+                            continue
+                        cs = occurrence.class_schedule
+                        options.append(MakeupOption(
+                            class_schedule=cs,
+                            date=occurrence.date,
+                            available_seats=ScheduleOccupancyService.available_makeup_seats(
+                                cs, occupancy.get((schedule_id, occurrence.date), EMPTY_OCCUPANCY)
+                            ),
+                        ))
+                options.sort(key=lambda o: (o.date, o.class_schedule.start_time))
+                results[ticket.id] = options
+        return results
@@ -0,0 +1,90 @@
+"""
+Lessons Signals
+キオスク用スナップショット・振替検索のキャッシュ無効化、出欠集計の更新
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import AbsenceTicket, Attendance, GroupLessonEnrollment, LessonSchedule
+from .services.attendance_stats import schedule_refresh
+from .services.kiosk import invalidate_kiosk_snapshot, student_school_ids
+from .services.makeup_search import invalidate_symbol_codes
+
+
+@receiver([post_save, post_delete], sender=LessonSchedule)
+def invalidate_kiosk_on_lesson_schedule(sender, instance, **kwargs):
+    """授業の変更: 校舎のスナップショットを作り直す"""
+    invalidate_kiosk_snapshot(instance.school_id)
+
+
+@receiver([post_save, post_delete], sender=GroupLessonEnrollment)
+def invalidate_kiosk_on_group_enrollment(sender, instance, **kwargs):
+    """集団授業の受講者の変更: 校舎のスナップショットを作り直す"""
+    school_id = LessonSchedule.objects.filter(pk=instance.schedule_id).values_list(
+        'school_id', flat=True
+    ).first()
+    if school_id:
+        invalidate_kiosk_snapshot(school_id)
+
+
+# QRコード対応（スナップショットの students）に影響する生徒のフィールド
+KIOSK_STUDENT_FIELDS = {
+    'last_name', 'first_name', 'student_no', 'qr_code', 'deleted_at', 'primary_school', 'primary_school_id',
+}
+
+
+def _affects_kiosk(update_fields):
+    return update_fields is None or bool(KIOSK_STUDENT_FIELDS & set(update_fields))
+
+
+@receiver(pre_save, sender='students.Student')
+def remember_kiosk_primary_school(sender, instance, update_fields=None, **kwargs):
+    """生徒の更新: 主校舎の変更前の校舎も作り直すため記録しておく"""
+    if instance._state.adding or not _affects_kiosk(update_fields):
+        instance._kiosk_previous_school_id = None
+        return
+    instance._kiosk_previous_school_id = sender._base_manager.filter(pk=instance.pk).values_list(
+        'primary_school_id', flat=True
+    ).first()
+
+
+@receiver([post_save, post_delete], sender='students.Student')
+def invalidate_kiosk_on_student(sender, instance, update_fields=None, **kwargs):
+    """生徒の変更: 生徒が載る校舎（主校舎・当日以降の受講校舎）のスナップショットを作り直す"""
+    if not _affects_kiosk(update_fields):
+        return
+    for school_id in student_school_ids(
+        instance.pk, (instance.primary_school_id, getattr(instance, '_kiosk_previous_school_id', None))
+    ):
+        invalidate_kiosk_snapshot(school_id)
+
+
+@receiver([post_save, post_delete], sender='contracts.Ticket')
+def invalidate_makeup_symbol_codes(sender, instance, **kwargs):
+    """チケットの変更: テナントの 消化記号 → チケットコード の対応を作り直す"""
+    invalidate_symbol_codes(instance.tenant_id)
+
+
+@receiver([post_save, post_delete], sender=Attendance)
+def refresh_stats_on_attendance(sender, instance, **kwargs):
+    """出席記録の変更: 授業日の集計を作り直す"""
+    lesson_date = LessonSchedule.objects.filter(pk=instance.schedule_id).values_list('date', flat=True).first()
+    schedule_refresh(instance.tenant_id, [lesson_date], [instance.student_id])
+
+
+@receiver(pre_save, sender=AbsenceTicket)
+def remember_absence_ticket_dates(sender, instance, **kwargs):
+    """欠席チケットの更新: 変更前の欠席日・振替日も集計し直すため記録しておく"""
+    if instance._state.adding:
+        instance._stats_previous_dates = ()
+        return
+    instance._stats_previous_dates = AbsenceTicket.objects.filter(pk=instance.pk).values_list(
+        'absence_date', 'used_date'
+    ).first() or ()
+
+
+@receiver([post_save, post_delete], sender=AbsenceTicket)
+def refresh_stats_on_absence_ticket(sender, instance, **kwargs):
+    """欠席チケットの変更: 欠席日・振替日の集計を作り直す"""
+    dates = [instance.absence_date, instance.used_date, *getattr(instance, '_stats_previous_dates', ())]
+    schedule_refresh(instance.tenant_id, dates, [instance.student_id])
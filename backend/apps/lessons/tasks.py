@@ -0,0 +1,88 @@
+"""
+Lessons Celery Tasks - 授業・出席関連バックグラウンドタスク
+"""
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.db import IntegrityError, OperationalError
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(
+    bind=True,
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    retry_backoff_max=60,
+    max_retries=10,
+)
+def record_kiosk_check_in_task(self, schedule_id, student_id, tenant_id, check_in_time):
+    """キオスクの入室打刻を出席記録に書き込むCeleryタスク
+
+    DBが一時的に応答しない場合は間隔を空けて再試行する。
+
+    Args:
+        schedule_id: 授業スケジュールID
+        student_id: 生徒ID
+        tenant_id: テナントID
+        check_in_time: 入室時刻（'HH:MM:SS'）
+    """
+    from apps.lessons.services.kiosk import KioskService
+
+    KioskService.record_check_in(schedule_id, student_id, tenant_id, check_in_time)
+
+
+@shared_task(bind=True, soft_time_limit=600, time_limit=900)
+def prewarm_kiosk_snapshots_task(self, tenant_id=None):
+    """キオスク用の校舎スナップショットを事前構築するCeleryタスク
+
+    Args:
+        tenant_id: テナントID（省略時は全テナント）
+
+    Returns:
+        dict: 処理結果
+    """
+    from apps.lessons.services.kiosk import KioskService
+
+    count = KioskService.prewarm(tenant_id=tenant_id)
+    logger.info(f"Prewarmed kiosk snapshots for {count} schools")
+    return {'schools': count}
+
+
+@shared_task(
+    bind=True,
+    # 集計はテナント単位でロックして実行するが、ロック外の書き込みとの競合時も再試行する
+    autoretry_for=(OperationalError, IntegrityError),
+    retry_backoff=True,
+    retry_backoff_max=60,
+    max_retries=5,
+)
+def refresh_attendance_stats_task(self, tenant_id, dates, student_ids=()):
+    """出席記録・欠席チケットの書き込みに合わせて出欠集計を作り直すCeleryタスク
+
+    Args:
+        tenant_id: テナントID
+        dates: 集計し直す日付（'YYYY-MM-DD' のリスト）
+        student_ids: 月別集計を作り直す生徒IDのリスト
+    """
+    from datetime import date
+    from apps.lessons.services.attendance_stats import AttendanceStatsService
+
+    AttendanceStatsService.refresh(tenant_id, [date.fromisoformat(d) for d in dates], student_ids)
+
+
+@shared_task(bind=True, soft_time_limit=1800, time_limit=2400)
+def rebuild_attendance_stats_task(self, tenant_id=None, days=None):
+    """出欠集計を直近の期間についてまとめて作り直すCeleryタスク（夜間）
+
+    Args:
+        tenant_id: テナントID（省略時は全テナント）
+        days: 対象期間（今日から遡る日数）
+
+    Returns:
+        dict: 処理結果
+    """
+    from apps.lessons.services.attendance_stats import rebuild_recent
+
+    result = rebuild_recent(tenant_id=tenant_id, days=days)
+    logger.info(f"Rebuilt attendance stats: {result}")
+    return result
@@ -0,0 +1,172 @@
+"""
+Attendance Stats Tests - 出欠集計のユニットテスト
+"""
+import os
+import uuid
+from datetime import date, time, timedelta
+
+import pytest
+
+
+class TestMonthHelpers:
+    """月の範囲のテスト"""
+
+    def test_month_start_and_end(self):
+        from apps.lessons.services.attendance_stats import month_end, month_start
+
+        assert month_start(date(2025, 2, 14)) == date(2025, 2, 1)
+        assert month_end(date(2025, 2, 14)) == date(2025, 2, 28)
+        assert month_end(date(2024, 2, 1)) == date(2024, 2, 29)
+        assert month_end(date(2025, 12, 31)) == date(2025, 12, 31)
+
+
+class TestDateRange:
+    """集計対象日の指定のテスト"""
+
+    def test_dates_take_precedence(self):
+        from apps.lessons.services.attendance_stats import _range
+
+        assert _range('date', [date(2025, 4, 1)]) == {'date__in': [date(2025, 4, 1)]}
+        assert _range('used_date', None, date(2025, 4, 1), date(2025, 4, 30)) == {
+            'used_date__gte': date(2025, 4, 1),
+            'used_date__lte': date(2025, 4, 30),
+        }
+
+
+LESSON_DATE = date(2026, 4, 6)
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+class TestAttendanceStatsDatabase:
+    """集計の作り直し・参照のテスト"""
+
+    @pytest.fixture
+    def tenant(self):
+        from apps.tenants.models import Tenant
+
+        return Tenant.objects.create(tenant_code='STATS_TENANT', tenant_name='集計テナント', is_active=True)
+
+    @pytest.fixture
+    def school(self, tenant):
+        from apps.schools.models import School
+
+        return School.objects.create(tenant_ref=tenant, school_code='STATS_SCHOOL', school_name='集計校', is_active=True)
+
+    @pytest.fixture
+    def brand(self, tenant):
+        from apps.schools.models import Brand
+
+        return Brand.objects.create(tenant_ref=tenant, brand_code='STATS_BRAND', brand_name='集計', is_active=True)
+
+    @pytest.fixture
+    def students(self, tenant, school, brand):
+        from apps.students.models import Student
+
+        return [
+            Student.objects.create(
+                tenant_ref=tenant, student_no=f'STATS{i}', last_name='集計', first_name=f'{i}郎',
+                primary_school=school, primary_brand=brand,
+            )
+            for i in range(2)
+        ]
+
+    @pytest.fixture
+    def records(self, tenant, school, brand, students):
+        """出席・遅刻の出席記録と、クラスの欠席チケット1件"""
+        from apps.lessons.models import AbsenceTicket, Attendance, LessonSchedule
+        from apps.schools.models import ClassSchedule
+
+        schedule = LessonSchedule.objects.create(
+            tenant_id=tenant.id, school=school, date=LESSON_DATE, start_time=time(17, 0), end_time=time(18, 0),
+        )
+        present = Attendance.objects.create(tenant_id=tenant.id, schedule=schedule, student=students[0], status='present')
+        Attendance.objects.create(tenant_id=tenant.id, schedule=schedule, student=students[1], status='late')
+        class_schedule = ClassSchedule.objects.create(
+            tenant_id=tenant.id, schedule_code='STATS1', school=school, brand=brand, day_of_week=1, period=1,
+            start_time=time(17, 0), end_time=time(18, 0), class_name='集計クラス', capacity=10,
+        )
+        AbsenceTicket.objects.create(
+            tenant_id=tenant.id, student=students[1], class_schedule=class_schedule, absence_date=LESSON_DATE,
+            valid_until=date.today() + timedelta(days=30), status=AbsenceTicket.Status.ISSUED,
+        )
+        return present
+
+    def test_refresh_is_idempotent(self, tenant, school, students, records):
+        from apps.lessons.models import AttendanceDailyStat, StudentAttendanceMonthlyStat
+        from apps.lessons.services.attendance_stats import AttendanceStatsService
+
+        for _ in range(2):
+            AttendanceStatsService.refresh(tenant.id, [LESSON_DATE], [s.id for s in students])
+
+        assert AttendanceDailyStat.objects.filter(tenant_id=tenant.id).count() == 2
+        assert StudentAttendanceMonthlyStat.objects.filter(tenant_id=tenant.id).count() == 2
+
+        [row] = AttendanceStatsService.summarize(tenant.id, LESSON_DATE, LESSON_DATE, group_by='school')
+        assert row['school_id'] == school.id
+        assert (row['present'], row['late'], row['absent'], row['outstanding']) == (2, 1, 1, 1)
+
+    def test_refresh_updates_and_removes_monthly_rows(self, tenant, students, records):
+        from apps.lessons.models import AbsenceTicket, StudentAttendanceMonthlyStat
+        from apps.lessons.services.attendance_stats import AttendanceStatsService
+
+        student_ids = [s.id for s in students]
+        AttendanceStatsService.refresh(tenant.id, [LESSON_DATE], student_ids)
+        records.status = 'absent'
+        records.save(update_fields=['status'])
+        records.schedule.attendances.filter(student=students[1]).delete()
+        AttendanceStatsService.refresh(tenant.id, [LESSON_DATE], student_ids)
+
+        first = StudentAttendanceMonthlyStat.objects.get(tenant_id=tenant.id, student=students[0])
+        assert (first.present_count, first.absent_count) == (0, 1)
+        # 出席記録がなくなっても欠席チケットの分は残る
+        second = StudentAttendanceMonthlyStat.objects.get(tenant_id=tenant.id, student=students[1])
+        assert (second.present_count, second.late_count, second.absent_count) == (0, 0, 1)
+
+        # 集計対象がなくなった月の行は削除
+        AbsenceTicket.objects.filter(student=students[1]).update(status=AbsenceTicket.Status.CANCELLED)
+        AttendanceStatsService.refresh(tenant.id, [LESSON_DATE], student_ids)
+        assert not StudentAttendanceMonthlyStat.objects.filter(student=students[1]).exists()
+        assert StudentAttendanceMonthlyStat.objects.filter(student=students[0]).exists()
+
+    def test_summarize_by_date_and_brand(self, tenant, brand, students, records):
+        from apps.lessons.services.attendance_stats import AttendanceStatsService
+
+        AttendanceStatsService.refresh(tenant.id, [LESSON_DATE])
+
+        by_date = AttendanceStatsService.summarize(tenant.id, LESSON_DATE, LESSON_DATE, group_by='date')
+        assert [(r['date'], r['present'], r['absent']) for r in by_date] == [(LESSON_DATE, 2, 1)]
+        by_brand = AttendanceStatsService.summarize(
+            tenant.id, LESSON_DATE, LESSON_DATE, group_by='brand', brand_id=brand.id,
+        )
+        assert [(r['brand_id'], r['absent']) for r in by_brand] == [(brand.id, 1)]
+        with pytest.raises(ValueError):
+            AttendanceStatsService.summarize(tenant.id, LESSON_DATE, LESSON_DATE, group_by='teacher')
+
+    def test_summarize_by_class_omits_attendance_totals(self, tenant, school, brand, students, records):
+        """出席記録はブランド・クラスを持たないため、出席数・遅刻数は None、欠席数はチケットの分のみ"""
+        from apps.lessons.services.attendance_stats import AttendanceStatsService
+
+        AttendanceStatsService.refresh(tenant.id, [LESSON_DATE])
+
+        [by_class] = AttendanceStatsService.summarize(
+            tenant.id, LESSON_DATE, LESSON_DATE, group_by='class_schedule',
+        )
+        assert (by_class['present'], by_class['late'], by_class['absent']) == (None, None, 1)
+        [filtered] = AttendanceStatsService.summarize(
+            tenant.id, LESSON_DATE, LESSON_DATE, group_by='school', brand_id=brand.id,
+        )
+        assert filtered['school_id'] == school.id
+        assert (filtered['present'], filtered['late'], filtered['absent']) == (None, None, 1)
+
+    def test_student_months_are_scoped_to_tenant(self, tenant, students, records):
+        from apps.lessons.services.attendance_stats import AttendanceStatsService
+
+        AttendanceStatsService.refresh(tenant.id, [LESSON_DATE], [students[0].id])
+
+        assert len(AttendanceStatsService.student_months(tenant.id, students[0].id, LESSON_DATE, LESSON_DATE)) == 1
+        assert AttendanceStatsService.student_months(uuid.uuid4(), students[0].id, LESSON_DATE, LESSON_DATE) == []
@@ -0,0 +1,130 @@
+"""
+Calendar Import Tests - T13 開講カレンダー一括ロードのユニットテスト
+"""
+import csv
+import os
+from datetime import date, datetime
+
+import pytest
+
+
+class TestRowParsing:
+    """T13 形式の行の解釈のテスト"""
+
+    def test_parse_date(self):
+        """Excel の datetime / CSV の文字列（時刻付き・スラッシュ区切り）"""
+        from apps.schools.services.calendar_loader import parse_date
+
+        assert parse_date(datetime(2025, 4, 7, 0, 0)) == date(2025, 4, 7)
+        assert parse_date('2025-04-07 00:00:00') == date(2025, 4, 7)
+        assert parse_date('2025/04/07') == date(2025, 4, 7)
+        assert parse_date('nan') is None
+
+    def test_lesson_type_from_code(self):
+        """カレンダーコード末尾のパターン（ブランド名中の A/B/P は無視）"""
+        from apps.schools.services.calendar_loader import lesson_type_from_code
+
+        assert lesson_type_from_code('1001_SKAEC_A') == 'A'
+        assert lesson_type_from_code('1002_SKAEC_B') == 'B'
+        assert lesson_type_from_code('1003_AEC_P') == 'P'
+        assert lesson_type_from_code('Int_24') == 'Y'
+
+    def test_open_flag_and_ticket_sequence(self):
+        """開講日の判定と保護者カレンダー表示のチケット番号"""
+        from apps.schools.services.calendar_loader import is_open_row, parse_ticket_sequence
+
+        assert is_open_row('Y', '')
+        assert not is_open_row('', '休')
+        assert is_open_row('', '水A3')
+        assert parse_ticket_sequence('水A3') == 3
+        assert parse_ticket_sequence('講') is None
+
+    def test_iter_csv_rows_streams_dicts(self, tmp_path):
+        """CSV は BOM 付きでも列名で読める"""
+        from apps.schools.services.calendar_loader import iter_csv_rows
+
+        path = tmp_path / 't13.csv'
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['カレンダーID', '日付', '開講日'])
+            writer.writerow(['1001_SKAEC_A', '2025-04-07', 'Y'])
+        rows = list(iter_csv_rows(str(path)))
+        assert rows == [{'カレンダーID': '1001_SKAEC_A', '日付': '2025-04-07', '開講日': 'Y'}]
+
+
+T13_HEADER = ['カレンダーID', '日付', '曜日', '開講日', '保護者カレンダー表示', 'お知らせ']
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+class TestCalendarLoad:
+    """LessonCalendar への upsert と校舎・ブランドの解決のテスト"""
+
+    @pytest.fixture
+    def tenant(self):
+        from apps.tenants.models import Tenant
+
+        return Tenant.objects.create(tenant_code='T13_TENANT', tenant_name='カレンダーテナント', is_active=True)
+
+    @pytest.fixture
+    def refs(self, tenant):
+        from apps.schools.models import Brand, School
+
+        school = School.objects.create(tenant_ref=tenant, school_code='S11001', school_name='本校', is_active=True)
+        brand = Brand.objects.create(tenant_ref=tenant, brand_code='AEC', brand_name='英会話', is_active=True)
+        return school, brand
+
+    @staticmethod
+    def _write(path, rows):
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(T13_HEADER)
+            writer.writerows(rows)
+        return str(path)
+
+    def test_reimport_updates_without_duplicates(self, tenant, refs, tmp_path):
+        from apps.schools.models import LessonCalendar
+        from apps.schools.services.calendar_loader import CalendarLoader, iter_csv_rows
+
+        school, brand = refs
+        first = self._write(tmp_path / 'first.csv', [
+            ['1001_SKAEC_A', '2025-04-07', '月', 'Y', '月A1', ''],
+            ['1001_SKAEC_A', '2025-04-08', '火', '', '休', ''],
+        ])
+        stats = CalendarLoader(tenant.id).load(iter_csv_rows(first))
+        assert (stats.rows, stats.upserted, stats.unresolved) == (2, 2, set())
+
+        second = self._write(tmp_path / 'second.csv', [
+            ['1001_SKAEC_A', '2025-04-07', '月', 'Y', '月A2', '振替可'],
+            ['1001_SKAEC_A', '2025-04-08', '火', 'Y', '火A1', ''],
+        ])
+        CalendarLoader(tenant.id).load(iter_csv_rows(second))
+
+        calendars = LessonCalendar.objects.filter(tenant_id=tenant.id).order_by('lesson_date')
+        assert calendars.count() == 2
+        monday, tuesday = calendars
+        assert (monday.display_label, monday.ticket_sequence, monday.notice_message) == ('月A2', 2, '振替可')
+        assert tuesday.is_open and tuesday.lesson_type == 'A'
+        assert (monday.school_id, monday.brand_id) == (school.id, brand.id)
+
+    def test_unknown_school_and_brand(self, tenant, refs, tmp_path):
+        """校舎・ブランドを特定できないコードは校舎・ブランドなしで登録し、unresolved に記録"""
+        from apps.schools.models import LessonCalendar
+        from apps.schools.services.calendar_loader import CalendarLoader, iter_csv_rows
+
+        path = self._write(tmp_path / 'unknown.csv', [
+            ['9999_NOPE_A', '2025-04-07', '月', 'Y', '月A1', ''],
+            ['1001_NOPE_B', '2025-04-07', '月', 'Y', '月B1', ''],
+        ])
+        stats = CalendarLoader(tenant.id).load(iter_csv_rows(path))
+
+        assert stats.unresolved == {'9999_NOPE_A', '1001_NOPE_B'}
+        unknown = LessonCalendar.objects.get(tenant_id=tenant.id, calendar_code='9999_NOPE_A')
+        assert (unknown.school_id, unknown.brand_id) == (None, None)
+        # 校舎のみ解決できた場合も校舎は設定する
+        partial = LessonCalendar.objects.get(tenant_id=tenant.id, calendar_code='1001_NOPE_B')
+        assert partial.school_id == refs[0].id and partial.brand_id is None
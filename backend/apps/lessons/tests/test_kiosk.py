@@ -0,0 +1,250 @@
+"""
+Kiosk Services Tests - キオスク打刻・同期サービスのテスト
+"""
+import os
+from datetime import date, datetime, time
+
+import pytest
+from django.utils import timezone
+
+
+def _snapshot():
+    return {
+        'date': '2026-10-16',
+        'schedules': [
+            {
+                'id': 's1', 'tenant_id': 't1', 'start_time': '17:00:00', 'end_time': '18:00:00',
+                'class_name': '英会話', 'student_ids': ['a'],
+            },
+            {
+                'id': 's2', 'tenant_id': 't1', 'start_time': '18:10:00', 'end_time': '19:00:00',
+                'class_name': 'そろばん', 'student_ids': ['a', 'b'],
+            },
+        ],
+        'students': {},
+    }
+
+
+class TestKioskScheduleMatch:
+    """スナップショットからの授業判定のテスト"""
+
+    @pytest.mark.parametrize('clock, expected', [
+        ((16, 45), 's1'),   # 開始15分前から打刻可能
+        ((16, 44), None),
+        ((18, 0), 's1'),    # 終了時刻までは前の授業
+        ((18, 5), 's2'),
+        ((19, 1), None),
+    ])
+    def test_check_in_window(self, clock, expected):
+        from apps.lessons.services.kiosk import KioskService
+
+        now = timezone.make_aware(datetime(2026, 10, 16, *clock))
+        matched = KioskService.match_schedule(_snapshot(), 'a', now)
+        assert (matched['id'] if matched else None) == expected
+
+    def test_not_enrolled(self):
+        """受講していない授業には打刻しない"""
+        from apps.lessons.services.kiosk import KioskService
+
+        now = timezone.make_aware(datetime(2026, 10, 16, 17, 0))
+        assert KioskService.match_schedule(_snapshot(), 'b', now) is None
+
+    def test_invalid_qr_code(self):
+        """UUIDとして不正なQRコードは None"""
+        from apps.lessons.services.kiosk import normalize_qr_code
+
+        assert normalize_qr_code('not-a-uuid') is None
+        assert normalize_qr_code(' 12345678-1234-5678-1234-567812345678 ') == '12345678-1234-5678-1234-567812345678'
+
+
+class TestKioskCheckIn:
+    """入室の書き込みのテスト"""
+
+    def test_writes_synchronously(self):
+        """直後の退室打刻で参照できるよう、その場で書き込む"""
+        from unittest import mock
+        from apps.lessons.services.kiosk import KioskService
+
+        with mock.patch.object(KioskService, 'record_check_in') as record, \
+                mock.patch('apps.lessons.tasks.record_kiosk_check_in_task') as task:
+            KioskService.check_in(_snapshot()['schedules'][0], 'a', '16:50:00')
+        record.assert_called_once_with('s1', 'a', 't1', '16:50:00')
+        task.delay.assert_not_called()
+
+    def test_queues_when_database_unavailable(self):
+        """DBが応答しない場合のみキューで再試行する"""
+        from unittest import mock
+        from django.db import OperationalError
+        from apps.lessons.services.kiosk import KioskService
+
+        with mock.patch.object(KioskService, 'record_check_in', side_effect=OperationalError), \
+                mock.patch('apps.lessons.tasks.record_kiosk_check_in_task') as task:
+            KioskService.check_in(_snapshot()['schedules'][0], 'a', '16:50:00')
+        task.delay.assert_called_once_with('s1', 'a', 't1', '16:50:00')
+
+
+class TestKioskStudentInvalidation:
+    """生徒の変更によるスナップショットの無効化のテスト"""
+
+    def _save(self, update_fields, previous_school_id='old-school'):
+        from types import SimpleNamespace
+        from unittest import mock
+        from apps.lessons import signals
+
+        student = SimpleNamespace(pk='st-1', primary_school_id='new-school', _kiosk_previous_school_id=previous_school_id)
+        with mock.patch.object(signals, 'student_school_ids', return_value={'new-school', 'old-school'}) as schools, \
+                mock.patch.object(signals, 'invalidate_kiosk_snapshot') as invalidate:
+            signals.invalidate_kiosk_on_student(sender=None, instance=student, update_fields=update_fields)
+        return schools, invalidate
+
+    def test_only_student_schools(self):
+        """全校舎ではなく生徒が載る校舎のみ無効化する"""
+        schools, invalidate = self._save(update_fields=None)
+        schools.assert_called_once_with('st-1', ('new-school', 'old-school'))
+        assert sorted(call.args[0] for call in invalidate.call_args_list) == ['new-school', 'old-school']
+
+    def test_qr_code_change(self):
+        _, invalidate = self._save(update_fields=['qr_code'])
+        assert invalidate.call_count == 2
+
+    def test_unrelated_field(self):
+        schools, invalidate = self._save(update_fields=['notes'])
+        schools.assert_not_called()
+        invalidate.assert_not_called()
+
+
+class TestKioskSyncEvent:
+    """同期イベントの検証のテスト"""
+
+    def test_valid_event(self):
+        from apps.lessons.services.kiosk_sync import parse_event
+
+        event = parse_event({
+            'idempotency_key': 'k1',
+            'type': 'check_in',
+            'student_id': '12345678-1234-5678-1234-567812345678',
+            'occurred_at': '2026-10-16T17:02:00+09:00',
+        })
+        assert event is not None
+        assert event.local_datetime == datetime(2026, 10, 16, 17, 2)
+        assert event.schedule_id is None
+
+    @pytest.mark.parametrize('override', [
+        {'idempotency_key': ''},
+        {'idempotency_key': 'x' * 65},
+        {'type': 'enter'},
+        {'student_id': 'abc'},
+        {'occurred_at': 'yesterday'},
+    ])
+    def test_invalid_event(self, override):
+        from apps.lessons.services.kiosk_sync import parse_event
+
+        raw = {
+            'idempotency_key': 'k1',
+            'type': 'check_out',
+            'student_id': '12345678-1234-5678-1234-567812345678',
+            'occurred_at': '2026-10-16T18:02:00+09:00',
+        }
+        raw.update(override)
+        assert parse_event(raw) is None
+
+    def test_signature_covers_payload(self):
+        """名簿の内容が変わると署名も変わる"""
+        from apps.lessons.services.kiosk_sync import sign_payload
+
+        payload = {'date': '2026-10-16', 'students': [['h', 'id', '山田 太郎', 'S001']]}
+        signature = sign_payload('school-1', payload)
+        assert signature == sign_payload('school-1', dict(payload))
+        assert signature != sign_payload('school-1', {**payload, 'date': '2026-10-17'})
+        assert signature != sign_payload('school-2', payload)
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+class TestKioskSyncReconcile:
+    """同期イベントの出席記録への反映（DB）"""
+
+    LESSON_DATE = date(2026, 4, 6)
+
+    @pytest.fixture
+    def tenant(self):
+        from apps.tenants.models import Tenant
+
+        return Tenant.objects.create(tenant_code='SYNC_TENANT', tenant_name='同期テナント', is_active=True)
+
+    @pytest.fixture
+    def school(self, tenant):
+        from apps.schools.models import School
+
+        return School.objects.create(tenant_ref=tenant, school_code='SYNC_SCHOOL', school_name='同期校', is_active=True)
+
+    @pytest.fixture
+    def student(self, tenant, school):
+        from apps.schools.models import Brand
+        from apps.students.models import Student
+
+        brand = Brand.objects.create(tenant_ref=tenant, brand_code='SYNC_BRAND', brand_name='同期', is_active=True)
+        return Student.objects.create(
+            tenant_ref=tenant, student_no='SYNC001', last_name='同期', first_name='太郎',
+            primary_school=school, primary_brand=brand,
+        )
+
+    @pytest.fixture
+    def schedule(self, tenant, school, student):
+        from apps.lessons.models import LessonSchedule
+
+        return LessonSchedule.objects.create(
+            tenant_id=tenant.id, school=school, student=student,
+            date=self.LESSON_DATE, start_time=time(17, 0), end_time=time(18, 0),
+        )
+
+    def _event(self, key, event_type, student, clock):
+        return {
+            'idempotency_key': key,
+            'type': event_type,
+            'student_id': str(student.id),
+            'occurred_at': timezone.make_aware(datetime.combine(self.LESSON_DATE, clock)).isoformat(),
+        }
+
+    def test_revives_soft_deleted_attendance(self, tenant, school, student, schedule):
+        from apps.lessons.models import Attendance, KioskSyncEvent
+        from apps.lessons.services.kiosk_sync import KioskSyncService
+
+        deleted = Attendance.objects.create(
+            tenant_id=tenant.id, schedule=schedule, student=student,
+            status=Attendance.Status.ABSENT, check_in_time=time(16, 0), deleted_at=timezone.now(),
+        )
+
+        result = KioskSyncService.apply_events(school, [
+            self._event('in-1', 'check_in', student, time(16, 55)),
+            self._event('out-1', 'check_out', student, time(18, 5)),
+        ])
+
+        assert result['applied'] == 2
+        deleted.refresh_from_db()
+        assert deleted.deleted_at is None
+        assert deleted.status == Attendance.Status.PRESENT
+        assert (deleted.check_in_time, deleted.check_out_time) == (time(16, 55), time(18, 5))
+        assert set(KioskSyncEvent.objects.values_list('result', flat=True)) == {KioskSyncEvent.Result.APPLIED}
+
+    def test_merges_into_concurrent_check_in(self, tenant, school, student, schedule):
+        """読み込み後にオンラインの打刻で作成された記録にも時刻を反映する"""
+        from apps.lessons.models import Attendance
+        from apps.lessons.services.kiosk_sync import KioskSyncService
+
+        online = Attendance.objects.create(
+            tenant_id=tenant.id, schedule=schedule, student=student,
+            status=Attendance.Status.PRESENT, check_in_time=time(17, 5),
+        )
+        key = (schedule.id, student.id)
+
+        # 既存の記録がない状態で読み込んだ後に衝突する
+        KioskSyncService._write_attendances(school, {}, {key: time(16, 55)}, {key: time(18, 2)})
+
+        online.refresh_from_db()
+        assert Attendance.objects.filter(schedule=schedule, student=student).count() == 1
+        assert (online.check_in_time, online.check_out_time) == (time(16, 55), time(18, 2))
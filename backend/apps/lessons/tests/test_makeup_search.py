@@ -0,0 +1,95 @@
+"""
+Makeup Search Tests - 振替先一括検索のユニットテスト
+"""
+from datetime import date
+from types import SimpleNamespace
+
+
+def _class(id, ticket_id='', transfer_group='', school_id='s1', brand_id='b1'):
+    return SimpleNamespace(
+        id=id, ticket_id=ticket_id, transfer_group=transfer_group, school_id=school_id, brand_id=brand_id
+    )
+
+
+def _index():
+    from apps.lessons.services.makeup_search import TransferIndex
+
+    return TransferIndex([
+        _class('c1', ticket_id='Ti1', transfer_group='G1'),
+        _class('c2', ticket_id='Ti2', transfer_group='G1'),
+        _class('c3', ticket_id='Ti3', school_id='s2'),
+        _class('c4', brand_id='b2'),
+    ])
+
+
+class TestTransferIndex:
+    """振替候補クラスの決定のテスト"""
+
+    def test_consumption_symbol(self):
+        """消化記号に対応するチケットコードのクラス"""
+        ticket = SimpleNamespace(consumption_symbol='A', class_schedule=None)
+        candidates = _index().candidates(ticket, {'A': {'Ti1', 'Ti3'}})
+        assert [cs.id for cs in candidates] == ['c1', 'c3']
+
+    def test_transfer_group_fallback(self):
+        """消化記号で見つからなければ同じ振替グループ"""
+        ticket = SimpleNamespace(consumption_symbol='Z', class_schedule=_class('c1', transfer_group='G1'))
+        candidates = _index().candidates(ticket, {'A': {'Ti1'}})
+        assert [cs.id for cs in candidates] == ['c1', 'c2']
+
+    def test_school_brand_fallback(self):
+        """振替グループもなければ同じ校舎・ブランド"""
+        ticket = SimpleNamespace(consumption_symbol='', class_schedule=_class('c4', brand_id='b2'))
+        assert [cs.id for cs in _index().candidates(ticket, {})] == ['c4']
+
+    def test_no_original_class(self):
+        ticket = SimpleNamespace(consumption_symbol='', class_schedule=None)
+        assert _index().candidates(ticket, {}) == []
+
+
+class TestSearchWindow:
+    def test_default_and_bounds(self):
+        from apps.lessons.services.makeup_search import search_window
+
+        today = date(2026, 10, 16)
+        assert search_window(None, today) == (today, date(2026, 11, 12))
+        assert search_window(100, today)[1] == date(2027, 1, 7)
+
+
+class TestSymbolCodeCache:
+    def test_version_is_per_tenant(self, settings):
+        """チケットの変更は同じテナントのキャッシュのみ無効化する"""
+        from unittest import mock
+        from django.core.cache import cache
+        from apps.lessons.services import makeup_search
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'makeup-tests',
+        }}
+        cache.clear()
+        cache.set(f'{makeup_search.CACHE_PREFIX}t1:0', {'A': {'Ti1'}})
+        cache.set(f'{makeup_search.CACHE_PREFIX}t2:0', {'B': {'Ti2'}})
+
+        with mock.patch.object(makeup_search.transaction, 'on_commit', side_effect=lambda fn: fn()):
+            makeup_search.invalidate_symbol_codes('t1')
+
+        with mock.patch('apps.contracts.models.Ticket.objects') as tickets:
+            tickets.filter.return_value.exclude.return_value.values_list.return_value = [('A', 'Ti9')]
+            assert makeup_search.get_symbol_codes('t1') == {'A': {'Ti9'}}
+            assert makeup_search.get_symbol_codes('t2') == {'B': {'Ti2'}}
+        assert tickets.filter.call_count == 1
+
+
+class TestMakeupSearchView:
+    def test_invalid_ticket_ids(self):
+        """不正な欠席チケットIDは400"""
+        from unittest import mock
+        from rest_framework.test import APIRequestFactory, force_authenticate
+        from apps.lessons.views.absence import MakeupSearchView
+
+        request = APIRequestFactory().get('/makeup-search/', {'absence_ticket_ids': 'abc,123'})
+        force_authenticate(request, user=SimpleNamespace(is_authenticated=True))
+        with mock.patch('apps.students.models.Guardian.objects') as guardians:
+            response = MakeupSearchView.as_view()(request)
+        assert response.status_code == 400
+        guardians.get.assert_not_called()
@@ -7,6 +7,8 @@ from .views import (
     TimeSlotViewSet,
     LessonScheduleViewSet,
     AttendanceViewSet,
+    AttendanceStatsView,
+    StudentAttendanceStatsView,
     MakeupLessonViewSet,
     LessonRecordViewSet,
     GroupLessonEnrollmentViewSet,
@@ -17,6 +19,7 @@ from .views import (
     TransferAvailableClassesView,
     CancelAbsenceView,
     CancelMakeupView,
+    MakeupSearchView,
     QRCheckInView,
     QRCheckOutView,
     # Kiosk (Public API)
@@ -24,6 +27,8 @@ from .views import (
     KioskCheckInView,
     KioskCheckOutView,
     KioskAttendanceView,
+    KioskRosterView,
+    KioskSyncEventsView,
 )
 
 app_name = 'lessons'
@@ -39,6 +44,10 @@ router.register('enrollments', GroupLessonEnrollmentViewSet, basename='enrollmen
 urlpatterns = [
     # 生徒カレンダー（開講時間割 + 年間カレンダー）
     path('student-calendar/', StudentCalendarView.as_view(), name='student-calendar'),
+    # 出欠集計（ダッシュボード・生徒の成績表）
+    path('attendance-stats/', AttendanceStatsView.as_view(), name='attendance-stats'),
+    path('attendance-stats/students/<uuid:student_id>/', StudentAttendanceStatsView.as_view(),
+         name='student-attendance-stats'),
     # 欠席登録（カレンダーから）
     path('mark-absence/', MarkAbsenceView.as_view(), name='mark-absence'),
     # 欠席チケット（振替チケット）一覧
@@ -47,6 +56,8 @@ urlpatterns = [
     path('use-absence-ticket/', UseAbsenceTicketView.as_view(), name='use-absence-ticket'),
     # 振替可能クラス取得
     path('transfer-available-classes/', TransferAvailableClassesView.as_view(), name='transfer-available-classes'),
+    # 振替先一括検索（複数チケット × 期間）
+    path('makeup-search/', MakeupSearchView.as_view(), name='makeup-search'),
     # 欠席キャンセル
     path('cancel-absence/', CancelAbsenceView.as_view(), name='cancel-absence'),
     # 振替キャンセル
@@ -59,5 +70,8 @@ urlpatterns = [
     path('kiosk/check-in/', KioskCheckInView.as_view(), name='kiosk-check-in'),
     path('kiosk/check-out/', KioskCheckOutView.as_view(), name='kiosk-check-out'),
     path('kiosk/attendance/', KioskAttendanceView.as_view(), name='kiosk-attendance'),
+    # キオスク同期（オフライン打刻）
+    path('kiosk/sync/roster/', KioskRosterView.as_view(), name='kiosk-sync-roster'),
+    path('kiosk/sync/events/', KioskSyncEventsView.as_view(), name='kiosk-sync-events'),
     path('', include(router.urls)),
 ]
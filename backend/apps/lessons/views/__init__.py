@@ -10,7 +10,11 @@ from .time_slot import TimeSlotViewSet
 from .schedule import LessonScheduleViewSet
 
 # Attendance
-from .attendance import AttendanceViewSet
+from .attendance import (
+    AttendanceViewSet,
+    AttendanceStatsView,
+    StudentAttendanceStatsView,
+)
 
 # Makeup
 from .makeup import MakeupLessonViewSet
@@ -32,6 +36,7 @@ from .absence import (
     TransferAvailableClassesView,
     CancelAbsenceView,
     CancelMakeupView,
+    MakeupSearchView,
 )
 
 # QR Attendance
@@ -46,6 +51,8 @@ from .kiosk import (
     KioskCheckInView,
     KioskCheckOutView,
     KioskAttendanceView,
+    KioskRosterView,
+    KioskSyncEventsView,
 )
 
 
@@ -56,6 +63,8 @@ __all__ = [
     'LessonScheduleViewSet',
     # Attendance
     'AttendanceViewSet',
+    'AttendanceStatsView',
+    'StudentAttendanceStatsView',
     # Makeup
     'MakeupLessonViewSet',
     # Record
@@ -70,6 +79,7 @@ __all__ = [
     'TransferAvailableClassesView',
     'CancelAbsenceView',
     'CancelMakeupView',
+    'MakeupSearchView',
     # QR Attendance
     'QRCheckInView',
     'QRCheckOutView',
@@ -78,4 +88,6 @@ __all__ = [
     'KioskCheckInView',
     'KioskCheckOutView',
     'KioskAttendanceView',
+    'KioskRosterView',
+    'KioskSyncEventsView',
 ]
@@ -1,7 +1,9 @@
 """
 Absence Views - 欠席・振替チケット関連Views
-MarkAbsenceView, AbsenceTicketListView, UseAbsenceTicketView, TransferAvailableClassesView
+MarkAbsenceView, AbsenceTicketListView, UseAbsenceTicketView, TransferAvailableClassesView,
+MakeupSearchView
 """
+import uuid
 from datetime import date, datetime, timedelta
 from rest_framework import status
 from rest_framework.views import APIView
@@ -469,7 +471,9 @@ class TransferAvailableClassesView(APIView):
     def get(self, request):
         from apps.students.models import Guardian, StudentGuardian
         from ..models import AbsenceTicket
+        from ..services.makeup_search import get_symbol_codes
         from apps.schools.models import ClassSchedule
+        from apps.schools.services.trial_availability import matches_school_year
 
         absence_ticket_id = request.query_params.get('absence_ticket_id')
         if not absence_ticket_id:
@@ -514,28 +518,20 @@ class TransferAvailableClassesView(APIView):
 
         # consumption_symbolでフィルタ
         if absence_ticket.consumption_symbol:
-            from apps.contracts.models import Ticket
-            matching_ticket_codes = list(Ticket.objects.filter(
-                consumption_symbol=absence_ticket.consumption_symbol
-            ).values_list('ticket_code', flat=True))
+            matching_ticket_codes = get_symbol_codes(absence_ticket.tenant_id).get(
+                absence_ticket.consumption_symbol
+            )
 
             if matching_ticket_codes:
                 available_classes = available_classes.filter(
                     ticket_id__in=matching_ticket_codes
                 )
 
-        # 生徒の学年でフィルター（対象学年のクラスのみ表示）
+        # 生徒の学年でフィルター（対象学年のクラスのみ表示、gradeが未設定のクラスは含める）
         if student_school_year:
-            filtered_classes = []
-            for cs in available_classes:
-                if cs.grade:
-                    # gradeに紐づくschool_yearsに生徒の学年が含まれるかチェック
-                    if cs.grade.school_years.filter(id=student_school_year.id).exists():
-                        filtered_classes.append(cs)
-                else:
-                    # gradeが未設定のクラスは含める
-                    filtered_classes.append(cs)
-            available_classes = filtered_classes
+            available_classes = [
+                cs for cs in available_classes if matches_school_year(cs, student_school_year)
+            ]
 
         day_names = ['日', '月', '火', '水', '木', '金', '土']
         classes = []
@@ -567,3 +563,95 @@ class TransferAvailableClassesView(APIView):
             })
 
         return Response(classes)
+
+
+class MakeupSearchView(APIView):
+    """振替先一括検索API
+
+    保護者の子供の有効な欠席チケット（複数可）について、
+    今日から指定週数の振替先（クラス × 日付、休講日を除く）をまとめて返す。
+    ?absence_ticket_ids=xxx,yyy（省略時は全チケット）&weeks=4
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        from apps.students.models import Guardian, StudentGuardian
+        from ..models import AbsenceTicket
+        from ..services.makeup_search import MakeupSearchService, search_window
+
+        try:
+            ticket_ids = [
+                uuid.UUID(t.strip())
+                for t in (request.query_params.get('absence_ticket_ids') or '').split(',') if t.strip()
+            ]
+        except ValueError:
+            raise ValidationException('absence_ticket_ids は欠席チケットIDをカンマ区切りで指定してください')
+        try:
+            weeks = int(request.query_params.get('weeks') or 0)
+        except ValueError:
+            raise ValidationException('weeks は整数で指定してください')
+
+        # 保護者の子供を取得
+        try:
+            guardian = Guardian.objects.get(user=request.user)
+            student_ids = list(StudentGuardian.objects.filter(
+                guardian=guardian
+            ).values_list('student_id', flat=True))
+        except Guardian.DoesNotExist:
+            raise GuardianNotFoundError()
+
+        date_from, date_to = search_window(weeks)
+
+        # 有効な欠席チケットを取得
+        tickets = AbsenceTicket.objects.filter(
+            student_id__in=student_ids,
+            status=AbsenceTicket.Status.ISSUED,
+            valid_until__gte=date_from,
+            deleted_at__isnull=True,
+        ).select_related('student', 'class_schedule').order_by('absence_date')
+        if ticket_ids:
+            tickets = tickets.filter(id__in=ticket_ids)
+
+        # 退会日を過ぎた生徒のチケットは対象外
+        tickets = [
+            t for t in tickets
+            if not (t.student.status == 'withdrawn' and t.student.withdrawal_date
+                    and date_from > t.student.withdrawal_date)
+        ]
+
+        options_by_ticket = MakeupSearchService.search(tickets, date_from, date_to)
+
+        results = []
+        for ticket in tickets:
+            options = []
+            for option in options_by_ticket.get(ticket.id, []):
+                cs = option.class_schedule
+                options.append({
+                    'classScheduleId': str(cs.id),
+                    'date': option.date.isoformat(),
+                    'dayOfWeek': cs.day_of_week,
+                    'startTime': cs.start_time.strftime('%H:%M') if cs.start_time else None,
+                    'endTime': cs.end_time.strftime('%H:%M') if cs.end_time else None,
+                    'schoolId': str(cs.school_id) if cs.school_id else None,
+                    'schoolName': cs.school.school_name if cs.school else '',
+                    'brandId': str(cs.brand_id) if cs.brand_id else None,
+                    'brandName': cs.brand.brand_name if cs.brand else '',
+                    'className': cs.class_name or '',
+                    'maxSeat': cs.capacity,
+                    'availableSeats': option.available_seats,
+                })
+            results.append({
+                'absenceTicketId': str(ticket.id),
+                'studentId': str(ticket.student_id),
+                'studentName': ticket.student.full_name,
+                'consumptionSymbol': ticket.consumption_symbol or '',
+                'absenceDate': ticket.absence_date.isoformat() if ticket.absence_date else None,
+                'validUntil': ticket.valid_until.isoformat() if ticket.valid_until else None,
+                'options': options,
+            })
+
+        return Response({
+            'dateFrom': date_from.isoformat(),
+            'dateTo': date_to.isoformat(),
+            'tickets': results,
+        })
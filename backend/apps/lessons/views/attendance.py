@@ -1,13 +1,17 @@
 """
 Attendance Views - 出席記録Views
-AttendanceViewSet
+AttendanceViewSet, AttendanceStatsView, StudentAttendanceStatsView
 """
-from datetime import timedelta
+from datetime import date, timedelta
 from rest_framework import viewsets
+from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 
+from apps.core.exceptions import ValidationException
+from apps.core.permissions import IsTenantUser
+
 from ..models import Attendance, MakeupLesson
 from ..serializers import AttendanceSerializer
 
@@ -76,3 +80,92 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
+
+
+def _parse_date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValidationException(f'{name} は YYYY-MM-DD 形式で指定してください')
+
+
+class AttendanceStatsView(APIView):
+    """出欠集計API（ダッシュボード用）
+
+    集計済みの日別データを合計して返す。
+    ?date_from=&date_to=&group_by=school|brand|class_schedule|date|month&school_id=&brand_id=&class_schedule_id=
+    ブランド・クラスで絞り込む・まとめる場合、出席記録はブランド・クラスを持たないため
+    present / late は null、absent は欠席チケットの件数のみになる。
+    """
+    permission_classes = [IsAuthenticated, IsTenantUser]
+
+    def get(self, request):
+        from ..services.attendance_stats import GROUP_FIELDS, AttendanceStatsService
+
+        params = request.query_params
+        group_by = params.get('group_by') or 'school'
+        date_from = _parse_date(params.get('date_from'), 'date_from')
+        date_to = _parse_date(params.get('date_to'), 'date_to')
+        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
+
+        try:
+            rows = AttendanceStatsService.summarize(
+                tenant_id, date_from, date_to,
+                group_by=group_by,
+                school_id=params.get('school_id'),
+                brand_id=params.get('brand_id'),
+                class_schedule_id=params.get('class_schedule_id'),
+            )
+        except ValueError as e:
+            raise ValidationException(str(e))
+
+        results = []
+        for row in rows:
+            value = row[GROUP_FIELDS[group_by]]
+            results.append({
+                'key': value.isoformat() if isinstance(value, date) else (str(value) if value else None),
+                'present': row['present'],
+                'absent': row['absent'] or 0,
+                'late': row['late'],
+                'makeupUsed': row['makeup_used'] or 0,
+                'ticketsOutstanding': row['outstanding'] or 0,
+            })
+        return Response({
+            'dateFrom': date_from.isoformat(),
+            'dateTo': date_to.isoformat(),
+            'groupBy': group_by,
+            'results': results,
+        })
+
+
+class StudentAttendanceStatsView(APIView):
+    """生徒の出欠集計API（成績表用）
+
+    集計済みの月別データを返す。?month_from=YYYY-MM-DD&month_to=YYYY-MM-DD（省略時は直近12か月）
+    """
+    permission_classes = [IsAuthenticated, IsTenantUser]
+
+    def get(self, request, student_id):
+        from ..services.attendance_stats import AttendanceStatsService, month_start
+
+        params = request.query_params
+        today = date.today()
+        month_to = _parse_date(params['month_to'], 'month_to') if params.get('month_to') else today
+        month_from = (
+            _parse_date(params['month_from'], 'month_from') if params.get('month_from')
+            else month_start(month_start(today) - timedelta(days=335))
+        )
+
+        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
+        months = AttendanceStatsService.student_months(tenant_id, student_id, month_from, month_to)
+        return Response({
+            'studentId': str(student_id),
+            'months': [{
+                'month': m.month.strftime('%Y-%m'),
+                'present': m.present_count,
+                'absent': m.absent_count,
+                'late': m.late_count,
+                'makeupUsed': m.makeup_used_count,
+                'ticketsOutstanding': m.tickets_outstanding,
+            } for m in months],
+        })
@@ -2,7 +2,6 @@
 Student Calendar Views - 生徒カレンダー表示Views
 StudentCalendarView
 """
-from datetime import timedelta
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -13,13 +12,14 @@ from apps.core.exceptions import ValidationException, StudentNotFoundError
 class StudentCalendarView(APIView):
     """生徒のカレンダー表示用API
 
-    開講時間割（ClassSchedule）と年間カレンダー（LessonCalendar）を組み合わせて
+    授業実施日（LessonOccurrence: 開講時間割 × 年間カレンダー・休講）から
     生徒のカレンダーイベントを生成する
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from apps.schools.models import ClassSchedule, LessonCalendar
+        from apps.schools.models import ClassSchedule
+        from apps.schools.services.lesson_occurrence import LessonOccurrenceService
         from apps.contracts.models import StudentItem
         from apps.students.models import Student
         from datetime import datetime as dt
@@ -134,22 +134,6 @@ class StudentCalendarView(APIView):
                         class_schedules.append(cs)
                         break
 
-        # LessonCalendarを取得
-        lesson_calendars = LessonCalendar.objects.filter(
-            lesson_date__gte=date_from,
-            lesson_date__lte=date_to,
-        )
-        if school_ids:
-            lesson_calendars = lesson_calendars.filter(school_id__in=school_ids)
-        if brand_ids:
-            lesson_calendars = lesson_calendars.filter(brand_id__in=brand_ids)
-
-        # カレンダーをdate+school+brandでインデックス化
-        calendar_map = {}
-        for lc in lesson_calendars:
-            key = (lc.lesson_date, str(lc.school_id), str(lc.brand_id) if lc.brand_id else None)
-            calendar_map[key] = lc
-
         # 欠席チケット（AbsenceTicket）を取得（キャンセル済みは除外）
         from ..models import AbsenceTicket
         absence_tickets = AbsenceTicket.objects.filter(
@@ -165,89 +149,71 @@ class StudentCalendarView(APIView):
             key = (at.absence_date, str(at.class_schedule_id) if at.class_schedule_id else None)
             absence_map[key] = at
 
-        # カレンダーイベントを生成
+        # 授業実施日（開講カレンダー・休講を反映済み）からカレンダーイベントを生成
         events = []
         today = dt.now().date()
-        current_date = date_from
-        day_of_week_map = {0: 1, 1: 2, 2: 3, 3: 4, 4: 5, 5: 6, 6: 7}
+        occurrences = LessonOccurrenceService.get_occurrences(
+            max(date_from, today),
+            date_to,
+            tenant_id=tenant_id,
+            schedule_ids=[cs.id for cs in class_schedules],
+        )
 
-        while current_date <= date_to:
-            if current_date < today:
-                current_date += timedelta(days=1)
-                continue
+        for occurrence in occurrences:
+            cs = occurrence.class_schedule
+            current_date = occurrence.date
 
-            python_weekday = current_date.weekday()
-            db_day_of_week = day_of_week_map[python_weekday]
+            is_closed = not occurrence.is_open
+            is_native_day = occurrence.is_native_day
+            lesson_type = occurrence.lesson_type
 
-            for cs in class_schedules:
-                if cs.day_of_week != db_day_of_week:
-                    continue
+            absence_key = (current_date, str(cs.id))
+            absence_ticket = absence_map.get(absence_key)
+            is_absent = absence_ticket is not None
 
-                cal_key = (current_date, str(cs.school_id), str(cs.brand_id) if cs.brand_id else None)
-                lesson_cal = calendar_map.get(cal_key)
-
-                is_closed = False
-                is_native_day = False
-                lesson_type = 'A'
-                notice_message = ''
-                holiday_name = ''
-
-                if lesson_cal:
-                    is_closed = not lesson_cal.is_open
-                    is_native_day = lesson_cal.is_native_day
-                    lesson_type = lesson_cal.lesson_type
-                    notice_message = lesson_cal.notice_message or ''
-                    holiday_name = lesson_cal.holiday_name or ''
-
-                absence_key = (current_date, str(cs.id))
-                absence_ticket = absence_map.get(absence_key)
-                is_absent = absence_ticket is not None
-
-                start_datetime = dt.combine(current_date, cs.start_time)
-                end_datetime = dt.combine(current_date, cs.end_time)
-
-                event_type = 'lesson'
-                event_status = 'scheduled'
-                if is_closed:
-                    event_type = 'closed'
-                elif is_absent:
-                    event_type = 'absent'
-                    event_status = 'absent'
-                elif is_native_day:
-                    event_type = 'native'
-
-                events.append({
-                    'id': f'{cs.id}_{current_date.isoformat()}',
-                    'classScheduleId': str(cs.id),
-                    'title': cs.class_name or cs.display_course_name or 'レッスン',
-                    'start': start_datetime.isoformat(),
-                    'end': end_datetime.isoformat(),
-                    'date': current_date.isoformat(),
-                    'dayOfWeek': db_day_of_week,
-                    'period': cs.period,
-                    'type': event_type,
-                    'status': event_status,
-                    'lessonType': lesson_type,
-                    'isClosed': is_closed,
-                    'isAbsent': is_absent,
-                    'isNativeDay': is_native_day,
-                    'holidayName': holiday_name,
-                    'noticeMessage': notice_message,
-                    'schoolId': str(cs.school_id),
-                    'schoolName': cs.school.school_name if cs.school else '',
-                    'brandId': str(cs.brand_id) if cs.brand_id else None,
-                    'brandName': cs.brand.brand_name if cs.brand else '',
-                    'brandCategoryName': cs.brand_category.category_name if cs.brand_category else '',
-                    'roomName': cs.room_name or '',
-                    'className': cs.class_name,
-                    'displayCourseName': cs.display_course_name,
-                    'displayPairName': cs.display_pair_name,
-                    'transferGroup': cs.transfer_group,
-                    'calendarPattern': cs.calendar_pattern,
-                    'absenceTicketId': str(absence_ticket.id) if absence_ticket else None,
-                })
+            start_datetime = dt.combine(current_date, occurrence.start_time)
+            end_datetime = dt.combine(current_date, occurrence.end_time)
+
+            event_type = 'lesson'
+            event_status = 'scheduled'
+            if is_closed:
+                event_type = 'closed'
+            elif is_absent:
+                event_type = 'absent'
+                event_status = 'absent'
+            elif is_native_day:
+                event_type = 'native'
 
-            current_date += timedelta(days=1)
+            events.append({
+                'id': f'{cs.id}_{current_date.isoformat()}',
+                'classScheduleId': str(cs.id),
+                'title': cs.class_name or cs.display_course_name or 'レッスン',
+                'start': start_datetime.isoformat(),
+                'end': end_datetime.isoformat(),
+                'date': current_date.isoformat(),
+                'dayOfWeek': occurrence.day_of_week,
+                'period': cs.period,
+                'type': event_type,
+                'status': event_status,
+                'lessonType': lesson_type,
+                'isClosed': is_closed,
+                'isAbsent': is_absent,
+                'isNativeDay': is_native_day,
+                'holidayName': occurrence.holiday_name,
+                'noticeMessage': occurrence.notice_message,
+                'schoolId': str(cs.school_id),
+                'schoolName': cs.school.school_name if cs.school else '',
+                'brandId': str(cs.brand_id) if cs.brand_id else None,
+                'brandName': cs.brand.brand_name if cs.brand else '',
+                'brandCategoryName': cs.brand_category.category_name if cs.brand_category else '',
+                'roomName': cs.room_name or '',
+                'className': cs.class_name,
+                'displayCourseName': cs.display_course_name,
+                'displayPairName': cs.display_pair_name,
+                'transferGroup': cs.transfer_group,
+                'calendarPattern': cs.calendar_pattern,
+                'absenceTicketId': str(absence_ticket.id) if absence_ticket else None,
+            })
 
         # 振替予約を追加
         from ..models import Attendance
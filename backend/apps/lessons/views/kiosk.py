@@ -2,33 +2,25 @@
 Kiosk API Views - キオスク端末用の公開API
 認証不要でキオスクトークンを使用
 """
-from datetime import timedelta
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.utils import timezone
-from django.db.models import Q
-from django.conf import settings
-import hashlib
-import hmac
 
-from apps.students.models import Student
-from apps.users.models import User
 from apps.schools.models import School
-from ..models import LessonSchedule, Attendance
+from ..models import Attendance
+from ..services.kiosk import KioskService, verify_kiosk_token
+from ..services.kiosk_sync import MAX_EVENTS_PER_BATCH, KioskSyncService, build_roster
 
 
-def verify_kiosk_token(school_id: str, token: str) -> bool:
-    """キオスクトークンを検証"""
-    # 簡易的な検証（本番では環境変数等でシークレットを管理）
-    secret = getattr(settings, 'KIOSK_SECRET_KEY', 'oz-kiosk-secret-2024')
-    expected = hmac.new(
-        secret.encode(),
-        f"kiosk:{school_id}".encode(),
-        hashlib.sha256
-    ).hexdigest()[:32]
-    return hmac.compare_digest(token, expected)
+def _schedule_info(schedule: dict) -> dict:
+    """スナップショットの授業をレスポンス用に整形"""
+    return {
+        'class_name': schedule['class_name'],
+        'start_time': schedule['start_time'][:5],
+        'end_time': schedule['end_time'][:5],
+    }
 
 
 class KioskSchoolListView(APIView):
@@ -76,20 +68,14 @@ class KioskCheckInView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # QRコードから生徒を特定
-        student = None
-        user = None
-
-        # まず生徒のQRコードを検索
-        try:
-            student = Student.objects.get(qr_code=qr_code, deleted_at__isnull=True)
-        except Student.DoesNotExist:
-            pass
+        # 校舎の当日スナップショット（授業・QRコード対応）から生徒を特定
+        snapshot = KioskService.get_snapshot(school_id)
+        student = KioskService.find_student(snapshot, qr_code)
 
         # 生徒が見つからない場合、ユーザー（保護者）のQRコードを検索
         if not student:
-            try:
-                user = User.objects.get(qr_code=qr_code, is_active=True)
+            user = KioskService.find_guardian_user(qr_code)
+            if user:
                 # ユーザーの場合は保護者として記録（別途処理が必要な場合）
                 return Response({
                     'success': True,
@@ -98,16 +84,13 @@ class KioskCheckInView(APIView):
                     'user_name': user.full_name,
                     'timestamp': timezone.now().isoformat(),
                 })
-            except User.DoesNotExist:
-                return Response(
-                    {'success': False, 'message': '無効なQRコードです'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
+            return Response(
+                {'success': False, 'message': '無効なQRコードです'},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
         # 校舎の存在確認
-        try:
-            school = School.objects.get(id=school_id, deleted_at__isnull=True)
-        except School.DoesNotExist:
+        if snapshot is None:
             return Response(
                 {'success': False, 'message': '校舎が見つかりません'},
                 status=status.HTTP_404_NOT_FOUND
@@ -115,89 +98,36 @@ class KioskCheckInView(APIView):
 
         # 現在時刻を取得
         now = timezone.localtime(timezone.now())
-        current_date = now.date()
         current_time = now.time()
 
-        # 許容範囲（±15分）
-        time_margin = timedelta(minutes=15)
-        now_datetime = timezone.now()
-
-        # 該当する授業スケジュールを検索
-        schedules = LessonSchedule.objects.filter(
-            school_id=school_id,
-            date=current_date,
-            status__in=['scheduled', 'confirmed', 'in_progress'],
-            deleted_at__isnull=True
-        ).filter(
-            Q(student=student) |
-            Q(group_enrollments__student=student, group_enrollments__deleted_at__isnull=True)
-        ).distinct()
-
-        # 開始時刻でフィルタ
-        matching_schedule = None
-        for schedule in schedules:
-            schedule_start_datetime = timezone.make_aware(
-                timezone.datetime.combine(schedule.date, schedule.start_time)
-            )
-            schedule_end_datetime = timezone.make_aware(
-                timezone.datetime.combine(schedule.date, schedule.end_time)
-            )
-            earliest_checkin = schedule_start_datetime - time_margin
-
-            if earliest_checkin <= now_datetime <= schedule_end_datetime:
-                matching_schedule = schedule
-                break
+        # 該当する授業スケジュールを検索（授業開始15分前〜授業終了）
+        matching_schedule = KioskService.match_schedule(snapshot, student['id'], now)
 
         if not matching_schedule:
             # 授業がなくても入室記録だけは残す（今後の機能拡張用）
             return Response({
                 'success': True,
                 'type': 'check_in',
-                'message': f'{student.full_name}さんの入室を記録しました（授業予定なし）',
-                'student_name': student.full_name,
-                'student_no': student.student_no,
+                'message': f'{student["full_name"]}さんの入室を記録しました（授業予定なし）',
+                'student_name': student['full_name'],
+                'student_no': student['student_no'],
                 'timestamp': timezone.now().isoformat(),
                 'has_schedule': False,
             })
 
-        # 出席レコードを作成または更新
-        attendance, created = Attendance.objects.get_or_create(
-            schedule=matching_schedule,
-            student=student,
-            defaults={
-                'tenant_id': matching_schedule.tenant_id,
-                'status': 'present',
-                'check_in_time': current_time,
-            }
-        )
-
-        if not created:
-            if not attendance.check_in_time:
-                attendance.check_in_time = current_time
-                attendance.status = 'present'
-                attendance.save(update_fields=['check_in_time', 'status'])
-
-        # 授業ステータスを更新
-        if matching_schedule.status == 'scheduled':
-            matching_schedule.status = 'confirmed'
-            matching_schedule.save(update_fields=['status'])
+        # 出席レコードの作成・更新（直後の退室打刻で参照するためその場で書き込む）
+        KioskService.check_in(matching_schedule, student['id'], current_time.strftime('%H:%M:%S'))
 
         return Response({
             'success': True,
             'type': 'check_in',
-            'message': f'{student.full_name}さんの入室を記録しました',
-            'student_name': student.full_name,
-            'student_no': student.student_no,
+            'message': f'{student["full_name"]}さんの入室を記録しました',
+            'student_name': student['full_name'],
+            'student_no': student['student_no'],
             'check_in_time': current_time.strftime('%H:%M'),
             'timestamp': timezone.now().isoformat(),
             'has_schedule': True,
-            'schedule_info': {
-                'class_name': matching_schedule.class_name or (
-                    matching_schedule.subject.subject_name if matching_schedule.subject else ''
-                ),
-                'start_time': matching_schedule.start_time.strftime('%H:%M'),
-                'end_time': matching_schedule.end_time.strftime('%H:%M'),
-            },
+            'schedule_info': _schedule_info(matching_schedule),
         })
 
 
@@ -230,13 +160,11 @@ class KioskCheckOutView(APIView):
             )
 
         # QRコードから生徒を特定
-        student = None
-        try:
-            student = Student.objects.get(qr_code=qr_code, deleted_at__isnull=True)
-        except Student.DoesNotExist:
+        student = KioskService.find_student(KioskService.get_snapshot(school_id), qr_code)
+        if not student:
             # ユーザー（保護者）を検索
-            try:
-                user = User.objects.get(qr_code=qr_code, is_active=True)
+            user = KioskService.find_guardian_user(qr_code)
+            if user:
                 return Response({
                     'success': True,
                     'type': 'guardian_check_out',
@@ -244,11 +172,10 @@ class KioskCheckOutView(APIView):
                     'user_name': user.full_name,
                     'timestamp': timezone.now().isoformat(),
                 })
-            except User.DoesNotExist:
-                return Response(
-                    {'success': False, 'message': '無効なQRコードです'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
+            return Response(
+                {'success': False, 'message': '無効なQRコードです'},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
         # 現在時刻を取得
         now = timezone.localtime(timezone.now())
@@ -257,7 +184,7 @@ class KioskCheckOutView(APIView):
 
         # 今日の出席レコードで、check_in_timeがあってcheck_out_timeがないものを検索
         attendance = Attendance.objects.filter(
-            student=student,
+            student_id=student['id'],
             schedule__school_id=school_id,
             schedule__date=current_date,
             check_in_time__isnull=False,
@@ -270,9 +197,9 @@ class KioskCheckOutView(APIView):
             return Response({
                 'success': True,
                 'type': 'check_out',
-                'message': f'{student.full_name}さんの退室を記録しました（入室記録なし）',
-                'student_name': student.full_name,
-                'student_no': student.student_no,
+                'message': f'{student["full_name"]}さんの退室を記録しました（入室記録なし）',
+                'student_name': student['full_name'],
+                'student_no': student['student_no'],
                 'timestamp': timezone.now().isoformat(),
                 'has_check_in': False,
             })
@@ -286,9 +213,9 @@ class KioskCheckOutView(APIView):
         return Response({
             'success': True,
             'type': 'check_out',
-            'message': f'{student.full_name}さんの退室を記録しました',
-            'student_name': student.full_name,
-            'student_no': student.student_no,
+            'message': f'{student["full_name"]}さんの退室を記録しました',
+            'student_name': student['full_name'],
+            'student_no': student['student_no'],
             'check_in_time': attendance.check_in_time.strftime('%H:%M'),
             'check_out_time': current_time.strftime('%H:%M'),
             'timestamp': timezone.now().isoformat(),
@@ -325,13 +252,12 @@ class KioskAttendanceView(APIView):
             )
 
         # QRコードから生徒を特定
-        student = None
-        try:
-            student = Student.objects.get(qr_code=qr_code, deleted_at__isnull=True)
-        except Student.DoesNotExist:
+        snapshot = KioskService.get_snapshot(school_id)
+        student = KioskService.find_student(snapshot, qr_code)
+        if not student:
             # ユーザー（保護者）を検索
-            try:
-                user = User.objects.get(qr_code=qr_code, is_active=True)
+            user = KioskService.find_guardian_user(qr_code)
+            if user:
                 # 保護者の入退室は簡易記録
                 return Response({
                     'success': True,
@@ -340,11 +266,10 @@ class KioskAttendanceView(APIView):
                     'student_name': user.full_name,
                     'timestamp': timezone.now().isoformat(),
                 })
-            except User.DoesNotExist:
-                return Response(
-                    {'success': False, 'message': '無効なQRコードです'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
+            return Response(
+                {'success': False, 'message': '無効なQRコードです'},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
         now = timezone.localtime(timezone.now())
         current_date = now.date()
@@ -352,7 +277,7 @@ class KioskAttendanceView(APIView):
 
         # 今日の入室中の出席レコードを検索
         active_attendance = Attendance.objects.filter(
-            student=student,
+            student_id=student['id'],
             schedule__school_id=school_id,
             schedule__date=current_date,
             check_in_time__isnull=False,
@@ -369,9 +294,9 @@ class KioskAttendanceView(APIView):
             return Response({
                 'success': True,
                 'type': 'check_out',
-                'message': f'{student.full_name}さんが退室しました',
-                'student_name': student.full_name,
-                'student_no': student.student_no,
+                'message': f'{student["full_name"]}さんが退室しました',
+                'student_name': student['full_name'],
+                'student_no': student['student_no'],
                 'check_in_time': active_attendance.check_in_time.strftime('%H:%M'),
                 'check_out_time': current_time.strftime('%H:%M'),
                 'timestamp': timezone.now().isoformat(),
@@ -383,79 +308,103 @@ class KioskAttendanceView(APIView):
             })
 
         # 入室処理
-        # 該当する授業スケジュールを検索
-        time_margin = timedelta(minutes=15)
-        now_datetime = timezone.now()
-
-        schedules = LessonSchedule.objects.filter(
-            school_id=school_id,
-            date=current_date,
-            status__in=['scheduled', 'confirmed', 'in_progress'],
-            deleted_at__isnull=True
-        ).filter(
-            Q(student=student) |
-            Q(group_enrollments__student=student, group_enrollments__deleted_at__isnull=True)
-        ).distinct()
-
-        matching_schedule = None
-        for schedule in schedules:
-            schedule_start_datetime = timezone.make_aware(
-                timezone.datetime.combine(schedule.date, schedule.start_time)
-            )
-            schedule_end_datetime = timezone.make_aware(
-                timezone.datetime.combine(schedule.date, schedule.end_time)
-            )
-            earliest_checkin = schedule_start_datetime - time_margin
-
-            if earliest_checkin <= now_datetime <= schedule_end_datetime:
-                matching_schedule = schedule
-                break
+        # 該当する授業スケジュールを検索（授業開始15分前〜授業終了）
+        matching_schedule = KioskService.match_schedule(snapshot, student['id'], now)
 
         if matching_schedule:
-            attendance, created = Attendance.objects.get_or_create(
-                schedule=matching_schedule,
-                student=student,
-                defaults={
-                    'tenant_id': matching_schedule.tenant_id,
-                    'status': 'present',
-                    'check_in_time': current_time,
-                }
-            )
-
-            if not created and not attendance.check_in_time:
-                attendance.check_in_time = current_time
-                attendance.status = 'present'
-                attendance.save(update_fields=['check_in_time', 'status'])
-
-            if matching_schedule.status == 'scheduled':
-                matching_schedule.status = 'confirmed'
-                matching_schedule.save(update_fields=['status'])
+            # 出席レコードの作成・更新（直後の退室打刻で参照するためその場で書き込む）
+            KioskService.check_in(matching_schedule, student['id'], current_time.strftime('%H:%M:%S'))
 
             return Response({
                 'success': True,
                 'type': 'check_in',
-                'message': f'{student.full_name}さんが入室しました',
-                'student_name': student.full_name,
-                'student_no': student.student_no,
+                'message': f'{student["full_name"]}さんが入室しました',
+                'student_name': student['full_name'],
+                'student_no': student['student_no'],
                 'check_in_time': current_time.strftime('%H:%M'),
                 'timestamp': timezone.now().isoformat(),
-                'schedule_info': {
-                    'class_name': matching_schedule.class_name or (
-                        matching_schedule.subject.subject_name if matching_schedule.subject else ''
-                    ),
-                    'start_time': matching_schedule.start_time.strftime('%H:%M'),
-                    'end_time': matching_schedule.end_time.strftime('%H:%M'),
-                },
+                'schedule_info': _schedule_info(matching_schedule),
             })
 
         # 授業がない場合でも入室記録
         return Response({
             'success': True,
             'type': 'check_in',
-            'message': f'{student.full_name}さんが入室しました',
-            'student_name': student.full_name,
-            'student_no': student.student_no,
+            'message': f'{student["full_name"]}さんが入室しました',
+            'student_name': student['full_name'],
+            'student_no': student['student_no'],
             'check_in_time': current_time.strftime('%H:%M'),
             'timestamp': timezone.now().isoformat(),
             'schedule_info': None,
         })
+
+
+def _verify_sync_request(school_id, kiosk_token):
+    """同期APIのリクエスト検証（名簿に生徒情報を含むためトークン必須）"""
+    if not school_id:
+        return Response(
+            {'success': False, 'message': '校舎IDが必要です'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not kiosk_token or not verify_kiosk_token(str(school_id), kiosk_token):
+        return Response(
+            {'success': False, 'message': '無効なキオスクトークンです'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return None
+
+
+class KioskRosterView(APIView):
+    """キオスク同期用の当日名簿（QRコードのハッシュと授業の時間帯、署名付き）"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        school_id = request.query_params.get('school_id')
+        kiosk_token = request.query_params.get('kiosk_token') or request.headers.get('X-Kiosk-Token')
+
+        error = _verify_sync_request(school_id, kiosk_token)
+        if error:
+            return error
+
+        roster = build_roster(school_id)
+        if roster is None:
+            return Response(
+                {'success': False, 'message': '校舎が見つかりません'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(roster)
+
+
+class KioskSyncEventsView(APIView):
+    """キオスク同期用の打刻イベント一括送信（冪等キーで重複反映を防止）"""
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        school_id = request.data.get('school_id')
+        kiosk_token = request.data.get('kiosk_token') or request.headers.get('X-Kiosk-Token')
+        events = request.data.get('events')
+
+        error = _verify_sync_request(school_id, kiosk_token)
+        if error:
+            return error
+
+        if not isinstance(events, list) or not events:
+            return Response(
+                {'success': False, 'message': 'イベントが必要です'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(events) > MAX_EVENTS_PER_BATCH:
+            return Response(
+                {'success': False, 'message': f'一度に送信できるイベントは{MAX_EVENTS_PER_BATCH}件までです'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        school = School.objects.filter(id=school_id, deleted_at__isnull=True).first()
+        if school is None:
+            return Response(
+                {'success': False, 'message': '校舎が見つかりません'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        result = KioskSyncService.apply_events(school, events)
+        return Response({'success': True, **result})
@@ -1,17 +1,16 @@
 """
 QR Attendance Views - QRコード出席打刻
 """
-from datetime import timedelta
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Q
 
 from apps.students.models import Student
 from apps.core.permissions import IsTenantUser
-from ..models import LessonSchedule, Attendance
+from ..models import Attendance
+from ..services.kiosk import KioskService
 
 
 class QRCheckInView(APIView):
@@ -34,10 +33,10 @@ class QRCheckInView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # QRコードから生徒を特定
-        try:
-            student = Student.objects.get(qr_code=qr_code, deleted_at__isnull=True)
-        except Student.DoesNotExist:
+        # 校舎の当日スナップショット（授業・QRコード対応）から生徒を特定
+        snapshot = KioskService.get_snapshot(school_id)
+        student = KioskService.find_student(snapshot, qr_code)
+        if not student:
             return Response(
                 {'error': '無効なQRコードです'},
                 status=status.HTTP_404_NOT_FOUND
@@ -45,85 +44,32 @@ class QRCheckInView(APIView):
 
         # 現在時刻を取得
         now = timezone.localtime(timezone.now())
-        current_date = now.date()
         current_time = now.time()
 
-        # 許容範囲（±15分）
-        time_margin = timedelta(minutes=15)
-        now_datetime = timezone.now()
-        start_range = (now_datetime - time_margin).time()
-        end_range = (now_datetime + time_margin).time()
-
         # 該当する授業スケジュールを検索
-        # 条件：今日の日付、指定校舎、該当生徒、開始時刻が±15分以内
-        schedules = LessonSchedule.objects.filter(
-            school_id=school_id,
-            date=current_date,
-            status__in=['scheduled', 'confirmed', 'in_progress'],
-            deleted_at__isnull=True
-        ).filter(
-            # 個別授業の場合：生徒が直接紐づいている
-            Q(student=student) |
-            # 集団授業の場合：enrollmentsで紐づいている
-            Q(group_enrollments__student=student, group_enrollments__deleted_at__isnull=True)
-        ).distinct()
-
-        # 開始時刻でフィルタ（現在時刻の±15分以内、または既に開始して終了前）
-        matching_schedule = None
-        for schedule in schedules:
-            # 授業開始時刻から15分前〜授業終了時刻までが打刻可能範囲
-            schedule_start_datetime = timezone.make_aware(
-                timezone.datetime.combine(schedule.date, schedule.start_time)
-            )
-            schedule_end_datetime = timezone.make_aware(
-                timezone.datetime.combine(schedule.date, schedule.end_time)
-            )
-            earliest_checkin = schedule_start_datetime - time_margin
-
-            if earliest_checkin <= now_datetime <= schedule_end_datetime:
-                matching_schedule = schedule
-                break
+        # 条件：今日の日付、指定校舎、該当生徒、授業開始15分前〜授業終了
+        matching_schedule = KioskService.match_schedule(snapshot, student['id'], now)
 
         if not matching_schedule:
             return Response(
                 {
                     'error': '現在時刻に該当する授業が見つかりません',
-                    'student_name': student.full_name,
+                    'student_name': student['full_name'],
                     'current_time': current_time.strftime('%H:%M'),
                 },
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # 出席レコードを作成または更新
-        attendance, created = Attendance.objects.get_or_create(
-            schedule=matching_schedule,
-            student=student,
-            defaults={
-                'tenant_id': matching_schedule.tenant_id,
-                'status': 'present',
-                'check_in_time': current_time,
-            }
-        )
-
-        if not created:
-            # 既に出席レコードがある場合、check_in_timeを更新
-            if not attendance.check_in_time:
-                attendance.check_in_time = current_time
-                attendance.status = 'present'
-                attendance.save(update_fields=['check_in_time', 'status'])
-
-        # 授業ステータスを「実施中」に更新
-        if matching_schedule.status == 'scheduled':
-            matching_schedule.status = 'confirmed'
-            matching_schedule.save(update_fields=['status'])
+        # 出席レコードの作成・更新と授業ステータスの更新（直後の退室打刻で参照するためその場で書き込む）
+        KioskService.check_in(matching_schedule, student['id'], current_time.strftime('%H:%M:%S'))
 
         return Response({
             'success': True,
-            'student_name': student.full_name,
-            'student_no': student.student_no,
+            'student_name': student['full_name'],
+            'student_no': student['student_no'],
             'check_in_time': current_time.strftime('%H:%M'),
-            'schedule_info': f"{matching_schedule.date} {matching_schedule.start_time.strftime('%H:%M')}-{matching_schedule.end_time.strftime('%H:%M')}",
-            'class_name': matching_schedule.class_name or (matching_schedule.subject.subject_name if matching_schedule.subject else ''),
+            'schedule_info': f"{snapshot['date']} {matching_schedule['start_time'][:5]}-{matching_schedule['end_time'][:5]}",
+            'class_name': matching_schedule['class_name'],
             'status': 'present',
             'message': '出席を記録しました',
         })
@@ -55,7 +55,7 @@ class OnboardingRegisterView(APIView):
             raise ValidationException('氏名は必須です', field_errors={'full_name': ['氏名を入力してください']})
 
         # メールアドレスの重複チェック
-        if User.objects.filter(email=email).exists():
+        if User.objects.with_email(email).exists():
             raise ValidationException(
                 'このメールアドレスは既に登録されています',
                 field_errors={'email': ['このメールアドレスは既に登録されています']}
@@ -42,6 +42,7 @@ from .calendar import (
     LessonCalendarAdmin,
     ClassScheduleAdmin,
     CalendarOperationLogAdmin,
+    GoogleCalendarSyncStateAdmin,
 )
 
 # Bank
@@ -79,6 +80,7 @@ __all__ = [
     'LessonCalendarAdmin',
     'ClassScheduleAdmin',
     'CalendarOperationLogAdmin',
+    'GoogleCalendarSyncStateAdmin',
     # Bank
     'BankBranchInline',
     'BankTypeAdmin',
@@ -1,10 +1,11 @@
 """
 Calendar Admin - カレンダー・時間割管理Admin
-CalendarMasterAdmin, LessonCalendarAdmin, ClassScheduleAdmin, CalendarOperationLogAdmin
+CalendarMasterAdmin, LessonCalendarAdmin, ClassScheduleAdmin, CalendarOperationLogAdmin,
+GoogleCalendarSyncStateAdmin
 """
 from django.contrib import admin
 from apps.core.admin_csv import CSVImportExportMixin
-from ..models import CalendarMaster, LessonCalendar, ClassSchedule, CalendarOperationLog
+from ..models import CalendarMaster, LessonCalendar, ClassSchedule, CalendarOperationLog, GoogleCalendarSyncState
 from .importer import LessonCalendarCSVImporter
 
 
@@ -295,3 +296,13 @@ class CalendarOperationLogAdmin(CSVImportExportMixin, admin.ModelAdmin):
         'operated_by.email': '操作者',
         'operated_at': '操作日時',
     }
+
+
+@admin.register(GoogleCalendarSyncState)
+class GoogleCalendarSyncStateAdmin(admin.ModelAdmin):
+    """Googleカレンダー同期対象の管理（登録したカレンダーは次回の定期同期で全件同期）"""
+    list_display = ['calendar_id', 'is_active', 'last_synced_at', 'last_full_sync_at', 'last_error']
+    list_filter = ['is_active']
+    search_fields = ['calendar_id']
+    fields = ['calendar_id', 'is_active', 'window_start', 'last_synced_at', 'last_full_sync_at', 'last_error']
+    readonly_fields = ['window_start', 'last_synced_at', 'last_full_sync_at', 'last_error']
@@ -7,6 +7,7 @@
 """
 from django.core.management.base import BaseCommand
 from apps.schools.models import Brand, School, LessonCalendar, BrandSchool
+from apps.schools.services.calendar_loader import CalendarLoader
 from apps.tenants.models import Tenant
 from datetime import date, timedelta
 import calendar
@@ -104,7 +105,8 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('開講校舎が見つかりません'))
             return
 
-        created_count = 0
+        loader = CalendarLoader(tenant.id)
+        calendars = []
 
         for bs in brand_schools:
             brand = bs.brand
@@ -162,32 +164,30 @@ class Command(BaseCommand):
                                 f"{display_label} | {'Y' if is_open else ''} | {ticket_type or ''}"
                             )
                     else:
-                        LessonCalendar.objects.update_or_create(
-                            tenant_id=tenant.id,
-                            calendar_code=calendar_code,
-                            lesson_date=current_date,
-                            defaults={
-                                'brand': brand,
-                                'school': school,
-                                'day_of_week': weekday_name,
-                                'is_open': is_open,
-                                'lesson_type': cal_type if is_open else 'closed',
-                                'display_label': display_label,
-                                'ticket_type': ticket_type or '',
-                                'ticket_sequence': ticket_sequence,
-                                'holiday_name': holiday_name,
-                                'is_makeup_allowed': True,
-                                'auto_send_notice': False,
-                                'tenant_ref': tenant,
-                            }
-                        )
-                        created_count += 1
+                        calendars.append(loader.new_calendar(
+                            calendar_code,
+                            current_date,
+                            brand_id=brand.id,
+                            school_id=school.id,
+                            day_of_week=weekday_name,
+                            is_open=is_open,
+                            lesson_type=cal_type if is_open else 'closed',
+                            display_label=display_label,
+                            ticket_type=ticket_type or '',
+                            ticket_sequence=ticket_sequence,
+                            holiday_name=holiday_name,
+                            is_makeup_allowed=True,
+                            auto_send_notice=False,
+                        ))
 
                     current_date += timedelta(days=1)
 
                 if dry_run:
                     self.stdout.write(f"[DRY-RUN] {calendar_code}: 365日分")
 
+        # (カレンダーコード, 日付) 単位で一括 upsert（再実行しても重複しない）
+        created_count = loader.load_objects(calendars).upserted if calendars else 0
+
         if dry_run:
             self.stdout.write(self.style.SUCCESS(f'\n[DRY-RUN] 生成予定: {len(brand_schools) * 365}件'))
         else:
@@ -0,0 +1,61 @@
+"""
+授業実施日（LessonOccurrence）を生成
+
+定期ジョブ（generate_lesson_occurrences_task）と同じ範囲を再生成する。
+導入時の初回生成や、時間割・カレンダーの一括取り込み後に実行する。
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.schools.models import ClassSchedule
+from apps.schools.services.lesson_occurrence import LessonOccurrenceService
+
+
+class Command(BaseCommand):
+    help = '授業実施日（LessonOccurrence）を生成'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant-id',
+            type=str,
+            help='対象のテナントID'
+        )
+        parser.add_argument(
+            '--school-id',
+            type=str,
+            help='対象の校舎ID（--date-from/--date-to と併用）'
+        )
+        parser.add_argument(
+            '--date-from',
+            type=str,
+            help='開始日（YYYY-MM-DD。省略時は定期生成範囲）'
+        )
+        parser.add_argument(
+            '--date-to',
+            type=str,
+            help='終了日（YYYY-MM-DD）'
+        )
+
+    def handle(self, *args, **options):
+        if not options['date_from'] and not options['date_to']:
+            count = LessonOccurrenceService.generate_horizon(tenant_id=options.get('tenant_id'))
+            self.stdout.write(self.style.SUCCESS(f'{count}件の授業実施日を生成しました'))
+            return
+
+        try:
+            date_from = datetime.strptime(options['date_from'], '%Y-%m-%d').date()
+            date_to = datetime.strptime(options['date_to'], '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            raise CommandError('--date-from と --date-to を YYYY-MM-DD 形式で指定してください')
+
+        schedules = ClassSchedule.objects.all()
+        if options.get('tenant_id'):
+            schedules = schedules.filter(tenant_id=options['tenant_id'])
+        if options.get('school_id'):
+            schedules = schedules.filter(school_id=options['school_id'])
+
+        count = LessonOccurrenceService.generate(schedules, date_from, date_to)
+        self.stdout.write(self.style.SUCCESS(
+            f'{date_from}〜{date_to}: {count}件の授業実施日を生成しました'
+        ))
@@ -0,0 +1,26 @@
+"""
+座席占有数（ClassSchedule.enrolled_count / ScheduleOccupancy）を再集計
+
+queryset.update() や一括取り込みなど、シグナルを経由しない
+StudentSchool / AbsenceTicket / TrialBooking の変更後に実行する。
+"""
+from django.core.management.base import BaseCommand
+
+from apps.schools.services.occupancy import ScheduleOccupancyService
+
+
+class Command(BaseCommand):
+    help = '座席占有数（在籍数・日別の欠席/振替/体験数）を再集計'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant-id',
+            type=str,
+            help='対象のテナントID'
+        )
+
+    def handle(self, *args, **options):
+        schedules, occupancies = ScheduleOccupancyService.rebuild(tenant_id=options.get('tenant_id'))
+        self.stdout.write(self.style.SUCCESS(
+            f'時間割 {schedules}件の在籍数、日別占有数 {occupancies}件を再集計しました'
+        ))
@@ -0,0 +1,41 @@
+"""
+Googleカレンダーのイベントをローカルへ同期
+
+定期ジョブ（sync_google_calendars_task）と同じ処理を実行する。
+カレンダーを追加する場合は --calendar-id で指定すると同期対象に登録して全件同期する。
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.schools.models import GoogleCalendarSyncState
+from apps.schools.services.google_calendar import get_google_calendar_service
+
+
+class Command(BaseCommand):
+    help = 'Googleカレンダーのイベントをローカルへ同期'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--calendar-id',
+            action='append',
+            help='対象のGoogleカレンダーID（複数指定可。未登録なら同期対象に追加）'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='sync_token を使わず全件同期する'
+        )
+
+    def handle(self, *args, **options):
+        service = get_google_calendar_service()
+        if not service.credentials_dict:
+            raise CommandError('Googleカレンダーの認証情報が設定されていません')
+
+        calendar_ids = options.get('calendar_id') or None
+        for calendar_id in calendar_ids or []:
+            GoogleCalendarSyncState.objects.get_or_create(calendar_id=calendar_id)
+
+        result = service.sync_all(calendar_ids=calendar_ids, full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['calendars']}件のカレンダーを同期しました"
+            f"（更新 {result['upserted']}件、削除 {result['deleted']}件、失敗 {result['failed']}件）"
+        ))
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0023_add_purchase_notes_to_brand_category"),
+        ("students", "0027_add_class_schedule_to_trial_booking"),
+        ("lessons", "0008_alter_absenceticket_tenant_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="classschedule",
+            name="enrolled_count",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="在籍生徒数"
+            ),
+        ),
+        migrations.CreateModel(
+            name="ScheduleOccupancy",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("tenant_id", models.UUIDField(db_index=True, verbose_name="会社ID")),
+                ("schedule_id", models.UUIDField(verbose_name="スケジュールID")),
+                ("date", models.DateField(verbose_name="日付")),
+                (
+                    "absence_count",
+                    models.IntegerField(default=0, verbose_name="欠席数"),
+                ),
+                (
+                    "makeup_count",
+                    models.IntegerField(default=0, verbose_name="振替受入数"),
+                ),
+                (
+                    "trial_count",
+                    models.IntegerField(default=0, verbose_name="体験予約数"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+            ],
+            options={
+                "verbose_name": "T14d_日別座席占有数",
+                "verbose_name_plural": "T14d_日別座席占有数",
+                "db_table": "t14d_schedule_occupancies",
+                "unique_together": {("schedule_id", "date")},
+            },
+        ),
+    ]
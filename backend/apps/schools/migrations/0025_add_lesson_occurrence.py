@@ -0,0 +1,108 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0024_add_schedule_occupancy"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LessonOccurrence",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("tenant_id", models.UUIDField(verbose_name="会社ID")),
+                ("date", models.DateField(verbose_name="授業日")),
+                ("day_of_week", models.IntegerField(verbose_name="曜日")),
+                ("start_time", models.TimeField(verbose_name="開始時間")),
+                ("end_time", models.TimeField(verbose_name="終了時間")),
+                ("is_open", models.BooleanField(default=True, verbose_name="開講")),
+                (
+                    "lesson_type",
+                    models.CharField(
+                        default="A", max_length=10, verbose_name="授業タイプ"
+                    ),
+                ),
+                (
+                    "holiday_name",
+                    models.CharField(blank=True, max_length=50, verbose_name="祝日名"),
+                ),
+                (
+                    "notice_message",
+                    models.TextField(blank=True, verbose_name="お知らせ"),
+                ),
+                (
+                    "generated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="生成日時"),
+                ),
+                (
+                    "brand",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lesson_occurrences",
+                        to="schools.brand",
+                        verbose_name="ブランド",
+                    ),
+                ),
+                (
+                    "class_schedule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occurrences",
+                        to="schools.classschedule",
+                        verbose_name="開講時間割",
+                    ),
+                ),
+                (
+                    "closure",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="schools.schoolclosure",
+                        verbose_name="休講",
+                    ),
+                ),
+                (
+                    "lesson_calendar",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="schools.lessoncalendar",
+                        verbose_name="開講カレンダー",
+                    ),
+                ),
+                (
+                    "school",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lesson_occurrences",
+                        to="schools.school",
+                        verbose_name="校舎",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "T14e_授業実施日",
+                "verbose_name_plural": "T14e_授業実施日",
+                "db_table": "t14e_lesson_occurrences",
+                "ordering": ["date", "start_time"],
+                "indexes": [
+                    models.Index(
+                        fields=["school", "date"], name="lesson_occ_school_date_idx"
+                    ),
+                    models.Index(
+                        fields=["tenant_id", "date"], name="lesson_occ_tenant_date_idx"
+                    ),
+                ],
+                "unique_together": {("class_schedule", "date")},
+            },
+        ),
+    ]
@@ -0,0 +1,148 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0025_add_lesson_occurrence"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GoogleCalendarSyncState",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+                (
+                    "calendar_id",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="GoogleカレンダーID"
+                    ),
+                ),
+                (
+                    "sync_token",
+                    models.TextField(blank=True, verbose_name="同期トークン"),
+                ),
+                (
+                    "window_start",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="同期対象の開始日時"
+                    ),
+                ),
+                (
+                    "last_synced_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="最終同期日時"
+                    ),
+                ),
+                (
+                    "last_full_sync_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="最終全件同期日時"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="最終エラー")),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, verbose_name="定期同期"),
+                ),
+            ],
+            options={
+                "verbose_name": "Googleカレンダー同期状態",
+                "verbose_name_plural": "Googleカレンダー同期状態",
+                "db_table": "google_calendar_sync_states",
+                "ordering": ["calendar_id"],
+            },
+        ),
+        migrations.CreateModel(
+            name="GoogleCalendarEvent",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+                (
+                    "event_id",
+                    models.CharField(max_length=1024, verbose_name="イベントID"),
+                ),
+                (
+                    "start_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="開始日時"
+                    ),
+                ),
+                (
+                    "end_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="終了日時"
+                    ),
+                ),
+                ("is_all_day", models.BooleanField(default=False, verbose_name="終日")),
+                (
+                    "data",
+                    models.JSONField(default=dict, verbose_name="イベント（表示用）"),
+                ),
+                (
+                    "google_updated_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Google側の更新日時"
+                    ),
+                ),
+                (
+                    "calendar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="schools.googlecalendarsyncstate",
+                        verbose_name="カレンダー",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Googleカレンダーイベント",
+                "verbose_name_plural": "Googleカレンダーイベント",
+                "db_table": "google_calendar_events",
+                "ordering": ["start_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["calendar", "start_at"], name="idx_gcal_event_start"
+                    )
+                ],
+                "unique_together": {("calendar", "event_id")},
+            },
+        ),
+    ]
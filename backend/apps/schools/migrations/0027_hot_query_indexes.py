@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:24
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（トランザクション外で実行）
+    atomic = False
+
+    dependencies = [
+        ("schools", "0026_add_google_calendar_sync"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="lessoncalendar",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["school", "brand", "lesson_date"],
+                name="lc_school_brand_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+"""
+既存データから在籍生徒数・日別占有数を集計
+
+ScheduleOccupancyService.rebuild()（rebuild_schedule_occupancy コマンド）と同じ集計を
+マイグレーション時点のモデル（apps.get_model）で行う。
+現行のモデルを使うと、後のマイグレーションで参照先のモデルが変わった際に新規環境の migrate が失敗する。
+"""
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# 体験予約で席を占有するステータス（occupancy.ACTIVE_TRIAL_STATUSES と同じ）
+ACTIVE_TRIAL_STATUSES = ("pending", "confirmed")
+
+
+def rebuild_occupancy(apps, schema_editor):
+    ClassSchedule = apps.get_model("schools", "ClassSchedule")
+    ScheduleOccupancy = apps.get_model("schools", "ScheduleOccupancy")
+    StudentSchool = apps.get_model("students", "StudentSchool")
+    TrialBooking = apps.get_model("students", "TrialBooking")
+    AbsenceTicket = apps.get_model("lessons", "AbsenceTicket")
+
+    enrolled = (
+        StudentSchool.objects.filter(class_schedule=OuterRef("pk"), enrollment_status="active")
+        .order_by()
+        .values("class_schedule")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    ClassSchedule.objects.update(enrolled_count=Coalesce(Subquery(enrolled), 0))
+
+    rows = defaultdict(lambda: defaultdict(int))
+    tenants = {}
+
+    def add(tenant_id, schedule_id, date, field, count):
+        tenants[(schedule_id, date)] = tenant_id
+        rows[(schedule_id, date)][field] += count
+
+    tickets = AbsenceTicket.objects.filter(deleted_at__isnull=True)
+    for tenant_id, schedule_id, date, count in (
+        tickets.filter(class_schedule__isnull=False)
+        .exclude(status="cancelled")
+        .values_list("tenant_id", "class_schedule_id", "absence_date")
+        .annotate(c=Count("id"))
+    ):
+        add(tenant_id, schedule_id, date, "absence_count", count)
+    for tenant_id, schedule_id, date, count in (
+        tickets.filter(status="used", used_class_schedule__isnull=False, used_date__isnull=False)
+        .values_list("tenant_id", "used_class_schedule_id", "used_date")
+        .annotate(c=Count("id"))
+    ):
+        add(tenant_id, schedule_id, date, "makeup_count", count)
+    trials = TrialBooking.objects.filter(deleted_at__isnull=True, status__in=ACTIVE_TRIAL_STATUSES)
+    for key_field in ("schedule_id", "class_schedule_id"):
+        for tenant_id, schedule_id, date, count in (
+            trials.filter(**{f"{key_field}__isnull": False})
+            .values_list("tenant_id", key_field, "trial_date")
+            .annotate(c=Count("id"))
+        ):
+            add(tenant_id, schedule_id, date, "trial_count", count)
+
+    ScheduleOccupancy.objects.all().delete()
+    ScheduleOccupancy.objects.bulk_create(
+        [
+            ScheduleOccupancy(tenant_id=tenants[key], schedule_id=key[0], date=key[1], **counts)
+            for key, counts in rows.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0027_hot_query_indexes"),
+        ("students", "0029_hot_query_indexes"),
+        ("lessons", "0010_add_attendance_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_occupancy, migrations.RunPython.noop),
+    ]
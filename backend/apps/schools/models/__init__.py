@@ -33,6 +33,8 @@ from .schedule import (
     ClassSchedule,
     SchoolCourse,
     SchoolClosure,
+    ScheduleOccupancy,
+    LessonOccurrence,
 )
 
 # Calendar
@@ -42,6 +44,12 @@ from .calendar import (
     CalendarOperationLog,
 )
 
+# Google Calendar
+from .google_calendar import (
+    GoogleCalendarSyncState,
+    GoogleCalendarEvent,
+)
+
 # Bank Master
 from .bank_master import (
     BankType,
@@ -69,10 +77,15 @@ __all__ = [
     'ClassSchedule',
     'SchoolCourse',
     'SchoolClosure',
+    'ScheduleOccupancy',
+    'LessonOccurrence',
     # Calendar
     'CalendarMaster',
     'LessonCalendar',
     'CalendarOperationLog',
+    # Google Calendar
+    'GoogleCalendarSyncState',
+    'GoogleCalendarEvent',
     # Bank Master
     'BankType',
     'Bank',
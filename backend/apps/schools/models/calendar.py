@@ -210,6 +210,14 @@ class LessonCalendar(TenantModel):
         ordering = ['calendar_code', 'lesson_date']
         # カレンダーコード + 日付でユニーク（テナント単位）
         unique_together = ['tenant_id', 'calendar_code', 'lesson_date']
+        indexes = [
+            # 校舎・ブランドの期間内の開講日
+            models.Index(
+                fields=['school', 'brand', 'lesson_date'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='lc_school_brand_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.calendar_code} {self.lesson_date} {self.lesson_type}"
@@ -239,7 +247,8 @@ class LessonCalendar(TenantModel):
             brand_id=brand_id,
             school_id=school_id,
             lesson_date__gte=first_day,
-            lesson_date__lte=last_day
+            lesson_date__lte=last_day,
+            deleted_at__isnull=True
         ).order_by('lesson_date')
 
     @classmethod
@@ -0,0 +1,59 @@
+"""
+Google Calendar Models - Googleカレンダー同期
+GoogleCalendarSyncState, GoogleCalendarEvent
+"""
+from django.db import models
+from apps.core.models import BaseModel
+
+
+class GoogleCalendarSyncState(BaseModel):
+    """Googleカレンダーの同期状態（カレンダー単位）
+
+    認証情報はシステム共通のため、テナントには紐付けない。
+    sync_token があれば差分同期、なければ全件同期を行う。
+    """
+    calendar_id = models.CharField('GoogleカレンダーID', max_length=255, unique=True)
+    sync_token = models.TextField('同期トークン', blank=True)
+    window_start = models.DateTimeField('同期対象の開始日時', null=True, blank=True)
+    last_synced_at = models.DateTimeField('最終同期日時', null=True, blank=True)
+    last_full_sync_at = models.DateTimeField('最終全件同期日時', null=True, blank=True)
+    last_error = models.TextField('最終エラー', blank=True)
+    is_active = models.BooleanField('定期同期', default=True)
+
+    class Meta:
+        db_table = 'google_calendar_sync_states'
+        verbose_name = 'Googleカレンダー同期状態'
+        verbose_name_plural = 'Googleカレンダー同期状態'
+        ordering = ['calendar_id']
+
+    def __str__(self):
+        return f"{self.calendar_id} ({self.last_synced_at or '未同期'})"
+
+
+class GoogleCalendarEvent(BaseModel):
+    """Googleカレンダーのイベント（同期済みのローカルコピー）"""
+    calendar = models.ForeignKey(
+        GoogleCalendarSyncState,
+        on_delete=models.CASCADE,
+        related_name='events',
+        verbose_name='カレンダー'
+    )
+    event_id = models.CharField('イベントID', max_length=1024)
+    start_at = models.DateTimeField('開始日時', null=True, blank=True)
+    end_at = models.DateTimeField('終了日時', null=True, blank=True)
+    is_all_day = models.BooleanField('終日', default=False)
+    data = models.JSONField('イベント（表示用）', default=dict)
+    google_updated_at = models.DateTimeField('Google側の更新日時', null=True, blank=True)
+
+    class Meta:
+        db_table = 'google_calendar_events'
+        verbose_name = 'Googleカレンダーイベント'
+        verbose_name_plural = 'Googleカレンダーイベント'
+        ordering = ['start_at']
+        unique_together = ['calendar', 'event_id']
+        indexes = [
+            models.Index(fields=['calendar', 'start_at'], name='idx_gcal_event_start'),
+        ]
+
+    def __str__(self):
+        return f"{self.calendar_id} {self.event_id} {self.start_at}"
@@ -6,15 +6,21 @@ Schedule Models - スケジュール関連
 - class_schedule.py: ClassSchedule - 開講時間割
 - school_course.py: SchoolCourse - 校舎別コース開講設定
 - school_closure.py: SchoolClosure - 休講・休校マスタ
+- schedule_occupancy.py: ScheduleOccupancy - 日別座席占有数
+- lesson_occurrence.py: LessonOccurrence - 授業実施日（展開済み）
 """
 from .school_schedule import SchoolSchedule
 from .class_schedule import ClassSchedule
 from .school_course import SchoolCourse
 from .school_closure import SchoolClosure
+from .schedule_occupancy import ScheduleOccupancy
+from .lesson_occurrence import LessonOccurrence
 
 __all__ = [
     'SchoolSchedule',
     'ClassSchedule',
     'SchoolCourse',
     'SchoolClosure',
+    'ScheduleOccupancy',
+    'LessonOccurrence',
 ]
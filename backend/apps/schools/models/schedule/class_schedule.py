@@ -147,6 +147,8 @@ class ClassSchedule(TenantModel):
     capacity = models.IntegerField('定員', default=12)
     trial_capacity = models.IntegerField('体験受入可能数', default=2)
     reserved_seats = models.IntegerField('予約済み席数', default=0)
+    # 在籍生徒数（StudentSchool の変更時に signals で再集計）
+    enrolled_count = models.IntegerField('在籍生徒数', default=0, editable=False)
     pause_seat_fee = models.DecimalField(
         '休会時座席料金',
         max_digits=10,
@@ -236,17 +238,13 @@ class ClassSchedule(TenantModel):
 
     @property
     def active_student_count(self):
-        """在籍中の生徒数（リアルタイム計算）"""
-        from apps.students.models import StudentSchool
-        return StudentSchool.objects.filter(
-            class_schedule=self,
-            enrollment_status=StudentSchool.EnrollmentStatus.ACTIVE
-        ).count()
+        """在籍中の生徒数（集計済みの enrolled_count を返す）"""
+        return self.enrolled_count
 
     @property
     def available_seats(self):
-        """空き席数（リアルタイム計算）"""
-        return max(0, self.capacity - self.active_student_count)
+        """空き席数"""
+        return max(0, self.capacity - self.enrolled_count)
 
     def is_available(self):
         """予約可能かどうか"""
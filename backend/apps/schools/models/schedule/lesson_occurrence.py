@@ -0,0 +1,85 @@
+"""
+LessonOccurrence Model - 授業実施日（展開済み）
+"""
+from django.db import models
+
+
+class LessonOccurrence(models.Model):
+    """開講時間割 × 開講カレンダー × 休講 を日付ごとに展開した授業
+
+    ClassSchedule（曜日単位）を LessonCalendar（日別のA/B・開講）と
+    SchoolClosure（休講）に照らして日付単位に展開したもの。
+    カレンダー系の画面はこのテーブルの範囲読み出しで表示する。
+
+    一定期間先まで定期ジョブで生成し、時間割・カレンダー・休講の変更時に
+    該当範囲のみ再生成する（services/lesson_occurrence.py 参照）。
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    tenant_id = models.UUIDField('会社ID')
+    class_schedule = models.ForeignKey(
+        'schools.ClassSchedule',
+        on_delete=models.CASCADE,
+        related_name='occurrences',
+        verbose_name='開講時間割'
+    )
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        related_name='lesson_occurrences',
+        verbose_name='校舎'
+    )
+    brand = models.ForeignKey(
+        'schools.Brand',
+        on_delete=models.CASCADE,
+        related_name='lesson_occurrences',
+        verbose_name='ブランド'
+    )
+
+    date = models.DateField('授業日')
+    day_of_week = models.IntegerField('曜日')
+    start_time = models.TimeField('開始時間')
+    end_time = models.TimeField('終了時間')
+
+    # 開講カレンダー・休講の判定結果
+    is_open = models.BooleanField('開講', default=True)
+    lesson_type = models.CharField('授業タイプ', max_length=10, default='A')
+    lesson_calendar = models.ForeignKey(
+        'schools.LessonCalendar',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='開講カレンダー'
+    )
+    closure = models.ForeignKey(
+        'schools.SchoolClosure',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='休講'
+    )
+    holiday_name = models.CharField('祝日名', max_length=50, blank=True)
+    notice_message = models.TextField('お知らせ', blank=True)
+
+    generated_at = models.DateTimeField('生成日時', auto_now=True)
+
+    class Meta:
+        db_table = 't14e_lesson_occurrences'
+        verbose_name = 'T14e_授業実施日'
+        verbose_name_plural = 'T14e_授業実施日'
+        ordering = ['date', 'start_time']
+        unique_together = ['class_schedule', 'date']
+        indexes = [
+            models.Index(fields=['school', 'date'], name='lesson_occ_school_date_idx'),
+            models.Index(fields=['tenant_id', 'date'], name='lesson_occ_tenant_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.class_schedule_id} {self.date} {self.lesson_type}{'' if self.is_open else ' 休講'}"
+
+    @property
+    def is_native_day(self):
+        """外国人講師がいる日かどうか（開講カレンダーの行がある日のみ）"""
+        return self.lesson_calendar_id is not None and self.lesson_type == 'A'
@@ -0,0 +1,35 @@
+"""
+ScheduleOccupancy Model - 日別座席占有数
+"""
+from django.db import models
+
+
+class ScheduleOccupancy(models.Model):
+    """開講枠の日別占有数（欠席・振替・体験）
+
+    AbsenceTicket / TrialBooking の変更時に signals で再集計して保持する。
+    一覧表示のたびに COUNT を発行しないための集計テーブル（services/occupancy.py 参照）。
+
+    schedule_id は ClassSchedule.id または SchoolSchedule.id
+    （TrialBooking.get_booked_count と同じく、どちらのIDでも引けるようにする）
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    tenant_id = models.UUIDField('会社ID', db_index=True)
+    schedule_id = models.UUIDField('スケジュールID')
+    date = models.DateField('日付')
+
+    absence_count = models.IntegerField('欠席数', default=0)
+    makeup_count = models.IntegerField('振替受入数', default=0)
+    trial_count = models.IntegerField('体験予約数', default=0)
+
+    updated_at = models.DateTimeField('更新日時', auto_now=True)
+
+    class Meta:
+        db_table = 't14d_schedule_occupancies'
+        verbose_name = 'T14d_日別座席占有数'
+        verbose_name_plural = 'T14d_日別座席占有数'
+        unique_together = ['schedule_id', 'date']
+
+    def __str__(self):
+        return f"{self.schedule_id} {self.date} 欠席{self.absence_count} 振替{self.makeup_count} 体験{self.trial_count}"
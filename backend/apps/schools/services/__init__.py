@@ -1,3 +1,4 @@
 from .google_calendar import GoogleCalendarService
+from .occupancy import ScheduleOccupancyService
 
-__all__ = ['GoogleCalendarService']
+__all__ = ['GoogleCalendarService', 'ScheduleOccupancyService']
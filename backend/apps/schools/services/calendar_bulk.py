@@ -0,0 +1,414 @@
+"""
+Calendar Bulk Service
+開講カレンダー・休講の一括操作（期間 × 校舎/ブランド/カレンダーパターン）
+
+AdminCalendarABSwapView は1日・1パターンずつ LessonCalendar を作成/更新し、
+そのたびに CalendarOperationLog を1件書き込むため、1か月分のABパターン変更や
+複数校舎・ブランドへの休講設定は数百回のAPI呼び出しになっていた。
+
+ここでは1回の操作で
+- 対象の既存行を1回で取得し、差分を計算
+- bulk_create / bulk_update で反映
+- 操作ログを bulk_create で1回で書き込み
+- 授業実施日（LessonOccurrence）と体験の空き状況キャッシュを操作単位で1回だけ更新
+を行い、変更内容（diff）を返す。dry_run では差分の計算のみ行う。
+
+bulk_create / bulk_update は signals を発火しないため、
+授業実施日とキャッシュの更新はここで明示的に行う。
+"""
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from apps.schools.models import CalendarOperationLog, ClassSchedule, LessonCalendar, SchoolClosure
+
+logger = logging.getLogger(__name__)
+
+# 1回の操作で扱う最大日数
+MAX_RANGE_DAYS = 366
+# 指定できるレッスンタイプ
+PATTERN_TYPES = ('A', 'B', 'P', 'Y')
+SWAP_TYPES = {'A': 'B', 'B': 'A'}
+DAY_NAMES = '月火水木金土日'
+
+
+class CalendarBulkError(ValueError):
+    """一括操作の指定が不正"""
+
+
+@dataclass
+class BulkResult:
+    """一括操作の結果"""
+    created: List[Dict] = field(default_factory=list)
+    updated: List[Dict] = field(default_factory=list)
+    deleted: List[Dict] = field(default_factory=list)
+    unchanged: int = 0
+    skipped: List[Dict] = field(default_factory=list)
+    dry_run: bool = False
+
+    def to_dict(self) -> Dict:
+        return {
+            'dryRun': self.dry_run,
+            'created': self.created,
+            'updated': self.updated,
+            'deleted': self.deleted,
+            'unchanged': self.unchanged,
+            'skipped': self.skipped,
+            'summary': {
+                'created': len(self.created),
+                'updated': len(self.updated),
+                'deleted': len(self.deleted),
+                'unchanged': self.unchanged,
+                'skipped': len(self.skipped),
+            },
+        }
+
+
+def _dates(date_from: date, date_to: date, weekdays: Optional[Set[int]] = None):
+    """期間内の日付（weekdays は 1=月〜7=日）"""
+    if date_from > date_to:
+        raise CalendarBulkError('開始日は終了日以前を指定してください')
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise CalendarBulkError(f'期間は{MAX_RANGE_DAYS}日以内で指定してください')
+    current = date_from
+    while current <= date_to:
+        if not weekdays or current.isoweekday() in weekdays:
+            yield current
+        current += timedelta(days=1)
+
+
+def _ids(values, label: str) -> List[uuid.UUID]:
+    """校舎・ブランドIDのリスト（UUIDでない値は CalendarBulkError）"""
+    if not values:
+        return []
+    if isinstance(values, (str, bytes)) or not isinstance(values, Iterable):
+        raise CalendarBulkError(f'{label} はIDのリストで指定してください')
+    try:
+        return [value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)) for value in values]
+    except (TypeError, ValueError, AttributeError):
+        raise CalendarBulkError(f'{label} に不正なIDが含まれています')
+
+
+def _codes(values) -> List[str]:
+    """カレンダーパターンのリスト（文字列以外は CalendarBulkError）"""
+    if not values:
+        return []
+    if isinstance(values, (str, bytes)) or not isinstance(values, Iterable):
+        raise CalendarBulkError('calendar_patterns は文字列のリストで指定してください')
+    values = list(values)
+    if not all(isinstance(value, str) and value for value in values):
+        raise CalendarBulkError('calendar_patterns は文字列のリストで指定してください')
+    return values
+
+
+def _weekdays(weekdays) -> Optional[Set[int]]:
+    """対象曜日（1=月〜7=日 以外は CalendarBulkError）"""
+    if not weekdays:
+        return None
+    if not all(isinstance(w, int) and 1 <= w <= 7 for w in weekdays):
+        raise CalendarBulkError('weekdays は 1〜7 で指定してください')
+    return set(weekdays)
+
+
+class CalendarBulkService:
+    """開講カレンダー・休講の一括操作"""
+
+    # ----------------------------------------
+    # ABパターン
+    # ----------------------------------------
+
+    @staticmethod
+    def resolve_patterns(tenant_id, calendar_patterns: Iterable = (), school_ids: Iterable = (),
+                         brand_ids: Iterable = ()) -> Dict[str, Dict]:
+        """
+        対象のカレンダーパターン（直接指定、または校舎・ブランドの開講時間割から）
+
+        Returns:
+            {calendar_pattern: {'school_id', 'brand_id', 'days': 授業のある曜日の集合}}
+        """
+        calendar_patterns = _codes(calendar_patterns)
+        school_ids = _ids(school_ids, 'school_ids')
+        brand_ids = _ids(brand_ids, 'brand_ids')
+        schedules = ClassSchedule.objects.filter(
+            tenant_id=tenant_id,
+            is_active=True,
+            deleted_at__isnull=True,
+        ).exclude(calendar_pattern='')
+        if calendar_patterns:
+            schedules = schedules.filter(calendar_pattern__in=calendar_patterns)
+        else:
+            if not school_ids and not brand_ids:
+                raise CalendarBulkError('カレンダーパターン、校舎、ブランドのいずれかを指定してください')
+            if school_ids:
+                schedules = schedules.filter(school_id__in=school_ids)
+            if brand_ids:
+                schedules = schedules.filter(brand_id__in=brand_ids)
+
+        patterns = {}
+        for pattern, school_id, brand_id, day_of_week in schedules.values_list(
+            'calendar_pattern', 'school_id', 'brand_id', 'day_of_week'
+        ).order_by('calendar_pattern', 'school_id'):
+            entry = patterns.setdefault(pattern, {'school_id': school_id, 'brand_id': brand_id, 'days': set()})
+            entry['days'].add(day_of_week)
+        return patterns
+
+    @classmethod
+    def apply_pattern(cls, tenant_id, date_from: date, date_to: date, *, lesson_type: Optional[str] = None,
+                      calendar_patterns: Iterable = (), school_ids: Iterable = (), brand_ids: Iterable = (),
+                      weekdays: Optional[Set[int]] = None, user=None, reason: str = '',
+                      dry_run: bool = False) -> BulkResult:
+        """
+        期間 × カレンダーパターンにABパターンを設定
+
+        Args:
+            lesson_type: 設定するタイプ（A/B/P/Y）。省略時は A ⇔ B を入れ替える
+            weekdays: 対象の曜日（1=月〜7=日）。省略時はパターンの授業がある曜日すべて
+        """
+        if lesson_type and lesson_type not in PATTERN_TYPES:
+            raise CalendarBulkError(f'lesson_type は {", ".join(PATTERN_TYPES)} のいずれかを指定してください')
+
+        patterns = cls.resolve_patterns(tenant_id, calendar_patterns, school_ids, brand_ids)
+        result = BulkResult(dry_run=dry_run)
+        target_dates = list(_dates(date_from, date_to, _weekdays(weekdays)))
+        if not patterns or not target_dates:
+            return result
+
+        existing = {
+            (lc.calendar_code, lc.lesson_date): lc
+            for lc in LessonCalendar.objects.filter(
+                tenant_id=tenant_id,
+                calendar_code__in=patterns.keys(),
+                lesson_date__gte=date_from,
+                lesson_date__lte=date_to,
+            )
+        }
+
+        to_create, to_update, logs = [], [], []
+        for pattern, info in sorted(patterns.items()):
+            for target_date in target_dates:
+                # パターンの授業がない曜日は対象外
+                if target_date.isoweekday() not in info['days']:
+                    continue
+                lesson_calendar = existing.get((pattern, target_date))
+                old_type = (lesson_calendar.lesson_type if lesson_calendar else None) or 'A'
+                new_type = lesson_type or SWAP_TYPES.get(old_type)
+                diff = {'calendarPattern': pattern, 'date': target_date.isoformat(),
+                        'oldType': old_type if lesson_calendar else None, 'newType': new_type}
+
+                if new_type is None:
+                    result.skipped.append({**diff, 'reason': f'{old_type} は自動で入れ替えできません'})
+                    continue
+                if lesson_calendar is not None and lesson_calendar.lesson_type == new_type:
+                    result.unchanged += 1
+                    continue
+
+                if lesson_calendar is None:
+                    lesson_calendar = LessonCalendar(
+                        tenant_id=tenant_id,
+                        calendar_code=pattern,
+                        lesson_date=target_date,
+                        day_of_week=DAY_NAMES[target_date.weekday()],
+                        school_id=info['school_id'],
+                        brand_id=info['brand_id'],
+                        lesson_type=new_type,
+                        is_open=True,
+                    )
+                    to_create.append(lesson_calendar)
+                    result.created.append(diff)
+                else:
+                    lesson_calendar.lesson_type = new_type
+                    lesson_calendar.updated_at = timezone.now()
+                    to_update.append(lesson_calendar)
+                    result.updated.append(diff)
+
+                logs.append(CalendarOperationLog(
+                    tenant_id=tenant_id,
+                    operation_type=CalendarOperationLog.OperationType.AB_SWAP,
+                    school_id=lesson_calendar.school_id,
+                    brand_id=lesson_calendar.brand_id,
+                    lesson_calendar=lesson_calendar,
+                    operation_date=target_date,
+                    operated_by=user,
+                    old_value=old_type,
+                    new_value=new_type,
+                    reason=reason,
+                    metadata={'calendar_code': pattern, 'bulk': True},
+                ))
+
+        if dry_run or not logs:
+            return result
+
+        with transaction.atomic():
+            LessonCalendar.objects.bulk_create(to_create, batch_size=500)
+            LessonCalendar.objects.bulk_update(to_update, ['lesson_type', 'updated_at'], batch_size=500)
+            CalendarOperationLog.objects.bulk_create(logs, batch_size=500)
+            transaction.on_commit(lambda: cls._refresh_downstream(
+                ClassSchedule.objects.filter(tenant_id=tenant_id, calendar_pattern__in=patterns.keys()),
+                date_from, date_to, school_ids=None,
+            ))
+        return result
+
+    # ----------------------------------------
+    # 休講
+    # ----------------------------------------
+
+    @classmethod
+    def set_closure(cls, tenant_id, date_from: date, date_to: date, *, school_ids: Iterable,
+                    brand_ids: Iterable = (), closure_type: str = SchoolClosure.ClosureType.OTHER,
+                    reason: str = '', weekdays: Optional[Set[int]] = None, user=None,
+                    dry_run: bool = False) -> BulkResult:
+        """
+        期間 × 校舎（× ブランド）に休講を設定
+
+        ブランド省略時は校舎全体の休講。同じ校舎・ブランド・日付の休講（時間帯指定なし）が
+        既にある場合は変更しない。
+        """
+        if closure_type not in SchoolClosure.ClosureType.values:
+            raise CalendarBulkError('closure_type が不正です')
+        school_ids = _ids(school_ids, 'school_ids')
+        if not school_ids:
+            raise CalendarBulkError('校舎を指定してください')
+        brand_ids = _ids(brand_ids, 'brand_ids') or [None]
+        target_dates = list(_dates(date_from, date_to, _weekdays(weekdays)))
+        result = BulkResult(dry_run=dry_run)
+
+        existing = set(SchoolClosure.objects.filter(
+            tenant_id=tenant_id,
+            school_id__in=school_ids,
+            closure_date__gte=date_from,
+            closure_date__lte=date_to,
+            schedule__isnull=True,
+            deleted_at__isnull=True,
+        ).values_list('school_id', 'brand_id', 'closure_date'))
+        existing = {(str(s), str(b) if b else None, d) for s, b, d in existing}
+
+        closures, logs = [], []
+        for school_id in school_ids:
+            for brand_id in brand_ids:
+                for target_date in target_dates:
+                    diff = {'schoolId': str(school_id), 'brandId': str(brand_id) if brand_id else None,
+                            'date': target_date.isoformat()}
+                    if (str(school_id), str(brand_id) if brand_id else None, target_date) in existing:
+                        result.unchanged += 1
+                        continue
+                    closure = SchoolClosure(
+                        tenant_id=tenant_id,
+                        school_id=school_id,
+                        brand_id=brand_id,
+                        closure_date=target_date,
+                        closure_type=closure_type,
+                        reason=reason,
+                    )
+                    closures.append(closure)
+                    result.created.append(diff)
+                    logs.append(CalendarOperationLog(
+                        tenant_id=tenant_id,
+                        operation_type=CalendarOperationLog.OperationType.SET_CLOSURE,
+                        school_id=school_id,
+                        brand_id=brand_id,
+                        operation_date=target_date,
+                        operated_by=user,
+                        new_value=closure.get_closure_type_display(),
+                        reason=reason,
+                        metadata={'closure_id': str(closure.id), 'closure_type': closure_type, 'bulk': True},
+                    ))
+
+        if dry_run or not closures:
+            return result
+
+        with transaction.atomic():
+            SchoolClosure.objects.bulk_create(closures, batch_size=500)
+            CalendarOperationLog.objects.bulk_create(logs, batch_size=500)
+            transaction.on_commit(lambda: cls._refresh_downstream(
+                cls._closure_schedules(tenant_id, school_ids, brand_ids), date_from, date_to,
+                school_ids=school_ids,
+            ))
+        return result
+
+    @classmethod
+    def cancel_closure(cls, tenant_id, date_from: date, date_to: date, *, school_ids: Iterable,
+                       brand_ids: Iterable = (), weekdays: Optional[Set[int]] = None, user=None,
+                       reason: str = '', dry_run: bool = False) -> BulkResult:
+        """期間 × 校舎（× ブランド）の休講（時間帯指定なし）を解除（論理削除）"""
+        school_ids = _ids(school_ids, 'school_ids')
+        if not school_ids:
+            raise CalendarBulkError('校舎を指定してください')
+        brand_ids = _ids(brand_ids, 'brand_ids')
+        target_dates = set(_dates(date_from, date_to, _weekdays(weekdays)))
+        result = BulkResult(dry_run=dry_run)
+
+        closures = SchoolClosure.objects.filter(
+            tenant_id=tenant_id,
+            school_id__in=school_ids,
+            closure_date__gte=date_from,
+            closure_date__lte=date_to,
+            schedule__isnull=True,
+            deleted_at__isnull=True,
+        )
+        if brand_ids:
+            closures = closures.filter(brand_id__in=brand_ids)
+        closures = [c for c in closures if c.closure_date in target_dates]
+
+        logs = []
+        for closure in closures:
+            result.deleted.append({
+                'schoolId': str(closure.school_id),
+                'brandId': str(closure.brand_id) if closure.brand_id else None,
+                'date': closure.closure_date.isoformat(),
+            })
+            logs.append(CalendarOperationLog(
+                tenant_id=tenant_id,
+                operation_type=CalendarOperationLog.OperationType.CANCEL_CLOSURE,
+                school_id=closure.school_id,
+                brand_id=closure.brand_id,
+                operation_date=closure.closure_date,
+                operated_by=user,
+                old_value=closure.get_closure_type_display(),
+                reason=reason,
+                metadata={'closure_id': str(closure.id), 'bulk': True},
+            ))
+
+        if dry_run or not closures:
+            return result
+
+        with transaction.atomic():
+            SchoolClosure.objects.filter(id__in=[c.id for c in closures]).update(deleted_at=timezone.now())
+            CalendarOperationLog.objects.bulk_create(logs, batch_size=500)
+            transaction.on_commit(lambda: cls._refresh_downstream(
+                cls._closure_schedules(tenant_id, school_ids, brand_ids or [None]), date_from, date_to,
+                school_ids=school_ids,
+            ))
+        return result
+
+    # ----------------------------------------
+    # 後続処理
+    # ----------------------------------------
+
+    @staticmethod
+    def _closure_schedules(tenant_id, school_ids, brand_ids):
+        schedules = ClassSchedule.objects.filter(tenant_id=tenant_id, school_id__in=school_ids)
+        brand_ids = [b for b in brand_ids if b]
+        if brand_ids:
+            schedules = schedules.filter(brand_id__in=brand_ids)
+        return schedules
+
+    @staticmethod
+    def _refresh_downstream(schedules, date_from: date, date_to: date, school_ids=None):
+        """授業実施日とキャッシュを操作単位で1回だけ更新"""
+        from .lesson_occurrence import LessonOccurrenceService
+        from .trial_availability import invalidate_trial_availability
+
+        try:
+            LessonOccurrenceService.refresh_range(schedules, date_from, date_to)
+        except DatabaseError as e:
+            logger.error(f"Failed to refresh lesson occurrences after bulk calendar operation: {e}", exc_info=True)
+        if school_ids:
+            for school_id in school_ids:
+                invalidate_trial_availability(school_id)
+        else:
+            invalidate_trial_availability()
@@ -0,0 +1,386 @@
+"""
+Calendar Loader Service
+T13 開講カレンダー（LessonCalendar）の一括ロード
+
+import_t13_calendar / scripts/import_t13_calendar_v2.py / generate_calendar_2025 は
+1行ごとにブランド・校舎を検索し、update_or_create / create で保存していたため、
+1年分（カレンダーコード数 × 365日）の再生成に数分かかっていた。
+
+ここでは
+- CSV / Excel をストリーミングで読み込み（全行をメモリに載せない）
+- カレンダーコード → 校舎・ブランド・カレンダーマスターを事前に読み込んだ対応表で解決
+- (tenant_id, calendar_code, lesson_date) をキーに bulk_create(update_conflicts=True) で upsert
+を行う。同じファイルを何度ロードしても結果は同じ（再実行可能）。
+
+bulk_create は signals を発火しないため、ロード完了後に
+授業実施日（LessonOccurrence）と体験の空き状況キャッシュを1回だけ更新する。
+"""
+import csv
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from django.db import transaction
+
+from apps.schools.models import Brand, CalendarMaster, ClassSchedule, LessonCalendar, School
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DAY_NAMES = '月火水木金土日'
+
+# upsert 時に更新する項目（キー項目・id・created_at 以外）
+UPDATE_FIELDS = [
+    'calendar_master', 'brand', 'school', 'day_of_week', 'is_open', 'lesson_type',
+    'display_label', 'ticket_type', 'ticket_sequence', 'is_makeup_allowed', 'rejection_reason',
+    'ticket_issue_count', 'valid_days', 'notice_message', 'auto_send_notice', 'holiday_name', 'updated_at',
+]
+
+# カレンダーコード中のブランド表記 → ブランドコード（例: 1001_SKAEC_A → AEC）
+BRAND_ALIASES = {
+    'SKAEC': 'AEC',
+    'SOR': 'SOROBAN',
+    'FUDE': 'FUDE',
+    'JUKU': 'GYM',
+    'SUDA': 'SUDA',
+    'INT': 'INT',
+}
+
+CALENDAR_ID_COLUMN = 'カレンダーID'
+
+
+class CalendarLoadError(ValueError):
+    """行の内容が不正"""
+
+
+# ----------------------------------------
+# 読み込み
+# ----------------------------------------
+
+def iter_csv_rows(path: str) -> Iterator[Dict]:
+    """CSV を1行ずつ読み込む"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def iter_xlsx_rows(path: str, sheets: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """
+    Excel を read_only で1行ずつ読み込む
+
+    カレンダーID 列を持つシートのみ対象。sheets を指定した場合はそのシートに限る。
+    """
+    from openpyxl import load_workbook
+
+    sheets = set(sheets or [])
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            if sheets and worksheet.title not in sheets:
+                continue
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header or CALENDAR_ID_COLUMN not in header:
+                continue
+            header = [str(h).strip() if h is not None else '' for h in header]
+            for values in rows:
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(path: str, sheets: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """拡張子に応じて CSV / Excel を読み込む"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_xlsx_rows(path, sheets)
+    return iter_csv_rows(path)
+
+
+# ----------------------------------------
+# 行の解釈
+# ----------------------------------------
+
+def _text(value) -> str:
+    if value is None:
+        return ''
+    text = str(value).strip()
+    return '' if text in ('nan', 'None') else text
+
+
+def _int(value) -> Optional[int]:
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        return int(float(text))
+    except ValueError:
+        return None
+
+
+def parse_date(value) -> Optional[date]:
+    """日付（datetime / date / 'YYYY-MM-DD' / 'YYYY/MM/DD'、時刻付き可）"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = _text(value).split(' ')[0]
+    for fmt in ('%Y-%m-%d', '%Y/%m/%d'):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def lesson_type_from_code(calendar_code: str) -> str:
+    """カレンダーコードからレッスンタイプを判定"""
+    code = calendar_code.upper()
+    for lesson_type in ('A', 'B', 'P'):
+        if code.endswith(lesson_type):
+            return lesson_type
+    if 'INT' in code:
+        return 'Y'
+    return 'A'
+
+
+def parse_ticket_sequence(display_label: str) -> Optional[int]:
+    """保護者カレンダー表示からチケット番号を抽出（例: 水A3 → 3）"""
+    if not display_label or display_label in ('講', '休', '★', '0'):
+        return None
+    match = re.search(r'(\d+)', display_label)
+    return int(match.group(1)) if match else None
+
+
+def is_open_row(open_flag: str, display_label: str) -> bool:
+    """開講日かどうか"""
+    if open_flag == 'Y':
+        return True
+    if display_label == '休':
+        return False
+    if display_label == '講' or any(c.isdigit() for c in display_label):
+        return True
+    return '★' in display_label
+
+
+# ----------------------------------------
+# 参照の解決
+# ----------------------------------------
+
+class CalendarRefs:
+    """カレンダーコード → 校舎・ブランド・カレンダーマスター の対応表（テナント単位で1回だけ読み込む）"""
+
+    def __init__(self, tenant_id):
+        self.tenant_id = tenant_id
+        self.brands = dict(Brand.objects.filter(
+            tenant_id=tenant_id, deleted_at__isnull=True
+        ).values_list('brand_code', 'id'))
+        self.brands_upper = {code.upper(): brand_id for code, brand_id in self.brands.items()}
+        self.schools = dict(School.objects.filter(
+            tenant_id=tenant_id, deleted_at__isnull=True
+        ).values_list('school_code', 'id'))
+        self.masters = {
+            code: (master_id, brand_id)
+            for code, master_id, brand_id in CalendarMaster.objects.filter(
+                tenant_id=tenant_id, deleted_at__isnull=True
+            ).values_list('code', 'id', 'brand_id')
+        }
+        self.patterns = {}
+        for pattern, school_id, brand_id in ClassSchedule.objects.filter(
+            tenant_id=tenant_id, deleted_at__isnull=True
+        ).exclude(calendar_pattern='').values_list('calendar_pattern', 'school_id', 'brand_id'):
+            self.patterns.setdefault(pattern, (school_id, brand_id))
+        self._resolved = {}
+
+    def resolve(self, calendar_code: str):
+        """(calendar_master_id, school_id, brand_id)"""
+        if calendar_code not in self._resolved:
+            self._resolved[calendar_code] = self._resolve(calendar_code)
+        return self._resolved[calendar_code]
+
+    def _resolve(self, calendar_code: str):
+        master_id, master_brand_id = self.masters.get(calendar_code, (None, None))
+        if calendar_code in self.patterns:
+            school_id, brand_id = self.patterns[calendar_code]
+            return master_id, school_id, brand_id or master_brand_id
+
+        # コードの構成（{校舎番号}_{ブランド}_{パターン}）から推定
+        school_id, brand_id = None, master_brand_id
+        parts = calendar_code.split('_')
+        if len(parts) >= 3:
+            school_id = self.schools.get(f'S1{parts[0]}')
+            if brand_id is None:
+                key = parts[1].upper()
+                brand_id = self.brands_upper.get(key) or self.brands_upper.get(BRAND_ALIASES.get(key, ''))
+        return master_id, school_id, brand_id
+
+
+# ----------------------------------------
+# ロード
+# ----------------------------------------
+
+@dataclass
+class LoadStats:
+    """ロード結果"""
+    rows: int = 0
+    upserted: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+    calendar_codes: Set[str] = field(default_factory=set)
+    # 校舎・ブランドを解決できなかったカレンダーコード（校舎・ブランドなしで保存する）
+    unresolved: Set[str] = field(default_factory=set)
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def track(self, lesson_calendar):
+        self.calendar_codes.add(lesson_calendar.calendar_code)
+        if lesson_calendar.school_id is None or lesson_calendar.brand_id is None:
+            self.unresolved.add(lesson_calendar.calendar_code)
+        lesson_date = lesson_calendar.lesson_date
+        if self.date_from is None or lesson_date < self.date_from:
+            self.date_from = lesson_date
+        if self.date_to is None or lesson_date > self.date_to:
+            self.date_to = lesson_date
+
+
+class CalendarLoader:
+    """
+    LessonCalendar の一括 upsert
+
+    使い方:
+        loader = CalendarLoader(tenant_id)
+        stats = loader.load(iter_rows(path))                # T13 形式の行
+        stats = loader.load_objects(generated_calendars)    # 生成済みの LessonCalendar
+    """
+
+    def __init__(self, tenant_id, default_lesson_type: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False):
+        from apps.tenants.models import Tenant
+
+        self.tenant_id = tenant_id
+        self.default_lesson_type = default_lesson_type
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.refs = CalendarRefs(tenant_id)
+        self.tenant_ref_id = tenant_id if Tenant.objects.filter(id=tenant_id).exists() else None
+
+    def build(self, row: Dict) -> Optional[LessonCalendar]:
+        """T13 形式の1行から LessonCalendar を組み立てる（対象外の行は None）"""
+        calendar_code = _text(row.get(CALENDAR_ID_COLUMN))
+        if not calendar_code or calendar_code in ('0', 'ID', CALENDAR_ID_COLUMN):
+            return None
+        lesson_date = parse_date(row.get('日付'))
+        if lesson_date is None:
+            raise CalendarLoadError(f'日付が不正です: {row.get("日付")!r}')
+
+        display_label = _text(row.get('保護者カレンダー表示'))
+        is_open = is_open_row(_text(row.get('開講日')), display_label)
+        lesson_type = self.default_lesson_type or lesson_type_from_code(calendar_code)
+        rejection_reason = _text(row.get('拒否理由'))
+        valid_days = _int(row.get('有効期限'))
+
+        return self.new_calendar(
+            calendar_code,
+            lesson_date,
+            day_of_week=_text(row.get('曜日')) or DAY_NAMES[lesson_date.weekday()],
+            is_open=is_open,
+            lesson_type=lesson_type if is_open else LessonCalendar.LessonType.CLOSED,
+            display_label=display_label[:20],
+            ticket_type=_text(row.get('消化・発行チケット券種'))[:10],
+            ticket_sequence=parse_ticket_sequence(display_label),
+            is_makeup_allowed=not rejection_reason,
+            rejection_reason=rejection_reason[:100],
+            ticket_issue_count=_int(row.get('権利発券数') or row.get('発券')),
+            valid_days=valid_days if valid_days is not None else 90,
+            notice_message=_text(row.get('お知らせ')),
+            holiday_name=_text(row.get('祝日名'))[:50],
+        )
+
+    def new_calendar(self, calendar_code: str, lesson_date: date, **values) -> LessonCalendar:
+        """参照を解決した LessonCalendar（未保存）"""
+        master_id, school_id, brand_id = self.refs.resolve(calendar_code)
+        values.setdefault('school_id', school_id)
+        values.setdefault('brand_id', brand_id)
+        values.setdefault('day_of_week', DAY_NAMES[lesson_date.weekday()])
+        return LessonCalendar(
+            tenant_id=self.tenant_id,
+            tenant_ref_id=self.tenant_ref_id,
+            calendar_code=calendar_code,
+            lesson_date=lesson_date,
+            calendar_master_id=master_id,
+            **values,
+        )
+
+    def load(self, rows: Iterable[Dict]) -> LoadStats:
+        """T13 形式の行をロード"""
+        stats = LoadStats()
+
+        def objects():
+            for row_num, row in enumerate(rows, start=2):
+                stats.rows += 1
+                try:
+                    lesson_calendar = self.build(row)
+                except CalendarLoadError as e:
+                    stats.errors.append(f'行{row_num}: {e}')
+                    lesson_calendar = None
+                if lesson_calendar is None:
+                    stats.skipped += 1
+                    continue
+                yield lesson_calendar
+
+        return self._upsert_all(objects(), stats)
+
+    def load_objects(self, calendars: Iterable[LessonCalendar]) -> LoadStats:
+        """生成済みの LessonCalendar をロード"""
+        stats = LoadStats()
+
+        def objects():
+            for lesson_calendar in calendars:
+                stats.rows += 1
+                yield lesson_calendar
+
+        return self._upsert_all(objects(), stats)
+
+    def _upsert_all(self, objects: Iterable[LessonCalendar], stats: LoadStats) -> LoadStats:
+        with transaction.atomic():
+            batch = {}
+            for lesson_calendar in objects:
+                stats.track(lesson_calendar)
+                # 同じ (カレンダーコード, 日付) はファイル内で後の行を優先
+                batch[(lesson_calendar.calendar_code, lesson_calendar.lesson_date)] = lesson_calendar
+                if len(batch) >= self.batch_size:
+                    stats.upserted += self._upsert(batch.values())
+                    batch = {}
+            if batch:
+                stats.upserted += self._upsert(batch.values())
+
+            if not self.dry_run and stats.upserted:
+                transaction.on_commit(lambda: self._refresh_downstream(stats))
+        return stats
+
+    def _upsert(self, calendars) -> int:
+        calendars = list(calendars)
+        if not self.dry_run:
+            LessonCalendar.objects.bulk_create(
+                calendars,
+                update_conflicts=True,
+                unique_fields=['tenant_id', 'calendar_code', 'lesson_date'],
+                update_fields=UPDATE_FIELDS,
+            )
+        return len(calendars)
+
+    def _refresh_downstream(self, stats: LoadStats):
+        """授業実施日とキャッシュをロード単位で1回だけ更新"""
+        from .lesson_occurrence import LessonOccurrenceService
+        from .trial_availability import invalidate_trial_availability
+
+        try:
+            LessonOccurrenceService.refresh_range(
+                ClassSchedule.objects.filter(tenant_id=self.tenant_id, calendar_pattern__in=stats.calendar_codes),
+                stats.date_from,
+                stats.date_to,
+            )
+        except Exception as e:
+            logger.error(f"Failed to refresh lesson occurrences after calendar load: {e}", exc_info=True)
+        invalidate_trial_availability()
+
@@ -1,18 +1,82 @@
 """
 Google Calendar API Service
 Googleカレンダーとの連携サービス
+
+イベントは GoogleCalendarEvent にローカル保存し、月・週表示はローカルから返す。
+定期ジョブ（sync_google_calendars_task）が Google の syncToken を使って差分だけを取得し、
+複数カレンダーの差分取得は1回のバッチリクエストにまとめる。
+- 初回（sync_token なし）: 過去 SYNC_PAST_DAYS 日以降の全件を取得して置き換え
+- 2回目以降: sync_token で前回以降の変更のみ取得（キャンセルされたイベントは削除）
+- sync_token の期限切れ（410 Gone）: 全件同期をやり直す
+同期範囲より前の期間を表示する場合のみ、従来どおり API から直接取得する。
+
+同期の対象は、設定（GOOGLE_CALENDAR_DEFAULT_CALENDAR_ID / GOOGLE_CALENDAR_SYNC_CALENDAR_IDS）の
+カレンダーと、管理画面・sync_google_calendars コマンドで登録したカレンダーに限る。
+それ以外のカレンダーIDを表示した場合は同期対象に加えず、API から直接取得する（短時間キャッシュ）。
+リクエスト中に全件同期は行わない（設定のカレンダーを初めて表示した場合は同期をジョブに依頼する）。
 """
 import os
 import json
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 logger = logging.getLogger(__name__)
 
+# 全件同期で取り込む過去の期間
+SYNC_PAST_DAYS = 90
+# events.list の1ページの件数（API上限）
+PAGE_SIZE = 2500
+# 1回のバッチリクエストに含めるカレンダー数（API上限）
+BATCH_LIMIT = 50
+
+
+def _is_sync_token_expired(error: Exception) -> bool:
+    """sync_token が無効になった（410 Gone）かどうか"""
+    resp = getattr(error, 'resp', None)
+    return getattr(resp, 'status', None) == 410
+
+
+def _aware(value: datetime) -> datetime:
+    """タイムゾーンなしの日時は現在のタイムゾーン（Asia/Tokyo）として扱う"""
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def event_bounds(event: Dict[str, Any]):
+    """
+    イベントの開始・終了日時（終日イベントは現在のタイムゾーンの0時）
+
+    Returns:
+        (start_at, end_at, is_all_day)
+    """
+    start = event.get('start', {})
+    end = event.get('end', {})
+    if 'date' in start:
+        start_date, end_date = parse_date(start['date']), parse_date(end.get('date') or start['date'])
+        return (
+            _aware(datetime.combine(start_date, datetime.min.time())),
+            _aware(datetime.combine(end_date, datetime.min.time())),
+            True,
+        )
+    start_at = parse_datetime(start['dateTime']) if start.get('dateTime') else None
+    end_at = parse_datetime(end['dateTime']) if end.get('dateTime') else start_at
+    return start_at, end_at, False
+
+
+@dataclass
+class SyncChanges:
+    """1カレンダー分の取得結果"""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    next_sync_token: str = ''
+    full: bool = False
+
 
 class GoogleCalendarService:
     """Google Calendar API連携サービス"""
@@ -103,6 +167,66 @@ class GoogleCalendarService:
         Returns:
             イベントリスト
         """
+        start_date, end_date = _aware(start_date), _aware(end_date)
+        state = self._sync_state(calendar_id)
+        if (state and state.is_active and state.last_synced_at and state.window_start
+                and start_date >= state.window_start):
+            return self._stored_events(state, start_date, end_date, max_results)
+        return self._fetch_events(calendar_id, start_date, end_date, max_results)
+
+    @staticmethod
+    def configured_calendar_ids() -> set:
+        """設定で同期対象に指定したカレンダーID"""
+        calendar_ids = set(getattr(settings, 'GOOGLE_CALENDAR_SYNC_CALENDAR_IDS', None) or ())
+        default_id = getattr(settings, 'GOOGLE_CALENDAR_DEFAULT_CALENDAR_ID', None)
+        if default_id:
+            calendar_ids.add(default_id)
+        return calendar_ids
+
+    def _sync_state(self, calendar_id: str):
+        """
+        登録済みの同期状態（未登録の場合、設定のカレンダーのみ登録して同期をジョブに依頼）
+
+        Returns:
+            GoogleCalendarSyncState または None（同期対象外）
+        """
+        from apps.schools.models import GoogleCalendarSyncState
+
+        state = GoogleCalendarSyncState.objects.filter(calendar_id=calendar_id).first()
+        if state is not None or calendar_id not in self.configured_calendar_ids():
+            return state
+        state, created = GoogleCalendarSyncState.objects.get_or_create(calendar_id=calendar_id)
+        if created:
+            transaction.on_commit(lambda: self._enqueue_sync(calendar_id))
+        return state
+
+    @staticmethod
+    def _enqueue_sync(calendar_id: str):
+        from apps.schools.tasks import sync_google_calendars_task
+
+        try:
+            sync_google_calendars_task.delay(calendar_ids=[calendar_id])
+        except Exception as e:
+            logger.warning(f"Failed to enqueue Google Calendar sync for {calendar_id}: {e}")
+
+    def _stored_events(self, state, start_date: datetime, end_date: datetime, max_results: int):
+        """ローカルに同期済みのイベント（期間と重なるもの、開始日時順）"""
+        from apps.schools.models import GoogleCalendarEvent
+
+        return list(GoogleCalendarEvent.objects.filter(
+            calendar=state,
+            start_at__lt=end_date,
+            end_at__gt=start_date,
+        ).order_by('start_at').values_list('data', flat=True)[:max_results])
+
+    def _fetch_events(
+        self,
+        calendar_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        max_results: int = 250
+    ) -> List[Dict[str, Any]]:
+        """API から直接取得（同期範囲外の期間用）"""
         # キャッシュキー生成
         cache_key = f"{self.CACHE_KEY_PREFIX}:{calendar_id}:{start_date.date()}:{end_date.date()}"
         cached_events = cache.get(cache_key)
@@ -114,14 +238,10 @@ class GoogleCalendarService:
             return []
 
         try:
-            # RFC3339形式に変換
-            time_min = start_date.isoformat() + 'Z' if start_date.tzinfo is None else start_date.isoformat()
-            time_max = end_date.isoformat() + 'Z' if end_date.tzinfo is None else end_date.isoformat()
-
             events_result = service.events().list(
                 calendarId=calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
+                timeMin=start_date.isoformat(),
+                timeMax=end_date.isoformat(),
                 maxResults=max_results,
                 singleEvents=True,
                 orderBy='startTime'
@@ -223,6 +343,201 @@ class GoogleCalendarService:
             'source': 'google_calendar'
         }
 
+    # ----------------------------------------
+    # 同期
+    # ----------------------------------------
+
+    def _list_pages(self, service, first_page: Optional[Dict] = None, **params) -> SyncChanges:
+        """events.list を最後のページまで取得（最終ページの nextSyncToken を返す）"""
+        changes = SyncChanges()
+        page = first_page
+        while True:
+            if page is None:
+                page = service.events().list(**params).execute()
+            changes.items.extend(page.get('items', []))
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                changes.next_sync_token = page.get('nextSyncToken', '')
+                return changes
+            params['pageToken'] = page_token
+            page = None
+
+    def fetch_full(self, service, calendar_id: str, window_start: datetime) -> SyncChanges:
+        """全件取得（window_start 以降）"""
+        changes = self._list_pages(
+            service,
+            calendarId=calendar_id,
+            timeMin=window_start.isoformat(),
+            singleEvents=True,
+            maxResults=PAGE_SIZE,
+        )
+        changes.full = True
+        return changes
+
+    def fetch_changes(self, service, states) -> Dict[Any, Any]:
+        """
+        複数カレンダーの差分をバッチリクエストで取得
+
+        Args:
+            states: sync_token を持つ GoogleCalendarSyncState のリスト
+
+        Returns:
+            {state.id: SyncChanges または 例外}（sync_token 期限切れは全件取得に切り替え済み）
+        """
+        results = {}
+        for offset in range(0, len(states), BATCH_LIMIT):
+            chunk = {str(s.id): s for s in states[offset:offset + BATCH_LIMIT]}
+            responses = {}
+
+            def collect(request_id, response, exception):
+                responses[request_id] = (response, exception)
+
+            batch = service.new_batch_http_request(callback=collect)
+            for request_id, state in chunk.items():
+                batch.add(service.events().list(
+                    calendarId=state.calendar_id,
+                    syncToken=state.sync_token,
+                    singleEvents=True,
+                    maxResults=PAGE_SIZE,
+                ), request_id=request_id)
+            batch.execute()
+
+            for request_id, state in chunk.items():
+                response, exception = responses.get(request_id, (None, None))
+                try:
+                    if exception is not None:
+                        raise exception
+                    results[state.id] = self._list_pages(
+                        service,
+                        first_page=response or {},
+                        calendarId=state.calendar_id,
+                        syncToken=state.sync_token,
+                        singleEvents=True,
+                        maxResults=PAGE_SIZE,
+                    )
+                except Exception as e:
+                    if _is_sync_token_expired(e):
+                        logger.info(f"Sync token expired for {state.calendar_id}, running full sync")
+                        try:
+                            results[state.id] = self.fetch_full(service, state.calendar_id, self.window_start())
+                        except Exception as full_error:
+                            results[state.id] = full_error
+                    else:
+                        results[state.id] = e
+        return results
+
+    @staticmethod
+    def window_start() -> datetime:
+        """全件同期の開始日時"""
+        today = timezone.localdate()
+        return _aware(datetime.combine(today - timedelta(days=SYNC_PAST_DAYS), datetime.min.time()))
+
+    def apply_changes(self, state, changes: SyncChanges) -> Dict[str, int]:
+        """取得結果をローカルに反映し、sync_token を更新"""
+        from apps.schools.models import GoogleCalendarEvent
+
+        now = timezone.now()
+        deleted_ids = set()
+        events = {}
+        for item in changes.items:
+            if item.get('status') == 'cancelled':
+                deleted_ids.add(item['id'])
+                events.pop(item['id'], None)
+                continue
+            start_at, end_at, is_all_day = event_bounds(item)
+            updated = item.get('updated')
+            events[item['id']] = GoogleCalendarEvent(
+                calendar=state,
+                event_id=item['id'],
+                start_at=start_at,
+                end_at=end_at,
+                is_all_day=is_all_day,
+                data=self._format_event(item),
+                google_updated_at=parse_datetime(updated) if updated else None,
+            )
+            deleted_ids.discard(item['id'])
+
+        with transaction.atomic():
+            if changes.full:
+                GoogleCalendarEvent.objects.filter(calendar=state).delete()
+                state.window_start = self.window_start()
+                state.last_full_sync_at = now
+            elif deleted_ids:
+                GoogleCalendarEvent.objects.filter(calendar=state, event_id__in=deleted_ids).delete()
+            GoogleCalendarEvent.objects.bulk_create(
+                list(events.values()),
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['calendar', 'event_id'],
+                update_fields=['start_at', 'end_at', 'is_all_day', 'data', 'google_updated_at', 'updated_at'],
+            )
+            state.sync_token = changes.next_sync_token
+            state.last_synced_at = now
+            state.last_error = ''
+            state.save(update_fields=[
+                'sync_token', 'window_start', 'last_synced_at', 'last_full_sync_at', 'last_error', 'updated_at'
+            ])
+        return {'upserted': len(events), 'deleted': 0 if changes.full else len(deleted_ids)}
+
+    def _record_error(self, state, error: Exception):
+        logger.error(f"Failed to sync Google Calendar {state.calendar_id}: {error}")
+        state.last_error = str(error)[:1000]
+        state.save(update_fields=['last_error', 'updated_at'])
+
+    def sync_calendar(self, state, full: bool = False) -> Optional[Dict[str, int]]:
+        """1カレンダーを同期（sync_token があれば差分、なければ全件）"""
+        service = self._get_service()
+        if not service:
+            return None
+        try:
+            if full or not state.sync_token:
+                changes = self.fetch_full(service, state.calendar_id, self.window_start())
+            else:
+                changes = self.fetch_changes(service, [state])[state.id]
+                if isinstance(changes, Exception):
+                    raise changes
+            return self.apply_changes(state, changes)
+        except Exception as e:
+            self._record_error(state, e)
+            return None
+
+    def sync_all(self, calendar_ids: Optional[List[str]] = None, full: bool = False) -> Dict[str, int]:
+        """
+        定期同期の対象カレンダーをまとめて同期
+
+        差分取得は BATCH_LIMIT 件ずつのバッチリクエストにまとめる。
+        """
+        from apps.schools.models import GoogleCalendarSyncState
+
+        totals = {'calendars': 0, 'upserted': 0, 'deleted': 0, 'failed': 0}
+        service = self._get_service()
+        if not service:
+            return totals
+
+        states = GoogleCalendarSyncState.objects.filter(is_active=True)
+        if calendar_ids:
+            states = states.filter(calendar_id__in=calendar_ids)
+        states = list(states)
+        incremental = [] if full else [s for s in states if s.sync_token]
+        results = self.fetch_changes(service, incremental) if incremental else {}
+
+        for state in states:
+            changes = results.get(state.id)
+            try:
+                if changes is None:
+                    changes = self.fetch_full(service, state.calendar_id, self.window_start())
+                if isinstance(changes, Exception):
+                    raise changes
+                result = self.apply_changes(state, changes)
+            except Exception as e:
+                self._record_error(state, e)
+                totals['failed'] += 1
+                continue
+            totals['calendars'] += 1
+            totals['upserted'] += result['upserted']
+            totals['deleted'] += result['deleted']
+        return totals
+
     def list_calendars(self) -> List[Dict[str, Any]]:
         """
         アクセス可能なカレンダー一覧を取得
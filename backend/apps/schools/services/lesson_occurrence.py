@@ -0,0 +1,351 @@
+"""
+Lesson Occurrence Service
+開講時間割を日付単位に展開した授業実施日（LessonOccurrence）の生成と参照
+
+生徒カレンダー・管理カレンダーなどは、これまでリクエストごとに
+ClassSchedule の曜日を LessonCalendar / SchoolClosure と照合して展開していた。
+展開ルールをここに一本化し、結果を LessonOccurrence に保持する。
+
+展開ルール（日付 d の時間割 cs）:
+- cs.day_of_week == d の曜日（1=月〜7=日）かつ クラス開始日〜終了日の範囲内
+- 開講カレンダー: calendar_code=cs.calendar_pattern の行、なければ 校舎+ブランドの行
+  （行があれば is_open / lesson_type をそのまま採用。なければ開講・Aパターン）
+- 休講: 校舎・ブランド・時間帯（SchoolSchedule.time_slot の開始時刻）が一致する
+  SchoolClosure があれば休講
+
+生成範囲:
+- 定期ジョブ（tasks.generate_lesson_occurrences_task）が LOOKBACK_DAYS 日前〜HORIZON_DAYS 日先 を再生成
+- 時間割・カレンダー・休講の変更時は signals から該当の時間割・日付のみ再生成
+- 範囲外の期間を参照した場合は、その部分のみその場で展開して返す（保存はしない）
+- 範囲内でも未生成の日付（デプロイ直後・定期ジョブの未実行で範囲の先端が欠けた場合）は
+  その場で展開して補う
+"""
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Q
+
+from apps.schools.models import ClassSchedule, LessonCalendar, LessonOccurrence, SchoolClosure
+
+logger = logging.getLogger(__name__)
+
+# 定期生成する範囲（今日から何日先まで）
+HORIZON_DAYS = 120
+# 定期生成の対象として保持する過去日数
+LOOKBACK_DAYS = 31
+
+
+def _daterange(date_from: date, date_to: date):
+    current = date_from
+    while current <= date_to:
+        yield current
+        current += timedelta(days=1)
+
+
+def _schedule_dates(cs, date_from: date, date_to: date):
+    """時間割の期間内の授業日（曜日・クラス開始日〜終了日。開講・休講は問わない）"""
+    start = max(date_from, cs.class_start_date) if cs.class_start_date else date_from
+    end = min(date_to, cs.class_end_date) if cs.class_end_date else date_to
+    for target_date in _daterange(start, end):
+        if target_date.isoweekday() == cs.day_of_week:
+            yield target_date
+
+
+def _is_expandable(cs) -> bool:
+    """展開の対象か（無効・削除済み・時刻未設定の時間割は対象外）"""
+    return cs.is_active and cs.deleted_at is None and bool(cs.start_time and cs.end_time)
+
+
+def coverage_window(today: Optional[date] = None):
+    """定期生成でカバーされる期間"""
+    today = today or date.today()
+    return today - timedelta(days=LOOKBACK_DAYS), today + timedelta(days=HORIZON_DAYS)
+
+
+class LessonOccurrenceService:
+    """授業実施日の生成・参照"""
+
+    # ----------------------------------------
+    # 生成
+    # ----------------------------------------
+
+    @classmethod
+    def expand(cls, schedules, date_from: date, date_to: date):
+        """
+        時間割を期間内の授業実施日に展開（保存はしない）
+
+        Args:
+            schedules: ClassSchedule のイテラブル（無効な時間割は対象外）
+        """
+        active = [s for s in schedules if _is_expandable(s)]
+        if not active or date_from > date_to:
+            return []
+
+        calendars_by_code, calendars_by_school = cls._load_calendars(active, date_from, date_to)
+        closures_by_date = cls._load_closures(active, date_from, date_to)
+
+        occurrences = []
+        for cs in active:
+            for target_date in _schedule_dates(cs, date_from, date_to):
+                occurrences.append(cls._build(
+                    cs, target_date, calendars_by_code, calendars_by_school, closures_by_date
+                ))
+        return occurrences
+
+    @classmethod
+    def generate(cls, schedules, date_from: date, date_to: date) -> int:
+        """
+        指定した時間割・期間の授業実施日を作り直す
+
+        Args:
+            schedules: ClassSchedule のクエリセット（無効な時間割は削除のみ行う）
+            date_from, date_to: 期間（両端を含む）
+
+        Returns:
+            作成した件数
+        """
+        schedules = list(schedules)
+        if not schedules or date_from > date_to:
+            return 0
+        occurrences = cls.expand(schedules, date_from, date_to)
+
+        with transaction.atomic():
+            LessonOccurrence.objects.filter(
+                class_schedule_id__in=[s.id for s in schedules],
+                date__gte=date_from,
+                date__lte=date_to,
+            ).delete()
+            LessonOccurrence.objects.bulk_create(occurrences, batch_size=1000)
+        return len(occurrences)
+
+    @staticmethod
+    def _load_calendars(schedules, date_from, date_to):
+        codes = {s.calendar_pattern for s in schedules if s.calendar_pattern}
+        school_ids = {s.school_id for s in schedules}
+        tenant_ids = {s.tenant_id for s in schedules}
+        calendars_by_code = {}
+        calendars_by_school = {}
+        if not schedules:
+            return calendars_by_code, calendars_by_school
+        for lc in LessonCalendar.objects.filter(
+            Q(calendar_code__in=codes) | Q(school_id__in=school_ids),
+            tenant_id__in=tenant_ids,
+            lesson_date__gte=date_from,
+            lesson_date__lte=date_to,
+            deleted_at__isnull=True,
+        ):
+            calendars_by_code[(lc.tenant_id, lc.calendar_code, lc.lesson_date)] = lc
+            if lc.school_id:
+                calendars_by_school.setdefault((lc.school_id, lc.brand_id, lc.lesson_date), lc)
+        return calendars_by_code, calendars_by_school
+
+    @staticmethod
+    def _load_closures(schedules, date_from, date_to):
+        closures_by_date = defaultdict(list)
+        if not schedules:
+            return closures_by_date
+        school_ids = {s.school_id for s in schedules}
+        for closure in SchoolClosure.objects.filter(
+            Q(school__isnull=True) | Q(school_id__in=school_ids),
+            tenant_id__in={s.tenant_id for s in schedules},
+            closure_date__gte=date_from,
+            closure_date__lte=date_to,
+            deleted_at__isnull=True,
+        ).select_related('schedule__time_slot'):
+            closures_by_date[closure.closure_date].append(closure)
+        return closures_by_date
+
+    @staticmethod
+    def _find_closure(cs, closures):
+        for closure in closures:
+            if closure.tenant_id != cs.tenant_id:
+                continue
+            if closure.school_id and closure.school_id != cs.school_id:
+                continue
+            if closure.brand_id and closure.brand_id != cs.brand_id:
+                continue
+            if closure.schedule_id:
+                time_slot = closure.schedule.time_slot
+                if not time_slot or time_slot.start_time != cs.start_time:
+                    continue
+            return closure
+        return None
+
+    @classmethod
+    def _build(cls, cs, target_date, calendars_by_code, calendars_by_school, closures_by_date):
+        lesson_calendar = None
+        if cs.calendar_pattern:
+            lesson_calendar = calendars_by_code.get((cs.tenant_id, cs.calendar_pattern, target_date))
+        if lesson_calendar is None:
+            lesson_calendar = calendars_by_school.get((cs.school_id, cs.brand_id, target_date))
+
+        occurrence = LessonOccurrence(
+            tenant_id=cs.tenant_id,
+            class_schedule=cs,
+            school_id=cs.school_id,
+            brand_id=cs.brand_id,
+            date=target_date,
+            day_of_week=cs.day_of_week,
+            start_time=cs.start_time,
+            end_time=cs.end_time,
+        )
+        if lesson_calendar:
+            occurrence.lesson_calendar = lesson_calendar
+            occurrence.is_open = lesson_calendar.is_open
+            occurrence.lesson_type = lesson_calendar.lesson_type or 'A'
+            occurrence.holiday_name = lesson_calendar.holiday_name or ''
+            occurrence.notice_message = lesson_calendar.notice_message or ''
+
+        closure = cls._find_closure(cs, closures_by_date.get(target_date, ()))
+        if closure:
+            occurrence.closure = closure
+            occurrence.is_open = False
+        return occurrence
+
+    @classmethod
+    def generate_horizon(cls, tenant_id=None, today: Optional[date] = None) -> int:
+        """
+        定期生成範囲（LOOKBACK_DAYS 日前〜HORIZON_DAYS 日先）を再生成し、
+        範囲より過去の分を削除する（定期ジョブ用）
+        """
+        window_start, window_end = coverage_window(today)
+        schedules = ClassSchedule.objects.all()
+        expired = LessonOccurrence.objects.filter(date__lt=window_start)
+        if tenant_id:
+            schedules = schedules.filter(tenant_id=tenant_id)
+            expired = expired.filter(tenant_id=tenant_id)
+        expired.delete()
+        total = 0
+        # 校舎単位で分割してトランザクションを小さくする
+        for school_id in schedules.values_list('school_id', flat=True).distinct().order_by():
+            total += cls.generate(schedules.filter(school_id=school_id), window_start, window_end)
+        return total
+
+    # ----------------------------------------
+    # 変更時の再生成（signals から呼ばれる）
+    # ----------------------------------------
+
+    @staticmethod
+    def _in_window(target_date) -> bool:
+        """定期生成範囲内か（範囲外は参照時に展開するため再生成不要）"""
+        window_start, window_end = coverage_window()
+        return target_date is not None and window_start <= target_date <= window_end
+
+    @classmethod
+    def refresh_schedule(cls, class_schedule_id):
+        """時間割の変更: 定期生成範囲を作り直し、範囲外の生成済み分は破棄"""
+        window_start, window_end = coverage_window()
+        cls.generate(ClassSchedule.objects.filter(pk=class_schedule_id), window_start, window_end)
+        LessonOccurrence.objects.filter(class_schedule_id=class_schedule_id).exclude(
+            date__gte=window_start, date__lte=window_end
+        ).delete()
+
+    @classmethod
+    def refresh_calendar_date(cls, tenant_id, calendar_code, school_id, brand_id, target_date):
+        """開講カレンダーの変更: 影響する時間割の当日分を作り直す"""
+        if not cls._in_window(target_date):
+            return
+        condition = Q()
+        if calendar_code:
+            condition |= Q(calendar_pattern=calendar_code)
+        if school_id:
+            condition |= Q(school_id=school_id, brand_id=brand_id)
+        if not condition:
+            return
+        schedules = ClassSchedule.objects.filter(condition, tenant_id=tenant_id)
+        cls.generate(schedules, target_date, target_date)
+
+    @classmethod
+    def refresh_closure_date(cls, tenant_id, school_id, brand_id, target_date):
+        """休講の変更: 影響する時間割の当日分を作り直す"""
+        if not cls._in_window(target_date):
+            return
+        schedules = ClassSchedule.objects.filter(
+            tenant_id=tenant_id, day_of_week=target_date.isoweekday()
+        )
+        if school_id:
+            schedules = schedules.filter(school_id=school_id)
+        if brand_id:
+            schedules = schedules.filter(brand_id=brand_id)
+        cls.generate(schedules, target_date, target_date)
+
+    @classmethod
+    def refresh_range(cls, schedules, date_from: date, date_to: date) -> int:
+        """一括操作の変更: 指定した時間割の期間内（定期生成範囲に限る）を作り直す"""
+        window_start, window_end = coverage_window()
+        return cls.generate(schedules, max(date_from, window_start), min(date_to, window_end))
+
+    # ----------------------------------------
+    # 参照
+    # ----------------------------------------
+
+    @classmethod
+    def get_occurrences(cls, date_from: date, date_to: date, *, tenant_id=None, school_id=None,
+                        brand_id=None, schedule_ids: Optional[Iterable] = None, open_only=False):
+        """
+        期間内の授業実施日を取得（日付・開始時間順のリスト）
+
+        定期生成の範囲内はテーブルから読み出し、範囲外の部分と範囲内で未生成の日付は
+        その場で展開する。class_schedule は school / brand / brand_category / room / grade を取得済み
+        """
+        schedules = ClassSchedule.objects.select_related(
+            'school', 'brand', 'brand_category', 'room', 'grade'
+        )
+        if tenant_id:
+            schedules = schedules.filter(tenant_id=tenant_id)
+        if school_id:
+            schedules = schedules.filter(school_id=school_id)
+        if brand_id:
+            schedules = schedules.filter(brand_id=brand_id)
+        if schedule_ids is not None:
+            schedules = schedules.filter(id__in=list(schedule_ids))
+        schedules = list(schedules.filter(is_active=True, deleted_at__isnull=True))
+        if not schedules:
+            return []
+        schedules_by_id = {s.id: s for s in schedules}
+
+        window_start, window_end = coverage_window()
+        occurrences = []
+        if date_from < window_start:
+            occurrences.extend(cls.expand(
+                schedules, date_from, min(date_to, window_start - timedelta(days=1))
+            ))
+        stored_from, stored_to = max(date_from, window_start), min(date_to, window_end)
+        if stored_from <= stored_to:
+            covered = set()
+            for occurrence in LessonOccurrence.objects.filter(
+                class_schedule_id__in=schedules_by_id.keys(),
+                date__gte=stored_from,
+                date__lte=stored_to,
+            ):
+                occurrence.class_schedule = schedules_by_id[occurrence.class_schedule_id]
+                occurrences.append(occurrence)
+                covered.add((occurrence.class_schedule_id, occurrence.date))
+            occurrences.extend(cls._expand_missing(schedules, stored_from, stored_to, covered))
+        if date_to > window_end:
+            occurrences.extend(cls.expand(
+                schedules, max(date_from, window_end + timedelta(days=1)), date_to
+            ))
+
+        if open_only:
+            occurrences = [o for o in occurrences if o.is_open]
+        occurrences.sort(key=lambda o: (o.date, o.start_time))
+        return occurrences
+
+    @classmethod
+    def _expand_missing(cls, schedules, date_from: date, date_to: date, covered):
+        """定期生成の範囲内で未生成の (時間割, 日付) のみ展開する"""
+        missing = {
+            (cs.id, target_date)
+            for cs in schedules if _is_expandable(cs)
+            for target_date in _schedule_dates(cs, date_from, date_to)
+        } - covered
+        if not missing:
+            return []
+        missing_ids = {schedule_id for schedule_id, _ in missing}
+        dates = [target_date for _, target_date in missing]
+        expanded = cls.expand([s for s in schedules if s.id in missing_ids], min(dates), max(dates))
+        return [o for o in expanded if (o.class_schedule_id, o.date) in missing]
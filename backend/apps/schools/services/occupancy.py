@@ -0,0 +1,252 @@
+"""
+Schedule Occupancy Service
+開講枠の座席占有数（在籍数・日別の欠席/振替/体験数）の集計と参照
+
+ClassSchedule.active_student_count は参照のたびに StudentSchool を COUNT しており、
+一覧や振替検索ではスケジュール数だけクエリが発行されていた。
+
+- 在籍数: ClassSchedule.enrolled_count
+- 日別の欠席・振替・体験数: ScheduleOccupancy
+
+を StudentSchool / AbsenceTicket / TrialBooking の保存・削除時に同じトランザクション内で
+再集計して保持し、一覧では annotate_occupancy() / get_date_occupancy() で参照する。
+増減ではなく対象キーごとの再集計とすることで、取りこぼしによるずれを残さない。
+
+READ COMMITTED では同時に保存した2件が互いの行を数えずに上書きし合うため、
+再集計の前に時間割・日別占有数の行をロックする（select_for_update）。
+後から来たトランザクションはロック待ちの後に COUNT するので、先にコミットされた行も数える。
+日別占有数の行はロック対象として残し、0件になっても削除しない。
+"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.schools.models import ClassSchedule, ScheduleOccupancy
+
+logger = logging.getLogger(__name__)
+
+# 体験予約で席を占有するステータス（TrialBooking.get_booked_count と同じ）
+ACTIVE_TRIAL_STATUSES = ('pending', 'confirmed')
+
+
+@dataclass(frozen=True)
+class DateOccupancy:
+    """日別の占有数"""
+    absence_count: int = 0
+    makeup_count: int = 0
+    trial_count: int = 0
+
+
+EMPTY_OCCUPANCY = DateOccupancy()
+
+
+class ScheduleOccupancyService:
+    """座席占有数の集計・参照"""
+
+    # ----------------------------------------
+    # 集計（signals から呼ばれる）
+    # ----------------------------------------
+
+    @staticmethod
+    def _enrolled_subquery():
+        from apps.students.models import StudentSchool
+        return Subquery(
+            StudentSchool.objects.filter(
+                class_schedule=OuterRef('pk'),
+                enrollment_status=StudentSchool.EnrollmentStatus.ACTIVE,
+            ).order_by().values('class_schedule').annotate(c=Count('id')).values('c'),
+            output_field=IntegerField(),
+        )
+
+    @classmethod
+    def refresh_enrolled_counts(cls, class_schedule_ids: Iterable):
+        """在籍数を再集計（時間割の行をロックしてから数える）"""
+        ids = sorted({i for i in class_schedule_ids if i}, key=str)
+        if not ids:
+            return
+        with transaction.atomic():
+            list(ClassSchedule.objects.select_for_update().filter(pk__in=ids).order_by('pk').values_list('pk'))
+            ClassSchedule.objects.filter(pk__in=ids).update(
+                enrolled_count=Coalesce(cls._enrolled_subquery(), Value(0))
+            )
+
+    @staticmethod
+    def _lock_date(tenant_id, schedule_id, target_date):
+        """日別占有数の行を作成（未作成の場合）してロック"""
+        ScheduleOccupancy.objects.bulk_create(
+            [ScheduleOccupancy(tenant_id=tenant_id, schedule_id=schedule_id, date=target_date)],
+            ignore_conflicts=True,
+        )
+        ScheduleOccupancy.objects.select_for_update().filter(schedule_id=schedule_id, date=target_date).first()
+
+    @classmethod
+    def refresh_dates(cls, keys: Iterable[Tuple]):
+        """
+        日別占有数を再集計
+
+        Args:
+            keys: (tenant_id, schedule_id, date) のイテラブル
+        """
+        from apps.lessons.models import AbsenceTicket
+        from apps.students.models import TrialBooking
+
+        # ロックの順序を揃えてデッドロックを避ける
+        keys = sorted({k for k in keys if k[1] and k[2]}, key=lambda k: (str(k[1]), k[2]))
+        with transaction.atomic():
+            for tenant_id, schedule_id, target_date in keys:
+                cls._lock_date(tenant_id, schedule_id, target_date)
+                absence_count = AbsenceTicket.objects.filter(
+                    class_schedule_id=schedule_id,
+                    absence_date=target_date,
+                    deleted_at__isnull=True,
+                ).exclude(status=AbsenceTicket.Status.CANCELLED).count()
+                makeup_count = AbsenceTicket.objects.filter(
+                    used_class_schedule_id=schedule_id,
+                    used_date=target_date,
+                    status=AbsenceTicket.Status.USED,
+                    deleted_at__isnull=True,
+                ).count()
+                trial_count = TrialBooking.objects.filter(
+                    Q(schedule_id=schedule_id) | Q(class_schedule_id=schedule_id),
+                    trial_date=target_date,
+                    status__in=ACTIVE_TRIAL_STATUSES,
+                    deleted_at__isnull=True,
+                ).count()
+
+                ScheduleOccupancy.objects.filter(schedule_id=schedule_id, date=target_date).update(
+                    absence_count=absence_count,
+                    makeup_count=makeup_count,
+                    trial_count=trial_count,
+                    updated_at=timezone.now(),
+                )
+
+    # ----------------------------------------
+    # 参照
+    # ----------------------------------------
+
+    @staticmethod
+    def annotate_occupancy(queryset, target_date):
+        """
+        ClassSchedule のクエリセットに指定日の占有数を付与
+
+        付与するフィールド: occupancy_absence / occupancy_makeup / occupancy_trial
+        """
+        occupancy = ScheduleOccupancy.objects.filter(schedule_id=OuterRef('pk'), date=target_date)
+        return queryset.annotate(**{
+            f'occupancy_{name}': Coalesce(
+                Subquery(occupancy.values(f'{name}_count')[:1], output_field=IntegerField()),
+                Value(0),
+            )
+            for name in ('absence', 'makeup', 'trial')
+        })
+
+    @staticmethod
+    def get_date_occupancy(schedule_ids: Iterable, date_from, date_to) -> Dict[Tuple, DateOccupancy]:
+        """
+        期間内の日別占有数を1クエリで取得
+
+        Returns:
+            {(schedule_id, date): DateOccupancy}（記録のない組は含まない）
+        """
+        ids = [i for i in schedule_ids if i]
+        if not ids:
+            return {}
+        rows = ScheduleOccupancy.objects.filter(
+            schedule_id__in=ids,
+            date__gte=date_from,
+            date__lte=date_to,
+        ).values_list('schedule_id', 'date', 'absence_count', 'makeup_count', 'trial_count')
+        return {
+            (schedule_id, target_date): DateOccupancy(absence, makeup, trial)
+            for schedule_id, target_date, absence, makeup, trial in rows
+        }
+
+    @staticmethod
+    def get_trial_count(schedule_id, target_date) -> int:
+        """指定スケジュール・日付の体験予約数"""
+        return ScheduleOccupancy.objects.filter(
+            schedule_id=schedule_id, date=target_date
+        ).values_list('trial_count', flat=True).first() or 0
+
+    @staticmethod
+    def available_makeup_seats(schedule: ClassSchedule, occupancy: DateOccupancy = EMPTY_OCCUPANCY) -> int:
+        """
+        振替で受け入れ可能な席数
+
+        定員 - 在籍数 + 当日の欠席数 - 当日の振替受入数 - 当日の体験予約数
+        """
+        return max(
+            0,
+            schedule.capacity - schedule.enrolled_count
+            + occupancy.absence_count - occupancy.makeup_count - occupancy.trial_count,
+        )
+
+    # ----------------------------------------
+    # 再構築
+    # ----------------------------------------
+
+    @classmethod
+    def rebuild(cls, tenant_id=None) -> Tuple[int, int]:
+        """
+        全件を再集計
+
+        Returns:
+            (更新した時間割数, 作成した日別占有数の件数)
+        """
+        from apps.lessons.models import AbsenceTicket
+        from apps.students.models import TrialBooking
+
+        schedules = ClassSchedule.objects.all()
+        occupancies = ScheduleOccupancy.objects.all()
+        tickets = AbsenceTicket.objects.filter(deleted_at__isnull=True)
+        trials = TrialBooking.objects.filter(deleted_at__isnull=True, status__in=ACTIVE_TRIAL_STATUSES)
+        if tenant_id:
+            schedules = schedules.filter(tenant_id=tenant_id)
+            occupancies = occupancies.filter(tenant_id=tenant_id)
+            tickets = tickets.filter(tenant_id=tenant_id)
+            trials = trials.filter(tenant_id=tenant_id)
+
+        rows = defaultdict(lambda: defaultdict(int))
+        tenants = {}
+
+        def add(row, field):
+            key = (row[1], row[2])
+            tenants[key] = row[0]
+            rows[key][field] += row[3]
+
+        for row in tickets.filter(class_schedule__isnull=False).exclude(
+            status=AbsenceTicket.Status.CANCELLED
+        ).values_list('tenant_id', 'class_schedule_id', 'absence_date').annotate(c=Count('id')):
+            add(row, 'absence_count')
+        for row in tickets.filter(
+            status=AbsenceTicket.Status.USED,
+            used_class_schedule__isnull=False,
+            used_date__isnull=False,
+        ).values_list('tenant_id', 'used_class_schedule_id', 'used_date').annotate(c=Count('id')):
+            add(row, 'makeup_count')
+        for key_field in ('schedule_id', 'class_schedule_id'):
+            for row in trials.filter(**{f'{key_field}__isnull': False}).values_list(
+                'tenant_id', key_field, 'trial_date'
+            ).annotate(c=Count('id')):
+                add(row, 'trial_count')
+
+        with transaction.atomic():
+            updated = schedules.update(enrolled_count=Coalesce(cls._enrolled_subquery(), Value(0)))
+            occupancies.delete()
+            created = ScheduleOccupancy.objects.bulk_create([
+                ScheduleOccupancy(
+                    tenant_id=tenants[key],
+                    schedule_id=key[0],
+                    date=key[1],
+                    **counts,
+                )
+                for key, counts in rows.items()
+            ], batch_size=1000)
+        logger.info(f"Schedule occupancy rebuilt: {updated} schedules, {len(created)} date rows")
+        return updated, len(created)
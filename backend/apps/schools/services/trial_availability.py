@@ -0,0 +1,214 @@
+"""
+Trial Availability Service
+体験予約の月間空き状況（公開サイト用）の算出とキャッシュ
+
+従来は 日数 × スケジュール数 の予約数 COUNT と、クラスごとの
+grade.school_years.filter(...).exists() を発行していた。
+ここでは以下の固定回数のクエリで1か月分を算出する。
+
+- 時間割（学年→学年区分は prefetch した集合で判定）
+- 休講日・日本人講師のみの日（LessonCalendar）
+- 月内の体験予約数（集計済みの ScheduleOccupancy を1回で取得）
+
+結果は (校舎, ブランド, 年月, 学年区分) ごとにキャッシュし、
+TrialBooking / LessonCalendar / ClassSchedule / SchoolSchedule の変更時に
+バージョンを更新して無効化する（signals.py 参照）。
+バージョンの更新は書き込みのトランザクションのコミット後に行う（コミット前に更新すると、
+その間に読んだ古い内容が新しいバージョンでキャッシュされる）。
+"""
+import calendar as cal
+import logging
+from datetime import date, timedelta
+from typing import Dict, List
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.schools.models import ClassSchedule, LessonCalendar, SchoolSchedule
+
+from .occupancy import ScheduleOccupancyService
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'trial_monthly_availability:'
+CACHE_TIMEOUT = 60 * 10
+# 全体のバージョン（LessonCalendar はカレンダーコード経由で複数校舎に影響するため）
+GLOBAL_VERSION_KEY = f'{CACHE_PREFIX}version'
+# 校舎ごとのバージョン
+SCHOOL_VERSION_PREFIX = f'{CACHE_PREFIX}school_version:'
+
+
+def _bump(key):
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+    except Exception as e:
+        logger.warning(f"Failed to bump trial availability version {key}: {e}")
+
+
+def invalidate_trial_availability(school_id=None):
+    """
+    月間空き状況のキャッシュを無効化
+
+    Args:
+        school_id: 指定時はその校舎のみ、省略時は全校舎
+
+    トランザクション内ではコミット後に無効化する
+    """
+    key = f'{SCHOOL_VERSION_PREFIX}{school_id}' if school_id else GLOBAL_VERSION_KEY
+    transaction.on_commit(lambda: _bump(key))
+
+
+def _cache_key(school_id, brand_id, year, month, school_year_id):
+    school_version_key = f'{SCHOOL_VERSION_PREFIX}{school_id}'
+    try:
+        versions = cache.get_many([GLOBAL_VERSION_KEY, school_version_key])
+    except Exception as e:
+        logger.warning(f"Trial availability cache unavailable: {e}")
+        return None
+    return (
+        f'{CACHE_PREFIX}{school_id}:{brand_id}:{year}-{month:02d}:{school_year_id or "-"}:'
+        f'{versions.get(GLOBAL_VERSION_KEY, 0)}:{versions.get(school_version_key, 0)}'
+    )
+
+
+def matches_school_year(schedule: ClassSchedule, school_year) -> bool:
+    """クラスの対象学年に生徒の学年区分が含まれるか（学年未設定は対象）"""
+    if not school_year or not schedule.grade:
+        return True
+    # prefetch 済みの school_years を使う（.filter() は追加クエリになる）
+    return any(sy.id == school_year.id for sy in schedule.grade.school_years.all())
+
+
+def get_monthly_availability(school_id, brand_id, year: int, month: int, school_year=None) -> Dict:
+    """月間空き状況（キャッシュ経由）"""
+    key = _cache_key(school_id, brand_id, year, month, school_year.id if school_year else None)
+    if key:
+        try:
+            cached = cache.get(key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            return cached
+
+    result = compute_monthly_availability(school_id, brand_id, year, month, school_year)
+
+    if key:
+        try:
+            cache.set(key, result, CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to cache trial availability: {e}")
+    return result
+
+
+def compute_monthly_availability(school_id, brand_id, year: int, month: int, school_year=None) -> Dict:
+    """月間空き状況を算出"""
+    first_day = date(year, month, 1)
+    last_day = date(year, month, cal.monthrange(year, month)[1])
+
+    # スケジュールを取得（ClassSchedule がなければ SchoolSchedule）
+    class_schedules = list(ClassSchedule.objects.filter(
+        school_id=school_id,
+        brand_id=brand_id,
+        is_active=True,
+        deleted_at__isnull=True
+    ).select_related('grade').prefetch_related('grade__school_years'))
+
+    use_class_schedule = bool(class_schedules)
+    if use_class_schedule:
+        # 生徒の学年でフィルター（対象学年のクラスのみ残席をカウント）
+        schedules = [cs for cs in class_schedules if matches_school_year(cs, school_year)]
+    else:
+        schedules = list(SchoolSchedule.objects.filter(
+            school_id=school_id,
+            brand_id=brand_id,
+            is_active=True,
+            deleted_at__isnull=True
+        ))
+
+    schedules_by_day: Dict[int, List] = {}
+    for sched in schedules:
+        schedules_by_day.setdefault(sched.day_of_week, []).append(sched)
+
+    # 休講日・日本人講師のみの日
+    closure_dates = set()
+    japanese_only_dates = set()
+    calendar_entries = LessonCalendar.objects.filter(
+        brand_id=brand_id,
+        school_id=school_id,
+        lesson_date__gte=first_day,
+        lesson_date__lte=last_day,
+        deleted_at__isnull=True,
+    ).values_list('lesson_date', 'is_open', 'lesson_type')
+    for lesson_date, is_open, lesson_type in calendar_entries:
+        if not is_open:
+            closure_dates.add(lesson_date)
+        if lesson_type == 'B':
+            japanese_only_dates.add(lesson_date)
+
+    if use_class_schedule:
+        calendar_patterns = {cs.calendar_pattern for cs in schedules if cs.calendar_pattern}
+        if calendar_patterns:
+            japanese_only_dates.update(LessonCalendar.objects.filter(
+                calendar_code__in=calendar_patterns,
+                lesson_date__gte=first_day,
+                lesson_date__lte=last_day,
+                lesson_type='B',
+                deleted_at__isnull=True,
+            ).values_list('lesson_date', flat=True))
+
+    # 月内の予約数（スケジュール×日付）を一括取得
+    occupancy = ScheduleOccupancyService.get_date_occupancy(
+        [s.id for s in schedules], first_day, last_day
+    )
+
+    daily_availability = []
+    for offset in range((last_day - first_day).days + 1):
+        current_date = first_day + timedelta(days=offset)
+        day_of_week = current_date.isoweekday()
+
+        day_data = {
+            'date': current_date.isoformat(),
+            'dayOfWeek': day_of_week,
+            'isOpen': True,
+            'totalCapacity': 0,
+            'bookedCount': 0,
+            'availableCount': 0,
+            'isAvailable': False,
+        }
+
+        if current_date in closure_dates:
+            day_data['isOpen'] = False
+            day_data['reason'] = 'closed'
+        elif current_date in japanese_only_dates:
+            day_data['isOpen'] = False
+            day_data['reason'] = 'japanese_only'
+        elif day_of_week in schedules_by_day:
+            total_capacity = 0
+            total_booked = 0
+            for sched in schedules_by_day[day_of_week]:
+                total_capacity += sched.trial_capacity or 2
+                date_occupancy = occupancy.get((sched.id, current_date))
+                if date_occupancy:
+                    total_booked += date_occupancy.trial_count
+
+            available = max(0, total_capacity - total_booked)
+            day_data['totalCapacity'] = total_capacity
+            day_data['bookedCount'] = total_booked
+            day_data['availableCount'] = available
+            day_data['isAvailable'] = available > 0 or total_capacity > 0
+        else:
+            day_data['isOpen'] = False
+            day_data['reason'] = 'no_schedule'
+
+        daily_availability.append(day_data)
+
+    return {
+        'year': year,
+        'month': month,
+        'schoolId': str(school_id),
+        'brandId': str(brand_id),
+        'days': daily_availability,
+    }
@@ -1,12 +1,18 @@
 """
 Schools Signals
-休校設定時にお知らせを自動作成
+休校設定時にお知らせを自動作成、座席占有数（在籍数・日別占有数）の再集計、
+体験空き状況キャッシュの無効化、授業実施日（LessonOccurrence）の再生成
 """
 import logging
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
+from .services.lesson_occurrence import LessonOccurrenceService
+from .services.occupancy import ScheduleOccupancyService
+from .services.trial_availability import invalidate_trial_availability
+
 logger = logging.getLogger(__name__)
 
 
@@ -103,3 +109,178 @@ def create_announcement_on_closure(sender, instance, created, **kwargs):
 
     except Exception as e:
         logger.error(f"[SchoolClosure] Failed to create announcement: {e}", exc_info=True)
+
+
+# ========================================
+# 座席占有数
+# ========================================
+
+# 再集計の対象キーに影響するフィールド
+ENROLLMENT_FIELDS = {'class_schedule', 'class_schedule_id', 'enrollment_status'}
+ABSENCE_FIELDS = {
+    'class_schedule', 'class_schedule_id', 'absence_date', 'status',
+    'used_class_schedule', 'used_class_schedule_id', 'used_date', 'deleted_at',
+}
+TRIAL_FIELDS = {
+    'schedule', 'schedule_id', 'class_schedule', 'class_schedule_id',
+    'trial_date', 'status', 'deleted_at',
+}
+
+
+def _absence_keys(ticket):
+    return {
+        (ticket.tenant_id, ticket.class_schedule_id, ticket.absence_date),
+        (ticket.tenant_id, ticket.used_class_schedule_id, ticket.used_date),
+    }
+
+
+def _trial_keys(booking):
+    return {
+        (booking.tenant_id, booking.schedule_id, booking.trial_date),
+        (booking.tenant_id, booking.class_schedule_id, booking.trial_date),
+    }
+
+
+def _is_relevant(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+def _previous(sender, instance):
+    """更新前の行（新規作成時は None）"""
+    if instance._state.adding or instance.pk is None:
+        return None
+    return sender._base_manager.filter(pk=instance.pk).first()
+
+
+@receiver(pre_save, sender='students.StudentSchool')
+def remember_previous_enrollment(sender, instance, update_fields=None, **kwargs):
+    if _is_relevant(update_fields, ENROLLMENT_FIELDS):
+        previous = _previous(sender, instance)
+        instance._occupancy_previous = {previous.class_schedule_id} if previous else set()
+
+
+@receiver(post_save, sender='students.StudentSchool')
+@receiver(post_delete, sender='students.StudentSchool')
+def refresh_enrolled_count(sender, instance, **kwargs):
+    """在籍の変更時に時間割の在籍数を再集計"""
+    if not _is_relevant(kwargs.get('update_fields'), ENROLLMENT_FIELDS):
+        return
+    previous = getattr(instance, '_occupancy_previous', set())
+    ScheduleOccupancyService.refresh_enrolled_counts(previous | {instance.class_schedule_id})
+
+
+@receiver(pre_save, sender='lessons.AbsenceTicket')
+@receiver(pre_save, sender='students.AbsenceTicket')
+def remember_previous_absence(sender, instance, update_fields=None, **kwargs):
+    if _is_relevant(update_fields, ABSENCE_FIELDS):
+        previous = _previous(sender, instance)
+        instance._occupancy_previous = _absence_keys(previous) if previous else set()
+
+
+@receiver(post_save, sender='lessons.AbsenceTicket')
+@receiver(post_delete, sender='lessons.AbsenceTicket')
+@receiver(post_save, sender='students.AbsenceTicket')
+@receiver(post_delete, sender='students.AbsenceTicket')
+def refresh_absence_occupancy(sender, instance, **kwargs):
+    """欠席・振替の変更時に日別占有数を再集計"""
+    if not _is_relevant(kwargs.get('update_fields'), ABSENCE_FIELDS):
+        return
+    previous = getattr(instance, '_occupancy_previous', set())
+    ScheduleOccupancyService.refresh_dates(previous | _absence_keys(instance))
+
+
+@receiver(pre_save, sender='students.TrialBooking')
+def remember_previous_trial(sender, instance, update_fields=None, **kwargs):
+    if _is_relevant(update_fields, TRIAL_FIELDS):
+        previous = _previous(sender, instance)
+        instance._occupancy_previous = _trial_keys(previous) if previous else set()
+
+
+@receiver(post_save, sender='students.TrialBooking')
+@receiver(post_delete, sender='students.TrialBooking')
+def refresh_trial_occupancy(sender, instance, **kwargs):
+    """体験予約の変更時に日別占有数を再集計"""
+    if not _is_relevant(kwargs.get('update_fields'), TRIAL_FIELDS):
+        return
+    previous = getattr(instance, '_occupancy_previous', set())
+    ScheduleOccupancyService.refresh_dates(previous | _trial_keys(instance))
+
+
+# ========================================
+# 体験空き状況キャッシュ
+# ========================================
+
+@receiver(post_save, sender='students.TrialBooking')
+@receiver(post_delete, sender='students.TrialBooking')
+@receiver(post_save, sender='schools.ClassSchedule')
+@receiver(post_delete, sender='schools.ClassSchedule')
+@receiver(post_save, sender='schools.SchoolSchedule')
+@receiver(post_delete, sender='schools.SchoolSchedule')
+def invalidate_school_trial_availability(sender, instance, **kwargs):
+    """予約・時間割の変更時に校舎の月間空き状況キャッシュを無効化"""
+    invalidate_trial_availability(instance.school_id)
+
+
+@receiver(post_save, sender='schools.LessonCalendar')
+@receiver(post_delete, sender='schools.LessonCalendar')
+def invalidate_all_trial_availability(sender, instance, **kwargs):
+    """カレンダーはカレンダーコード経由で複数校舎に影響するため全体を無効化"""
+    invalidate_trial_availability()
+
+
+# ========================================
+# 授業実施日（LessonOccurrence）
+# ========================================
+
+def _calendar_scope(lesson_calendar):
+    return (
+        lesson_calendar.tenant_id, lesson_calendar.calendar_code,
+        lesson_calendar.school_id, lesson_calendar.brand_id, lesson_calendar.lesson_date,
+    )
+
+
+def _closure_scope(closure):
+    return (closure.tenant_id, closure.school_id, closure.brand_id, closure.closure_date)
+
+
+@receiver(post_save, sender='schools.ClassSchedule')
+def refresh_schedule_occurrences(sender, instance, **kwargs):
+    """時間割の変更時に授業実施日を作り直す（コミット後）"""
+    schedule_id = instance.pk
+    transaction.on_commit(lambda: LessonOccurrenceService.refresh_schedule(schedule_id))
+
+
+@receiver(pre_save, sender='schools.LessonCalendar')
+def remember_previous_lesson_calendar(sender, instance, **kwargs):
+    previous = _previous(sender, instance)
+    instance._occurrence_previous = _calendar_scope(previous) if previous else None
+
+
+@receiver(post_save, sender='schools.LessonCalendar')
+@receiver(post_delete, sender='schools.LessonCalendar')
+def refresh_calendar_occurrences(sender, instance, **kwargs):
+    """開講カレンダーの変更時に該当日の授業実施日を作り直す（コミット後）"""
+    scopes = {_calendar_scope(instance), getattr(instance, '_occurrence_previous', None)} - {None}
+
+    def refresh():
+        for scope in scopes:
+            LessonOccurrenceService.refresh_calendar_date(*scope)
+    transaction.on_commit(refresh)
+
+
+@receiver(pre_save, sender='schools.SchoolClosure')
+def remember_previous_closure(sender, instance, **kwargs):
+    previous = _previous(sender, instance)
+    instance._occurrence_previous = _closure_scope(previous) if previous else None
+
+
+@receiver(post_save, sender='schools.SchoolClosure')
+@receiver(post_delete, sender='schools.SchoolClosure')
+def refresh_closure_occurrences(sender, instance, **kwargs):
+    """休講の変更時に該当日の授業実施日を作り直す（コミット後）"""
+    scopes = {_closure_scope(instance), getattr(instance, '_occurrence_previous', None)} - {None}
+
+    def refresh():
+        for scope in scopes:
+            LessonOccurrenceService.refresh_closure_date(*scope)
+    transaction.on_commit(refresh)
@@ -0,0 +1,42 @@
+"""
+Schools Celery Tasks - 校舎関連バックグラウンドタスク
+"""
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(bind=True, soft_time_limit=1800, time_limit=2400)
+def generate_lesson_occurrences_task(self, tenant_id=None):
+    """授業実施日（LessonOccurrence）を定期生成範囲で再生成するCeleryタスク
+
+    Args:
+        tenant_id: テナントID（省略時は全テナント）
+
+    Returns:
+        dict: 処理結果
+    """
+    from apps.schools.services.lesson_occurrence import LessonOccurrenceService
+
+    count = LessonOccurrenceService.generate_horizon(tenant_id=tenant_id)
+    logger.info(f"Generated {count} lesson occurrences")
+    return {'generated': count}
+
+
+@shared_task(bind=True, soft_time_limit=240, time_limit=300)
+def sync_google_calendars_task(self, full=False, calendar_ids=None):
+    """Googleカレンダーのイベントをローカルへ同期するCeleryタスク（通常は差分同期）
+
+    Args:
+        full: True の場合は sync_token を使わず全件同期
+        calendar_ids: 対象のカレンダーID（省略時は同期対象すべて）
+
+    Returns:
+        dict: 処理結果
+    """
+    from apps.schools.services.google_calendar import get_google_calendar_service
+
+    result = get_google_calendar_service().sync_all(calendar_ids=calendar_ids, full=full)
+    logger.info(f"Synced Google Calendars: {result}")
+    return result
@@ -0,0 +1,171 @@
+"""
+Calendar Bulk Tests - カレンダー一括操作（差分・dry_run・反映）と授業実施日の再生成のテスト
+"""
+import os
+import uuid
+from datetime import date, time, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from apps.schools.services.calendar_bulk import CalendarBulkError, CalendarBulkService
+
+requires_postgres = pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+
+
+def _next_monday(weeks=1):
+    today = date.today()
+    return today + timedelta(days=7 - today.weekday() + 7 * (weeks - 1))
+
+
+@pytest.mark.unit
+class TestValidation:
+    """指定不正は CalendarBulkError（DBには問い合わせない）"""
+
+    @pytest.mark.parametrize('school_ids', [['not-a-uuid'], 'not-a-list', [123]])
+    def test_invalid_school_ids(self, school_ids):
+        with pytest.raises(CalendarBulkError):
+            CalendarBulkService.set_closure(uuid.uuid4(), date(2026, 4, 1), date(2026, 4, 2), school_ids=school_ids)
+
+    def test_invalid_brand_ids(self):
+        with pytest.raises(CalendarBulkError):
+            CalendarBulkService.cancel_closure(
+                uuid.uuid4(), date(2026, 4, 1), date(2026, 4, 2),
+                school_ids=[uuid.uuid4()], brand_ids=['x'],
+            )
+
+    def test_invalid_calendar_patterns(self):
+        with pytest.raises(CalendarBulkError):
+            CalendarBulkService.resolve_patterns(uuid.uuid4(), calendar_patterns=[{'code': 'A'}])
+
+    def test_invalid_weekdays(self):
+        with pytest.raises(CalendarBulkError):
+            CalendarBulkService.set_closure(
+                uuid.uuid4(), date(2026, 4, 1), date(2026, 4, 2), school_ids=[uuid.uuid4()], weekdays={0, 8},
+            )
+
+    def test_view_returns_400_for_invalid_ids(self):
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        from apps.schools.views.calendar.admin.admin_bulk import AdminCalendarBulkView
+
+        request = APIRequestFactory().post('/calendar/bulk/', {
+            'operation': 'set_closure', 'date_from': '2026-04-01', 'date_to': '2026-04-02',
+            'school_ids': ['not-a-uuid'],
+        }, format='json')
+        force_authenticate(request, user=SimpleNamespace(
+            is_authenticated=True, is_superuser=False, is_staff=False, role='STAFF', user_type='staff',
+            tenant_id=uuid.uuid4(),
+        ))
+
+        response = AdminCalendarBulkView.as_view()(request)
+
+        assert response.status_code == 400
+        assert 'school_ids' in response.data['error']
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+@requires_postgres
+class TestCalendarBulkDatabase:
+    """差分・dry_run・反映と授業実施日の再生成"""
+
+    @pytest.fixture
+    def tenant(self):
+        from apps.tenants.models import Tenant
+
+        return Tenant.objects.create(tenant_code='BULK_TENANT', tenant_name='一括テナント', is_active=True)
+
+    @pytest.fixture
+    def school(self, tenant):
+        from apps.schools.models import School
+
+        return School.objects.create(tenant_ref=tenant, school_code='BULK_SCHOOL', school_name='一括校', is_active=True)
+
+    @pytest.fixture
+    def brand(self, tenant):
+        from apps.schools.models import Brand
+
+        return Brand.objects.create(tenant_ref=tenant, brand_code='BULK_BRAND', brand_name='一括', is_active=True)
+
+    @pytest.fixture
+    def schedule(self, tenant, school, brand):
+        from apps.schools.models import ClassSchedule
+
+        return ClassSchedule.objects.create(
+            tenant_id=tenant.id, schedule_code='BULK1', school=school, brand=brand, calendar_pattern='BULK_A',
+            day_of_week=1, period=1, start_time=time(17, 0), end_time=time(18, 0), class_name='月曜', capacity=10,
+        )
+
+    def test_dry_run_returns_diff_without_writing(self, tenant, schedule):
+        from apps.schools.models import CalendarOperationLog, LessonCalendar
+
+        monday = _next_monday()
+        result = CalendarBulkService.apply_pattern(
+            tenant.id, monday, monday + timedelta(days=13), lesson_type='B',
+            calendar_patterns=['BULK_A'], dry_run=True,
+        )
+
+        # 月曜の2日分のみ（授業のない曜日は対象外）
+        assert [d['date'] for d in result.created] == [monday.isoformat(), (monday + timedelta(days=7)).isoformat()]
+        assert result.to_dict()['dryRun'] is True
+        assert not LessonCalendar.objects.filter(tenant_id=tenant.id).exists()
+        assert not CalendarOperationLog.objects.filter(tenant_id=tenant.id).exists()
+
+    def test_apply_then_swap(self, tenant, schedule, django_capture_on_commit_callbacks):
+        from apps.schools.models import CalendarOperationLog, LessonCalendar, LessonOccurrence
+
+        monday = _next_monday()
+        with django_capture_on_commit_callbacks(execute=True):
+            result = CalendarBulkService.apply_pattern(
+                tenant.id, monday, monday, lesson_type='B', calendar_patterns=['BULK_A'],
+            )
+        assert len(result.created) == 1
+        assert LessonCalendar.objects.get(tenant_id=tenant.id, calendar_code='BULK_A').lesson_type == 'B'
+        assert LessonOccurrence.objects.get(class_schedule=schedule, date=monday).lesson_type == 'B'
+
+        # 同じ指定は変更なし、ABスワップは B → A
+        again = CalendarBulkService.apply_pattern(tenant.id, monday, monday, lesson_type='B', calendar_patterns=['BULK_A'])
+        assert (again.unchanged, again.created, again.updated) == (1, [], [])
+        with django_capture_on_commit_callbacks(execute=True):
+            swapped = CalendarBulkService.apply_pattern(tenant.id, monday, monday, school_ids=[schedule.school_id])
+        assert swapped.updated == [{'calendarPattern': 'BULK_A', 'date': monday.isoformat(), 'oldType': 'B', 'newType': 'A'}]
+        assert LessonOccurrence.objects.get(class_schedule=schedule, date=monday).lesson_type == 'A'
+        assert CalendarOperationLog.objects.filter(tenant_id=tenant.id).count() == 2
+
+    def test_closure_set_and_cancel(self, tenant, school, schedule, django_capture_on_commit_callbacks):
+        from apps.schools.models import LessonOccurrence, SchoolClosure
+
+        monday = _next_monday()
+        with django_capture_on_commit_callbacks(execute=True):
+            created = CalendarBulkService.set_closure(tenant.id, monday, monday, school_ids=[str(school.id)])
+        assert len(created.created) == 1
+        assert not LessonOccurrence.objects.get(class_schedule=schedule, date=monday).is_open
+
+        # 既存の休講は重複して作らない
+        assert CalendarBulkService.set_closure(tenant.id, monday, monday, school_ids=[school.id]).unchanged == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            cancelled = CalendarBulkService.cancel_closure(tenant.id, monday, monday, school_ids=[school.id])
+        assert len(cancelled.deleted) == 1
+        assert not SchoolClosure.objects.filter(school=school, deleted_at__isnull=True).exists()
+        assert LessonOccurrence.objects.get(class_schedule=schedule, date=monday).is_open
+
+    def test_refresh_range_limits_to_window(self, tenant, schedule):
+        from apps.schools.models import ClassSchedule, LessonOccurrence
+        from apps.schools.services.lesson_occurrence import LessonOccurrenceService, coverage_window
+
+        window_start, window_end = coverage_window()
+        schedules = ClassSchedule.objects.filter(id=schedule.id)
+
+        count = LessonOccurrenceService.refresh_range(
+            schedules, window_start - timedelta(days=60), window_end + timedelta(days=60),
+        )
+
+        dates = list(LessonOccurrence.objects.filter(class_schedule=schedule).values_list('date', flat=True))
+        assert count == len(dates) > 0
+        assert window_start <= min(dates) and max(dates) <= window_end
+        assert all(d.isoweekday() == 1 for d in dates)
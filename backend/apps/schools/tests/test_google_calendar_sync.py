@@ -0,0 +1,200 @@
+"""
+Google Calendar Sync Tests - Googleカレンダー差分同期のユニットテスト
+
+Calendar API はページング・バッチ・410 Gone を再現する最小限のフェイクで置き換える。
+"""
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+from uuid import uuid4
+
+import pytest
+from django.utils import timezone
+
+
+class GoneError(Exception):
+    """sync_token 期限切れ（HttpError 410 相当）"""
+    resp = SimpleNamespace(status=410)
+
+
+class FakeRequest:
+    def __init__(self, api, params):
+        self.api = api
+        self.params = params
+
+    def execute(self):
+        self.api.calls.append(self.params)
+        return self.api.respond(self.params)
+
+
+class FakeBatch:
+    def __init__(self, api, callback):
+        self.api = api
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.api.batches.append(len(self.requests))
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+class FakeCalendarAPI:
+    """events().list と new_batch_http_request のみを持つフェイク"""
+
+    def __init__(self, pages, expired=()):
+        self.pages = pages          # {calendar_id: [page, ...]}
+        self.expired = set(expired)  # 410 を返すカレンダー
+        self.calls = []
+        self.batches = []
+
+    def events(self):
+        return SimpleNamespace(list=lambda **params: FakeRequest(self, params))
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+    def respond(self, params):
+        calendar_id = params['calendarId']
+        if 'syncToken' in params and calendar_id in self.expired:
+            raise GoneError('Sync token is no longer valid')
+        pages = self.pages[calendar_id]
+        return pages[int(params.get('pageToken', 0))]
+
+
+def _state(calendar_id, sync_token='token-0'):
+    return SimpleNamespace(id=uuid4(), calendar_id=calendar_id, sync_token=sync_token)
+
+
+class TestFetch:
+    """Calendar API からの取得のテスト"""
+
+    def test_pages_until_sync_token(self):
+        """nextPageToken を辿り、最終ページの nextSyncToken を返す"""
+        from apps.schools.services.google_calendar import GoogleCalendarService
+
+        api = FakeCalendarAPI({'cal': [
+            {'items': [{'id': 'e1'}], 'nextPageToken': '1'},
+            {'items': [{'id': 'e2'}], 'nextSyncToken': 'token-1'},
+        ]})
+        service = GoogleCalendarService(credentials_dict={})
+        changes = service.fetch_full(api, 'cal', timezone.now())
+
+        assert [item['id'] for item in changes.items] == ['e1', 'e2']
+        assert changes.next_sync_token == 'token-1'
+        assert changes.full
+        assert api.calls[1]['pageToken'] == '1'
+
+    def test_incremental_requests_are_batched(self):
+        """差分取得は1回のバッチにまとめ、期限切れのカレンダーだけ全件取得に切り替える"""
+        from apps.schools.services.google_calendar import GoogleCalendarService
+
+        api = FakeCalendarAPI({
+            'a': [{'items': [{'id': 'a1', 'status': 'cancelled'}], 'nextSyncToken': 'a-2'}],
+            'b': [{'items': [{'id': 'b1'}, {'id': 'b2'}], 'nextSyncToken': 'b-2'}],
+        }, expired={'b'})
+        states = [_state('a'), _state('b')]
+        results = GoogleCalendarService(credentials_dict={}).fetch_changes(api, states)
+
+        assert api.batches == [2]
+        assert not results[states[0].id].full
+        assert results[states[0].id].next_sync_token == 'a-2'
+        assert results[states[1].id].full
+        assert 'syncToken' not in api.calls[-1]
+
+
+class TestEventBounds:
+    """イベントの期間の解釈のテスト"""
+
+    def test_all_day_event_uses_local_midnight(self):
+        from apps.schools.services.google_calendar import event_bounds
+
+        start_at, end_at, is_all_day = event_bounds({
+            'start': {'date': '2026-10-16'}, 'end': {'date': '2026-10-17'},
+        })
+        assert is_all_day
+        assert start_at == timezone.make_aware(datetime(2026, 10, 16))
+        assert (end_at - start_at).days == 1
+
+    def test_timed_event(self):
+        from apps.schools.services.google_calendar import event_bounds
+
+        start_at, end_at, is_all_day = event_bounds({
+            'start': {'dateTime': '2026-10-16T17:00:00+09:00'},
+            'end': {'dateTime': '2026-10-16T18:00:00+09:00'},
+        })
+        assert not is_all_day
+        assert end_at.hour - start_at.hour == 1
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+class TestGetEvents:
+    """表示時の同期対象の判定のテスト（リクエスト中に全件同期しない）"""
+
+    @pytest.fixture
+    def service(self, settings):
+        from apps.schools.services.google_calendar import GoogleCalendarService
+
+        settings.GOOGLE_CALENDAR_DEFAULT_CALENDAR_ID = 'configured@example.com'
+        settings.GOOGLE_CALENDAR_SYNC_CALENDAR_IDS = []
+        service = GoogleCalendarService(credentials_dict={})
+        with mock.patch.object(service, '_fetch_events', return_value=['live']) as fetch, \
+                mock.patch.object(service, 'sync_calendar') as sync, \
+                mock.patch.object(service, '_enqueue_sync') as enqueue:
+            yield SimpleNamespace(service=service, fetch=fetch, sync=sync, enqueue=enqueue)
+
+    @staticmethod
+    def _range():
+        start = timezone.now()
+        return start, start + timedelta(days=7)
+
+    def test_unknown_calendar_is_not_registered(self, service):
+        from apps.schools.models import GoogleCalendarSyncState
+
+        assert service.service.get_events('stranger@example.com', *self._range()) == ['live']
+        assert not GoogleCalendarSyncState.objects.filter(calendar_id='stranger@example.com').exists()
+        service.sync.assert_not_called()
+
+    def test_configured_calendar_is_synced_by_job(self, service, django_capture_on_commit_callbacks):
+        from apps.schools.models import GoogleCalendarSyncState
+
+        with django_capture_on_commit_callbacks(execute=True):
+            events = service.service.get_events('configured@example.com', *self._range())
+
+        assert events == ['live']
+        assert GoogleCalendarSyncState.objects.filter(calendar_id='configured@example.com').exists()
+        service.sync.assert_not_called()
+        service.enqueue.assert_called_once_with('configured@example.com')
+
+    def test_synced_calendar_is_served_locally(self, service):
+        from apps.schools.models import GoogleCalendarEvent, GoogleCalendarSyncState
+
+        start, end = self._range()
+        state = GoogleCalendarSyncState.objects.create(
+            calendar_id='registered@example.com', last_synced_at=timezone.now(),
+            window_start=start - timedelta(days=90),
+        )
+        GoogleCalendarEvent.objects.create(
+            calendar=state, event_id='e1', start_at=start + timedelta(hours=1), end_at=start + timedelta(hours=2),
+            data={'id': 'e1'},
+        )
+
+        assert service.service.get_events('registered@example.com', start, end) == [{'id': 'e1'}]
+        service.fetch.assert_not_called()
+
+        # 定期同期を止めたカレンダーは API から取得
+        state.is_active = False
+        state.save(update_fields=['is_active'])
+        assert service.service.get_events('registered@example.com', start, end) == ['live']
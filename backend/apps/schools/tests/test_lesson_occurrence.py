@@ -0,0 +1,105 @@
+"""
+Lesson Occurrence Tests - 授業実施日の参照（未生成の日付の補完）のテスト
+"""
+import os
+from datetime import date, time, timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.schools.services.lesson_occurrence import LessonOccurrenceService, coverage_window
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+        reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+    ),
+]
+
+
+@pytest.fixture
+def tenant():
+    from apps.tenants.models import Tenant
+
+    return Tenant.objects.create(tenant_code='OCCR_TENANT', tenant_name='授業日テナント', is_active=True)
+
+
+@pytest.fixture
+def school(tenant):
+    from apps.schools.models import School
+
+    return School.objects.create(tenant_ref=tenant, school_code='OCCR_SCHOOL', school_name='授業日校', is_active=True)
+
+
+@pytest.fixture
+def brand(tenant):
+    from apps.schools.models import Brand
+
+    return Brand.objects.create(tenant_ref=tenant, brand_code='OCCR_BRAND', brand_name='授業日', is_active=True)
+
+
+@pytest.fixture
+def schedule(tenant, school, brand):
+    from apps.schools.models import ClassSchedule
+
+    return ClassSchedule.objects.create(
+        tenant_id=tenant.id, schedule_code='OCCR1', school=school, brand=brand,
+        day_of_week=1, period=1, start_time=time(17, 0), end_time=time(18, 0), class_name='月曜', capacity=10,
+    )
+
+
+def _mondays(date_from, date_to):
+    first = date_from + timedelta(days=(7 - date_from.weekday()) % 7)
+    return [first + timedelta(days=7 * i) for i in range((date_to - first).days // 7 + 1)]
+
+
+def _dates(occurrences):
+    return [o.date for o in occurrences]
+
+
+class TestGetOccurrences:
+
+    def test_empty_table_is_expanded(self, tenant, schedule):
+        """デプロイ直後（未生成）でも範囲内の授業日を返す"""
+        from apps.schools.models import LessonOccurrence
+
+        window_start, window_end = coverage_window()
+        LessonOccurrence.objects.all().delete()
+
+        occurrences = LessonOccurrenceService.get_occurrences(window_start, window_end, tenant_id=tenant.id)
+
+        assert _dates(occurrences) == _mondays(window_start, window_end)
+        assert not LessonOccurrence.objects.exists()
+
+    def test_missing_far_edge_is_filled(self, tenant, schedule):
+        """定期ジョブが実行されず範囲の先端が欠けている場合は、欠けた日付のみ展開する"""
+        from apps.schools.models import ClassSchedule, LessonOccurrence
+
+        window_start, window_end = coverage_window()
+        edge = window_end - timedelta(days=14)
+        LessonOccurrence.objects.all().delete()
+        LessonOccurrenceService.generate(ClassSchedule.objects.filter(pk=schedule.pk), window_start, edge)
+        stored = LessonOccurrence.objects.count()
+
+        occurrences = LessonOccurrenceService.get_occurrences(window_start, window_end, tenant_id=tenant.id)
+
+        assert _dates(occurrences) == _mondays(window_start, window_end)
+        assert sum(o.pk is not None for o in occurrences) == stored
+
+    def test_deleted_calendar_is_ignored(self, tenant, school, brand, schedule):
+        """論理削除された開講カレンダーは展開に使わない"""
+        from apps.schools.models import LessonCalendar
+
+        monday = _mondays(date.today() + timedelta(days=1), date.today() + timedelta(days=8))[0]
+        calendar = LessonCalendar.objects.create(
+            tenant_ref=tenant, calendar_code='OCCR_CAL', school=school, brand=brand,
+            lesson_date=monday, day_of_week='月', is_open=False,
+        )
+        LessonCalendar.objects.filter(pk=calendar.pk).update(deleted_at=timezone.now())
+
+        [occurrence] = LessonOccurrenceService.expand([schedule], monday, monday)
+
+        assert occurrence.is_open
+        assert occurrence.lesson_calendar is None
@@ -12,7 +12,7 @@ from .views import (
     PublicTicketsBySchoolView, PublicTrialMonthlyAvailabilityView, PublicCalendarSeatsView,
     PublicTrialStatsView,
     PublicBankTypesView, PublicBanksView, PublicBankDetailView, PublicBankBranchesView,
-    AdminCalendarView, AdminCalendarEventDetailView, AdminCalendarABSwapView,
+    AdminCalendarView, AdminCalendarEventDetailView, AdminCalendarABSwapView, AdminCalendarBulkView,
     AdminMarkAttendanceView, AdminAbsenceTicketListView,
     GoogleCalendarEventsView, GoogleCalendarListView,
 )
@@ -59,6 +59,7 @@ urlpatterns = [
     path('admin/calendar/', AdminCalendarView.as_view(), name='admin-calendar'),
     path('admin/calendar/event/', AdminCalendarEventDetailView.as_view(), name='admin-calendar-event'),
     path('admin/calendar/ab-swap/', AdminCalendarABSwapView.as_view(), name='admin-calendar-ab-swap'),
+    path('admin/calendar/bulk/', AdminCalendarBulkView.as_view(), name='admin-calendar-bulk'),
     path('admin/calendar/attendance/', AdminMarkAttendanceView.as_view(), name='admin-calendar-attendance'),
     path('admin/calendar/absence-tickets/', AdminAbsenceTicketListView.as_view(), name='admin-absence-tickets'),
     # Google Calendar API
@@ -30,7 +30,8 @@ from .trial import (
 # Calendar Views
 from .calendar import (
     PublicLessonCalendarView, PublicCalendarSeatsView,
-    AdminCalendarView, AdminCalendarEventDetailView, AdminCalendarABSwapView
+    AdminCalendarView, AdminCalendarEventDetailView, AdminCalendarABSwapView,
+    AdminCalendarBulkView,
 )
 
 # Attendance Views
@@ -80,6 +81,7 @@ __all__ = [
     'AdminCalendarView',
     'AdminCalendarEventDetailView',
     'AdminCalendarABSwapView',
+    'AdminCalendarBulkView',
     # Attendance
     'AdminMarkAttendanceView',
     'AdminAbsenceTicketListView',
@@ -13,6 +13,7 @@ from django.utils import timezone
 from django.db.models import Prefetch
 from apps.core.permissions import IsTenantUser, IsTenantAdmin
 from apps.core.csv_utils import CSVMixin
+from apps.core.throttling import PUBLIC_THROTTLES
 from ..models import Brand, BrandCategory, BrandSchool
 from ..serializers import (
     BrandListSerializer, BrandDetailSerializer, BrandCreateUpdateSerializer,
@@ -115,6 +116,7 @@ class BrandViewSet(CSVMixin, viewsets.ModelViewSet):
 class PublicBrandCategoriesView(APIView):
     """公開ブランドカテゴリ一覧API（認証不要）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -139,6 +141,7 @@ class PublicBrandCategoriesView(APIView):
 class PublicBrandSchoolsView(APIView):
     """ブランド開講校舎一覧API（認証不要・地図表示用）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request, brand_id):
         """
@@ -184,6 +187,7 @@ class PublicBrandSchoolsView(APIView):
 class PublicCategorySchoolsView(APIView):
     """カテゴリ内全ブランドの開講校舎一括取得API（認証不要）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
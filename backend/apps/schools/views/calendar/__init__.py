@@ -7,12 +7,14 @@ Calendar Views Package - カレンダー関連ビュー
   - admin_calendar.py: AdminCalendarView
   - admin_event_detail.py: AdminCalendarEventDetailView
   - admin_ab_swap.py: AdminCalendarABSwapView
+  - admin_bulk.py: AdminCalendarBulkView
 """
 from .public import PublicLessonCalendarView, PublicCalendarSeatsView
 from .admin import (
     AdminCalendarView,
     AdminCalendarEventDetailView,
     AdminCalendarABSwapView,
+    AdminCalendarBulkView,
 )
 
 __all__ = [
@@ -23,4 +25,5 @@ __all__ = [
     'AdminCalendarView',
     'AdminCalendarEventDetailView',
     'AdminCalendarABSwapView',
+    'AdminCalendarBulkView',
 ]
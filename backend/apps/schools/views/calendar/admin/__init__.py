@@ -5,13 +5,16 @@ Admin Calendar Views - 管理者用カレンダーAPI
 - admin_calendar.py: AdminCalendarView - カレンダー一覧
 - admin_event_detail.py: AdminCalendarEventDetailView - イベント詳細
 - admin_ab_swap.py: AdminCalendarABSwapView - ABスワップ
+- admin_bulk.py: AdminCalendarBulkView - 一括操作
 """
 from .admin_calendar import AdminCalendarView
 from .admin_event_detail import AdminCalendarEventDetailView
 from .admin_ab_swap import AdminCalendarABSwapView
+from .admin_bulk import AdminCalendarBulkView
 
 __all__ = [
     'AdminCalendarView',
     'AdminCalendarEventDetailView',
     'AdminCalendarABSwapView',
+    'AdminCalendarBulkView',
 ]
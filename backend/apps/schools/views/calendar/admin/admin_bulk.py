@@ -0,0 +1,102 @@
+"""
+AdminCalendarBulkView - カレンダー一括操作API
+"""
+from datetime import datetime
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from apps.core.permissions import IsTenantUser
+from apps.schools.services.calendar_bulk import CalendarBulkError, CalendarBulkService
+
+
+class AdminCalendarBulkView(APIView):
+    """カレンダー一括操作API
+
+    期間 × 校舎/ブランド/カレンダーパターン に対して
+    ABパターン設定・ABスワップ・休講設定・休講解除を1回で行い、変更内容を返す。
+    """
+    permission_classes = [IsAuthenticated, IsTenantUser]
+
+    OPERATIONS = ('set_pattern', 'swap', 'set_closure', 'cancel_closure')
+
+    def post(self, request):
+        """
+        一括操作を実行
+
+        Body:
+            operation: set_pattern / swap / set_closure / cancel_closure
+            date_from, date_to: 期間 (YYYY-MM-DD)
+            calendar_patterns: カレンダーパターンのリスト（set_pattern / swap）
+            school_ids, brand_ids: 校舎・ブランドのリスト
+            weekdays: 対象曜日のリスト (1=月〜7=日) - オプション
+            lesson_type: A/B/P/Y（set_pattern）
+            closure_type: 休講種別（set_closure）- オプション
+            reason: 理由 - オプション
+            dry_run: true の場合は変更内容の確認のみ
+        """
+        data = request.data
+        operation = data.get('operation')
+        if operation not in self.OPERATIONS:
+            return Response(
+                {'error': f'operation must be one of {", ".join(self.OPERATIONS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            date_from = datetime.strptime(data.get('date_from') or '', '%Y-%m-%d').date()
+            date_to = datetime.strptime(data.get('date_to') or '', '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'date_from and date_to are required. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            weekdays = {int(w) for w in data.get('weekdays') or []}
+        except (TypeError, ValueError):
+            return Response({'error': 'weekdays must be a list of 1-7'}, status=status.HTTP_400_BAD_REQUEST)
+
+        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
+        common = {
+            'weekdays': weekdays or None,
+            'user': request.user if request.user.is_authenticated else None,
+            'reason': data.get('reason') or '',
+            'dry_run': bool(data.get('dry_run')),
+        }
+
+        try:
+            if operation in ('set_pattern', 'swap'):
+                if operation == 'set_pattern' and not data.get('lesson_type'):
+                    raise CalendarBulkError('lesson_type is required for set_pattern')
+                result = CalendarBulkService.apply_pattern(
+                    tenant_id, date_from, date_to,
+                    lesson_type=data.get('lesson_type') if operation == 'set_pattern' else None,
+                    calendar_patterns=data.get('calendar_patterns') or [],
+                    school_ids=data.get('school_ids') or [],
+                    brand_ids=data.get('brand_ids') or [],
+                    **common,
+                )
+            elif operation == 'set_closure':
+                extra = {'closure_type': data['closure_type']} if data.get('closure_type') else {}
+                result = CalendarBulkService.set_closure(
+                    tenant_id, date_from, date_to,
+                    school_ids=data.get('school_ids') or [],
+                    brand_ids=data.get('brand_ids') or [],
+                    **extra,
+                    **common,
+                )
+            else:
+                result = CalendarBulkService.cancel_closure(
+                    tenant_id, date_from, date_to,
+                    school_ids=data.get('school_ids') or [],
+                    brand_ids=data.get('brand_ids') or [],
+                    **common,
+                )
+        except CalendarBulkError as e:
+            # ID・曜日・期間などの指定不正は400（想定外の例外はそのまま送出する）
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'success': True, 'operation': operation, **result.to_dict()})
@@ -8,15 +8,16 @@ from rest_framework.views import APIView
 from django.db.models import Count, Q
 
 from apps.core.permissions import IsTenantUser
-from apps.schools.models import LessonCalendar, ClassSchedule, SchoolClosure
+from apps.schools.models import SchoolClosure
+from apps.schools.services.lesson_occurrence import LessonOccurrenceService
 from apps.lessons.models import AbsenceTicket
 
 
 class AdminCalendarView(APIView):
     """管理者用カレンダーAPI
 
-    ClassSchedule（基本時間割）とLessonCalendar（日別情報）を
-    組み合わせてカレンダーデータを返す。
+    授業実施日（LessonOccurrence: ClassSchedule × LessonCalendar・休講）から
+    カレンダーデータを返す。
     出欠情報、ABスワップ、休校日も含む。
     """
     permission_classes = [IsAuthenticated, IsTenantUser]
@@ -54,36 +55,15 @@ class AdminCalendarView(APIView):
         first_day = date(year, month, 1)
         last_day = date(year, month, cal.monthrange(year, month)[1])
 
-        # ClassScheduleを取得
-        schedules_qs = ClassSchedule.objects.filter(
-            school_id=school_id,
-            is_active=True,
-            deleted_at__isnull=True
-        ).select_related('brand', 'brand_category', 'room', 'grade')
-
-        if brand_id:
-            schedules_qs = schedules_qs.filter(brand_id=brand_id)
-
-        # 曜日ごとにスケジュールをグループ化
-        schedules_by_day = {}
-        for sched in schedules_qs:
-            if sched.day_of_week not in schedules_by_day:
-                schedules_by_day[sched.day_of_week] = []
-            schedules_by_day[sched.day_of_week].append(sched)
-
-        # LessonCalendarを取得（calendar_patternごと）
-        calendar_patterns = set(s.calendar_pattern for s in schedules_qs if s.calendar_pattern)
-        lesson_calendars = LessonCalendar.objects.filter(
-            lesson_date__gte=first_day,
-            lesson_date__lte=last_day
-        ).filter(
-            Q(calendar_code__in=calendar_patterns) |
-            Q(school_id=school_id)
-        )
-        lesson_cal_dict = {}
-        for lc in lesson_calendars:
-            key = (lc.lesson_date, lc.calendar_code or f"{lc.school_id}_{lc.brand_id}")
-            lesson_cal_dict[key] = lc
+        # 授業実施日を取得（開講カレンダー・休講を反映済み、開講分のみ）
+        occurrences_by_date = {}
+        for occurrence in LessonOccurrenceService.get_occurrences(
+            first_day, last_day, school_id=school_id, brand_id=brand_id, open_only=True
+        ):
+            occurrences_by_date.setdefault(occurrence.date, []).append(occurrence)
+        schedule_ids = list({
+            o.class_schedule_id for day in occurrences_by_date.values() for o in day
+        })
 
         # SchoolClosureを取得
         closures = SchoolClosure.objects.filter(
@@ -105,7 +85,6 @@ class AdminCalendarView(APIView):
         enrollment_counts = {e['class_schedule_id']: e['count'] for e in enrollments}
 
         # AbsenceTicketを取得（日別・スケジュール別の欠席数）
-        schedule_ids = [s.id for s in schedules_qs]
         absence_tickets = AbsenceTicket.objects.filter(
             class_schedule_id__in=schedule_ids,
             absence_date__gte=first_day,
@@ -145,25 +124,9 @@ class AdminCalendarView(APIView):
                 day_data['isClosed'] = True
                 day_data['closureReason'] = closure.reason
 
-            # 該当曜日のスケジュールを取得
-            day_schedules = schedules_by_day.get(day_of_week, [])
-
-            for sched in day_schedules:
-                # LessonCalendarからlesson_type取得
-                cal_key = (current_date, sched.calendar_pattern) if sched.calendar_pattern else None
-                lesson_cal = lesson_cal_dict.get(cal_key) if cal_key else None
-
-                # 開講チェック
-                is_open = True
-                lesson_type = 'A'  # デフォルト
-                if lesson_cal:
-                    is_open = lesson_cal.is_open
-                    lesson_type = lesson_cal.lesson_type or 'A'
-                if closure and not closure.schedule_id:
-                    is_open = False
-
-                if not is_open:
-                    continue
+            for occurrence in occurrences_by_date.get(current_date, []):
+                sched = occurrence.class_schedule
+                lesson_type = occurrence.lesson_type or 'A'
 
                 # 受講者数
                 enrolled_count = enrollment_counts.get(sched.id, 0)
@@ -7,12 +7,15 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 
+from apps.core.throttling import PUBLIC_THROTTLES
 from apps.schools.models import LessonCalendar, ClassSchedule
+from apps.schools.services.occupancy import EMPTY_OCCUPANCY, ScheduleOccupancyService
 
 
 class PublicLessonCalendarView(APIView):
     """開講カレンダーAPI（認証不要・保護者向け）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     @staticmethod
     def extract_brand_code_from_calendar_code(calendar_code: str) -> str | None:
@@ -73,7 +76,8 @@ class PublicLessonCalendarView(APIView):
         # クエリ構築
         calendars = LessonCalendar.objects.filter(
             lesson_date__gte=first_day,
-            lesson_date__lte=last_day
+            lesson_date__lte=last_day,
+            deleted_at__isnull=True
         )
 
         if calendar_code:
@@ -137,6 +141,7 @@ class PublicCalendarSeatsView(APIView):
     受講生と残り席数を表示するために使用
     """
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -189,10 +194,16 @@ class PublicCalendarSeatsView(APIView):
             brand_id=brand_id,
             school_id=school_id,
             lesson_date__gte=first_day,
-            lesson_date__lte=last_day
+            lesson_date__lte=last_day,
+            deleted_at__isnull=True
         )
         lesson_cal_dict = {lc.lesson_date: lc for lc in lesson_cal}
 
+        # 日別の欠席・振替・体験数（月内分を一括取得）
+        date_occupancy = ScheduleOccupancyService.get_date_occupancy(
+            [s.id for s in class_schedules], first_day, last_day
+        )
+
         # 日付ごとの座席状況を計算
         daily_seats = []
         current_date = first_day
@@ -234,8 +245,13 @@ class PublicCalendarSeatsView(APIView):
                 total_enrolled = 0
 
                 for sched in day_schedules:
+                    occupancy = date_occupancy.get((sched.id, current_date), EMPTY_OCCUPANCY)
                     total_capacity += sched.capacity
-                    total_enrolled += sched.reserved_seats or 0
+                    total_enrolled += max(
+                        0,
+                        sched.enrolled_count - occupancy.absence_count
+                        + occupancy.makeup_count + occupancy.trial_count,
+                    )
 
                 day_data['totalCapacity'] = total_capacity
                 day_data['enrolledCount'] = total_enrolled
@@ -13,6 +13,7 @@ from django.utils import timezone
 from apps.core.permissions import IsTenantUser, IsTenantAdmin
 from apps.core.exceptions import ValidationException
 from apps.core.csv_utils import CSVMixin
+from apps.core.throttling import PUBLIC_THROTTLES
 from ..models import School
 from ..serializers import (
     SchoolListSerializer, SchoolDetailSerializer, SchoolCreateUpdateSerializer,
@@ -151,6 +152,7 @@ class SchoolViewSet(CSVMixin, viewsets.ModelViewSet):
 class PublicSchoolListView(APIView):
     """公開校舎一覧API（認証不要・新規登録用）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -179,6 +181,7 @@ class PublicSchoolListView(APIView):
 class PublicPrefectureListView(APIView):
     """公開都道府県一覧API（認証不要・新規登録用）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """校舎が存在する都道府県一覧を返す"""
@@ -195,6 +198,7 @@ class PublicPrefectureListView(APIView):
 class PublicAreaListView(APIView):
     """公開地域（市区町村）一覧API（認証不要・新規登録用）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """校舎が存在する市区町村一覧を返す"""
@@ -225,6 +229,7 @@ class PublicAreaListView(APIView):
 class PublicSchoolsByAreaView(APIView):
     """地域別校舎一覧API（認証不要・新規登録用）"""
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
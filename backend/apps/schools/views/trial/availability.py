@@ -3,13 +3,14 @@ Trial Availability Views - 体験枠空き状況Views
 PublicTrialAvailabilityView, PublicTrialMonthlyAvailabilityView
 """
 from datetime import datetime, date
-import calendar as cal
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 
+from apps.core.throttling import PUBLIC_THROTTLES
 from ...models import SchoolSchedule, LessonCalendar, ClassSchedule
+from ...services.trial_availability import get_monthly_availability, matches_school_year
 from .utils import get_school_year_from_birth_date
 
 
@@ -22,6 +23,7 @@ class PublicTrialAvailabilityView(APIView):
     - birth_dateで生徒の学年をフィルター
     """
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -79,7 +81,8 @@ class PublicTrialAvailabilityView(APIView):
             for pattern in calendar_patterns:
                 entry = LessonCalendar.objects.filter(
                     calendar_code=pattern,
-                    lesson_date=target_date
+                    lesson_date=target_date,
+                    deleted_at__isnull=True
                 ).first()
                 if entry:
                     calendar_entry = entry
@@ -91,7 +94,8 @@ class PublicTrialAvailabilityView(APIView):
             calendar_entry = LessonCalendar.objects.filter(
                 brand_id=brand_id,
                 school_id=school_id,
-                lesson_date=target_date
+                lesson_date=target_date,
+                deleted_at__isnull=True
             ).first()
             if calendar_entry and calendar_entry.lesson_type == 'B':
                 is_japanese_only = True
@@ -128,14 +132,9 @@ class PublicTrialAvailabilityView(APIView):
 
         # 生徒の学年でフィルター
         if student_school_year:
-            filtered_schedules = []
-            for cs in class_schedules:
-                if cs.grade:
-                    if cs.grade.school_years.filter(id=student_school_year.id).exists():
-                        filtered_schedules.append(cs)
-                else:
-                    filtered_schedules.append(cs)
-            class_schedules = filtered_schedules
+            class_schedules = [
+                cs for cs in class_schedules if matches_school_year(cs, student_school_year)
+            ]
 
         # SchoolScheduleも取得
         school_schedules = SchoolSchedule.objects.filter(
@@ -224,13 +223,12 @@ class PublicTrialMonthlyAvailabilityView(APIView):
     birth_dateを指定すると、生徒の学年に応じたクラスのみカウント
     """
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
         ?school_id=xxx&brand_id=xxx&year=2025&month=12&birth_date=2014-05-15
         """
-        from apps.students.models import TrialBooking
-
         school_id = request.query_params.get('school_id')
         brand_id = request.query_params.get('brand_id')
         year = request.query_params.get('year')
@@ -246,6 +244,7 @@ class PublicTrialMonthlyAvailabilityView(APIView):
         try:
             year = int(year)
             month = int(month)
+            date(year, month, 1)
         except ValueError:
             return Response(
                 {'error': 'year and month must be integers'},
@@ -261,157 +260,6 @@ class PublicTrialMonthlyAvailabilityView(APIView):
             except ValueError:
                 pass
 
-        first_day = date(year, month, 1)
-        last_day = date(year, month, cal.monthrange(year, month)[1])
-
-        # スケジュールを取得
-        class_schedules = ClassSchedule.objects.filter(
-            school_id=school_id,
-            brand_id=brand_id,
-            is_active=True,
-            deleted_at__isnull=True
-        ).select_related('grade').prefetch_related('grade__school_years')
-
-        if class_schedules.exists():
-            # 生徒の学年でフィルター（対象学年のクラスのみ残席をカウント）
-            if student_school_year:
-                filtered_schedules = []
-                for cs in class_schedules:
-                    if cs.grade:
-                        # gradeに紐づくschool_yearsに生徒の学年が含まれるかチェック
-                        if cs.grade.school_years.filter(id=student_school_year.id).exists():
-                            filtered_schedules.append(cs)
-                    else:
-                        # gradeが未設定のクラスは含める
-                        filtered_schedules.append(cs)
-                class_schedules = filtered_schedules
-
-            schedules_by_day = {}
-            for sched in class_schedules:
-                if sched.day_of_week not in schedules_by_day:
-                    schedules_by_day[sched.day_of_week] = []
-                schedules_by_day[sched.day_of_week].append({
-                    'id': sched.id,
-                    'trial_capacity': sched.trial_capacity or 2,
-                })
-            use_class_schedule = True
-        else:
-            school_schedules = SchoolSchedule.objects.filter(
-                school_id=school_id,
-                brand_id=brand_id,
-                is_active=True,
-                deleted_at__isnull=True
-            ).select_related('time_slot')
-
-            schedules_by_day = {}
-            for sched in school_schedules:
-                if sched.day_of_week not in schedules_by_day:
-                    schedules_by_day[sched.day_of_week] = []
-                schedules_by_day[sched.day_of_week].append({
-                    'id': sched.id,
-                    'trial_capacity': sched.trial_capacity or 2,
-                })
-            use_class_schedule = False
-
-        # 休講日を取得
-        closures = LessonCalendar.objects.filter(
-            brand_id=brand_id,
-            school_id=school_id,
-            lesson_date__gte=first_day,
-            lesson_date__lte=last_day,
-            is_open=False
-        ).values_list('lesson_date', flat=True)
-        closure_dates = set(closures)
-
-        # 日本人講師のみの日を取得
-        japanese_only_entries = LessonCalendar.objects.filter(
-            brand_id=brand_id,
-            school_id=school_id,
-            lesson_date__gte=first_day,
-            lesson_date__lte=last_day,
-            lesson_type='B'
-        ).values_list('lesson_date', flat=True)
-        japanese_only_dates = set(japanese_only_entries)
-
-        if use_class_schedule:
-            calendar_patterns = set(cs.calendar_pattern for cs in class_schedules if cs.calendar_pattern)
-            if calendar_patterns:
-                pattern_entries = LessonCalendar.objects.filter(
-                    calendar_code__in=calendar_patterns,
-                    lesson_date__gte=first_day,
-                    lesson_date__lte=last_day,
-                    lesson_type='B'
-                ).values_list('lesson_date', flat=True)
-                japanese_only_dates.update(pattern_entries)
-
-        # 日付ごとの空き状況を計算
-        daily_availability = []
-        current_date = first_day
-        while current_date <= last_day:
-            day_of_week = current_date.isoweekday()
-
-            day_data = {
-                'date': current_date.isoformat(),
-                'dayOfWeek': day_of_week,
-                'isOpen': True,
-                'totalCapacity': 0,
-                'bookedCount': 0,
-                'availableCount': 0,
-                'isAvailable': False,
-            }
-
-            if current_date in closure_dates:
-                day_data['isOpen'] = False
-                day_data['reason'] = 'closed'
-                daily_availability.append(day_data)
-                next_day = current_date.day + 1
-                if next_day > cal.monthrange(year, month)[1]:
-                    break
-                current_date = date(year, month, next_day)
-                continue
-
-            if current_date in japanese_only_dates:
-                day_data['isOpen'] = False
-                day_data['reason'] = 'japanese_only'
-                daily_availability.append(day_data)
-                next_day = current_date.day + 1
-                if next_day > cal.monthrange(year, month)[1]:
-                    break
-                current_date = date(year, month, next_day)
-                continue
-
-            if day_of_week in schedules_by_day:
-                day_schedules = schedules_by_day[day_of_week]
-                total_capacity = 0
-                total_booked = 0
-
-                for sched_info in day_schedules:
-                    trial_cap = sched_info['trial_capacity']
-                    total_capacity += trial_cap
-                    if not use_class_schedule:
-                        booked = TrialBooking.get_booked_count(sched_info['id'], current_date)
-                        total_booked += booked
-
-                available = max(0, total_capacity - total_booked)
-                day_data['totalCapacity'] = total_capacity
-                day_data['bookedCount'] = total_booked
-                day_data['availableCount'] = available
-                day_data['isAvailable'] = available > 0 or total_capacity > 0
-            else:
-                day_data['isOpen'] = False
-                day_data['reason'] = 'no_schedule'
-
-            daily_availability.append(day_data)
-
-            next_day = current_date.day + 1
-            if next_day > cal.monthrange(year, month)[1]:
-                break
-            current_date = date(year, month, next_day)
-
-        return Response({
-            'year': year,
-            'month': month,
-            'schoolId': school_id,
-            'brandId': brand_id,
-            'days': daily_availability
-        })
+        return Response(get_monthly_availability(
+            school_id, brand_id, year, month, school_year=student_school_year
+        ))
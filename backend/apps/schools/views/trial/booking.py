@@ -124,7 +124,8 @@ class PublicTrialBookingView(APIView):
         calendar_entry = LessonCalendar.objects.filter(
             brand_id=brand_id,
             school_id=school_id,
-            lesson_date=trial_date
+            lesson_date=trial_date,
+            deleted_at__isnull=True
         ).first()
 
         if calendar_entry and not calendar_entry.is_open:
@@ -139,7 +140,8 @@ class PublicTrialBookingView(APIView):
         existing_filter = {
             'student_id': student_id,
             'trial_date': trial_date,
-            'status__in': [TrialBooking.Status.PENDING, TrialBooking.Status.CONFIRMED]
+            'status__in': [TrialBooking.Status.PENDING, TrialBooking.Status.CONFIRMED],
+            'deleted_at__isnull': True,
         }
         if schedule:
             existing_filter['schedule_id'] = schedule.id
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 
+from apps.core.throttling import PUBLIC_THROTTLES
 from ...models import ClassSchedule
 
 
@@ -17,6 +18,7 @@ class PublicClassScheduleView(APIView):
     クラス選択画面やクラス登録画面で使用
     """
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 
+from apps.core.throttling import PUBLIC_THROTTLES
 from ...models import School, ClassSchedule
 from apps.contracts.models import Ticket
 
@@ -17,6 +18,7 @@ class PublicSchoolsByTicketView(APIView):
     特定のチケットIDに対して、開講時間割が存在する校舎の一覧を返す
     """
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -78,6 +80,7 @@ class PublicTicketsBySchoolView(APIView):
     フロントエンドと一致させるため、ticket_idを「T」プレフィックス形式に正規化して返す
     """
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     @staticmethod
     def normalize_ticket_id(ticket_id: str) -> str:
@@ -8,6 +8,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 
+from apps.core.throttling import PUBLIC_THROTTLES
 from ...models import Brand, SchoolSchedule, ClassSchedule
 
 
@@ -19,6 +20,7 @@ class PublicTrialScheduleView(APIView):
     - 外国人講師チェック: LessonCalendarでlesson_type='B'（日本人のみ）の日は除外
     """
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
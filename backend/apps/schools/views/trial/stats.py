@@ -9,6 +9,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from django.db.models import Q
 
+from apps.core.throttling import PUBLIC_THROTTLES
 from ...models import Brand, BrandCategory, School, Grade
 
 
@@ -18,6 +19,7 @@ class PublicTrialStatsView(APIView):
     学年・ブランドカテゴリ・校舎ごとの体験予約人数を集計して返す
     """
     permission_classes = [AllowAny]
+    throttle_classes = PUBLIC_THROTTLES
 
     def get(self, request):
         """
@@ -31,8 +33,10 @@ class PublicTrialStatsView(APIView):
         year = request.query_params.get('year')
         month = request.query_params.get('month')
 
-        # 基本クエリ：キャンセル以外の体験予約
-        queryset = TrialBooking.objects.exclude(
+        # 基本クエリ：キャンセル・削除済み以外の体験予約
+        queryset = TrialBooking.objects.filter(
+            deleted_at__isnull=True
+        ).exclude(
             status=TrialBooking.Status.CANCELLED
         ).select_related('student', 'school', 'brand')
 
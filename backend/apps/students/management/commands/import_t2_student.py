@@ -11,6 +11,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction, models
 from apps.students.models import Student, Guardian
 from apps.schools.models import School, Brand
+from apps.tasks.outbox import task_events
 from apps.tenants.models import Tenant
 
 
@@ -21,8 +22,14 @@ class Command(BaseCommand):
         parser.add_argument('csv_file', type=str, help='CSVファイルのパス')
         parser.add_argument('--dry-run', action='store_true', help='実際には保存しない')
         parser.add_argument('--clear', action='store_true', help='既存データを削除してからインポート')
+        parser.add_argument('--skip-tasks', action='store_true', help='生徒登録などのタスクを自動作成しない')
 
     def handle(self, *args, **options):
+        # 取り込み中に発生するタスク作成イベントは終了時にまとめて送信（--skip-tasks なら作成しない）
+        with task_events(suppress=options['skip_tasks']):
+            self.run_import(*args, **options)
+
+    def run_import(self, *args, **options):
         csv_file = options['csv_file']
         dry_run = options['dry_run']
         clear = options.get('clear', False)
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:11
+
+from django.db import migrations, models
+
+from apps.core.utils import normalize_phone
+
+
+def backfill_normalized_phones(apps, schema_editor):
+    """既存保護者の正規化済み電話番号を設定"""
+    Guardian = apps.get_model("students", "Guardian")
+    batch = []
+    for guardian in Guardian.objects.exclude(phone="", phone_mobile="").only(
+        "id", "phone", "phone_mobile"
+    ).iterator(chunk_size=2000):
+        guardian.phone_normalized = normalize_phone(guardian.phone)
+        guardian.phone_mobile_normalized = normalize_phone(guardian.phone_mobile)
+        batch.append(guardian)
+        if len(batch) >= 2000:
+            Guardian.objects.bulk_update(batch, ["phone_normalized", "phone_mobile_normalized"])
+            batch = []
+    if batch:
+        Guardian.objects.bulk_update(batch, ["phone_normalized", "phone_mobile_normalized"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("students", "0027_add_class_schedule_to_trial_booking"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="guardian",
+            name="phone_mobile_normalized",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=20,
+                verbose_name="携帯電話（正規化）",
+            ),
+        ),
+        migrations.AddField(
+            model_name="guardian",
+            name="phone_normalized",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=20,
+                verbose_name="電話番号（正規化）",
+            ),
+        ),
+        migrations.RunPython(backfill_normalized_phones, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:24
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # 稼働中のテーブルへの書き込みを止めないよう CONCURRENTLY で作成する（トランザクション外で実行）
+    atomic = False
+
+    dependencies = [
+        ("students", "0028_normalized_contacts"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="trialbooking",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["schedule", "trial_date", "status"],
+                name="trial_sched_date_status_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="trialbooking",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["class_schedule", "trial_date", "status"],
+                name="trial_cls_date_status_idx",
+            ),
+        ),
+    ]
@@ -98,6 +98,19 @@ class TrialBooking(TenantModel):
         ordering = ['trial_date', 'created_at']
         # 同じ生徒が同じ日時に複数予約できないようにする
         unique_together = ['student', 'trial_date', 'schedule']
+        indexes = [
+            # 授業枠・日付ごとの体験予約数（空き状況）
+            models.Index(
+                fields=['schedule', 'trial_date', 'status'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='trial_sched_date_status_idx',
+            ),
+            models.Index(
+                fields=['class_schedule', 'trial_date', 'status'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='trial_cls_date_status_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.trial_date} {self.school.school_name}"
@@ -106,13 +119,10 @@ class TrialBooking(TenantModel):
     def get_booked_count(cls, schedule_id, trial_date):
         """指定スケジュール・日付の予約数を取得
         schedule_idはSchoolSchedule.idまたはClassSchedule.idのどちらでも対応
+        （予約の保存時に集計済みの ScheduleOccupancy を参照）
         """
-        from django.db.models import Q
-        return cls.objects.filter(
-            Q(schedule_id=schedule_id) | Q(class_schedule_id=schedule_id),
-            trial_date=trial_date,
-            status__in=[cls.Status.PENDING, cls.Status.CONFIRMED]
-        ).count()
+        from apps.schools.services.occupancy import ScheduleOccupancyService
+        return ScheduleOccupancyService.get_trial_count(schedule_id, trial_date)
 
     @classmethod
     def is_available(cls, schedule_id, trial_date, trial_capacity):
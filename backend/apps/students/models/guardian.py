@@ -4,6 +4,7 @@ Guardian Model - 保護者マスタ
 import uuid
 from django.db import models
 from apps.core.models import TenantModel
+from apps.core.utils import normalize_phone
 
 
 class Guardian(TenantModel):
@@ -40,6 +41,16 @@ class Guardian(TenantModel):
         # 紹介コードがなければ自動生成
         if not self.referral_code:
             self.referral_code = self.generate_referral_code()
+        # 検索用の正規化済み電話番号
+        self.phone_normalized = normalize_phone(self.phone)
+        self.phone_mobile_normalized = normalize_phone(self.phone_mobile)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            extra = [
+                target for source, target in (('phone', 'phone_normalized'), ('phone_mobile', 'phone_mobile_normalized'))
+                if source in update_fields
+            ]
+            kwargs['update_fields'] = [*update_fields, *extra]
         super().save(*args, **kwargs)
 
     # 基本情報
@@ -55,6 +66,11 @@ class Guardian(TenantModel):
     email = models.EmailField('メールアドレス', blank=True)
     phone = models.CharField('電話番号', max_length=20, blank=True)
     phone_mobile = models.CharField('携帯電話', max_length=20, blank=True)
+    # 検索用（数字のみ。save() で設定）
+    phone_normalized = models.CharField('電話番号（正規化）', max_length=20, blank=True, db_index=True, editable=False)
+    phone_mobile_normalized = models.CharField(
+        '携帯電話（正規化）', max_length=20, blank=True, db_index=True, editable=False
+    )
     line_id = models.CharField('LINE ID', max_length=50, blank=True)
 
     # 住所
@@ -233,11 +233,13 @@ class BankAccountChangeRequestViewSet(viewsets.ModelViewSet):
         instance.save()
 
         # 関連タスクを完了に
+        from apps.tasks.counters import schedule_rebuild as schedule_task_counter_rebuild
         from apps.tasks.models import Task
         Task.objects.filter(
             source_type='bank_account_request',
             source_id=instance.id
         ).update(status='completed', completed_at=timezone.now())
+        schedule_task_counter_rebuild(instance.tenant_id)
 
         return Response(BankAccountChangeRequestSerializer(instance).data)
 
@@ -258,10 +260,12 @@ class BankAccountChangeRequestViewSet(viewsets.ModelViewSet):
         instance.save()
 
         # 関連タスクを完了に
+        from apps.tasks.counters import schedule_rebuild as schedule_task_counter_rebuild
         from apps.tasks.models import Task
         Task.objects.filter(
             source_type='bank_account_request',
             source_id=instance.id
         ).update(status='completed', completed_at=timezone.now())
+        schedule_task_counter_rebuild(instance.tenant_id)
 
         return Response(BankAccountChangeRequestSerializer(instance).data)
@@ -9,6 +9,7 @@ from rest_framework.permissions import IsAuthenticated
 
 from apps.core.permissions import IsTenantUser
 from apps.core.exceptions import ValidationException
+from apps.tenants.services import TenantResolver
 from ..models import SuspensionRequest, WithdrawalRequest, StudentSchool, StudentEnrollment
 from ..serializers import (
     SuspensionRequestSerializer, SuspensionRequestCreateSerializer,
@@ -53,9 +54,7 @@ class SuspensionRequestViewSet(viewsets.ModelViewSet):
         return SuspensionRequestSerializer
 
     def perform_create(self, serializer):
-        tenant_id = getattr(self.request, 'tenant_id', None)
-        if not tenant_id and hasattr(self.request.user, 'guardian_profile') and self.request.user.guardian_profile:
-            tenant_id = self.request.user.guardian_profile.tenant_id
+        tenant_id = TenantResolver.resolve_id(self.request)
 
         # 生徒情報から自動的にブランド・校舎を設定
         student = serializer.validated_data.get('student')
@@ -182,9 +181,7 @@ class WithdrawalRequestViewSet(viewsets.ModelViewSet):
         return WithdrawalRequestSerializer
 
     def perform_create(self, serializer):
-        tenant_id = getattr(self.request, 'tenant_id', None)
-        if not tenant_id and hasattr(self.request.user, 'guardian_profile') and self.request.user.guardian_profile:
-            tenant_id = self.request.user.guardian_profile.tenant_id
+        tenant_id = TenantResolver.resolve_id(self.request)
 
         # 生徒情報から自動的にブランド・校舎を設定
         student = serializer.validated_data.get('student')
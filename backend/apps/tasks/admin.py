@@ -167,20 +167,30 @@ class TaskAdmin(CSVImportExportMixin, admin.ModelAdmin):
 
     actions = ['mark_in_progress', 'mark_completed', 'mark_cancelled']
 
+    def _update_tasks(self, queryset, **fields):
+        """一括更新（シグナルを通らないため、対象テナントの件数集計をコミット後に作り直す）"""
+        from apps.tasks import counters as task_counters
+        tenant_ids = set(queryset.order_by().values_list('tenant_id', flat=True).distinct())
+        updated = queryset.update(**fields)
+        for tenant_id in tenant_ids:
+            if tenant_id:
+                task_counters.schedule_rebuild(tenant_id)
+        return updated
+
     @admin.action(description='選択した作業を「対応中」にする')
     def mark_in_progress(self, request, queryset):
-        updated = queryset.update(status='in_progress')
+        updated = self._update_tasks(queryset, status='in_progress')
         self.message_user(request, f'{updated}件の作業を「対応中」に変更しました。')
 
     @admin.action(description='選択した作業を「完了」にする')
     def mark_completed(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(status='completed', completed_at=timezone.now())
+        updated = self._update_tasks(queryset, status='completed', completed_at=timezone.now())
         self.message_user(request, f'{updated}件の作業を「完了」に変更しました。')
 
     @admin.action(description='選択した作業を「キャンセル」にする')
     def mark_cancelled(self, request, queryset):
-        updated = queryset.update(status='cancelled')
+        updated = self._update_tasks(queryset, status='cancelled')
         self.message_user(request, f'{updated}件の作業を「キャンセル」に変更しました。')
 
 
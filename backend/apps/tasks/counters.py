@@ -0,0 +1,177 @@
+"""
+Task Counters - 未完了タスクの件数集計（TaskCounter）の更新と読み取り
+
+- Task の保存・削除時にシグナルで該当する集計行を ±1 する（読み込み時の値を post_init で覚えておく）
+- bulk_create / queryset.update() はシグナルを通らないため、呼び出し側で
+  record_created() / schedule_rebuild() を呼ぶ
+- summarize() はテナントの集計行を1回読むだけで、受信箱のバッジ件数と校舎・担当者別の負荷を返す
+"""
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# 集計対象（未完了）のステータス
+OPEN_STATUSES = ('new', 'in_progress', 'waiting')
+
+
+def counter_key(task) -> Optional[tuple]:
+    """集計行のキー（tenant_id, assigned_to_id, school_id, status, due_date）。集計対象外は None"""
+    if task.deleted_at is not None or task.status not in OPEN_STATUSES or not task.tenant_id:
+        return None
+    return (str(task.tenant_id), task.assigned_to_id, task.school_id, task.status, task.due_date)
+
+
+def _bucket_key(assigned_to_id, school_id, status, due_date) -> str:
+    return '|'.join([
+        str(assigned_to_id or '-'),
+        str(school_id or '-'),
+        status,
+        due_date.isoformat() if due_date else '-',
+    ])
+
+
+def apply(deltas: Dict[tuple, int]):
+    """集計行を増減する（行がなければ作成）"""
+    from .models import TaskCounter
+
+    for key, delta in deltas.items():
+        if key is None or not delta:
+            continue
+        tenant_id, assigned_to_id, school_id, status, due_date = key
+        bucket_key = _bucket_key(assigned_to_id, school_id, status, due_date)
+        rows = TaskCounter.objects.filter(tenant_id=tenant_id, bucket_key=bucket_key)
+        if rows.update(count=F('count') + delta):
+            continue
+        if delta < 0:
+            # 集計行がない（集計の作り直し前のタスク等）。次回の作り直しで整合する
+            continue
+        try:
+            with transaction.atomic():
+                TaskCounter.objects.create(
+                    tenant_id=tenant_id,
+                    bucket_key=bucket_key,
+                    assigned_to_id=assigned_to_id,
+                    school_id=school_id,
+                    status=status,
+                    due_date=due_date,
+                    count=delta,
+                )
+        except IntegrityError:
+            # 同時に作成された場合は加算し直す
+            rows.update(count=F('count') + delta)
+
+
+def record_created(tasks: Iterable):
+    """bulk_create したタスクを集計に反映"""
+    apply(Counter(counter_key(task) for task in tasks))
+
+
+def rebuild(tenant_id=None) -> int:
+    """
+    集計を Task から作り直す（整合性の回復用）
+
+    Returns:
+        作成した集計行数
+    """
+    from .models import Task, TaskCounter
+
+    tasks = Task.objects.filter(deleted_at__isnull=True, status__in=OPEN_STATUSES)
+    counters = TaskCounter.objects.all()
+    if tenant_id:
+        tasks = tasks.filter(tenant_id=tenant_id)
+        counters = counters.filter(tenant_id=tenant_id)
+
+    rows = [
+        TaskCounter(
+            tenant_id=row['tenant_id'],
+            bucket_key=_bucket_key(row['assigned_to_id'], row['school_id'], row['status'], row['due_date']),
+            assigned_to_id=row['assigned_to_id'],
+            school_id=row['school_id'],
+            status=row['status'],
+            due_date=row['due_date'],
+            count=row['count'],
+        )
+        for row in tasks.values(
+            'tenant_id', 'assigned_to_id', 'school_id', 'status', 'due_date'
+        ).annotate(count=Count('id')).order_by()
+    ]
+    with transaction.atomic():
+        counters.delete()
+        TaskCounter.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def schedule_rebuild(tenant_id):
+    """コミット後にテナントの集計を作り直す（queryset.update() でタスクを更新した場合）"""
+    transaction.on_commit(lambda: rebuild(tenant_id))
+
+
+def summarize(tenant_id, user_id=None, today=None) -> Dict:
+    """
+    受信箱のバッジ件数と校舎・担当者別の負荷
+
+    Returns:
+        {
+            'open', 'today', 'overdue', 'unassigned', 'by_status',
+            'mine': {'open', 'today', 'overdue', 'by_status'},
+            'by_school': [{'school_id', 'school_name', 'open', 'today', 'overdue'}, ...],
+            'by_assignee': [{'assignee_id', 'open', 'today', 'overdue'}, ...],
+        }
+    """
+    from .models import TaskCounter
+
+    today = today or timezone.localdate()
+    user_id = str(user_id) if user_id else None
+
+    def bucket():
+        return {'open': 0, 'today': 0, 'overdue': 0, 'by_status': {s: 0 for s in OPEN_STATUSES}}
+
+    def add(target, status, due_date, count):
+        target['open'] += count
+        target['by_status'][status] += count
+        if due_date is not None:
+            if due_date == today:
+                target['today'] += count
+            elif due_date < today:
+                target['overdue'] += count
+
+    totals, mine = bucket(), bucket()
+    unassigned = 0
+    schools, school_names, assignees = {}, {}, {}
+
+    rows = TaskCounter.objects.filter(tenant_id=tenant_id, count__gt=0).values_list(
+        'assigned_to_id', 'school_id', 'school__school_name', 'status', 'due_date', 'count'
+    )
+    for assigned_to_id, school_id, school_name, status, due_date, count in rows:
+        if status not in OPEN_STATUSES:
+            continue
+        add(totals, status, due_date, count)
+        if assigned_to_id is None:
+            unassigned += count
+        else:
+            add(assignees.setdefault(str(assigned_to_id), bucket()), status, due_date, count)
+            if str(assigned_to_id) == user_id:
+                add(mine, status, due_date, count)
+        if school_id is not None:
+            add(schools.setdefault(str(school_id), bucket()), status, due_date, count)
+            school_names[str(school_id)] = school_name
+
+    return {
+        **totals,
+        'unassigned': unassigned,
+        'mine': mine,
+        'by_school': sorted(
+            [{'school_id': sid, 'school_name': school_names[sid], **values} for sid, values in schools.items()],
+            key=lambda row: (-row['open'], row['school_name'] or ''),
+        ),
+        'by_assignee': sorted(
+            [{'assignee_id': aid, **values} for aid, values in assignees.items()],
+            key=lambda row: -row['open'],
+        ),
+    }
@@ -0,0 +1,24 @@
+"""
+未完了タスクの件数集計（TaskCounter）を作り直す
+
+定期ジョブ（reconcile_task_counters_task）と同じ処理を実行する。
+導入時の初回集計や、queryset.update() 等でタスクを直接更新した後に実行する。
+"""
+from django.core.management.base import BaseCommand
+
+from apps.tasks.counters import rebuild
+
+
+class Command(BaseCommand):
+    help = '未完了タスクの件数集計を作り直す'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant-id',
+            type=str,
+            help='対象のテナントID（省略時は全テナント）'
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild(tenant_id=options.get('tenant_id'))
+        self.stdout.write(self.style.SUCCESS(f'{count}件の集計行を作成しました'))
@@ -0,0 +1,102 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("schools", "0026_add_google_calendar_sync"),
+        ("tenants", "0011_add_approval_status_to_employee"),
+        ("tasks", "0004_alter_task_tenant_id_alter_task_tenant_ref_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounter",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+                ("tenant_id", models.UUIDField(db_index=True, verbose_name="会社ID")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="削除日時"
+                    ),
+                ),
+                (
+                    "bucket_key",
+                    models.CharField(max_length=150, verbose_name="集計キー"),
+                ),
+                (
+                    "assigned_to_id",
+                    models.UUIDField(blank=True, null=True, verbose_name="担当者ID"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("new", "新規"),
+                            ("in_progress", "対応中"),
+                            ("waiting", "保留"),
+                            ("completed", "完了"),
+                            ("cancelled", "キャンセル"),
+                        ],
+                        max_length=20,
+                        verbose_name="ステータス",
+                    ),
+                ),
+                (
+                    "due_date",
+                    models.DateField(blank=True, null=True, verbose_name="期限日"),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="件数")),
+                (
+                    "school",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_counters",
+                        to="schools.school",
+                        verbose_name="校舎",
+                    ),
+                ),
+                (
+                    "tenant_ref",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="%(app_label)s_%(class)s_set",
+                        to="tenants.tenant",
+                        verbose_name="会社",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "作業件数集計",
+                "verbose_name_plural": "作業件数集計",
+                "db_table": "task_counters",
+                "unique_together": {("tenant_id", "bucket_key")},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_add_task_counter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="dedupe_key",
+            field=models.CharField(
+                blank=True, max_length=255, null=True, verbose_name="重複防止キー"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="task",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("dedupe_key__startswith", "source:"),
+                    ("status__in", ("new", "in_progress", "waiting")),
+                    _connector="OR",
+                ),
+                fields=("dedupe_key",),
+                name="tasks_dedupe_key_uniq",
+            ),
+        ),
+    ]
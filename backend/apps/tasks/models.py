@@ -2,6 +2,9 @@
 from django.db import models
 from apps.core.models import TenantModel
 
+# 未完了とみなすタスクのステータス
+OPEN_STATUSES = ('new', 'in_progress', 'waiting')
+
 
 class TaskCategory(TenantModel):
     """作業カテゴリ"""
@@ -117,12 +120,21 @@ class Task(TenantModel):
 
     # 追加情報
     metadata = models.JSONField('メタデータ', default=dict, blank=True)
+    # 自動作成時の重複防止キー（outbox で設定。open_ で始まるキーは未完了の間のみ一意）
+    dedupe_key = models.CharField('重複防止キー', max_length=255, null=True, blank=True)
 
     class Meta:
         db_table = 'tasks'
         verbose_name = '作業'
         verbose_name_plural = '作業一覧'
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(dedupe_key__startswith='source:') | models.Q(status__in=OPEN_STATUSES),
+                name='tasks_dedupe_key_uniq',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -145,3 +157,29 @@ class TaskComment(TenantModel):
 
     def __str__(self):
         return f'{self.task.title} - {self.created_at}'
+
+
+class TaskCounter(TenantModel):
+    """未完了タスクの件数集計（テナント × 担当者 × 校舎 × ステータス × 期限日）
+
+    受信箱のバッジ件数・校舎別の負荷を1回の読み取りで返すための集計テーブル。
+    Task の保存・削除時にシグナルで増減し、reconcile_task_counters で作り直す。
+    期限日そのものを区分に持ち、期限切れ・今日・今後・期限なしは読み取り時に判定する
+    （日付が変わっても行を付け替える必要がない）。
+    """
+    # 担当者・校舎・期限日が空の行を一意にするためのキー（NULL は一意制約で区別されないため）
+    bucket_key = models.CharField('集計キー', max_length=150)
+    assigned_to_id = models.UUIDField('担当者ID', null=True, blank=True)
+    school = models.ForeignKey(
+        'schools.School', on_delete=models.CASCADE, null=True, blank=True,
+        verbose_name='校舎', related_name='task_counters'
+    )
+    status = models.CharField('ステータス', max_length=20, choices=Task.STATUS_CHOICES)
+    due_date = models.DateField('期限日', null=True, blank=True)
+    count = models.IntegerField('件数', default=0)
+
+    class Meta:
+        db_table = 'task_counters'
+        verbose_name = '作業件数集計'
+        verbose_name_plural = '作業件数集計'
+        unique_together = [['tenant_id', 'bucket_key']]
@@ -0,0 +1,339 @@
+"""
+Task Event Outbox - タスク自動作成イベントの遅延・一括処理
+
+シグナルハンドラはタスクを直接作成せず、軽量なイベント（JSON化できる dict）を
+emit() でトランザクション（セーブポイント）単位のバッファに積むだけにする。
+- コミット後にバッファをまとめて Celery（process_task_events_task）へ渡す。
+  ロールバックされたトランザクション・セーブポイントのイベントは破棄される
+- Celery 側で重複（未完了の同種タスク・同じ参照元のタスク）を除外し、bulk_create で作成する。
+  並行して処理された場合の重複は Task.dedupe_key の一意制約で除外する（ignore_conflicts）
+- 一括インポートでは task_events() で囲むと、終了時に1回だけ送信する（suppress=True なら作成しない）
+
+    with task_events():
+        ...  # この間に発生したイベントはまとめて送信
+"""
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .counters import record_created
+
+logger = logging.getLogger(__name__)
+
+# 1回の Celery タスクで処理するイベント数
+DISPATCH_CHUNK_SIZE = 500
+
+# 未完了とみなすタスクのステータス
+OPEN_STATUSES = ('new', 'in_progress', 'waiting')
+
+_state = threading.local()
+
+
+class _TransactionBuffer:
+    """1セーブポイント分のイベント（コミット時に flush される）"""
+
+    def __init__(self, key):
+        self.key = key
+        self.events: List[Dict] = []
+
+    def flush(self):
+        buffers = getattr(_state, 'buffers', {})
+        if buffers.get(self.key) is self:
+            del buffers[self.key]
+        _deliver(self.events)
+
+
+def _is_registered(connection, callback) -> bool:
+    """コミット時のコールバックとして登録済みか（ロールバックで破棄されていないか）
+
+    Django はロールバック時に run_on_commit から該当するコールバックを取り除くため、
+    残っていなければ前のバッファは破棄されたものとして新しいバッファを作る。
+    """
+    return any(entry[1] == callback for entry in connection.run_on_commit)
+
+
+def _buffer(connection) -> _TransactionBuffer:
+    """
+    現在のセーブポイントのバッファ
+
+    バッファの flush は emit した時点のセーブポイントで on_commit に登録するため、
+    セーブポイントがロールバックされると Django がそのバッファごと破棄する。
+    """
+    key = tuple(connection.savepoint_ids)
+    buffers = getattr(_state, 'buffers', None)
+    if buffers is None:
+        buffers = _state.buffers = {}
+    buffer = buffers.get(key)
+    if buffer is not None and _is_registered(connection, buffer.flush):
+        return buffer
+
+    # ロールバックで破棄されたバッファを取り除く
+    for stale_key in [k for k, b in buffers.items() if not _is_registered(connection, b.flush)]:
+        del buffers[stale_key]
+    buffer = buffers[key] = _TransactionBuffer(key)
+    transaction.on_commit(buffer.flush)
+    return buffer
+
+
+def emit(task_type: str, tenant_id, title: str, **fields):
+    """
+    タスク作成イベントを積む
+
+    Args:
+        task_type: タスク種別
+        tenant_id: テナントID
+        title: タイトル（{student_name} / {guardian_name} は作成時に生徒・保護者名で置換）
+        **fields: description, priority, school_id, brand_id, student_id, guardian_id,
+                  source_type, source_id, metadata, dedupe, brand_hint, inherit_from_student
+    """
+    if getattr(_state, 'suppressed', 0):
+        return
+
+    event = {
+        'task_type': task_type,
+        'tenant_id': str(tenant_id) if tenant_id else None,
+        'title': title,
+    }
+    for key, value in fields.items():
+        event[key] = str(value) if key.endswith('_id') and value is not None else value
+
+    connection = connections[DEFAULT_DB_ALIAS]
+    if not connection.in_atomic_block:
+        _deliver([event])
+        return
+
+    _buffer(connection).events.append(event)
+
+
+def _deliver(events: List[Dict]):
+    """コミット済みのイベントを送信（task_events() の中ではまとめて送信するため保留）"""
+    if not events:
+        return
+    batch = getattr(_state, 'batch', None)
+    if batch is not None:
+        batch.extend(events)
+        return
+    dispatch(events)
+
+
+def dispatch(events: List[Dict]):
+    """イベントを Celery へ送信（ブローカーに接続できない場合はその場で処理）"""
+    from apps.tasks.tasks import process_task_events_task
+
+    for offset in range(0, len(events), DISPATCH_CHUNK_SIZE):
+        chunk = events[offset:offset + DISPATCH_CHUNK_SIZE]
+        try:
+            process_task_events_task.delay(chunk)
+        except Exception as e:
+            logger.warning(f"Failed to enqueue task events, processing synchronously: {e}")
+            process_task_events(chunk)
+
+
+@contextmanager
+def task_events(suppress: bool = False):
+    """
+    一括処理中のタスク作成イベントをまとめる
+
+    Args:
+        suppress: True の場合はイベントを破棄（タスクを作成しない）
+    """
+    if suppress:
+        _state.suppressed = getattr(_state, 'suppressed', 0) + 1
+        try:
+            yield
+        finally:
+            _state.suppressed -= 1
+        return
+
+    outer = getattr(_state, 'batch', None)
+    _state.batch = [] if outer is None else outer
+    try:
+        yield
+    finally:
+        if outer is None:
+            events, _state.batch = _state.batch, None
+            _deliver(events)
+
+
+# =============================================================================
+# 処理（Celery 側）
+# =============================================================================
+def _open_source_keys(events) -> set:
+    """同じ参照元で未完了の同種タスクがあるもの（チャット等）"""
+    from .models import Task
+
+    source_ids = {e['source_id'] for e in events if e.get('source_id')}
+    if not source_ids:
+        return set()
+    return set(Task.objects.filter(
+        source_id__in=source_ids, status__in=OPEN_STATUSES,
+    ).values_list('task_type', 'source_type', 'source_id').iterator())
+
+
+def _created_source_keys(events) -> set:
+    """既に作成済みのタスク（同じ種別・参照元。再送時の二重作成防止）"""
+    from .models import Task
+
+    source_ids = {e['source_id'] for e in events if e.get('source_id')}
+    if not source_ids:
+        return set()
+    return set(Task.objects.filter(
+        source_id__in=source_ids,
+    ).values_list('task_type', 'source_type', 'source_id').iterator())
+
+
+def _open_student_daily_keys(events) -> set:
+    """同じ生徒・同じ日の未完了の同種タスクがあるもの（複数商品契約の入会等）"""
+    from .models import Task
+
+    student_ids = {e['student_id'] for e in events if e.get('student_id')}
+    if not student_ids:
+        return set()
+    rows = Task.objects.filter(
+        student_id__in=student_ids, status__in=OPEN_STATUSES,
+    ).values_list('task_type', 'student_id', 'created_at').iterator()
+    return {
+        (task_type, str(student_id), timezone.localtime(created_at).date().isoformat())
+        for task_type, student_id, created_at in rows
+    }
+
+
+def _unique_key(event) -> Optional[str]:
+    """Task.dedupe_key（一意制約で並行処理時の重複を防ぐ）"""
+    dedupe = event.get('dedupe')
+    if dedupe == 'open_source':
+        return f"open_source:{event['task_type']}:{event.get('source_type', '')}:{event.get('source_id')}"
+    if dedupe == 'open_student_daily':
+        return f"open_student_daily:{event['task_type']}:{event.get('student_id')}:{event.get('event_date')}"
+    if event.get('source_id'):
+        return f"source:{event['task_type']}:{event.get('source_type', '')}:{event['source_id']}"
+    return None
+
+
+def _dedupe_key(event) -> Optional[tuple]:
+    dedupe = event.get('dedupe')
+    if dedupe == 'open_source':
+        return ('open_source', event['task_type'], event.get('source_type', ''), event.get('source_id'))
+    if dedupe == 'open_student_daily':
+        return ('open_student_daily', event['task_type'], event.get('student_id'), event.get('event_date'))
+    return None
+
+
+def process_task_events(events: List[Dict]) -> int:
+    """
+    イベントからタスクを一括作成
+
+    Returns:
+        作成したタスク数
+    """
+    from apps.schools.models import Brand
+    from apps.students.models import Guardian, Student
+    from .models import Task
+
+    by_dedupe = defaultdict(list)
+    for event in events:
+        by_dedupe[event.get('dedupe')].append(event)
+
+    created = {(t, st, str(sid)) for t, st, sid in _created_source_keys(
+        [e for e in events if e.get('dedupe') != 'open_source']
+    )}
+    open_source = {(t, st, str(sid)) for t, st, sid in _open_source_keys(by_dedupe['open_source'])}
+    open_daily = _open_student_daily_keys(by_dedupe['open_student_daily'])
+
+    # バッチ内の重複と既存タスクとの重複を除外
+    seen = set()
+    pending = []
+    for event in events:
+        dedupe_key = _dedupe_key(event)
+        # 参照元ごとに1件のタスク（チャットは完了後の新しいメッセージで再作成するため除く）
+        source_key = (event['task_type'], event.get('source_type', ''), event.get('source_id'))
+        if event.get('dedupe') != 'open_source' and event.get('source_id') and source_key in created:
+            continue
+        if dedupe_key:
+            if dedupe_key in seen:
+                continue
+            if dedupe_key[0] == 'open_source' and dedupe_key[1:] in open_source:
+                continue
+            if dedupe_key[0] == 'open_student_daily' and dedupe_key[1:] in open_daily:
+                continue
+            seen.add(dedupe_key)
+        pending.append(event)
+
+    if not pending:
+        return 0
+
+    # 名前・所属の解決（生徒・保護者・ブランドはまとめて取得）
+    student_ids = {e['student_id'] for e in pending if e.get('student_id')}
+    students = {
+        str(s['id']): s for s in Student.objects.filter(id__in=student_ids).values(
+            'id', 'last_name', 'first_name', 'guardian_id', 'primary_school_id', 'primary_brand_id',
+        )
+    } if student_ids else {}
+    guardian_ids = {e['guardian_id'] for e in pending if e.get('guardian_id')}
+    guardians = {
+        str(g['id']): g for g in Guardian.objects.filter(id__in=guardian_ids).values('id', 'last_name', 'first_name')
+    } if guardian_ids else {}
+
+    tasks = []
+    for event in pending:
+        student = students.get(event.get('student_id') or '')
+        guardian_id = event.get('guardian_id')
+        school_id = event.get('school_id')
+        brand_id = event.get('brand_id')
+        if student and event.get('inherit_from_student'):
+            guardian_id = guardian_id or student['guardian_id']
+            school_id = school_id or student['primary_school_id']
+            brand_id = brand_id or student['primary_brand_id']
+        if not brand_id and event.get('brand_hint'):
+            brand_id = _resolve_brand_hint(Brand, event['tenant_id'], event['brand_hint'])
+
+        guardian = guardians.get(str(guardian_id) if guardian_id else '')
+        title = event['title'].replace(
+            '{student_name}', f"{student['last_name']}{student['first_name']}" if student else '不明'
+        ).replace(
+            '{guardian_name}', f"{guardian['last_name']}{guardian['first_name']}" if guardian else '不明'
+        )
+        tasks.append(Task(
+            tenant_id=event['tenant_id'],
+            task_type=event['task_type'],
+            title=title,
+            description=event.get('description', ''),
+            status='new',
+            priority=event.get('priority', 'normal'),
+            school_id=school_id,
+            brand_id=brand_id,
+            student_id=event.get('student_id'),
+            guardian_id=guardian_id,
+            source_type=event.get('source_type', ''),
+            source_id=event.get('source_id'),
+            metadata=event.get('metadata') or {},
+            dedupe_key=_unique_key(event),
+        ))
+
+    with transaction.atomic():
+        # 並行して同じイベントを処理した場合は一意制約に当たった行を作成しない
+        Task.objects.bulk_create(tasks, batch_size=500, ignore_conflicts=True)
+        inserted = set(Task.objects.filter(id__in=[t.id for t in tasks]).values_list('id', flat=True))
+        tasks = [t for t in tasks if t.id in inserted]
+        # bulk_create はシグナルを通らないため、件数集計へ明示的に反映
+        record_created(tasks)
+    return len(tasks)
+
+
+def _resolve_brand_hint(Brand, tenant_id, hint):
+    """保護者の興味のあるブランド（ブランドID または ブランド名）"""
+    import uuid
+
+    try:
+        brand_uuid = uuid.UUID(str(hint))
+        return Brand.objects.filter(id=brand_uuid).values_list('id', flat=True).first()
+    except (ValueError, TypeError):
+        return Brand.objects.filter(
+            brand_name__icontains=hint,
+            tenant_ref=tenant_id
+        ).values_list('id', flat=True).first()
@@ -1,11 +1,21 @@
 """
 Task auto-creation signals
 各イベント発生時にタスクを自動作成する
+
+受信側ではタスクを直接作成せず、outbox.emit() でイベントを積む。
+タスクはコミット後に Celery でまとめて作成される（重複判定もそちらで行う）。
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
+from . import counters
 from .models import Task
+from .outbox import emit
+
+# 件数集計のキーに使うフィールド（読み込み時に遅延されていれば変更前の値が分からない）
+_COUNTER_FIELDS = {'tenant_id', 'assigned_to_id', 'school_id', 'status', 'due_date', 'deleted_at'}
+_UNKNOWN = object()
 
 
 def create_task_for_event(
@@ -40,6 +50,43 @@ def create_task_for_event(
     )
 
 
+# =============================================================================
+# 未完了タスクの件数集計（TaskCounter）
+# =============================================================================
+@receiver(post_init, sender=Task)
+def remember_task_counter_key(sender, instance, **kwargs):
+    """読み込み時の集計キーを覚えておく（保存時の増減に使う）"""
+    if _COUNTER_FIELDS & instance.get_deferred_fields():
+        instance._counter_key = _UNKNOWN
+    else:
+        instance._counter_key = counters.counter_key(instance)
+
+
+@receiver(post_save, sender=Task)
+def update_task_counters_on_save(sender, instance, created, **kwargs):
+    """担当者・校舎・ステータス・期限日の変更を集計に反映"""
+    new_key = counters.counter_key(instance)
+    old_key = None if created else instance._counter_key
+    if old_key is _UNKNOWN:
+        counters.schedule_rebuild(instance.tenant_id)
+    elif old_key != new_key:
+        deltas = {new_key: 1}
+        if old_key is not None:
+            deltas[old_key] = deltas.get(old_key, 0) - 1
+        counters.apply(deltas)
+    instance._counter_key = new_key
+
+
+@receiver(post_delete, sender=Task)
+def update_task_counters_on_delete(sender, instance, **kwargs):
+    """物理削除されたタスクを集計から除く"""
+    old_key = instance._counter_key
+    if old_key is _UNKNOWN:
+        counters.schedule_rebuild(instance.tenant_id)
+    elif old_key is not None:
+        counters.apply({old_key: -1})
+
+
 # =============================================================================
 # 生徒登録時のタスク作成
 # =============================================================================
@@ -47,15 +94,15 @@ def create_task_for_event(
 def create_task_on_student_registration(sender, instance, created, **kwargs):
     """生徒が新規登録されたらタスクを作成"""
     if created:
-        create_task_for_event(
+        emit(
+            'student_registration',
             tenant_id=instance.tenant_id,
-            task_type='student_registration',
             title=f'生徒登録: {instance.last_name}{instance.first_name}',
-            description=f'新しい生徒が登録されました',
-            student=instance,
-            guardian=instance.guardian if hasattr(instance, 'guardian') else None,
-            school=instance.primary_school,
-            brand=instance.primary_brand,
+            description='新しい生徒が登録されました',
+            student_id=instance.id,
+            guardian_id=getattr(instance, 'guardian_id', None),
+            school_id=instance.primary_school_id,
+            brand_id=instance.primary_brand_id,
             source_type='student',
             source_id=instance.id,
         )
@@ -68,32 +115,16 @@ def create_task_on_student_registration(sender, instance, created, **kwargs):
 def create_task_on_guardian_registration(sender, instance, created, **kwargs):
     """保護者が新規登録されたらタスクを作成"""
     if created:
-        # 興味のあるブランドから最初のブランドを取得
-        brand = None
+        # 興味のあるブランドの最初の1件（ID または 名前）は作成時に解決
         interested_brands = getattr(instance, 'interested_brands', None) or []
-        if interested_brands:
-            from apps.schools.models import Brand
-            import uuid as uuid_module
-            first_brand = interested_brands[0]
-            try:
-                # UUIDの場合
-                brand_uuid = uuid_module.UUID(first_brand)
-                brand = Brand.objects.filter(id=brand_uuid).first()
-            except (ValueError, TypeError):
-                # 名前の場合
-                brand = Brand.objects.filter(
-                    brand_name__icontains=first_brand,
-                    tenant_ref=instance.tenant_id
-                ).first()
-
-        create_task_for_event(
+        emit(
+            'guardian_registration',
             tenant_id=instance.tenant_id,
-            task_type='guardian_registration',
             title=f'保護者登録: {instance.last_name}{instance.first_name}',
-            description=f'新しい保護者が登録されました',
-            guardian=instance,
-            school=getattr(instance, 'nearest_school', None),
-            brand=brand,
+            description='新しい保護者が登録されました',
+            guardian_id=instance.id,
+            school_id=getattr(instance, 'nearest_school_id', None),
+            brand_hint=str(interested_brands[0]) if interested_brands else None,
             source_type='guardian',
             source_id=instance.id,
         )
@@ -112,32 +143,20 @@ def create_task_on_chat_message(sender, instance, created, **kwargs):
     if getattr(instance, 'sender_type', '') != 'guardian':
         return
 
-    # 同じチャンネルで未完了のチャットタスクがあれば作成しない
-    channel = getattr(instance, 'channel', None)
-    if channel:
-        existing = Task.objects.filter(
-            source_type='channel',
-            source_id=channel.id,
-            task_type='chat',
-            status__in=['new', 'in_progress', 'waiting']
-        ).exists()
-        if existing:
-            return
-
-    # チャンネルから保護者情報を取得
-    guardian = None
     tenant_id = getattr(instance, 'tenant_id', None)
-    if not tenant_id and channel:
-        tenant_id = getattr(channel, 'tenant_id', None)
+    channel_id = getattr(instance, 'channel_id', None)
+    if not tenant_id and channel_id:
+        tenant_id = instance.channel.tenant_id
 
-    create_task_for_event(
+    # 同じチャンネルで未完了のチャットタスクがあれば作成しない（作成時に判定）
+    emit(
+        'chat',
         tenant_id=tenant_id,
-        task_type='chat',
-        title=f'チャット対応',
-        description=f'新しいチャットメッセージが届きました',
-        guardian=guardian,
+        title='チャット対応',
+        description='新しいチャットメッセージが届きました',
         source_type='channel',
-        source_id=channel.id if channel else None,
+        source_id=channel_id,
+        dedupe='open_source' if channel_id else None,
     )
 
 
@@ -150,9 +169,6 @@ def create_task_on_suspension_request(sender, instance, created, **kwargs):
     if not created:
         return
 
-    student = getattr(instance, 'student', None)
-    student_name = f'{student.last_name}{student.first_name}' if student else '不明'
-
     # 休会期間の説明を作成
     suspend_from = instance.suspend_from.strftime('%Y/%m/%d') if instance.suspend_from else '未定'
     suspend_until = instance.suspend_until.strftime('%Y/%m/%d') if instance.suspend_until else '未定'
@@ -162,16 +178,14 @@ def create_task_on_suspension_request(sender, instance, created, **kwargs):
     if return_day:
         description += f'（復会予定日: {return_day}）'
 
-    create_task_for_event(
+    emit(
+        'suspension',
         tenant_id=instance.tenant_id,
-        task_type='suspension',
-        title=f'休会申請: {student_name}',
+        title='休会申請: {student_name}',
         description=description,
         priority='high',
-        student=student,
-        guardian=getattr(instance, 'guardian', None),
-        school=getattr(student, 'primary_school', None) if student else None,
-        brand=getattr(student, 'primary_brand', None) if student else None,
+        student_id=instance.student_id,
+        inherit_from_student=True,
         source_type='suspension_request',
         source_id=instance.id,
         metadata={
@@ -192,19 +206,14 @@ def create_task_on_withdrawal_request(sender, instance, created, **kwargs):
     if not created:
         return
 
-    student = getattr(instance, 'student', None)
-    student_name = f'{student.last_name}{student.first_name}' if student else '不明'
-
-    create_task_for_event(
+    emit(
+        'withdrawal',
         tenant_id=instance.tenant_id,
-        task_type='withdrawal',
-        title=f'退会申請: {student_name}',
-        description=f'退会申請が提出されました',
+        title='退会申請: {student_name}',
+        description='退会申請が提出されました',
         priority='high',
-        student=student,
-        guardian=getattr(instance, 'guardian', None),
-        school=getattr(student, 'primary_school', None) if student else None,
-        brand=getattr(student, 'primary_brand', None) if student else None,
+        student_id=instance.student_id,
+        inherit_from_student=True,
         source_type='withdrawal_request',
         source_id=instance.id,
     )
@@ -219,18 +228,15 @@ def create_task_on_trial_registration(sender, instance, created, **kwargs):
     if not created:
         return
 
-    student = getattr(instance, 'student', None)
-    student_name = f'{student.last_name}{student.first_name}' if student else '不明'
-
-    create_task_for_event(
+    emit(
+        'trial_registration',
         tenant_id=instance.tenant_id,
-        task_type='trial_registration',
-        title=f'体験登録: {student_name}',
-        description=f'体験授業が登録されました',
-        student=student,
-        guardian=getattr(student, 'guardian', None) if student else None,
-        school=getattr(instance, 'school', None),
-        brand=getattr(instance, 'brand', None),
+        title='体験登録: {student_name}',
+        description='体験授業が登録されました',
+        student_id=instance.student_id,
+        school_id=instance.school_id,
+        brand_id=instance.brand_id,
+        inherit_from_student=True,
         source_type='trial_booking',
         source_id=instance.id,
     )
@@ -249,34 +255,25 @@ def create_task_on_enrollment(sender, instance, created, **kwargs):
     if getattr(instance, 'is_trial', False):
         return
 
-    student = getattr(instance, 'student', None)
-    if not student:
-        return
-
-    student_name = f'{student.last_name}{student.first_name}'
-
-    # 同じ生徒の入会タスクが既にあれば作成しない（複数商品契約の場合）
-    existing = Task.objects.filter(
-        student=student,
-        task_type='enrollment',
-        status__in=['new', 'in_progress', 'waiting'],
-        created_at__date=instance.created_at.date() if instance.created_at else None
-    ).exists()
-    if existing:
+    if not instance.student_id:
         return
 
-    create_task_for_event(
+    # 同じ生徒・同じ日の入会タスクが既にあれば作成しない（複数商品契約の場合。作成時に判定）
+    created_at = timezone.localtime(instance.created_at) if instance.created_at else timezone.localtime()
+    emit(
+        'enrollment',
         tenant_id=instance.tenant_id,
-        task_type='enrollment',
-        title=f'入会申請: {student_name}',
-        description=f'新規入会申請が届きました',
+        title='入会申請: {student_name}',
+        description='新規入会申請が届きました',
         priority='high',
-        student=student,
-        guardian=getattr(student, 'guardian', None),
-        school=getattr(instance, 'school', None) or getattr(student, 'primary_school', None),
-        brand=getattr(instance, 'brand', None) or getattr(student, 'primary_brand', None),
+        student_id=instance.student_id,
+        school_id=getattr(instance, 'school_id', None),
+        brand_id=getattr(instance, 'brand_id', None),
+        inherit_from_student=True,
         source_type='student_item',
         source_id=instance.id,
+        dedupe='open_student_daily',
+        event_date=created_at.date().isoformat(),
     )
 
 
@@ -314,17 +311,15 @@ def create_task_on_refund_request(sender, instance, created, **kwargs):
     if not created:
         return
 
-    guardian = getattr(instance, 'guardian', None)
-    guardian_name = f'{guardian.last_name}{guardian.first_name}' if guardian else '不明'
     amount = getattr(instance, 'amount', 0)
 
-    create_task_for_event(
+    emit(
+        'refund_request',
         tenant_id=instance.tenant_id,
-        task_type='refund_request',
-        title=f'返金申請: {guardian_name}様',
+        title='返金申請: {guardian_name}様',
         description=f'返金金額: ¥{amount:,.0f}',
         priority='high',
-        guardian=guardian,
+        guardian_id=getattr(instance, 'guardian_id', None),
         source_type='refund_request',
         source_id=instance.id,
         metadata={
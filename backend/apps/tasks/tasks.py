@@ -0,0 +1,45 @@
+"""
+Tasks Celery Tasks - 作業一覧のバックグラウンドタスク
+"""
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def process_task_events_task(self, events):
+    """シグナルで積まれたタスク作成イベントをまとめて処理するCeleryタスク
+
+    Args:
+        events: outbox.emit() で作成したイベントのリスト
+
+    Returns:
+        dict: 処理結果
+    """
+    from apps.tasks.outbox import process_task_events
+
+    try:
+        created = process_task_events(events)
+    except Exception as exc:
+        logger.error(f"Failed to process {len(events)} task events: {exc}")
+        raise self.retry(exc=exc)
+    logger.info(f"Created {created} tasks from {len(events)} events")
+    return {'events': len(events), 'created': created}
+
+
+@shared_task(bind=True, soft_time_limit=600, time_limit=900)
+def reconcile_task_counters_task(self, tenant_id=None):
+    """未完了タスクの件数集計を Task から作り直すCeleryタスク
+
+    Args:
+        tenant_id: テナントID（省略時は全テナント）
+
+    Returns:
+        dict: 処理結果
+    """
+    from apps.tasks.counters import rebuild
+
+    count = rebuild(tenant_id=tenant_id)
+    logger.info(f"Rebuilt {count} task counter rows")
+    return {'rows': count}
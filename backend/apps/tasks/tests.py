@@ -1,3 +1,202 @@
-from django.test import TestCase
+"""
+Task Event Outbox Tests - タスク自動作成イベントのテスト
+"""
+import os
+import uuid
 
-# Create your tests here.
+import pytest
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """送信されたイベント（Celery へは送らない）"""
+    from apps.tasks import outbox
+
+    sent = []
+    monkeypatch.setattr(outbox, 'dispatch', lambda events: sent.append(list(events)))
+    return sent
+
+
+class TestOutboxBuffering:
+    """イベントの保留・一括送信のテスト"""
+
+    def test_emit_outside_transaction_is_sent_immediately(self, dispatched):
+        from apps.tasks.outbox import emit
+
+        source_id = uuid.uuid4()
+        emit('chat', tenant_id=uuid.uuid4(), title='チャット対応', source_id=source_id, dedupe='open_source')
+
+        assert len(dispatched) == 1
+        assert dispatched[0][0]['source_id'] == str(source_id)
+
+    def test_task_events_sends_once_on_exit(self, dispatched):
+        from apps.tasks.outbox import emit, task_events
+
+        with task_events():
+            for _ in range(3):
+                emit('student_registration', tenant_id=uuid.uuid4(), title='生徒登録')
+            with task_events():
+                emit('student_registration', tenant_id=uuid.uuid4(), title='生徒登録')
+            assert dispatched == []
+
+        assert [len(events) for events in dispatched] == [4]
+
+    def test_suppressed_events_are_dropped(self, dispatched):
+        from apps.tasks.outbox import emit, task_events
+
+        with task_events(suppress=True):
+            emit('enrollment', tenant_id=uuid.uuid4(), title='入会申請: {student_name}')
+        assert dispatched == []
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+@pytest.mark.django_db(transaction=True)
+class TestOutboxProcessing:
+    """コミット後の送信と、重複を除いた一括作成のテスト"""
+
+    def test_rolled_back_events_are_discarded(self, dispatched):
+        from django.db import transaction
+        from apps.tasks.outbox import emit
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                emit('chat', tenant_id=uuid.uuid4(), title='チャット対応')
+                raise RuntimeError
+        with transaction.atomic():
+            emit('chat', tenant_id=uuid.uuid4(), title='チャット対応')
+            emit('chat', tenant_id=uuid.uuid4(), title='チャット対応')
+            assert dispatched == []
+
+        assert [len(events) for events in dispatched] == [2]
+
+    def test_rolled_back_savepoint_events_are_discarded(self, dispatched):
+        from django.db import transaction
+        from apps.tasks.outbox import emit
+
+        with transaction.atomic():
+            emit('chat', tenant_id=uuid.uuid4(), title='外側')
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    emit('chat', tenant_id=uuid.uuid4(), title='ロールバック')
+                    raise RuntimeError
+            with transaction.atomic():
+                emit('chat', tenant_id=uuid.uuid4(), title='内側')
+
+        assert sorted(e['title'] for events in dispatched for e in events) == ['内側', '外側']
+
+    def test_concurrent_events_are_not_duplicated(self, monkeypatch):
+        """事前の重複確認をすり抜けても一意制約で1件のみ作成"""
+        from apps.tasks import outbox
+        from apps.tasks.models import Task
+
+        tenant_id, channel_id, student_id = str(uuid.uuid4()), str(uuid.uuid4()), str(uuid.uuid4())
+        chat = {
+            'task_type': 'chat', 'tenant_id': tenant_id, 'title': 'チャット対応',
+            'source_type': 'channel', 'source_id': channel_id, 'dedupe': 'open_source',
+        }
+        source = {
+            'task_type': 'referral', 'tenant_id': tenant_id, 'title': '友人紹介',
+            'source_type': 'referral', 'source_id': student_id,
+        }
+        assert outbox.process_task_events([chat, source]) == 2
+
+        # 並行する別のワーカーが確認した時点ではまだタスクがなかった場合
+        monkeypatch.setattr(outbox, '_open_source_keys', lambda events: set())
+        monkeypatch.setattr(outbox, '_created_source_keys', lambda events: set())
+        assert outbox.process_task_events([dict(chat), dict(source)]) == 0
+        assert Task.objects.filter(tenant_id=tenant_id).count() == 2
+
+    def test_open_chat_task_is_not_duplicated(self):
+        from apps.tasks.models import Task
+        from apps.tasks.outbox import process_task_events
+
+        tenant_id, channel_id = str(uuid.uuid4()), str(uuid.uuid4())
+        event = {
+            'task_type': 'chat', 'tenant_id': tenant_id, 'title': 'チャット対応',
+            'source_type': 'channel', 'source_id': channel_id, 'dedupe': 'open_source',
+        }
+
+        assert process_task_events([event, dict(event)]) == 1
+        assert process_task_events([dict(event)]) == 0
+
+        Task.objects.filter(source_id=channel_id).update(status='completed')
+        assert process_task_events([dict(event)]) == 1
+
+
+class TestCounterKey:
+    """件数集計のキーのテスト"""
+
+    def test_only_open_tasks_are_counted(self):
+        from types import SimpleNamespace
+        from apps.tasks.counters import counter_key
+
+        task = SimpleNamespace(
+            tenant_id=uuid.uuid4(), assigned_to_id=None, school_id=None,
+            status='new', due_date=None, deleted_at=None,
+        )
+        assert counter_key(task) is not None
+        task.status = 'completed'
+        assert counter_key(task) is None
+        task.status, task.deleted_at = 'waiting', '2026-10-18'
+        assert counter_key(task) is None
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+@pytest.mark.django_db
+class TestTaskCounters:
+    """件数集計の増減とバッジ件数のテスト"""
+
+    def test_counters_follow_task_changes(self, django_assert_num_queries):
+        from datetime import date, timedelta
+        from apps.tasks import counters
+        from apps.tasks.models import Task
+
+        tenant_id, me = uuid.uuid4(), uuid.uuid4()
+        today = date(2026, 10, 18)
+        overdue = Task.objects.create(tenant_id=tenant_id, title='a', due_date=today - timedelta(days=1))
+        Task.objects.create(tenant_id=tenant_id, title='b', due_date=today, assigned_to_id=me)
+        done = Task.objects.create(tenant_id=tenant_id, title='c', assigned_to_id=me)
+
+        overdue.assigned_to_id = me
+        overdue.status = 'in_progress'
+        overdue.save()
+        done.status = 'completed'
+        done.save()
+
+        with django_assert_num_queries(1):
+            summary = counters.summarize(tenant_id, user_id=me, today=today)
+        assert summary['open'] == 2
+        assert summary['mine'] == {
+            'open': 2, 'today': 1, 'overdue': 1,
+            'by_status': {'new': 1, 'in_progress': 1, 'waiting': 0},
+        }
+        assert summary['unassigned'] == 0
+
+        counters.rebuild(tenant_id)
+        assert counters.summarize(tenant_id, user_id=me, today=today) == summary
+
+    def test_admin_bulk_actions_rebuild_counters(self, django_capture_on_commit_callbacks):
+        from unittest import mock
+        from django.contrib import admin
+        from apps.tasks import counters
+        from apps.tasks.admin import TaskAdmin
+        from apps.tasks.models import Task
+
+        tenant_ids = [uuid.uuid4(), uuid.uuid4()]
+        for tenant_id in tenant_ids:
+            Task.objects.create(tenant_id=tenant_id, title='a')
+        task_admin = TaskAdmin(Task, admin.site)
+
+        with mock.patch.object(task_admin, 'message_user'), django_capture_on_commit_callbacks(execute=True):
+            task_admin.mark_completed(None, Task.objects.filter(tenant_id__in=tenant_ids))
+
+        for tenant_id in tenant_ids:
+            assert counters.summarize(tenant_id)['open'] == 0
@@ -8,6 +8,7 @@ from django.utils import timezone
 
 from apps.core.permissions import IsTenantUser
 from apps.core.exceptions import UnauthorizedError, ValidationException
+from . import counters as task_counters
 from .models import Task, TaskCategory, TaskComment
 from .serializers import (
     TaskSerializer, TaskDetailSerializer, TaskCreateUpdateSerializer,
@@ -68,6 +69,14 @@ class TaskViewSet(viewsets.ModelViewSet):
         response_serializer = TaskSerializer(instance)
         return Response(response_serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def counters(self, request):
+        """受信箱のバッジ件数と校舎・担当者別の負荷（件数集計テーブルを1回読むだけ）"""
+        tenant_id = getattr(request, 'tenant_id', None) or getattr(request.user, 'tenant_id', None)
+        if not tenant_id:
+            raise ValidationException('テナントが特定できません')
+        return Response(task_counters.summarize(tenant_id, user_id=request.user.id))
+
     @action(detail=False, methods=['get'])
     def my_tasks(self, request):
         """自分に割り当てられたタスク一覧"""
@@ -213,6 +222,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         """社員登録タスクを却下する（データは保持）"""
         from apps.tenants.models import Employee
         from apps.users.models import User
+        from apps.authentication.services import UserIdentityCache
 
         task = self.get_object()
 
@@ -239,7 +249,10 @@ class TaskViewSet(viewsets.ModelViewSet):
             employee.save()
 
             # 関連するUserを無効化（削除せずに保持）
-            User.objects.filter(staff_id=employee.id).update(is_active=False)
+            staff_users = User.objects.filter(staff_id=employee.id)
+            user_ids = list(staff_users.values_list('id', flat=True))
+            staff_users.update(is_active=False)
+            UserIdentityCache.invalidate_many(user_ids)
         except Employee.DoesNotExist:
             employee_name = '不明'
 
@@ -1,4 +1,8 @@
 """Tenant middleware."""
+from django.utils.functional import SimpleLazyObject
+
+from apps.tenants.services.feature_permissions import FeaturePermissionCompiler
+from apps.tenants.services.tenant_resolver import TenantResolver
 
 
 class TenantMiddleware:
@@ -7,6 +11,10 @@ class TenantMiddleware:
     Sets request.tenant_id from:
     1. X-Tenant-ID header (if provided)
     2. Authenticated user's tenant_id (fallback)
+
+    Also sets request.tenant, the resolved Tenant (TenantResolver, cached by id).
+    Evaluated lazily so that users authenticated later by DRF (JWT) and guardian
+    users without User.tenant_id are resolved too; falsy when no tenant is found.
     """
 
     def __init__(self, get_response):
@@ -24,6 +32,25 @@ class TenantMiddleware:
 
         # Set tenant_id on request
         request.tenant_id = tenant_id
+        request.tenant = SimpleLazyObject(lambda: TenantResolver.for_request(request))
 
         response = self.get_response(request)
         return response
+
+
+class FeaturePermissionMiddleware:
+    """Attach the user's effective feature permissions to the request.
+
+    Sets request.feature_permissions (FeaturePermissionSet). Evaluated lazily on
+    first access so that users authenticated later by DRF (JWT) are resolved too;
+    the compiled bitsets come from the per-tenant cache, so checks need no queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.feature_permissions = SimpleLazyObject(
+            lambda: FeaturePermissionCompiler.for_user(getattr(request, 'user', None))
+        )
+        return self.get_response(request)
@@ -0,0 +1,48 @@
+"""
+Tenant Mixins - テナント単位の絞り込み
+"""
+from .services.tenant_resolver import TenantResolver
+
+_UNRESOLVED = object()
+
+
+class TenantScopedViewSetMixin:
+    """テナントと論理削除の絞り込みを1か所で適用するViewSet用Mixin
+
+    get_queryset() は super().get_queryset() に tenant_id と deleted_at__isnull=True を適用する。
+    get_queryset() を独自に組み立てるビューは、その中で scope_queryset() を通す。
+    テナントは TenantResolver で1リクエスト1回だけ解決し、テナントが特定できない場合は空の結果を返す。
+    """
+
+    # テナントの絞り込みに使うフィールド（'channel__tenant_id' のような関連先も可）
+    tenant_field = 'tenant_id'
+    # 論理削除のフィールド（None の場合は絞り込まない）
+    soft_delete_field = 'deleted_at'
+    # テナントが特定できない場合に既定テナント（Tenant.objects.first()）を使う
+    default_tenant_fallback = False
+
+    def get_tenant_id(self):
+        """リクエストのテナントID（ビューのインスタンスごとに1回だけ解決）"""
+        tenant_id = getattr(self, '_resolved_tenant_id', _UNRESOLVED)
+        if tenant_id is _UNRESOLVED:
+            tenant_id = TenantResolver.resolve_id(
+                self.request, default_tenant_fallback=self.default_tenant_fallback
+            )
+            self._resolved_tenant_id = tenant_id
+        return tenant_id
+
+    def get_tenant(self):
+        """リクエストのテナント（キャッシュ経由）"""
+        return TenantResolver.get(self.get_tenant_id())
+
+    def scope_queryset(self, queryset):
+        """テナント・論理削除で絞り込む"""
+        if self.soft_delete_field:
+            queryset = queryset.filter(**{f'{self.soft_delete_field}__isnull': True})
+        tenant_id = self.get_tenant_id()
+        if not tenant_id:
+            return queryset.none()
+        return queryset.filter(**{self.tenant_field: tenant_id})
+
+    def get_queryset(self):
+        return self.scope_queryset(super().get_queryset())
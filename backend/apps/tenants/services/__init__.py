@@ -0,0 +1,13 @@
+"""
+Tenants Services
+"""
+from .employee_directory import EmployeeDirectory
+from .feature_permissions import FeaturePermissionCompiler, FeaturePermissionSet
+from .tenant_resolver import TenantResolver
+
+__all__ = [
+    'EmployeeDirectory',
+    'FeaturePermissionCompiler',
+    'FeaturePermissionSet',
+    'TenantResolver',
+]
@@ -0,0 +1,172 @@
+"""
+Employee Directory Service - 校舎・ブランド別の社員名簿
+
+EmployeeViewSet.grouped 用に、社員・校舎・ブランドの所属を索引（dict of lists）で組み立てる。
+- 社員1回、所属（社員↔校舎・社員↔ブランドの中間テーブル）各1回、校舎・ブランド各1回の問い合わせのみ
+- 組み立てた名簿はテナント単位でキャッシュし、キーにバージョンを含める。
+  社員・所属・校舎・ブランドが変わったら bump_version() で古い名簿を無効化する
+"""
+import logging
+from collections import defaultdict
+from typing import Dict
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class EmployeeDirectory:
+    """テナントの社員名簿（校舎別・ブランド別・所属なし）"""
+
+    CACHE_PREFIX = 'employee_directory'
+    CACHE_TIMEOUT = 60 * 60  # 1時間（変更時はバージョンで無効化）
+
+    @classmethod
+    def _version_key(cls, tenant_id) -> str:
+        return f'{cls.CACHE_PREFIX}:version:{tenant_id}'
+
+    @classmethod
+    def get_version(cls, tenant_id) -> int:
+        try:
+            return cache.get(cls._version_key(tenant_id)) or 0
+        except Exception as e:
+            logger.warning(f"Employee directory cache unavailable: {e}")
+            return 0
+
+    @classmethod
+    def bump_version(cls, tenant_id):
+        """テナントの名簿を無効化（トランザクション内ではコミット後）"""
+        if not tenant_id:
+            return
+        transaction.on_commit(lambda: cls._bump(tenant_id))
+
+    @classmethod
+    def _bump(cls, tenant_id):
+        key = cls._version_key(tenant_id)
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, timeout=None)
+        except Exception as e:
+            logger.warning(f"Failed to bump employee directory version for tenant {tenant_id}: {e}")
+
+    @classmethod
+    def get(cls, tenant_id) -> Dict:
+        """名簿をキャッシュ経由で取得"""
+        key = f'{cls.CACHE_PREFIX}:{tenant_id}:v{cls.get_version(tenant_id)}'
+        try:
+            directory = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Employee directory cache unavailable: {e}")
+            directory = None
+        if directory is None:
+            directory = cls.build(tenant_id)
+            try:
+                cache.set(key, directory, timeout=cls.CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to store employee directory for tenant {tenant_id}: {e}")
+        return directory
+
+    @classmethod
+    def build(cls, tenant_id) -> Dict:
+        """
+        名簿を組み立てる
+
+        Returns:
+            {
+                'school_groups': [{'type', 'id', 'name', 'employees'}, ...],  # 校舎名順
+                'brand_groups': [...],                                          # ブランド名順
+                'unassigned': [...],                                            # 校舎・ブランドどちらもない社員
+                'all_employees': [...],                                         # EmployeeListSerializer と同じ形式
+            }
+        """
+        from apps.schools.models import Brand, School
+        from apps.tenants.models import Employee
+
+        employees = list(Employee.objects.filter(
+            tenant_ref=tenant_id, is_active=True
+        ).order_by('last_name', 'first_name').values(
+            'id', 'employee_no', 'last_name', 'first_name', 'email', 'phone', 'department',
+            'position_id', 'position__position_name', 'position_text', 'profile_image_url', 'is_active',
+        ))
+        employee_ids = [e['id'] for e in employees]
+
+        # 中間テーブルから所属の索引を作る（社員 → 所属一覧、所属 → 社員一覧）
+        def memberships(through, target, name_field, ordering):
+            by_employee = defaultdict(list)
+            by_target = defaultdict(list)
+            rows = through.objects.filter(employee_id__in=employee_ids).order_by(
+                *[f'{target}__{field}' for field in ordering]
+            ).values_list('employee_id', f'{target}_id', f'{target}__{name_field}')
+            for employee_id, target_id, name in rows:
+                by_employee[employee_id].append({'id': str(target_id), 'name': name})
+                by_target[target_id].append(employee_id)
+            return by_employee, by_target
+
+        schools_by_employee, employees_by_school = memberships(
+            Employee.schools.through, 'school', 'school_name', School._meta.ordering
+        )
+        brands_by_employee, employees_by_brand = memberships(
+            Employee.brands.through, 'brand', 'brand_name', Brand._meta.ordering
+        )
+
+        summaries = {}
+        all_employees = []
+        for e in employees:
+            summaries[e['id']] = {
+                'id': str(e['id']),
+                'name': f"{e['last_name']} {e['first_name']}",
+                'position': e['position__position_name'] or e['position_text'] or '',
+                'email': e['email'] or '',
+            }
+            all_employees.append({
+                'id': str(e['id']),
+                'employee_no': e['employee_no'],
+                'full_name': f"{e['last_name']} {e['first_name']}",
+                'last_name': e['last_name'],
+                'first_name': e['first_name'],
+                'email': e['email'],
+                'phone': e['phone'],
+                'department': e['department'],
+                'position': str(e['position_id']) if e['position_id'] else None,
+                'position_name': e['position__position_name'],
+                'profile_image_url': e['profile_image_url'],
+                'schools_list': schools_by_employee.get(e['id'], []),
+                'brands_list': brands_by_employee.get(e['id'], []),
+                'is_active': e['is_active'],
+            })
+
+        # 社員の並び（姓名順）を保つため、所属の索引は社員一覧の順に並べ直す
+        order = {employee_id: i for i, employee_id in enumerate(employee_ids)}
+
+        def groups(group_type, targets, members):
+            result = []
+            for target_id, name in targets:
+                member_ids = members.get(target_id)
+                if member_ids:
+                    result.append({
+                        'type': group_type,
+                        'id': str(target_id),
+                        'name': name,
+                        'employees': [summaries[i] for i in sorted(member_ids, key=order.__getitem__)],
+                    })
+            return result
+
+        schools = School.objects.filter(
+            tenant_ref=tenant_id, is_active=True
+        ).order_by('school_name').values_list('id', 'school_name')
+        brands = Brand.objects.filter(
+            tenant_ref=tenant_id, is_active=True
+        ).order_by('brand_name').values_list('id', 'brand_name')
+
+        return {
+            'school_groups': groups('school', schools, employees_by_school),
+            'brand_groups': groups('brand', brands, employees_by_brand),
+            'unassigned': [
+                summaries[i] for i in employee_ids
+                if i not in schools_by_employee and i not in brands_by_employee
+            ],
+            'all_employees': all_employees,
+        }
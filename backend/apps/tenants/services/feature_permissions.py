@@ -0,0 +1,174 @@
+"""
+Feature Permission Service - 役職ごとの機能権限のビットセット
+
+PositionPermission（役職 × 機能マスタ）をテナント単位でコンパイルし、
+役職ごとに「機能コード → ビット位置」のビットセット（int）として保持する。
+
+- コンパイル結果はテナント単位でキャッシュし、キーにバージョンを含める。
+  権限・機能マスタ・役職・社員の役職が変わったら bump_version() で古い結果を無効化する
+- 社員ID（User.staff_id）→ 役職ID の対応も含めるため、リクエストごとの判定は
+  キャッシュ1回の参照のみ（DBへの問い合わせなし）
+- FeaturePermissionMiddleware がリクエストに request.feature_permissions を遅延で付与する
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class FeaturePermissionSet:
+    """ユーザーの有効な機能権限（ビットセット）"""
+
+    def __init__(self, bits: int = 0, index: Optional[Dict[str, int]] = None,
+                 position_id: Optional[str] = None, is_admin: bool = False):
+        self.bits = bits
+        self.index = index or {}
+        self.position_id = position_id
+        self.is_admin = is_admin
+
+    def has(self, feature_code: str) -> bool:
+        """機能を利用できるか（管理者は常に True）"""
+        if self.is_admin:
+            return True
+        bit = self.index.get(str(feature_code))
+        return bit is not None and bool(self.bits >> bit & 1)
+
+    def has_all(self, feature_codes: Iterable[str]) -> bool:
+        return all(self.has(code) for code in feature_codes)
+
+    def has_any(self, feature_codes: Iterable[str]) -> bool:
+        return any(self.has(code) for code in feature_codes)
+
+    @property
+    def feature_codes(self) -> List[str]:
+        """利用可能な機能コード一覧（機能マスタの表示順）"""
+        return [code for code in self.index if self.has(code)]
+
+    def __bool__(self):
+        return self.is_admin or bool(self.bits)
+
+    def __repr__(self):
+        return f'<FeaturePermissionSet admin={self.is_admin} bits={self.bits:#x}>'
+
+
+class FeaturePermissionCompiler:
+    """テナント単位の権限ビットセットのコンパイルとキャッシュ"""
+
+    CACHE_PREFIX = 'feature_permissions'
+    CACHE_TIMEOUT = 60 * 60  # 1時間（変更時はバージョンで無効化）
+    # 機能権限の設定に関係なく全機能を利用できるロール
+    ADMIN_ROLES = ('ADMIN', 'SUPER_ADMIN')
+
+    @classmethod
+    def _version_key(cls, tenant_id) -> str:
+        return f'{cls.CACHE_PREFIX}:version:{tenant_id}'
+
+    @classmethod
+    def get_version(cls, tenant_id) -> int:
+        try:
+            return cache.get(cls._version_key(tenant_id)) or 0
+        except Exception as e:
+            logger.warning(f"Feature permission cache unavailable: {e}")
+            return 0
+
+    @classmethod
+    def bump_version(cls, tenant_id):
+        """テナントのコンパイル結果を無効化（トランザクション内ではコミット後）"""
+        if not tenant_id:
+            return
+        transaction.on_commit(lambda: cls._bump(tenant_id))
+
+    @classmethod
+    def _bump(cls, tenant_id):
+        key = cls._version_key(tenant_id)
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, timeout=None)
+        except Exception as e:
+            logger.warning(f"Failed to bump feature permission version for tenant {tenant_id}: {e}")
+
+    @classmethod
+    def compile(cls, tenant_id) -> Dict:
+        """
+        テナントの権限をコンパイル
+
+        Returns:
+            {
+                'codes': [機能コード, ...],            # 表示順
+                'index': {機能コード: ビット位置},
+                'positions': {役職ID: ビットセット},
+                'employees': {社員ID: 役職ID},
+            }
+        """
+        from apps.tenants.models import Employee, FeatureMaster, PositionPermission
+
+        codes = list(dict.fromkeys(FeatureMaster.objects.filter(
+            tenant_id=tenant_id, is_active=True, deleted_at__isnull=True,
+        ).order_by('display_order', 'feature_code').values_list('feature_code', flat=True)))
+        index = {code: bit for bit, code in enumerate(codes)}
+
+        positions = {}
+        grants = PositionPermission.objects.filter(
+            tenant_id=tenant_id, has_permission=True, deleted_at__isnull=True,
+            position__is_active=True, feature__is_active=True,
+        ).values_list('position_id', 'feature__feature_code')
+        for position_id, feature_code in grants:
+            bit = index.get(feature_code)
+            if bit is not None:
+                key = str(position_id)
+                positions[key] = positions.get(key, 0) | (1 << bit)
+
+        employees = {
+            str(employee_id): str(position_id)
+            for employee_id, position_id in Employee.objects.filter(
+                tenant_id=tenant_id, position__isnull=False, deleted_at__isnull=True,
+            ).values_list('id', 'position_id')
+        }
+
+        return {'codes': codes, 'index': index, 'positions': positions, 'employees': employees}
+
+    @classmethod
+    def get_compiled(cls, tenant_id) -> Dict:
+        """コンパイル結果をキャッシュ経由で取得"""
+        key = f'{cls.CACHE_PREFIX}:{tenant_id}:v{cls.get_version(tenant_id)}'
+        try:
+            compiled = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Feature permission cache unavailable: {e}")
+            compiled = None
+        if compiled is None:
+            compiled = cls.compile(tenant_id)
+            try:
+                cache.set(key, compiled, timeout=cls.CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to store feature permissions for tenant {tenant_id}: {e}")
+        return compiled
+
+    @classmethod
+    def for_position(cls, tenant_id, position_id) -> FeaturePermissionSet:
+        compiled = cls.get_compiled(tenant_id)
+        position_id = str(position_id) if position_id else None
+        return FeaturePermissionSet(compiled['positions'].get(position_id, 0), compiled['index'], position_id)
+
+    @classmethod
+    def for_user(cls, user) -> FeaturePermissionSet:
+        """ユーザーの有効な機能権限（社員の役職から判定。管理者は全機能）"""
+        if not user or not user.is_authenticated:
+            return FeaturePermissionSet()
+        tenant_id = getattr(user, 'tenant_id', None)
+        if getattr(user, 'is_superuser', False) or getattr(user, 'role', None) in cls.ADMIN_ROLES:
+            index = cls.get_compiled(tenant_id)['index'] if tenant_id else {}
+            return FeaturePermissionSet(index=index, is_admin=True)
+
+        staff_id = getattr(user, 'staff_id', None)
+        if not tenant_id or not staff_id:
+            return FeaturePermissionSet()
+
+        compiled = cls.get_compiled(tenant_id)
+        position_id = compiled['employees'].get(str(staff_id))
+        return FeaturePermissionSet(compiled['positions'].get(position_id, 0), compiled['index'], position_id)
@@ -0,0 +1,149 @@
+"""
+Tenant Resolver - リクエストのテナント解決とテナントのキャッシュ
+
+ビューごとに request.tenant_id → request.user.tenant_id → 保護者プロフィールの tenant_id →
+Tenant.objects.first() の順でテナントを求めていたため、フォールバックのたびに問い合わせが発生していた。
+ここでは解決順序を1か所にまとめ、問い合わせが必要な値をキャッシュする。
+
+- テナント本体は ID ごとにキャッシュし、Tenant の保存・削除時に invalidate() で破棄する
+- 保護者ユーザー（User.tenant_id が空）のテナントはユーザーごとにキャッシュし、
+  Guardian の保存・削除時に invalidate_user() で破棄する
+- 既定テナント（Tenant.objects.first()）はテナントが特定できない管理者向けのフォールバック
+- TenantMiddleware がリクエストに request.tenant（遅延評価）を付与する
+"""
+import logging
+
+from django.core.cache import cache
+
+from apps.core.utils import parse_uuid
+
+logger = logging.getLogger(__name__)
+
+# 「該当なし」を表すキャッシュ値（None はキャッシュなしと区別できないため）
+_MISSING = ''
+
+
+class TenantResolver:
+    """テナントの解決とキャッシュ"""
+
+    CACHE_PREFIX = 'tenant_resolver'
+    CACHE_TIMEOUT = 60 * 10  # 10分（変更時は invalidate で破棄）
+
+    @classmethod
+    def _get(cls, key):
+        try:
+            return cache.get(key)
+        except Exception as e:
+            logger.warning(f"Tenant cache unavailable: {e}")
+            return None
+
+    @classmethod
+    def _set(cls, key, value):
+        try:
+            cache.set(key, value, timeout=cls.CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to store tenant cache: {e}")
+
+    @classmethod
+    def _delete(cls, *keys):
+        try:
+            cache.delete_many(keys)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate tenant cache: {e}")
+
+    @classmethod
+    def _tenant_key(cls, tenant_id) -> str:
+        return f'{cls.CACHE_PREFIX}:tenant:{tenant_id}'
+
+    @classmethod
+    def _default_key(cls) -> str:
+        return f'{cls.CACHE_PREFIX}:default'
+
+    @classmethod
+    def _guardian_key(cls, user_id) -> str:
+        return f'{cls.CACHE_PREFIX}:guardian:{user_id}'
+
+    @classmethod
+    def get(cls, tenant_id):
+        """
+        テナントを取得（キャッシュ経由）
+
+        Returns:
+            Tenant。tenant_id が空・不正な形式・存在しない場合は None
+        """
+        tenant_uuid = parse_uuid(str(tenant_id)) if tenant_id else None
+        if tenant_uuid is None:
+            return None
+
+        key = cls._tenant_key(tenant_uuid)
+        tenant = cls._get(key)
+        if tenant is not None:
+            return tenant or None
+
+        from apps.tenants.models import Tenant
+        tenant = Tenant.objects.filter(id=tenant_uuid).first()
+        cls._set(key, tenant or _MISSING)
+        return tenant
+
+    @classmethod
+    def default_tenant_id(cls):
+        """既定テナント（Tenant.objects.first()）のID"""
+        key = cls._default_key()
+        tenant_id = cls._get(key)
+        if tenant_id is None:
+            from apps.tenants.models import Tenant
+            tenant_id = Tenant.objects.values_list('id', flat=True).first()
+            cls._set(key, tenant_id or _MISSING)
+        return tenant_id or None
+
+    @classmethod
+    def guardian_tenant_id(cls, user):
+        """保護者ユーザーのテナント（保護者プロフィールの tenant_id。保護者でない場合は None）"""
+        if getattr(user, 'cached_guardian_id', _MISSING) is None:
+            # UserIdentityCache で保護者でないことが分かっている
+            return None
+
+        key = cls._guardian_key(user.pk)
+        tenant_id = cls._get(key)
+        if tenant_id is None:
+            from apps.students.models import Guardian
+            tenant_id = Guardian.objects.filter(user_id=user.pk).values_list('tenant_id', flat=True).first()
+            cls._set(key, tenant_id or _MISSING)
+        return tenant_id or None
+
+    @classmethod
+    def resolve_id(cls, request, default_tenant_fallback: bool = False):
+        """
+        リクエストのテナントIDを解決
+
+        1. X-Tenant-ID ヘッダー（TenantMiddleware が request.tenant_id に設定）
+        2. ログインユーザーの tenant_id
+        3. 保護者ユーザーの保護者プロフィールの tenant_id
+        4. default_tenant_fallback=True の場合は既定テナント
+
+        Returns:
+            テナントID（str または UUID）。解決できない場合は None
+        """
+        tenant_id = getattr(request, 'tenant_id', None)
+        user = getattr(request, 'user', None)
+        if not tenant_id and user is not None and user.is_authenticated:
+            tenant_id = getattr(user, 'tenant_id', None) or cls.guardian_tenant_id(user)
+        if not tenant_id and default_tenant_fallback:
+            tenant_id = cls.default_tenant_id()
+        return tenant_id or None
+
+    @classmethod
+    def for_request(cls, request):
+        """リクエストのテナント（TenantMiddleware の request.tenant 用）"""
+        return cls.get(cls.resolve_id(request))
+
+    @classmethod
+    def invalidate(cls, tenant_id):
+        """テナントのキャッシュを破棄（既定テナントも作り直す）"""
+        cls._delete(cls._tenant_key(tenant_id), cls._default_key())
+
+    @classmethod
+    def invalidate_user(cls, user_id):
+        """保護者ユーザーのテナントのキャッシュを破棄"""
+        if user_id:
+            cls._delete(cls._guardian_key(user_id))
@@ -0,0 +1,61 @@
+"""
+Tenants Signals
+- 権限・機能マスタ・役職・社員の変更時に機能権限のコンパイル結果を無効化
+- 社員・所属・校舎・ブランドの変更時に社員名簿を無効化
+- テナント・保護者の変更時にテナント解決のキャッシュを破棄
+"""
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Employee
+from .services.employee_directory import EmployeeDirectory
+from .services.feature_permissions import FeaturePermissionCompiler
+from .services.tenant_resolver import TenantResolver
+
+
+@receiver(post_save, sender='tenants.PositionPermission')
+@receiver(post_delete, sender='tenants.PositionPermission')
+@receiver(post_save, sender='tenants.FeatureMaster')
+@receiver(post_delete, sender='tenants.FeatureMaster')
+@receiver(post_save, sender='tenants.Position')
+@receiver(post_delete, sender='tenants.Position')
+@receiver(post_save, sender='tenants.Employee')
+@receiver(post_delete, sender='tenants.Employee')
+def invalidate_feature_permissions(sender, instance, **kwargs):
+    """テナントの機能権限ビットセットを作り直す（社員は役職の付け替えに備えて）"""
+    FeaturePermissionCompiler.bump_version(instance.tenant_id)
+
+
+@receiver(post_save, sender='tenants.Employee')
+@receiver(post_delete, sender='tenants.Employee')
+@receiver(post_save, sender='tenants.Position')
+@receiver(post_save, sender='schools.School')
+@receiver(post_delete, sender='schools.School')
+@receiver(post_save, sender='schools.Brand')
+@receiver(post_delete, sender='schools.Brand')
+def invalidate_employee_directory(sender, instance, **kwargs):
+    """テナントの社員名簿を作り直す（役職名・校舎名・ブランド名の変更を含む）"""
+    EmployeeDirectory.bump_version(instance.tenant_id)
+
+
+@receiver(m2m_changed, sender=Employee.schools.through)
+@receiver(m2m_changed, sender=Employee.brands.through)
+def invalidate_employee_directory_on_membership(sender, instance, action, **kwargs):
+    """社員の対応校舎・ブランドの変更時に社員名簿を作り直す"""
+    # instance は社員、または校舎・ブランド側から変更された場合（school.employees.add など）はその校舎・ブランド
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        EmployeeDirectory.bump_version(instance.tenant_id)
+
+
+@receiver(post_save, sender='tenants.Tenant')
+@receiver(post_delete, sender='tenants.Tenant')
+def invalidate_tenant_cache(sender, instance, **kwargs):
+    """テナントのキャッシュを破棄"""
+    TenantResolver.invalidate(instance.id)
+
+
+@receiver(post_save, sender='students.Guardian')
+@receiver(post_delete, sender='students.Guardian')
+def invalidate_guardian_tenant(sender, instance, **kwargs):
+    """保護者ユーザーのテナントのキャッシュを破棄"""
+    TenantResolver.invalidate_user(instance.user_id)
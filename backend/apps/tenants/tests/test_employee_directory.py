@@ -0,0 +1,49 @@
+"""
+Employee Directory Tests - 校舎・ブランド別の社員名簿のテスト
+"""
+import os
+
+import pytest
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(
+        not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+        reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+    ),
+]
+
+
+@pytest.fixture
+def tenant(db):
+    from apps.tenants.models import Tenant
+
+    return Tenant.objects.create(tenant_code='DIR_TENANT', tenant_name='名簿テナント', is_active=True)
+
+
+def test_groups_employees_by_school_and_brand(tenant, django_assert_max_num_queries):
+    """所属の索引から校舎別・ブランド別・所属なしを組み立てる"""
+    from apps.schools.models import Brand, School
+    from apps.tenants.models import Employee
+    from apps.tenants.services.employee_directory import EmployeeDirectory
+
+    brand = Brand.objects.create(tenant_ref=tenant, brand_code='B1', brand_name='英会話', is_active=True)
+    school_a = School.objects.create(tenant_ref=tenant, school_code='S1', school_name='A校', is_active=True)
+    school_b = School.objects.create(tenant_ref=tenant, school_code='S2', school_name='B校', is_active=True)
+
+    def employee(last_name):
+        return Employee.objects.create(tenant_ref=tenant, last_name=last_name, first_name='太郎', is_active=True)
+
+    sato, suzuki, tanaka = employee('佐藤'), employee('鈴木'), employee('田中')
+    sato.schools.add(school_a, school_b)
+    suzuki.schools.add(school_a)
+    suzuki.brands.add(brand)
+
+    with django_assert_max_num_queries(5):
+        directory = EmployeeDirectory.build(tenant.id)
+
+    groups = {g['name']: [e['name'] for e in g['employees']] for g in directory['school_groups']}
+    assert groups == {'A校': ['佐藤 太郎', '鈴木 太郎'], 'B校': ['佐藤 太郎']}
+    assert [e['name'] for e in directory['brand_groups'][0]['employees']] == ['鈴木 太郎']
+    assert [e['id'] for e in directory['unassigned']] == [str(tanaka.id)]
+    assert len(directory['all_employees']) == 3
@@ -0,0 +1,85 @@
+"""
+Feature Permission Tests - 役職の機能権限ビットセットのユニットテスト
+"""
+from types import SimpleNamespace
+
+
+class TestFeaturePermissionSet:
+    """ビットセットによる判定のテスト"""
+
+    def test_has_feature(self):
+        from apps.tenants.services.feature_permissions import FeaturePermissionSet
+
+        index = {'1000': 0, '2000': 1, '10010': 2}
+        perms = FeaturePermissionSet(bits=0b101, index=index)
+
+        assert perms.has('1000')
+        assert not perms.has('2000')
+        assert perms.has('10010')
+        assert not perms.has('9999')  # 未登録の機能コード
+        assert perms.feature_codes == ['1000', '10010']
+        assert perms.has_any(['2000', '10010'])
+        assert not perms.has_all(['1000', '2000'])
+
+    def test_admin_has_every_feature(self):
+        from apps.tenants.services.feature_permissions import FeaturePermissionSet
+
+        perms = FeaturePermissionSet(index={'1000': 0, '2000': 1}, is_admin=True)
+        assert perms.has('2000')
+        assert perms.has('9999')
+        assert perms.feature_codes == ['1000', '2000']
+
+    def test_anonymous_user_has_nothing(self):
+        from apps.tenants.services.feature_permissions import FeaturePermissionCompiler
+
+        perms = FeaturePermissionCompiler.for_user(SimpleNamespace(is_authenticated=False))
+        assert not perms
+        assert not perms.has('1000')
+
+
+class TestHasFeaturePermission:
+    """DRF 権限クラスのテスト"""
+
+    def test_checks_required_features(self):
+        from apps.core.permissions import HasFeature
+        from apps.tenants.services.feature_permissions import FeaturePermissionSet
+
+        request = SimpleNamespace(
+            user=SimpleNamespace(is_authenticated=True),
+            feature_permissions=FeaturePermissionSet(bits=0b1, index={'1000': 0, '2000': 1}),
+        )
+        assert HasFeature().has_permission(request, SimpleNamespace(required_features=['1000']))
+        assert not HasFeature().has_permission(request, SimpleNamespace(required_features=['1000', '2000']))
+        assert HasFeature().has_permission(request, SimpleNamespace())
+
+
+class TestVersionBump:
+    """無効化のタイミングのテスト"""
+
+    def test_bump_waits_for_commit(self, settings):
+        """書き込みのトランザクションのコミット後にバージョンを更新する"""
+        from unittest import mock
+        from django.core.cache import cache
+        from apps.tenants.services.feature_permissions import FeaturePermissionCompiler
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'feature-permission-tests',
+        }}
+        cache.clear()
+        with mock.patch('apps.tenants.services.feature_permissions.transaction.on_commit') as on_commit:
+            FeaturePermissionCompiler.bump_version('tenant-1')
+            assert FeaturePermissionCompiler.get_version('tenant-1') == 0
+
+            on_commit.call_args.args[0]()
+        assert FeaturePermissionCompiler.get_version('tenant-1') == 1
+
+    def test_bump_survives_cache_outage(self):
+        """キャッシュ障害時もコミット後のコールバックから例外を送出しない"""
+        from unittest import mock
+        from apps.tenants.services.feature_permissions import FeaturePermissionCompiler
+
+        with mock.patch('apps.tenants.services.feature_permissions.cache') as cache:
+            cache.incr.side_effect = ValueError
+            cache.set.side_effect = ConnectionError('cache down')
+            FeaturePermissionCompiler._bump('tenant-1')
+        cache.set.assert_called_once()
@@ -0,0 +1,119 @@
+"""
+Tenant Resolver Tests - リクエストのテナント解決・テナント単位の絞り込みのユニットテスト
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from apps.tenants.mixins import TenantScopedViewSetMixin
+from apps.tenants.services.tenant_resolver import TenantResolver
+
+pytestmark = pytest.mark.unit
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tenant-tests'}}
+
+TENANT_A = '11111111-1111-1111-1111-111111111111'
+TENANT_B = '22222222-2222-2222-2222-222222222222'
+
+
+def _request(tenant_id=None, user_tenant_id=None, user_id=1, guardian_id=None, authenticated=True):
+    user = SimpleNamespace(
+        pk=user_id, is_authenticated=authenticated, tenant_id=user_tenant_id, cached_guardian_id=guardian_id,
+    )
+    return SimpleNamespace(tenant_id=tenant_id, user=user)
+
+
+class FakeQuerySet:
+    """filter() の条件を記録する QuerySet の代わり"""
+
+    def __init__(self, filters=None, empty=False):
+        self.filters = filters or {}
+        self.empty = empty
+
+    def filter(self, **kwargs):
+        return FakeQuerySet({**self.filters, **kwargs}, self.empty)
+
+    def none(self):
+        return FakeQuerySet(self.filters, empty=True)
+
+
+class ScopedView(TenantScopedViewSetMixin):
+    def __init__(self, request):
+        self.request = request
+
+
+class TestTenantResolver:
+    """解決順序のテスト（キャッシュは LocMem）"""
+
+    @pytest.fixture(autouse=True)
+    def locmem_cache(self, settings):
+        settings.CACHES = LOCMEM
+        cache.clear()
+
+    def test_header_wins_over_user(self):
+        request = _request(tenant_id=TENANT_A, user_tenant_id=TENANT_B)
+        assert TenantResolver.resolve_id(request) == TENANT_A
+
+    def test_user_tenant(self):
+        assert TenantResolver.resolve_id(_request(user_tenant_id=TENANT_B)) == TENANT_B
+
+    def test_guardian_tenant_is_cached(self):
+        request = _request(user_id=7, guardian_id='g-7')
+        cache.set(TenantResolver._guardian_key(7), TENANT_A)
+        assert TenantResolver.resolve_id(request) == TENANT_A
+
+        # 保護者の保存・削除で破棄される
+        TenantResolver.invalidate_user(7)
+        assert cache.get(TenantResolver._guardian_key(7)) is None
+
+    def test_non_guardian_skips_lookup(self):
+        # UserIdentityCache で保護者でないと分かっている場合は問い合わせない
+        request = _request(guardian_id=None)
+        assert TenantResolver.resolve_id(request) is None
+
+    def test_default_tenant_only_when_requested(self):
+        cache.set(TenantResolver._default_key(), TENANT_B)
+        request = _request(guardian_id=None)
+        assert TenantResolver.resolve_id(request) is None
+        assert TenantResolver.resolve_id(request, default_tenant_fallback=True) == TENANT_B
+
+    def test_anonymous_user(self):
+        request = _request(authenticated=False, user_tenant_id=TENANT_B)
+        assert TenantResolver.resolve_id(request) is None
+
+    def test_invalid_tenant_id(self):
+        assert TenantResolver.get('not-a-uuid') is None
+        assert TenantResolver.get(None) is None
+
+    def test_cached_miss(self):
+        cache.set(TenantResolver._tenant_key(TENANT_A), '')
+        assert TenantResolver.get(TENANT_A) is None
+
+
+class TestTenantScopedViewSetMixin:
+    """テナント・論理削除の絞り込みのテスト"""
+
+    def test_scope_queryset(self):
+        view = ScopedView(_request(tenant_id=TENANT_A))
+        queryset = view.scope_queryset(FakeQuerySet())
+        assert queryset.filters == {'deleted_at__isnull': True, 'tenant_id': TENANT_A}
+        assert not queryset.empty
+
+    def test_no_tenant_returns_empty(self):
+        view = ScopedView(_request(guardian_id=None))
+        assert view.scope_queryset(FakeQuerySet()).empty
+
+    def test_custom_fields(self):
+        view = ScopedView(_request(tenant_id=TENANT_A))
+        view.tenant_field = 'channel__tenant_id'
+        view.soft_delete_field = None
+        assert view.scope_queryset(FakeQuerySet()).filters == {'channel__tenant_id': TENANT_A}
+
+    def test_resolved_once_per_view(self):
+        view = ScopedView(_request(tenant_id=TENANT_A))
+        with mock.patch.object(TenantResolver, 'resolve_id', return_value=TENANT_A) as resolve_id:
+            view.get_tenant_id()
+            view.scope_queryset(FakeQuerySet())
+        assert resolve_id.call_count == 1
@@ -5,6 +5,8 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.utils import timezone
 from .models import Tenant, Position, FeatureMaster, PositionPermission, Employee, EmployeeGroup
 from .serializers import (
     TenantSerializer, TenantDetailSerializer,
@@ -13,6 +15,9 @@ from .serializers import (
     EmployeeListSerializer, EmployeeDetailSerializer,
     EmployeeGroupListSerializer, EmployeeGroupDetailSerializer, EmployeeGroupCreateUpdateSerializer,
 )
+from apps.tasks import counters as task_counters
+from .services.employee_directory import EmployeeDirectory
+from .services.feature_permissions import FeaturePermissionCompiler
 
 
 class TenantViewSet(viewsets.ReadOnlyModelViewSet):
@@ -106,27 +111,28 @@ class PositionPermissionViewSet(viewsets.ModelViewSet):
             tenant_ref=tenant_id, is_active=True
         ).order_by('display_order', 'feature_code')
 
-        # 権限マトリックス
-        permissions_map = {}
-        for perm in PositionPermission.objects.filter(tenant_ref=tenant_id):
-            key = f"{perm.position_id}_{perm.feature_id}"
-            permissions_map[key] = perm.has_permission
+        # 権限マトリックス（コンパイル済みの役職ビットセットから判定）
+        compiled = FeaturePermissionCompiler.get_compiled(tenant_id)
+        position_bits = [
+            (str(position.id), compiled['positions'].get(str(position.id), 0))
+            for position in positions
+        ]
 
         # マトリックスデータを構築
         matrix = []
         for feature in features:
-            row = {
+            bit = compiled['index'].get(feature.feature_code)
+            matrix.append({
                 'feature_id': str(feature.id),
                 'feature_code': feature.feature_code,
                 'feature_name': feature.feature_name,
                 'parent_code': feature.parent_code,
                 'category': feature.category,
-                'permissions': {}
-            }
-            for position in positions:
-                key = f"{position.id}_{feature.id}"
-                row['permissions'][str(position.id)] = permissions_map.get(key, False)
-            matrix.append(row)
+                'permissions': {
+                    position_id: bit is not None and bool(bits >> bit & 1)
+                    for position_id, bits in position_bits
+                },
+            })
 
         return Response({
             'positions': PositionSerializer(positions, many=True).data,
@@ -143,25 +149,44 @@ class PositionPermissionViewSet(viewsets.ModelViewSet):
         tenant_id = request.user.tenant_id
         permissions_data = serializer.validated_data['permissions']
 
-        updated_count = 0
-        created_count = 0
+        # 既存の権限をまとめて取得し、変更分のみ一括更新・一括作成
+        existing = {
+            (str(perm.position_id), str(perm.feature_id)): perm
+            for perm in PositionPermission.objects.filter(
+                tenant_ref=tenant_id,
+                position_id__in={p['position_id'] for p in permissions_data},
+                feature_id__in={p['feature_id'] for p in permissions_data},
+            )
+        }
 
+        now = timezone.now()
+        to_update = {}
+        to_create = {}
         for perm_data in permissions_data:
-            position_id = perm_data['position_id']
-            feature_id = perm_data['feature_id']
+            key = (str(perm_data['position_id']), str(perm_data['feature_id']))
             has_permission = perm_data['has_permission']
+            perm = existing.get(key)
+            if perm is None:
+                to_create[key] = PositionPermission(
+                    tenant_id=tenant_id,
+                    tenant_ref_id=tenant_id,
+                    position_id=perm_data['position_id'],
+                    feature_id=perm_data['feature_id'],
+                    has_permission=has_permission,
+                )
+            else:
+                perm.has_permission = has_permission
+                perm.updated_at = now
+                to_update[key] = perm
 
-            perm, created = PositionPermission.objects.update_or_create(
-                tenant_ref=tenant_id,
-                position_id=position_id,
-                feature_id=feature_id,
-                defaults={'has_permission': has_permission}
-            )
+        with transaction.atomic():
+            PositionPermission.objects.bulk_update(list(to_update.values()), ['has_permission', 'updated_at'])
+            PositionPermission.objects.bulk_create(list(to_create.values()))
+        # 一括更新はシグナルを経由しないため、ここでビットセットを無効化
+        FeaturePermissionCompiler.bump_version(tenant_id)
 
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+        created_count = len(to_create)
+        updated_count = len(to_update)
 
         return Response({
             'success': True,
@@ -280,86 +305,8 @@ class EmployeeViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def grouped(self, request):
-        """校舎・ブランド別にグループ化した社員一覧"""
-        from apps.schools.models import School, Brand
-
-        tenant_id = request.user.tenant_id
-
-        # 校舎一覧を取得
-        schools = School.objects.filter(
-            tenant_ref=tenant_id, is_active=True
-        ).order_by('school_name')
-
-        # ブランド一覧を取得
-        brands = Brand.objects.filter(
-            tenant_ref=tenant_id, is_active=True
-        ).order_by('brand_name')
-
-        # 全社員を取得
-        employees = Employee.objects.filter(
-            tenant_ref=tenant_id, is_active=True
-        ).select_related('position').prefetch_related('schools', 'brands').order_by(
-            'last_name', 'first_name'
-        )
-
-        # 校舎別グループ化
-        school_groups = []
-        for school in schools:
-            school_employees = [
-                {
-                    'id': str(e.id),
-                    'name': f"{e.last_name} {e.first_name}",
-                    'position': e.position.position_name if e.position else e.position_text or '',
-                    'email': e.email or '',
-                }
-                for e in employees if school in e.schools.all()
-            ]
-            if school_employees:
-                school_groups.append({
-                    'type': 'school',
-                    'id': str(school.id),
-                    'name': school.school_name,
-                    'employees': school_employees,
-                })
-
-        # ブランド別グループ化
-        brand_groups = []
-        for brand in brands:
-            brand_employees = [
-                {
-                    'id': str(e.id),
-                    'name': f"{e.last_name} {e.first_name}",
-                    'position': e.position.position_name if e.position else e.position_text or '',
-                    'email': e.email or '',
-                }
-                for e in employees if brand in e.brands.all()
-            ]
-            if brand_employees:
-                brand_groups.append({
-                    'type': 'brand',
-                    'id': str(brand.id),
-                    'name': brand.brand_name,
-                    'employees': brand_employees,
-                })
-
-        # 所属なし（校舎・ブランドどちらもない）
-        unassigned_employees = [
-            {
-                'id': str(e.id),
-                'name': f"{e.last_name} {e.first_name}",
-                'position': e.position.position_name if e.position else e.position_text or '',
-                'email': e.email or '',
-            }
-            for e in employees
-            if not e.schools.exists() and not e.brands.exists()
-        ]
-
-        return Response({
-            'school_groups': school_groups,
-            'brand_groups': brand_groups,
-            'unassigned': unassigned_employees,
-            'all_employees': EmployeeListSerializer(employees, many=True).data,
-        })
+        """校舎・ブランド別にグループ化した社員一覧（テナント単位でキャッシュした名簿）"""
+        return Response(EmployeeDirectory.get(request.user.tenant_id))
 
     @action(detail=False, methods=['get'])
     def pending(self, request):
@@ -426,6 +373,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             task_type='staff_registration',
             status__in=['new', 'in_progress', 'waiting']
         ).update(status='completed', completed_at=timezone.now())
+        task_counters.schedule_rebuild(request.user.tenant_id)
 
         return Response({
             'success': True,
@@ -438,6 +386,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
     def reject(self, request, pk=None):
         """社員登録を却下（データは保持）"""
         from apps.users.models import User
+        from apps.authentication.services import UserIdentityCache
         from apps.tasks.models import Task
         from django.utils import timezone
 
@@ -456,7 +405,10 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         employee.save()
 
         # 関連するUserを無効化（削除せずに保持）
-        User.objects.filter(staff_id=employee.id).update(is_active=False)
+        staff_users = User.objects.filter(staff_id=employee.id)
+        user_ids = list(staff_users.values_list('id', flat=True))
+        staff_users.update(is_active=False)
+        UserIdentityCache.invalidate_many(user_ids)
 
         # 関連するタスクをキャンセルにする
         Task.objects.filter(
@@ -466,6 +418,7 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             task_type='staff_registration',
             status__in=['new', 'in_progress', 'waiting']
         ).update(status='cancelled', completed_at=timezone.now())
+        task_counters.schedule_rebuild(request.user.tenant_id)
 
         return Response({
             'success': True,
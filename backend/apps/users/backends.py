@@ -3,45 +3,42 @@
 電話番号またはメールアドレスでログイン可能
 """
 from django.contrib.auth.backends import ModelBackend
-from django.db.models import Q
+
+from apps.core.utils import normalize_phone
 from .models import User
 
 
 class PhoneOrEmailBackend(ModelBackend):
     """電話番号またはメールアドレスで認証するバックエンド"""
 
+    # パスワードを照合する候補の上限（ハッシュ計算の回数を抑える）
+    MAX_CANDIDATES = 5
+
     def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            # SimpleJWT は USERNAME_FIELD（email）の名前で渡す
+            username = kwargs.get(User.USERNAME_FIELD)
         if username is None or password is None:
             return None
 
-        # 電話番号の正規化（ハイフンや空白を除去）
-        normalized_phone = ''.join(c for c in username if c.isdigit())
+        # メールアドレスまたは電話番号でユーザーを検索（正規化列のインデックスを使用）
+        # （ログイン応答のプロフィール用に保護者・最寄り校舎も同じクエリで取得。
+        #   大文字小文字違いの重複メールは正規化列が空のためメールアドレスで照合し、
+        #   複数ユーザーが見つかった場合はパスワードが一致する最初のものを使用）
+        users = User.objects.with_email(username)
+        normalized_phone = normalize_phone(username)
+        if normalized_phone and '@' not in username:
+            users = users | User.objects.filter(phone_normalized=normalized_phone)
+        users = users.select_related(
+            'guardian_profile', 'guardian_profile__nearest_school'
+        ).filter(
+            is_active=True,
+            deleted_at__isnull=True
+        ).order_by('created_at', 'id')
 
-        try:
-            # メールアドレスまたは電話番号でユーザーを検索
-            user = User.objects.get(
-                Q(email__iexact=username) |
-                Q(phone=username) |
-                Q(phone=normalized_phone),
-                is_active=True,
-                deleted_at__isnull=True
-            )
-        except User.DoesNotExist:
-            return None
-        except User.MultipleObjectsReturned:
-            # 複数ユーザーが見つかった場合は最初のものを使用
-            user = User.objects.filter(
-                Q(email__iexact=username) |
-                Q(phone=username) |
-                Q(phone=normalized_phone),
-                is_active=True,
-                deleted_at__isnull=True
-            ).first()
-            if user is None:
-                return None
-
-        if user.check_password(password):
-            return user
+        for user in users[:self.MAX_CANDIDATES]:
+            if user.check_password(password):
+                return user
         return None
 
     def get_user(self, user_id):
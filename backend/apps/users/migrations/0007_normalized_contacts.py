@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:11
+
+from django.db import migrations, models
+
+from apps.core.utils import normalize_email, normalize_phone
+
+
+def backfill_normalized_contacts(apps, schema_editor):
+    """既存ユーザーの正規化済み連絡先を設定（大文字小文字違いの重複メールは先に登録された方のみ）"""
+    User = apps.get_model("users", "User")
+    seen = set()
+    batch = []
+    for user in User.objects.only("id", "email", "phone").order_by("created_at", "id").iterator(chunk_size=2000):
+        email = normalize_email(user.email) or None
+        if email in seen:
+            email = None
+        elif email:
+            seen.add(email)
+        user.email_normalized = email
+        user.phone_normalized = normalize_phone(user.phone) or None
+        batch.append(user)
+        if len(batch) >= 2000:
+            User.objects.bulk_update(batch, ["email_normalized", "phone_normalized"])
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, ["email_normalized", "phone_normalized"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0006_add_user_qr_code"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="email_normalized",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=254,
+                null=True,
+                unique=True,
+                verbose_name="メールアドレス（正規化）",
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="phone_normalized",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=20,
+                null=True,
+                verbose_name="電話番号（正規化）",
+            ),
+        ),
+        migrations.RunPython(backfill_normalized_contacts, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 
+from apps.core.utils import normalize_email, normalize_phone
+
 
 class UserManager(BaseUserManager):
     """カスタムユーザーマネージャー"""
@@ -40,6 +42,28 @@ class UserManager(BaseUserManager):
         """有効なユーザーのみ取得"""
         return self.filter(is_active=True, deleted_at__isnull=True)
 
+    def with_email(self, email):
+        """
+        メールアドレスで検索（大文字小文字を区別しない。正規化列の一意インデックスを使用）
+
+        大文字小文字違いの重複で正規化列が空のユーザーはメールアドレスで照合する。
+        """
+        normalized = normalize_email(email)
+        if not normalized:
+            return self.none()
+        return self.filter(
+            models.Q(email_normalized=normalized)
+            | models.Q(email_normalized__isnull=True, email__iexact=normalized)
+        )
+
+    def with_phone(self, phone):
+        """電話番号で検索（ハイフン・空白・全角を区別しない。正規化列のインデックスを使用）"""
+        normalized = normalize_phone(phone)
+        if not normalized:
+            # 数字を含まない入力（phone_normalized IS NULL で電話番号のない全ユーザーに一致させない）
+            return self.none()
+        return self.filter(phone_normalized=normalized)
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     """カスタムユーザーモデル (T16)"""
@@ -146,6 +170,24 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name='LINE ID'
     )
 
+    # 検索用の正規化済み連絡先（save() で設定。重複チェック・ログイン時の検索に使用）
+    email_normalized = models.CharField(
+        max_length=254,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='メールアドレス（正規化）'
+    )
+    phone_normalized = models.CharField(
+        max_length=20,
+        db_index=True,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='電話番号（正規化）'
+    )
+
     # プロフィール
     profile_image_url = models.URLField(
         max_length=500,
@@ -302,6 +344,34 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.email} ({self.full_name})"
 
+    # 正規化済みの列と元の列
+    NORMALIZED_FIELDS = {
+        'email': ('email_normalized', normalize_email),
+        'phone': ('phone_normalized', normalize_phone),
+    }
+
+    def save(self, *args, **kwargs):
+        # 検索用の正規化済み連絡先を設定（読み込んでいない列は変更しない）
+        deferred = self.get_deferred_fields()
+        update_fields = kwargs.get('update_fields')
+        for source, (target, normalize) in self.NORMALIZED_FIELDS.items():
+            if source in deferred:
+                continue
+            value = normalize(getattr(self, source)) or None
+            if source == 'email' and value and value != self.email_normalized and self._email_taken(value):
+                # 大文字小文字違いの重複は正規化列を空のままにする（with_email はメールアドレスで照合）
+                value = None
+            setattr(self, target, value)
+            if update_fields is not None and source in update_fields:
+                update_fields = [*update_fields, target]
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def _email_taken(self, normalized):
+        """正規化済みメールアドレスを他のユーザーが使用しているか"""
+        return type(self)._default_manager.filter(email_normalized=normalized).exclude(pk=self.pk).exists()
+
     @property
     def full_name(self):
         """フルネーム"""
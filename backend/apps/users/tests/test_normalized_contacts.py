@@ -0,0 +1,74 @@
+"""
+Normalized Contacts Tests - 正規化済み連絡先（大文字小文字違いの重複メール）とログインのテスト
+"""
+import os
+
+import pytest
+
+from apps.users.backends import PhoneOrEmailBackend
+from apps.users.models import User
+
+requires_postgres = pytest.mark.skipif(
+    not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+    reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+)
+
+
+@pytest.mark.unit
+class TestEmptyContacts:
+    """正規化すると空になる入力は誰にも一致しない（正規化列が NULL のユーザーに一致させない）"""
+
+    @pytest.mark.parametrize('phone', ['', None, 'abc', '---'])
+    def test_with_phone(self, phone):
+        assert User.objects.with_phone(phone).query.is_empty()
+
+    @pytest.mark.parametrize('email', ['', None, '   '])
+    def test_with_email(self, email):
+        assert User.objects.with_email(email).query.is_empty()
+
+
+@pytest.fixture
+def duplicates():
+    """移行前から存在する大文字小文字違いの重複（後から登録された方は正規化列が空）"""
+    first = User.objects.create_user(email='dup@example.com', password='first-pass', last_name='先', first_name='一郎')
+    second = User.objects.create_user(email='Dup@Example.com', password='second-pass', last_name='後', first_name='二郎')
+    return first, second
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+@requires_postgres
+class TestDuplicateEmail:
+
+    def test_save_keeps_duplicate_empty(self, duplicates):
+        first, second = duplicates
+        assert first.email_normalized == 'dup@example.com'
+        assert second.email_normalized is None
+
+        # 再保存しても一意インデックスと衝突しない
+        second.first_name = '三郎'
+        second.save()
+        second.save(update_fields=['email', 'first_name'])
+        second.refresh_from_db()
+        assert (second.first_name, second.email_normalized) == ('三郎', None)
+
+    def test_with_email_finds_both(self, duplicates):
+        assert set(User.objects.with_email(' DUP@example.com ')) == set(duplicates)
+        assert not User.objects.with_email('').exists()
+
+    def test_both_can_log_in(self, duplicates):
+        first, second = duplicates
+        backend = PhoneOrEmailBackend()
+
+        assert backend.authenticate(None, username='dup@example.com', password='first-pass') == first
+        assert backend.authenticate(None, username='Dup@Example.com', password='second-pass') == second
+        assert backend.authenticate(None, username='dup@example.com', password='wrong') is None
+
+    def test_normalized_value_is_set_after_owner_changes_email(self, duplicates):
+        first, second = duplicates
+        first.email = 'renamed@example.com'
+        first.save()
+
+        second.save()
+        second.refresh_from_db()
+        assert second.email_normalized == 'dup@example.com'
@@ -4,6 +4,7 @@ Django settings for OZA System project - Base Configuration
 import os
 from pathlib import Path
 from datetime import timedelta
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -73,6 +74,7 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'apps.tenants.middleware.TenantMiddleware',
+    'apps.tenants.middleware.FeaturePermissionMiddleware',  # 機能権限（役職ビットセット）
     'apps.core.logging.RequestLoggingMiddleware',  # リクエストログ
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -182,7 +184,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -210,6 +212,16 @@ REST_FRAMEWORK = {
     'JSON_UNDERSCOREIZE': {
         'no_underscore_before_number': True,
     },
+    # 公開APIのレート制限（apps.core.throttling。ビュークラスごとに集計）
+    'DEFAULT_THROTTLE_RATES': {
+        'lookup_ip': os.environ.get('THROTTLE_LOOKUP_IP', '20/min'),
+        'lookup_tenant': os.environ.get('THROTTLE_LOOKUP_TENANT', '600/min'),
+        'public_ip': os.environ.get('THROTTLE_PUBLIC_IP', '120/min'),
+        'public_tenant': os.environ.get('THROTTLE_PUBLIC_TENANT', '3000/min'),
+    },
+    # IP単位の制限で X-Forwarded-For を信頼するプロキシの段数（既定は信頼せず接続元アドレスを使用。
+    # nginx 経由の環境では API_NUM_PROXIES=1 を設定する）
+    'NUM_PROXIES': int(os.environ.get('API_NUM_PROXIES', 0)),
 }
 
 
@@ -297,6 +309,38 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    # 授業実施日（LessonOccurrence）の定期生成
+    'generate-lesson-occurrences': {
+        'task': 'apps.schools.tasks.generate_lesson_occurrences_task',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    # Googleカレンダーの差分同期
+    'sync-google-calendars': {
+        'task': 'apps.schools.tasks.sync_google_calendars_task',
+        'schedule': crontab(minute='*/5'),
+    },
+    # 出欠集計の作り直し（未使用チケットの期限切れを反映）
+    'rebuild-attendance-stats': {
+        'task': 'apps.lessons.tasks.rebuild_attendance_stats_task',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    # 未完了タスクの件数集計の作り直し（直接更新による差分の解消）
+    'reconcile-task-counters': {
+        'task': 'apps.tasks.tasks.reconcile_task_counters_task',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    # 勤怠の月次締め（前月の月次集計を保持）
+    'close-hr-attendance-month': {
+        'task': 'apps.hr.tasks.close_hr_attendance_month_task',
+        'schedule': crontab(day_of_month=1, hour=5, minute=0),
+    },
+    # キオスク用の校舎スナップショットの事前構築
+    'prewarm-kiosk-snapshots': {
+        'task': 'apps.lessons.tasks.prewarm_kiosk_snapshots_task',
+        'schedule': crontab(hour=6, minute=0),
+    },
+}
 
 
 # Google Calendar Configuration
@@ -305,6 +349,10 @@ GOOGLE_CALENDAR_CREDENTIALS_PATH = os.environ.get('GOOGLE_CALENDAR_CREDENTIALS_P
 
 # Default calendar ID (can be overridden per-request)
 GOOGLE_CALENDAR_DEFAULT_CALENDAR_ID = os.environ.get('GOOGLE_CALENDAR_DEFAULT_CALENDAR_ID', 'primary')
+# ローカルへ同期するカレンダーID（カンマ区切り）。これ以外は管理画面・sync_google_calendars で登録する
+GOOGLE_CALENDAR_SYNC_CALENDAR_IDS = [
+    c.strip() for c in os.environ.get('GOOGLE_CALENDAR_SYNC_CALENDAR_IDS', '').split(',') if c.strip()
+]
 
 
 # Logging
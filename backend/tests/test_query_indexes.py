@@ -0,0 +1,229 @@
+"""
+複合インデックス・部分インデックスの回帰テスト
+
+よく使われる絞り込み（テナント + 年月、生徒 + 請求月 など）が、追加した
+複合インデックス・部分インデックス（deleted_at IS NULL / is_deleted = false）を
+使うことを実行計画（EXPLAIN）で確認します。インデックス名の変更・削除や、
+クエリの条件がインデックスと合わなくなった（部分インデックスの条件が抜けた等）場合に失敗します。
+
+テスト用DBの行数は少ないため、シーケンシャルスキャンを無効にして計画を比較します。
+公開サイトのカレンダー・体験予約は、サービス・ビューを実行して発行されたSQLの計画を確認します。
+
+実行方法:
+    docker compose exec backend pytest tests/test_query_indexes.py -v
+"""
+import os
+import uuid
+from datetime import date, time
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+        reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+    ),
+]
+
+TENANT_ID = uuid.uuid4()
+
+
+def plan(queryset):
+    """シーケンシャルスキャンを無効にした実行計画（テストのトランザクション内のみ）"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+def executed_plans(table, func):
+    """func の実行中に発行された table への SELECT の実行計画（発行順）"""
+    with CaptureQueriesContext(connection) as captured:
+        func()
+    queries = [
+        q['sql'] for q in captured.captured_queries
+        if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql']
+    ]
+    assert queries, f'{table} への問い合わせがありません'
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plans = []
+        for sql in queries:
+            cursor.execute(f'EXPLAIN {sql}')
+            plans.append('\n'.join(row[0] for row in cursor.fetchall()))
+    return plans
+
+
+def test_confirmed_billing_by_tenant_and_period():
+    from apps.billing.models import ConfirmedBilling
+
+    queryset = ConfirmedBilling.objects.filter(
+        tenant_id=TENANT_ID, year=2026, month=4, deleted_at__isnull=True,
+    )
+    assert 'cb_tenant_period_live_idx' in plan(queryset)
+
+
+def test_student_items_by_student_and_month():
+    from apps.contracts.models import StudentItem
+
+    queryset = StudentItem.objects.filter(
+        student_id=uuid.uuid4(), billing_month='2026-04', is_billed=False, deleted_at__isnull=True,
+    )
+    assert 'si_student_month_billed_idx' in plan(queryset)
+
+
+def test_student_items_by_tenant_and_month():
+    from apps.contracts.models import StudentItem
+
+    queryset = StudentItem.objects.filter(
+        tenant_id=TENANT_ID, billing_month='2026-04', deleted_at__isnull=True,
+    )
+    assert 'si_tenant_month_live_idx' in plan(queryset)
+
+
+def test_channel_messages():
+    from apps.communications.models import Message
+
+    queryset = Message.objects.filter(channel_id=uuid.uuid4(), is_deleted=False).order_by('created_at')
+    assert 'comm_msg_channel_live_idx' in plan(queryset)
+
+
+def test_bank_transfers_by_import_batch():
+    from apps.billing.models import BankTransfer
+
+    queryset = BankTransfer.objects.filter(
+        tenant_id=TENANT_ID, import_batch_id=str(uuid.uuid4()), status='pending', deleted_at__isnull=True,
+    )
+    assert 'bt_tenant_batch_status_idx' in plan(queryset)
+
+
+# ---------------------------------------------------------------------------
+# 公開サイトのカレンダー・体験予約（サービス・ビューが発行するクエリ）
+# ---------------------------------------------------------------------------
+LESSON_DATE = date(2026, 4, 6)
+
+
+@pytest.fixture
+def school(tenant):
+    from apps.schools.models import School
+
+    return School.objects.create(tenant_ref=tenant, school_code='IDX_SCHOOL', school_name='索引校', is_active=True)
+
+
+@pytest.fixture
+def brand(tenant):
+    from apps.schools.models import Brand
+
+    return Brand.objects.create(tenant_ref=tenant, brand_code='IDX_BRAND', brand_name='索引', is_active=True)
+
+
+@pytest.fixture
+def class_schedule(tenant, school, brand):
+    from apps.schools.models import ClassSchedule
+
+    return ClassSchedule.objects.create(
+        tenant_id=tenant.id, schedule_code='IDX1', school=school, brand=brand,
+        day_of_week=1, period=1, start_time=time(17, 0), end_time=time(18, 0), class_name='月曜', capacity=10,
+    )
+
+
+@pytest.fixture
+def closed_day(tenant, school, brand):
+    from apps.schools.models import LessonCalendar
+
+    return LessonCalendar.objects.create(
+        tenant_ref=tenant, calendar_code='IDX_CAL', school=school, brand=brand,
+        lesson_date=LESSON_DATE, day_of_week='月', is_open=False,
+    )
+
+
+def _get(view_class, params):
+    request = APIRequestFactory().get('/', params)
+    return view_class.as_view()(request)
+
+
+def test_trial_availability_calendar():
+    from apps.schools.services.trial_availability import compute_monthly_availability
+
+    plans = executed_plans(
+        't13_lesson_calendars', lambda: compute_monthly_availability(uuid.uuid4(), uuid.uuid4(), 2026, 4),
+    )
+    assert 'lc_school_brand_date_idx' in plans[0]
+
+
+def test_public_calendar_seats():
+    from apps.schools.views.calendar.public import PublicCalendarSeatsView
+
+    plans = executed_plans('t13_lesson_calendars', lambda: _get(PublicCalendarSeatsView, {
+        'school_id': str(uuid.uuid4()), 'brand_id': str(uuid.uuid4()), 'year': 2026, 'month': 4,
+    }))
+    assert 'lc_school_brand_date_idx' in plans[0]
+
+
+def test_public_lesson_calendar(school, brand, closed_day):
+    from apps.schools.views.calendar.public import PublicLessonCalendarView
+
+    plans = executed_plans('t13_lesson_calendars', lambda: _get(PublicLessonCalendarView, {
+        'school_id': str(school.id), 'brand_id': str(brand.id), 'year': 2026, 'month': 4,
+    }))
+    # 最後が校舎・ブランド・期間で絞り込んだ一覧
+    assert 'lc_school_brand_date_idx' in plans[-1]
+
+
+def test_trial_booking_closed_day(tenant, school, brand, class_schedule, closed_day):
+    from apps.schools.views.trial.booking import PublicTrialBookingView
+    from apps.students.models import Student
+
+    student = Student.objects.create(
+        tenant_ref=tenant, student_no='IDX001', last_name='索引', first_name='太郎',
+        primary_school=school, primary_brand=brand,
+    )
+    request = APIRequestFactory().post('/', {
+        'student_id': str(student.id), 'school_id': str(school.id), 'brand_id': str(brand.id),
+        'schedule_id': str(class_schedule.id), 'trial_date': LESSON_DATE.isoformat(),
+    }, format='json')
+    force_authenticate(request, user=SimpleNamespace(is_authenticated=True))
+
+    responses = []
+    plans = executed_plans('t13_lesson_calendars', lambda: responses.append(PublicTrialBookingView.as_view()(request)))
+
+    assert responses[0].status_code == 400
+    assert 'lc_school_brand_date_idx' in plans[0]
+
+
+def test_trial_count_refresh(tenant, class_schedule):
+    from apps.schools.services.occupancy import ScheduleOccupancyService
+
+    plans = executed_plans(
+        't03_trial_bookings',
+        lambda: ScheduleOccupancyService.refresh_dates([(tenant.id, class_schedule.id, LESSON_DATE)]),
+    )
+    # schedule_id / class_schedule_id のどちらかに一致する予約（BitmapOr）
+    assert 'trial_sched_date_status_idx' in plans[0]
+    assert 'trial_cls_date_status_idx' in plans[0]
+
+
+def test_capture_hot_queries_prepared_generic_plan():
+    """PostgreSQL 15 以前の --explain（プリペアド文の汎用プラン）"""
+    from apps.core.management.commands.capture_hot_queries import PLAN_STATEMENT, Command
+
+    query = (
+        'SELECT "id" FROM "t13_lesson_calendars" WHERE "school_id" = $1 AND "brand_id" = $2 '
+        'AND "lesson_date" >= $3 AND "lesson_date" <= $4 AND "deleted_at" IS NULL'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        lines = Command()._prepared_generic_plan(cursor, query)
+        cursor.execute('SELECT COUNT(*) FROM pg_prepared_statements WHERE name = %s', [PLAN_STATEMENT])
+        remaining = cursor.fetchone()[0]
+
+    assert 'lc_school_brand_date_idx' in '\n'.join(lines)
+    assert remaining == 0
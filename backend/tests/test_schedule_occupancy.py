@@ -0,0 +1,210 @@
+"""
+座席占有数（在籍数・日別の欠席/振替/体験数）の再集計テスト
+
+体験予約・キャンセル・振替（欠席チケットの使用）・在籍の変更で
+ClassSchedule.enrolled_count / ScheduleOccupancy が実際の件数と一致することを確認します。
+
+実行方法:
+    docker compose exec backend pytest tests/test_schedule_occupancy.py -v
+"""
+import os
+from datetime import date, time, timedelta
+
+import pytest
+
+from apps.lessons.models import AbsenceTicket
+from apps.schools.models import ClassSchedule, ScheduleOccupancy
+from apps.schools.services.occupancy import ScheduleOccupancyService
+from apps.students.models import StudentSchool, TrialBooking
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        not os.environ.get('USE_POSTGRES_FOR_TESTS'),
+        reason="Requires PostgreSQL. Set USE_POSTGRES_FOR_TESTS=1 or run in Docker."
+    ),
+]
+
+LESSON_DATE = date(2026, 4, 6)
+
+
+def _schedule(tenant, school, brand, code):
+    return ClassSchedule.objects.create(
+        tenant_id=tenant.id, schedule_code=code, school=school, brand=brand,
+        day_of_week=1, period=1, start_time=time(17, 0), end_time=time(18, 0),
+        class_name=f'クラス{code}', capacity=10,
+    )
+
+
+def _occupancy(schedule):
+    row = ScheduleOccupancy.objects.filter(schedule_id=schedule.id, date=LESSON_DATE).first()
+    return (row.absence_count, row.makeup_count, row.trial_count) if row else (0, 0, 0)
+
+
+@pytest.fixture
+def brand(tenant):
+    from apps.schools.models import Brand
+
+    return Brand.objects.create(tenant_ref=tenant, brand_code='OCC_BRAND', brand_name='座席テスト', is_active=True)
+
+
+@pytest.fixture
+def school(tenant):
+    from apps.schools.models import School
+
+    return School.objects.create(tenant_ref=tenant, school_code='OCC_SCHOOL', school_name='座席テスト校', is_active=True)
+
+
+@pytest.fixture
+def student(tenant, school, brand):
+    from apps.students.models import Student
+
+    return Student.objects.create(
+        tenant_ref=tenant, student_no='OCC001', last_name='座席', first_name='太郎',
+        primary_school=school, primary_brand=brand,
+    )
+
+
+@pytest.fixture
+def schedules(tenant, school, brand):
+    return _schedule(tenant, school, brand, 'A'), _schedule(tenant, school, brand, 'B')
+
+
+def _trial(tenant, student, school, brand, schedule, **kwargs):
+    return TrialBooking.objects.create(
+        tenant_id=tenant.id, student=student, school=school, brand=brand,
+        class_schedule=schedule, trial_date=LESSON_DATE, **kwargs,
+    )
+
+
+def _absence(tenant, student, schedule, **kwargs):
+    return AbsenceTicket.objects.create(
+        tenant_id=tenant.id, student=student, class_schedule=schedule,
+        absence_date=LESSON_DATE, valid_until=LESSON_DATE + timedelta(days=60), **kwargs,
+    )
+
+
+class TestTrialBooking:
+
+    def test_booking_and_cancel(self, tenant, student, school, brand, schedules):
+        first = _trial(tenant, student, school, brand, schedules[0], status='pending')
+        _trial(tenant, student, school, brand, schedules[0], status='confirmed')
+        assert _occupancy(schedules[0]) == (0, 0, 2)
+        assert TrialBooking.get_booked_count(schedules[0].id, LESSON_DATE) == 2
+
+        first.status = 'cancelled'
+        first.save()
+        assert _occupancy(schedules[0]) == (0, 0, 1)
+
+    def test_moving_booking(self, tenant, student, school, brand, schedules):
+        booking = _trial(tenant, student, school, brand, schedules[0], status='pending')
+
+        booking.class_schedule = schedules[1]
+        booking.save(update_fields=['class_schedule'])
+
+        assert _occupancy(schedules[0]) == (0, 0, 0)
+        assert _occupancy(schedules[1]) == (0, 0, 1)
+
+    def test_delete(self, tenant, student, school, brand, schedules):
+        booking = _trial(tenant, student, school, brand, schedules[0], status='pending')
+        booking.delete()
+        assert _occupancy(schedules[0]) == (0, 0, 0)
+
+
+class TestAbsenceAndTransfer:
+
+    def test_absence_and_cancel(self, tenant, student, schedules):
+        ticket = _absence(tenant, student, schedules[0], status=AbsenceTicket.Status.ISSUED)
+        assert _occupancy(schedules[0]) == (1, 0, 0)
+
+        ticket.status = AbsenceTicket.Status.CANCELLED
+        ticket.save(update_fields=['status'])
+        assert _occupancy(schedules[0]) == (0, 0, 0)
+
+    def test_transfer_counts_on_both_schedules(self, tenant, student, schedules):
+        ticket = _absence(tenant, student, schedules[0], status=AbsenceTicket.Status.ISSUED)
+
+        # 振替先で使用
+        ticket.status = AbsenceTicket.Status.USED
+        ticket.used_class_schedule = schedules[1]
+        ticket.used_date = LESSON_DATE
+        ticket.save()
+        assert _occupancy(schedules[0]) == (1, 0, 0)
+        assert _occupancy(schedules[1]) == (0, 1, 0)
+        schedules[1].refresh_from_db()
+        assert ScheduleOccupancyService.available_makeup_seats(
+            schedules[1], ScheduleOccupancyService.get_date_occupancy([schedules[1].id], LESSON_DATE, LESSON_DATE)[
+                (schedules[1].id, LESSON_DATE)
+            ],
+        ) == 9
+
+        # 振替先の変更
+        ticket.used_class_schedule = schedules[0]
+        ticket.save()
+        assert _occupancy(schedules[1]) == (0, 0, 0)
+        assert _occupancy(schedules[0]) == (1, 1, 0)
+
+
+class TestEnrollment:
+
+    def test_enrolled_count(self, tenant, student, school, brand, schedules):
+        enrollment = StudentSchool.objects.create(
+            tenant_id=tenant.id, student=student, school=school, brand=brand,
+            class_schedule=schedules[0], start_date=LESSON_DATE,
+            enrollment_status=StudentSchool.EnrollmentStatus.ACTIVE,
+        )
+        schedules[0].refresh_from_db()
+        assert schedules[0].enrolled_count == 1
+
+        # 別のクラスへ移動
+        enrollment.class_schedule = schedules[1]
+        enrollment.save()
+        for schedule in schedules:
+            schedule.refresh_from_db()
+        assert (schedules[0].enrolled_count, schedules[1].enrolled_count) == (0, 1)
+
+        enrollment.enrollment_status = StudentSchool.EnrollmentStatus.ENDED
+        enrollment.save(update_fields=['enrollment_status'])
+        schedules[1].refresh_from_db()
+        assert schedules[1].enrolled_count == 0
+
+
+class TestRebuild:
+
+    def test_rebuild_matches_incremental(self, tenant, student, school, brand, schedules):
+        _trial(tenant, student, school, brand, schedules[0], status='pending')
+        ticket = _absence(tenant, student, schedules[0], status=AbsenceTicket.Status.USED)
+        AbsenceTicket.objects.filter(pk=ticket.pk).update(used_class_schedule=schedules[1], used_date=LESSON_DATE)
+
+        ScheduleOccupancyService.rebuild(tenant_id=tenant.id)
+
+        assert _occupancy(schedules[0]) == (1, 0, 1)
+        assert _occupancy(schedules[1]) == (0, 1, 0)
+
+    def test_migration_backfill_matches_rebuild(self, tenant, student, school, brand, schedules):
+        """0028 のマイグレーション（マイグレーション時点のモデルで集計）とサービスの結果が一致する"""
+        import importlib
+
+        from django.apps import apps
+
+        migration = importlib.import_module('apps.schools.migrations.0028_rebuild_schedule_occupancy')
+
+        _trial(tenant, student, school, brand, schedules[0], status='pending')
+        ticket = _absence(tenant, student, schedules[0], status=AbsenceTicket.Status.USED)
+        AbsenceTicket.objects.filter(pk=ticket.pk).update(used_class_schedule=schedules[1], used_date=LESSON_DATE)
+        StudentSchool.objects.create(
+            tenant_id=tenant.id, student=student, school=school, brand=brand,
+            class_schedule=schedules[1], start_date=LESSON_DATE,
+            enrollment_status=StudentSchool.EnrollmentStatus.ACTIVE,
+        )
+        ScheduleOccupancy.objects.all().delete()
+        ClassSchedule.objects.update(enrolled_count=0)
+
+        migration.rebuild_occupancy(apps, None)
+
+        assert _occupancy(schedules[0]) == (1, 0, 1)
+        assert _occupancy(schedules[1]) == (0, 1, 0)
+        assert ScheduleOccupancy.objects.get(schedule_id=schedules[0].id, date=LESSON_DATE).tenant_id == tenant.id
+        assert list(ClassSchedule.objects.filter(pk__in=[s.pk for s in schedules]).order_by('schedule_code')
+                    .values_list('enrolled_count', flat=True)) == [0, 1]